@@ -1,5 +1,6 @@
 using System;
 using System.Collections.Concurrent;
+using System.Collections.Generic;
 using System.Diagnostics;
 using System.IO;
 using System.Runtime.InteropServices;
@@ -29,8 +30,15 @@ namespace TcAutomation.Commands
     ///   ensure-solution  {solutionPath, tcVersion?}  → opens or reloads solution
     ///   execute-step     {command, args}             → runs a StepDispatcher step
     ///   status                                        → current host/DTE state
+    ///   cancel           {id}                         → cancel a queued or running request
     ///   shutdown                                      → clean exit
     ///
+    /// "cancel" is answered by the stdin reader thread, out of band, so it
+    /// works while the STA thread is busy. A queued target is dropped (it is
+    /// answered with an error when its turn comes); a running target gets
+    /// StepCancellation.Request(), which polling steps honour. The result
+    /// says which: {"id": target, "state": "dropped"|"running"|"not-found"}.
+    ///
     /// Lifecycle guarantees:
     ///   1. Parent-death watchdog thread kills DTE and exits if MCP server dies.
     ///   2. Session file (Core.SessionFile) records mcpPid/hostPid/dtePid with
@@ -56,6 +64,14 @@ namespace TcAutomation.Commands
         private static int _callsServed;
         private static readonly DateTime _startedUtc = DateTime.UtcNow;
 
+        // Request ids read from stdin but not yet started, ids cancelled
+        // while queued, and the id running on the STA thread. Guarded by
+        // RequestStateLock (touched by the reader and the STA thread).
+        private static readonly object RequestStateLock = new object();
+        private static readonly HashSet<int> QueuedIds = new HashSet<int>();
+        private static readonly HashSet<int> CancelledIds = new HashSet<int>();
+        private static int? _runningRequestId;
+
         public static int Execute(int mcpPid, int? parentPollMs)
         {
             int hostPid = Process.GetCurrentProcess().Id;
@@ -131,6 +147,8 @@ namespace TcAutomation.Commands
                     string? line;
                     while ((line = Console.In.ReadLine()) != null)
                     {
+                        // Cancels must not queue behind the step they target.
+                        if (TryHandleCancel(line)) continue;
                         lines.Add(line);
                     }
                 }
@@ -202,6 +220,12 @@ namespace TcAutomation.Commands
                     return;
                 }
 
+                if (!BeginRequest(requestId))
+                {
+                    EmitError(requestId, "Cancelled by client before it started", sw);
+                    return;
+                }
+
                 switch (method)
                 {
                     case "ensure-solution":
@@ -238,6 +262,106 @@ namespace TcAutomation.Commands
             {
                 EmitError(requestId, $"{ex.GetType().Name}: {ex.Message}", sw);
             }
+            finally
+            {
+                EndRequest(requestId);
+            }
+        }
+
+        // ================ Cancellation ================
+
+        /// <summary>
+        /// Runs on the stdin reader thread. Answers "cancel" lines directly
+        /// and records the id of every other request as queued. Returns true
+        /// if the line was a cancel (and must not reach the request loop).
+        /// </summary>
+        private static bool TryHandleCancel(string line)
+        {
+            int? requestId = null;
+            string? method = null;
+            int? targetId = null;
+            try
+            {
+                using var doc = JsonDocument.Parse(line);
+                var root = doc.RootElement;
+                if (root.ValueKind != JsonValueKind.Object) return false;
+                if (root.TryGetProperty("id", out var idEl) && idEl.ValueKind == JsonValueKind.Number)
+                    requestId = idEl.GetInt32();
+                if (root.TryGetProperty("method", out var methodEl) && methodEl.ValueKind == JsonValueKind.String)
+                    method = methodEl.GetString();
+                if (root.TryGetProperty("params", out var paramsEl) && paramsEl.ValueKind == JsonValueKind.Object
+                    && paramsEl.TryGetProperty("id", out var targetEl) && targetEl.ValueKind == JsonValueKind.Number)
+                    targetId = targetEl.GetInt32();
+            }
+            catch (JsonException)
+            {
+                return false; // the request loop reports the parse error
+            }
+
+            if (method != "cancel")
+            {
+                if (requestId.HasValue)
+                {
+                    lock (RequestStateLock) { QueuedIds.Add(requestId.Value); }
+                }
+                return false;
+            }
+
+            var sw = Stopwatch.StartNew();
+            if (!targetId.HasValue)
+            {
+                EmitError(requestId, "cancel requires params.id", sw);
+                return true;
+            }
+
+            string state;
+            lock (RequestStateLock)
+            {
+                if (QueuedIds.Contains(targetId.Value))
+                {
+                    CancelledIds.Add(targetId.Value);
+                    state = "dropped";
+                }
+                else if (_runningRequestId == targetId)
+                {
+                    StepCancellation.Request();
+                    state = "running";
+                }
+                else
+                {
+                    state = "not-found";
+                }
+            }
+            EmitProgress($"host: cancel request {targetId.Value} ({state})");
+            EmitOk(requestId, new { id = targetId.Value, state }, sw);
+            return true;
+        }
+
+        /// <summary>
+        /// Marks a request as running on the STA thread. Returns false if it
+        /// was cancelled while still queued.
+        /// </summary>
+        private static bool BeginRequest(int? requestId)
+        {
+            StepCancellation.Reset();
+            if (!requestId.HasValue) return true;
+            lock (RequestStateLock)
+            {
+                QueuedIds.Remove(requestId.Value);
+                if (CancelledIds.Remove(requestId.Value)) return false;
+                _runningRequestId = requestId;
+                return true;
+            }
+        }
+
+        private static void EndRequest(int? requestId)
+        {
+            lock (RequestStateLock)
+            {
+                if (requestId.HasValue) QueuedIds.Remove(requestId.Value);
+                if (_runningRequestId == requestId) _runningRequestId = null;
+                StepCancellation.Reset();
+            }
         }
 
         // ================ Method handlers ================
@@ -482,7 +606,7 @@ namespace TcAutomation.Commands
 
             if (_sessionFile != null)
             {
-                try { SessionFile.Delete(_sessionFile.McpPid); } catch { }
+                try { SessionFile.Delete(_sessionFile.McpPid, _sessionFile.HostPid); } catch { }
             }
         }
 
@@ -585,7 +709,7 @@ namespace TcAutomation.Commands
 
                 if (_sessionFile != null)
                 {
-                    try { SessionFile.Delete(_sessionFile.McpPid); } catch { }
+                    try { SessionFile.Delete(_sessionFile.McpPid, _sessionFile.HostPid); } catch { }
                 }
 
                 try { Environment.Exit(2); } catch { }
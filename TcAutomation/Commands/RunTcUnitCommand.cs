@@ -355,7 +355,7 @@ namespace TcAutomation.Commands
                 bool plcRunning = false;
                 int waitAttempts = 0;
 
-                while (DateTime.Now < timeout)
+                while (DateTime.Now < timeout && !StepCancellation.IsRequested)
                 {
                     try
                     {
@@ -387,7 +387,15 @@ namespace TcAutomation.Commands
                         // Disconnect and retry
                         try { adsClient.Disconnect(); } catch { }
                     }
-                    Thread.Sleep(2000);
+                    StepCancellation.Sleep(2000);
+                }
+
+                if (StepCancellation.IsRequested)
+                {
+                    result.Success = false;
+                    result.ErrorMessage = "Cancelled by client";
+                    Progress("wait", "Cancelled while waiting for Run state");
+                    return result;
                 }
 
                 if (!plcRunning)
@@ -411,7 +419,13 @@ namespace TcAutomation.Commands
 
                 while (DateTime.Now < timeout)
                 {
-                    Thread.Sleep(5000);
+                    if (StepCancellation.Sleep(5000))
+                    {
+                        result.Success = false;
+                        result.ErrorMessage = "Cancelled by client";
+                        Progress("poll", "Cancelled while polling for TcUnit results");
+                        return result;
+                    }
                     pollCount++;
 
                     // Check PLC state
@@ -9,7 +9,10 @@ namespace TcAutomation.Core
 {
     /// <summary>
     /// Describes a persistent host session tied to a specific MCP server process.
-    /// Serialized to %LOCALAPPDATA%\twincat-mcp\session-&lt;mcpPid&gt;.json.
+    /// Serialized to %LOCALAPPDATA%\twincat-mcp\session-&lt;mcpPid&gt;-&lt;hostPid&gt;.json.
+    /// One MCP server may run several hosts (shell host, ADS host), so the
+    /// host PID is part of the name to keep their files from clobbering
+    /// each other.
     ///
     /// The session file is the out-of-band contract that lets us clean up after
     /// ANY combination of crashes:
@@ -78,12 +81,13 @@ namespace TcAutomation.Core
             }
         }
 
-        public static string PathFor(int mcpPid) => Path.Combine(SessionDir, $"session-{mcpPid}.json");
+        public static string PathFor(int mcpPid, int hostPid) =>
+            Path.Combine(SessionDir, $"session-{mcpPid}-{hostPid}.json");
 
         public void Save()
         {
             Directory.CreateDirectory(SessionDir);
-            string path = PathFor(McpPid);
+            string path = PathFor(McpPid, HostPid);
             string tmp = path + ".tmp";
 
             File.WriteAllText(tmp, JsonSerializer.Serialize(this, JsonOptions));
@@ -106,11 +110,11 @@ namespace TcAutomation.Core
             }
         }
 
-        public static void Delete(int mcpPid)
+        public static void Delete(int mcpPid, int hostPid)
         {
             try
             {
-                string path = PathFor(mcpPid);
+                string path = PathFor(mcpPid, hostPid);
                 if (File.Exists(path)) File.Delete(path);
             }
             catch { }
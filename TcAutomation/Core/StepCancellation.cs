@@ -0,0 +1,46 @@
+using System.Threading;
+
+namespace TcAutomation.Core
+{
+    /// <summary>
+    /// Cooperative cancellation for the step currently running on the host's
+    /// STA thread. The host's stdin reader thread calls <see cref="Request"/>
+    /// when the MCP server sends a "cancel" for the running request; long
+    /// polling loops (TcUnit result polling, waiting for Run state) check
+    /// <see cref="IsRequested"/> between iterations and bail out.
+    ///
+    /// A single DTE call (a build, an activation) cannot be interrupted this
+    /// way. The MCP server kills and respawns the host if the step has not
+    /// returned within its grace period after the cancel.
+    ///
+    /// Never requested in CLI mode, so commands behave as before there.
+    /// </summary>
+    public static class StepCancellation
+    {
+        private static volatile bool _requested;
+
+        public static bool IsRequested => _requested;
+
+        public static void Request() => _requested = true;
+
+        public static void Reset() => _requested = false;
+
+        /// <summary>
+        /// Thread.Sleep that wakes early (within ~250 ms) once cancellation
+        /// is requested. Returns true if it was cut short.
+        /// </summary>
+        public static bool Sleep(int milliseconds)
+        {
+            const int SliceMs = 250;
+            int remaining = milliseconds;
+            while (remaining > 0)
+            {
+                if (_requested) return true;
+                int slice = remaining < SliceMs ? remaining : SliceMs;
+                Thread.Sleep(slice);
+                remaining -= slice;
+            }
+            return _requested;
+        }
+    }
+}
@@ -0,0 +1,174 @@
+"""
+ADS latency and throughput against the fake PLC.
+
+Starts the AMS/TCP stand-in from `tests/fake_plc.py` with `--symbols`
+DINT variables and an optional injected response `--latency` and
+`--jitter` (milliseconds, to mimic a PLC on the network instead of
+loopback), then measures with the pure-Python client:
+
+  - round-trip:  sequential reads by handle, one in flight at a time;
+  - pipelined:   `--concurrency` reads in flight on one connection;
+  - sum read:    all symbols in one 0xF080 request vs one read each;
+  - read-var:    the whole `read-var` step as the tool runs it (pooled
+                 connection, symbols from the cache: one read each);
+  - read-var-list: the `read-var-list` step (sum commands) for each of
+                 `--list-sizes` symbols, against the same symbols read
+                 one `read-var` at a time;
+  - write-var-list: a `--recipe`-entry `write-var-list` (pre-read, sum
+                 write, verify read).
+
+Runs anywhere Python does, no TwinCAT needed.
+
+Usage:
+    python benchmarks/bench_ads.py [--requests 2000] [--concurrency 16] [--symbols 100]
+                                   [--list-sizes 10,100,1000,5000] [--recipe 500] [--latency 0] [--jitter 0]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tests"))
+
+from fake_plc import FakePlc  # noqa: E402
+from twincat_mcp.ads import AdsClient, shutdown_pool  # noqa: E402
+from twincat_mcp.ads.steps import run_step  # noqa: E402
+
+NET_ID = "127.0.0.1.1.1"
+
+
+def _fmt(samples: list[float]) -> str:
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    return (f"n={len(ms)}  min={ms[0]:.3f}ms  median={statistics.median(ms):.3f}ms  "
+            f"p95={p95:.3f}ms  max={ms[-1]:.3f}ms")
+
+
+async def _round_trip(client: AdsClient, handle: int, n: int) -> list[float]:
+    samples = []
+    for _ in range(n):
+        started = time.perf_counter()
+        await client.read_by_handle(handle, 4)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def _pipelined(client: AdsClient, handle: int, n: int, concurrency: int) -> float:
+    remaining = n
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await client.read_by_handle(handle, 4)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return n / (time.perf_counter() - started)
+
+
+async def _sum_vs_single(client: AdsClient, plc: FakePlc, count: int, rounds: int) -> tuple[float, float]:
+    items = [(info.index_group, info.index_offset, info.size) for info in plc.symbols.values()][:count]
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await client.sum_read(items)
+    summed = (time.perf_counter() - started) / rounds
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for ig, io, n in items:
+            await client.read(ig, io, n)
+    single = (time.perf_counter() - started) / rounds
+    return summed, single
+
+
+async def _read_var_steps(n: int) -> list[float]:
+    samples = []
+    for i in range(n):
+        started = time.perf_counter()
+        result = await run_step("read-var", {"amsNetId": NET_ID, "port": 851, "symbol": f"MAIN.n{i % 10}"})
+        samples.append(time.perf_counter() - started)
+        assert result["Success"], result
+    return samples
+
+
+async def _read_var_list(count: int) -> tuple[float, float]:
+    """(list step, same symbols one read-var step each), in seconds."""
+    symbols = [f"MAIN.n{i}" for i in range(count)]
+    args = {"amsNetId": NET_ID, "port": 851, "symbols": ",".join(symbols)}
+    started = time.perf_counter()
+    result = await run_step("read-var-list", args)
+    as_list = time.perf_counter() - started
+    assert result["Success"] and result["ErrorCount"] == 0, result.get("ErrorMessage")
+
+    started = time.perf_counter()
+    for symbol in symbols:
+        await run_step("read-var", {"amsNetId": NET_ID, "port": 851, "symbol": symbol})
+    return as_list, time.perf_counter() - started
+
+
+async def _write_var_list(count: int) -> float:
+    variables = {f"MAIN.n{i}": str(-i) for i in range(count)}
+    args = {"amsNetId": NET_ID, "port": 851, "variables": json.dumps(variables)}
+    started = time.perf_counter()
+    result = await run_step("write-var-list", args)
+    elapsed = time.perf_counter() - started
+    assert result["Success"] and result["ErrorCount"] == 0, result.get("ErrorMessage")
+    return elapsed
+
+
+async def _run(args) -> None:
+    list_sizes = [int(n) for n in args.list_sizes.split(",") if n.strip()]
+    symbols = {f"MAIN.n{i}": ("DINT", i) for i in range(max([args.symbols, args.recipe] + list_sizes))}
+    plc = await FakePlc(symbols, latency=args.latency / 1000, jitter=args.jitter / 1000, seed=1).start()
+    os.environ["TWINCAT_ADS_ROUTER"] = plc.router
+    client = AdsClient(NET_ID, 851, host=plc.host, tcp_port=plc.port)
+    await client.connect()
+    try:
+        handle = await client.get_handle("MAIN.n0")
+        await _round_trip(client, handle, 50)  # warm-up
+
+        print(f"fake PLC: {args.symbols} symbols, latency {args.latency:g}ms, jitter {args.jitter:g}ms")
+        print(f"round-trip (1 in flight):        {_fmt(await _round_trip(client, handle, args.requests))}")
+        rate = await _pipelined(client, handle, args.requests, args.concurrency)
+        print(f"pipelined ({args.concurrency} in flight):         {rate:,.0f} reads/s")
+        summed, single = await _sum_vs_single(client, plc, args.symbols,
+                                              rounds=max(1, args.requests // max(args.symbols, 1)))
+        print(f"{args.symbols} variables, sum read:       {summed * 1000:.3f}ms")
+        print(f"{args.symbols} variables, single reads:   {single * 1000:.3f}ms ({single / summed:.1f}x)")
+        steps = min(args.requests, 200)
+        print(f"read-var step:                   {_fmt(await _read_var_steps(steps))}")
+        for size in list_sizes:
+            as_list, one_by_one = await _read_var_list(size)
+            print(f"read-var-list, {size:>5} symbols:  {as_list * 1000:8.1f}ms  "
+                  f"(one read-var each: {one_by_one * 1000:.1f}ms, {one_by_one / as_list:.0f}x)")
+        if args.recipe:
+            print(f"write-var-list, {args.recipe:>4} variables: {await _write_var_list(args.recipe) * 1000:8.1f}ms")
+    finally:
+        await client.close()
+        await shutdown_pool()
+        await plc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--list-sizes", default="10,100,1000,5000", help="comma-separated symbol counts")
+    parser.add_argument("--recipe", type=int, default=500, help="variables in the write-var-list run")
+    parser.add_argument("--latency", type=float, default=0.0, help="injected response latency, ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, 0..jitter ms")
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
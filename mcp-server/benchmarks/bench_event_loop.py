@@ -0,0 +1,100 @@
+"""
+Event-loop responsiveness during a long shell step.
+
+Installs a ShellHost backed by the in-memory fake host from
+`tests/fake_host.py`, whose `execute-step` takes `--build-seconds`
+(simulating a TcXaeShell build), starts
+`twincat_build`, and while it runs repeatedly calls the read-only
+`twincat_host_status` tool and `twincat_get_state` (served by a separate
+fake ADS host) and measures their latency plus the event-loop
+scheduling lag.
+
+Usage:
+    python benchmarks/bench_event_loop.py [--build-seconds 3] [--interval 0.1]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tests"))
+
+from fake_host import FakeShellHost, default_responder  # noqa: E402
+from twincat_mcp import host  # noqa: E402
+from twincat_mcp.handlers import ads, safety, shell  # noqa: E402
+
+
+def _simulated_host(build_seconds: float) -> FakeShellHost:
+    async def responder(proc, req):
+        if req["method"] == "execute-step":
+            await asyncio.sleep(build_seconds)
+            return {"command": req["params"]["command"], "result": {"success": True, "summary": "Build succeeded"}}
+        return await default_responder(proc, req)
+
+    return FakeShellHost(responder)
+
+
+def _simulated_ads_host() -> FakeShellHost:
+    async def responder(proc, req):
+        if req["method"] == "execute-step":
+            return {"command": "get-state", "result": {"success": True, "adsState": "Run", "stateValue": 5}}
+        return await default_responder(proc, req)
+
+    return FakeShellHost(responder, role="ads")
+
+
+def _fmt(samples: list[float]) -> str:
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    return (f"n={len(ms)}  min={ms[0]:.2f}ms  median={statistics.median(ms):.2f}ms  "
+            f"p95={p95:.2f}ms  max={ms[-1]:.2f}ms")
+
+
+async def _run(build_seconds: float, interval: float) -> None:
+    shell_host = _simulated_host(build_seconds)
+    host._shell_pool = host.ShellHostPool(lambda: shell_host)
+    host._ads_host = _simulated_ads_host()
+
+    build_started = time.perf_counter()
+    build = asyncio.create_task(shell.handle_build({"solutionPath": "C:/Bench/Solution.sln"}, time.time()))
+    await asyncio.sleep(0.05)
+
+    status_latency: list[float] = []
+    state_latency: list[float] = []
+    loop_lag: list[float] = []
+    while not build.done():
+        t0 = time.perf_counter()
+        await safety.handle_host_status({}, time.time())
+        status_latency.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        await ads.handle_get_state({"amsNetId": "127.0.0.1.1.1"}, time.time())
+        state_latency.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        loop_lag.append(max(0.0, time.perf_counter() - t0 - interval))
+
+    await build
+    build_elapsed = time.perf_counter() - build_started
+
+    print(f"simulated build: {build_elapsed:.2f}s")
+    print(f"twincat_host_status during build: {_fmt(status_latency)}")
+    print(f"twincat_get_state during build:   {_fmt(state_latency)}")
+    print(f"event-loop lag during build:      {_fmt(loop_lag)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--build-seconds", type=float, default=3.0)
+    parser.add_argument("--interval", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(_run(args.build_seconds, args.interval))
+
+
+if __name__ == "__main__":
+    main()
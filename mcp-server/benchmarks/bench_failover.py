@@ -0,0 +1,104 @@
+"""
+Crash failover with and without a warm spare host.
+
+Uses the in-memory fake host from `tests/fake_host.py`. Loading a
+solution on a fresh host takes `--startup-seconds` (standing in for the
+TcXaeShell start), a build takes `--build-seconds`, and the first build
+crashes its host `--crash-after` seconds in. Reports the time from the
+crash until a build result is back:
+
+  - with spare:    `run_shell_step` promotes the warm spare and retries
+                   the build on it.
+  - without spare: the next call starts a fresh host, which loads the
+                   solution and then builds. (The one-shot CLI fallback
+                   in between needs a real TcAutomation.exe and is not
+                   run here; it would only add to this figure.)
+
+Usage:
+    python benchmarks/bench_failover.py [--startup-seconds 2] [--build-seconds 0.5] [--crash-after 0.2]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tests"))
+
+from fake_host import FakeShellHost, default_responder  # noqa: E402
+from twincat_mcp import host  # noqa: E402
+from twincat_mcp.dispatch import run_shell_step  # noqa: E402
+
+SOLUTION = "C:/Bench/Solution.sln"
+
+
+def _install_pool(args, spare: bool, crash: dict) -> host.ShellHostPool:
+    async def responder(proc, req):
+        if req["method"] == "ensure-solution":
+            await asyncio.sleep(args.startup_seconds)
+        elif req["method"] == "execute-step":
+            if crash["armed"]:
+                crash["armed"] = False
+                await asyncio.sleep(args.crash_after)
+                crash["at"] = time.perf_counter()
+                proc.exit(1, stderr="Unhandled COM exception 0x800706BE")
+                await asyncio.sleep(3600)
+            await asyncio.sleep(args.build_seconds)
+        return await default_responder(proc, req)
+
+    host._shell_pool = host.ShellHostPool(
+        lambda: FakeShellHost(responder), idle_seconds=0, memory_probe=lambda: None, spare=spare)
+    return host._shell_pool
+
+
+async def _with_spare(args) -> float:
+    crash = {"armed": False, "at": None}
+    pool = _install_pool(args, spare=True, crash=crash)
+    await run_shell_step("build", {}, SOLUTION)
+    while pool.spare_status()["state"] != "ready":
+        await asyncio.sleep(0.01)
+
+    crash["armed"] = True
+    await run_shell_step("build", {}, SOLUTION)
+    elapsed = time.perf_counter() - crash["at"]
+    await host.shutdown_shell_host()
+    return elapsed
+
+
+async def _without_spare(args) -> float:
+    crash = {"armed": False, "at": None}
+    pool = _install_pool(args, spare=False, crash=crash)
+    await run_shell_step("build", {}, SOLUTION)
+
+    crashed = pool.most_recent()
+    crash["armed"] = True
+    try:
+        await crashed.execute_step("build", {}, SOLUTION, None)
+    except host.HostError:
+        pass
+    host.drop_shell_host(crashed)
+    await run_shell_step("build", {}, SOLUTION)
+    elapsed = time.perf_counter() - crash["at"]
+    await host.shutdown_shell_host()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--startup-seconds", type=float, default=2.0)
+    parser.add_argument("--build-seconds", type=float, default=0.5)
+    parser.add_argument("--crash-after", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with_spare = asyncio.run(_with_spare(args))
+    without_spare = asyncio.run(_without_spare(args))
+    print(f"simulated shell start: {args.startup_seconds:.2f}s, build: {args.build_seconds:.2f}s")
+    print(f"crash -> build result, with warm spare:    {with_spare:.3f}s "
+          f"(failover overhead {max(0.0, with_spare - args.build_seconds) * 1000:.1f}ms)")
+    print(f"crash -> build result, without spare:      {without_spare:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
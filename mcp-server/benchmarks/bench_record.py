@@ -0,0 +1,118 @@
+"""
+twincat_ads_record memory over a long recording, against the fake PLC.
+
+Starts the AMS/TCP stand-in from `tests/fake_plc.py` with `--channels`
+REAL variables that change every PLC cycle, and records them all at
+`--sample-ms` for `--seconds` with the streaming `Recorder`. Every
+`--every` seconds it prints the rows recorded so far, the rows still in
+memory and the process RSS. Then the same recording again with the rows
+kept in memory until the end, as AdsRecordCommand does (one chunk that
+never fills, written at close). Each run gets its own child process, so
+the RSS figures don't mix.
+
+Runs anywhere Python does, no TwinCAT needed. RSS is read from
+/proc/self/statm; elsewhere the peak RSS from `resource` is shown.
+
+Usage:
+    python benchmarks/bench_record.py [--channels 20] [--sample-ms 1] [--seconds 60] [--every 5]
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tests"))
+
+from fake_plc import FakePlc  # noqa: E402
+from twincat_mcp.ads import AdsConnectionPool, recorder  # noqa: E402
+from twincat_mcp.ads.recorder import Recorder  # noqa: E402
+
+NET_ID = "127.0.0.1.1.1"
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+async def _mutate(plc: FakePlc, names: list[str], period: float) -> None:
+    tick = 0
+    while True:
+        tick += 1
+        for i, name in enumerate(names):
+            plc.set_value(name, math.sin(tick / 100 + i))
+        await asyncio.sleep(period)
+
+
+async def _record(args) -> None:
+    names = [f"GVL.fCh{i}" for i in range(args.channels)]
+    plc = await FakePlc({name: ("REAL", 0.0) for name in names}, cycle_ms=args.sample_ms).start()
+    os.environ["TWINCAT_ADS_ROUTER"] = plc.router
+    pool = AdsConnectionPool()
+    mutator = asyncio.create_task(_mutate(plc, names, args.sample_ms / 1000))
+    with tempfile.TemporaryDirectory() as tmp:
+        rec = Recorder(NET_ID, 851, names, os.path.join(tmp, "rec.csv"),
+                       sample_time_ms=args.sample_ms, duration_sec=args.seconds)
+        task = asyncio.create_task(rec.run(pool))
+        started = time.perf_counter()
+        print(f"  {'t':>5}  {'rows':>9}  {'in memory':>9}  {'RSS':>8}")
+        try:
+            while not task.done():
+                await asyncio.wait([task], timeout=args.every)
+                writer = rec.writer
+                if writer is not None and not task.done():
+                    rows = writer.written + writer.buffered
+                    print(f"  {time.perf_counter() - started:4.0f}s  {rows:9,}  {writer.buffered:9,}  "
+                          f"{_rss_mb():6.1f}MB", flush=True)
+            result = task.result()
+            size = os.path.getsize(rec.output_path) / 2**20
+        finally:
+            mutator.cancel()
+            await pool.close_all()
+            await plc.stop()
+    print(f"  done: {result['SamplesCollected']:,} rows in {result['DurationSeconds']:.1f}s "
+          f"({result['SamplesCollected'] / max(result['DurationSeconds'], 1e-9):,.0f} rows/s), "
+          f"{result.get('DroppedRows', 0)} dropped, {size:.1f}MB CSV, RSS {_rss_mb():.1f}MB")
+
+
+def _child(args) -> None:
+    if args.child == "memory":
+        with mock.patch.object(recorder, "CHUNK_ROWS", 2**62), mock.patch.object(recorder, "FLUSH_SEC", math.inf):
+            asyncio.run(_record(args))
+    else:
+        asyncio.run(_record(args))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--sample-ms", type=int, default=1)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--every", type=float, default=5.0, help="seconds between RSS lines")
+    parser.add_argument("--child", choices=["streaming", "memory"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(args)
+        return
+
+    print(f"{args.channels} REAL channels at {args.sample_ms}ms for {args.seconds:g}s")
+    for mode, title in [("streaming", "streaming to disk in chunks"), ("memory", "all rows in memory until the end")]:
+        print(f"\n{title}:", flush=True)
+        subprocess.run([sys.executable, __file__, "--child", mode] + sys.argv[1:], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,12 @@ Tools:
 - twincat_list_routes: List available ADS routes (PLCs)
 - twincat_get_error_list: Get VS Error List contents (errors, warnings, messages)
 - twincat_run_tcunit: Run TcUnit tests and return results
+- twincat_watch_subscribe / _read / _unsubscribe: Buffered ADS notification watches
+- twincat_wait_for_condition: Block until a PLC condition holds (notification-driven)
+- twincat_ads_record_start / _status / _stop: Background ADS recordings with a live tail
+- twincat_convert_recording: Convert an ADS recording between CSV and columnar .tcrec
+- twincat_analyze_recording: Statistics of an ADS recording, streamed from the file
+- twincat_preview_recording: Shape-preserving downsampled preview of an ADS recording
 """
 
 import time
@@ -49,6 +55,11 @@ from mcp.types import TextContent
 # Importing `twincat_mcp.handlers` is what populates `HANDLERS` (each
 # submodule registers its tools at import time).
 from twincat_mcp.handlers import HANDLERS
+from twincat_mcp.ads import shutdown_pool as shutdown_ads_pool
+from twincat_mcp.ads.jobs import shutdown_jobs
+from twincat_mcp.ads.watch import shutdown_watches
+from twincat_mcp.host import shutdown_shell_host, start_prewarm
+from twincat_mcp.progress import reporting
 from twincat_mcp.safety import check_armed_for_tool, check_confirmation
 from twincat_mcp.tools.schemas import get_tool_schemas
 
@@ -73,7 +84,9 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
          gate itself, so it runs *before* the gate.
       2) Run the armed-mode gate for dangerous tools (write/deploy/etc).
       3) Run the confirmation gate for highly destructive tools.
-      4) Look up the handler in `HANDLERS` and await it.
+      4) Look up the handler in `HANDLERS` and await it. If the client
+         sent a progress token, step progress is streamed back as MCP
+         progress notifications while the handler runs.
       5) Unknown tools fall through to a clear error message.
     """
 
@@ -94,17 +107,52 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         return [TextContent(type="text", text=f"Unknown tool: {name}")]
 
     tool_start_time = time.time()
-    return await handler(arguments, tool_start_time)
+    send = _progress_sender()
+    if send is None:
+        return await handler(arguments, tool_start_time)
+    async with reporting(send):
+        return await handler(arguments, tool_start_time)
+
+
+def _progress_sender():
+    """Coroutine function sending one progress notification for the
+    current request, or None if the client didn't pass a progress token."""
+    try:
+        ctx = server.request_context
+    except LookupError:
+        return None
+    token = ctx.meta.progressToken if ctx.meta is not None else None
+    if token is None:
+        return None
+
+    async def send(progress: float, message: str) -> None:
+        await ctx.session.send_progress_notification(
+            token, progress, message=message, related_request_id=ctx.request_id,
+        )
+
+    return send
 
 
 async def main():
     """Run the MCP server."""
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
-        )
+    # Opt-in (TWINCAT_HOST_PREWARM=1): start the host and load the preload
+    # solution in the background. Returns at once, so list_tools and every
+    # other request are served while TcXaeShell is still starting.
+    start_prewarm()
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options()
+            )
+    finally:
+        # Graceful host teardown while the event loop is still alive (the
+        # host client is asyncio-based, so atexit would be too late).
+        await shutdown_shell_host()
+        await shutdown_jobs()
+        await shutdown_watches()
+        await shutdown_ads_pool()
 
 
 if __name__ == "__main__":
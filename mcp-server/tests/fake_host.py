@@ -0,0 +1,182 @@
+"""
+In-memory stand-in for `TcAutomation.exe host`, shared by the host tests
+and benchmarks. Speaks the same NDJSON protocol as HostCommand.cs over
+asyncio streams, so the real ShellHost client runs unmodified against it.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from twincat_mcp import host  # noqa: E402
+
+
+async def default_responder(proc, req):
+    """Answer every method the way a healthy, idle host would."""
+    method = req.get("method")
+    params = req.get("params") or {}
+    if method == "execute-step":
+        return {"command": params.get("command"), "result": {"success": True}}
+    if method == "ensure-solution":
+        return {"loaded": True, "solutionPath": params.get("solutionPath")}
+    if method == "status":
+        return {"alive": True, "hostPid": proc.pid}
+    return {}
+
+
+class _FakeHostStdin:
+    def __init__(self, proc):
+        self._proc = proc
+        self._buffer = b""
+        self.closed = False
+
+    def write(self, data: bytes):
+        if self.closed:
+            raise BrokenPipeError("stdin closed")
+        self._buffer += data
+        while b"\n" in self._buffer:
+            line, self._buffer = self._buffer.split(b"\n", 1)
+            if line.strip():
+                self._proc._on_line(line.decode("utf-8"))
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeHostProcess:
+    """
+    Quacks like `asyncio.subprocess.Process`. Each request is served by
+    `responder(proc, request) -> result` (a coroutine); raising turns it
+    into an `ok: false` error response. With `serial=True` requests are
+    served one at a time in arrival order, like the real STA host;
+    otherwise they run concurrently so responses can come back out of order.
+
+    `cancel` is answered out of band, like HostCommand's stdin reader: a
+    queued target is dropped, a running one is flagged for responders that
+    poll `is_cancelled(req)`.
+    """
+
+    def __init__(self, responder=None, *, pid=4242, serial=False, ready=True):
+        self.pid = pid
+        self.returncode = None
+        self.stdout = asyncio.StreamReader()
+        self.stderr = asyncio.StreamReader()
+        self.stdin = _FakeHostStdin(self)
+        self.requests: list[dict] = []
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._responder = responder or default_responder
+        self._serial_lock = asyncio.Lock() if serial else None
+        self._queued: set = set()
+        self._running: set = set()
+        self._cancelled: set = set()
+        self._cancel_requested: set = set()
+        self._exited = asyncio.Event()
+        if ready:
+            self.emit({"type": "ready", "hostPid": pid, "startedUtc": "2026-01-01T00:00:00Z"})
+
+    # -- output helpers --------------------------------------------------
+
+    def emit(self, msg: dict):
+        if self.returncode is None:
+            self.stdout.feed_data((json.dumps(msg) + "\n").encode("utf-8"))
+
+    def progress(self, text: str):
+        if self.returncode is None:
+            self.stderr.feed_data(f"[PROGRESS] {text}\n".encode("utf-8"))
+
+    def exit(self, code: int = 0, stderr: str | None = None):
+        if self.returncode is not None:
+            return
+        if stderr:
+            self.stderr.feed_data((stderr + "\n").encode("utf-8"))
+        self.returncode = code
+        self.stdout.feed_eof()
+        self.stderr.feed_eof()
+        self._exited.set()
+
+    # -- Process API -----------------------------------------------------
+
+    def kill(self):
+        self.exit(-9)
+
+    def terminate(self):
+        self.exit(-15)
+
+    async def wait(self):
+        await self._exited.wait()
+        return self.returncode
+
+    # -- request handling ------------------------------------------------
+
+    def is_cancelled(self, req) -> bool:
+        return req.get("id") in self._cancel_requested
+
+    def _on_line(self, line: str):
+        req = json.loads(line)
+        self.requests.append(req)
+        if req.get("method") == "cancel":
+            self._cancel((req.get("params") or {}).get("id"), req.get("id"))
+            return
+        self._queued.add(req.get("id"))
+        asyncio.get_running_loop().create_task(self._serve(req))
+
+    def _cancel(self, target, req_id):
+        if target in self._queued:
+            self._cancelled.add(target)
+            state = "dropped"
+        elif target in self._running:
+            self._cancel_requested.add(target)
+            state = "running"
+        else:
+            state = "not-found"
+        self.emit({"id": req_id, "ok": True, "result": {"id": target, "state": state}})
+
+    async def _serve(self, req):
+        if self._serial_lock is not None:
+            async with self._serial_lock:
+                await self._answer(req)
+        else:
+            await self._answer(req)
+
+    async def _answer(self, req):
+        self._queued.discard(req.get("id"))
+        if req.get("id") in self._cancelled:
+            self.emit({"id": req.get("id"), "ok": False, "error": "Cancelled by client before it started"})
+            return
+        self._running.add(req.get("id"))
+        self._in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            try:
+                result = await self._responder(self, req)
+                msg = {"id": req.get("id"), "ok": True, "result": result}
+            except Exception as e:
+                msg = {"id": req.get("id"), "ok": False, "error": str(e)}
+        finally:
+            self._in_flight -= 1
+            self._running.discard(req.get("id"))
+        self.emit(msg)
+        if req.get("method") == "shutdown":
+            self.exit(0)
+
+
+class FakeShellHost(host.ShellHost):
+    """ShellHost whose `_spawn` returns FakeHostProcess instances."""
+
+    def __init__(self, responder=None, *, serial=True, role="shell"):
+        super().__init__(Path("TcAutomation.exe"), role=role)
+        self._responder = responder
+        self._serial = serial
+        self.spawned: list[FakeHostProcess] = []
+
+    async def _spawn(self):
+        proc = FakeHostProcess(self._responder, pid=4242 + len(self.spawned), serial=self._serial)
+        self.spawned.append(proc)
+        return proc
@@ -0,0 +1,522 @@
+"""
+In-process stand-in for a TwinCAT AMS router + PLC runtime, shared by the
+ADS tests and benchmarks. Speaks AMS/TCP on a local port, so the real
+`twincat_mcp.ads` client runs unmodified against it.
+
+Symbols live in one flat memory area (index group 0x4020, like PLC
+%M memory) and are accessible by address, by handle and by name, singly
+or through the sum commands (0xF080 read, 0xF081 write, 0xF082
+read/write). Struct types declared with `add_struct` make their members
+addressable by path (`MAIN.stAxis.fPos`), and the whole table can be
+uploaded (0xF00B symbols, 0xF00E data types, 0xF00F sizes).
+
+Beyond plain request/response it serves:
+
+  - device notifications (cyclic and on-change), checked once per
+    `cycle_ms` PLC cycle, on symbol memory, on the ADS state (0xF100)
+    and on the symbol version (0xF008), so `set_state` and
+    `bump_symbol_version` are pushed too;
+  - injectable response latency and jitter (`latency`, `jitter`,
+    seconds; requests are still handled in arrival order, only the
+    answers are delayed);
+  - injectable ADS errors (`inject_error`) per command and/or index
+    group, for the next N matching requests.
+
+Usage:
+
+    plc = await FakePlc({"MAIN.nCounter": ("DINT", 42)}).start()
+    os.environ["TWINCAT_ADS_ROUTER"] = plc.router
+    ...
+    await plc.stop()
+"""
+
+import asyncio
+import random
+import re
+import struct
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from twincat_mcp.ads import protocol  # noqa: E402
+from twincat_mcp.ads.protocol import AmsPacket, DataTypeEntry, NotificationSample, SymbolInfo  # noqa: E402
+from twincat_mcp.ads.values import _SCALAR_FORMATS, encode_value  # noqa: E402
+
+IG_PLC_MEMORY = 0x4020
+
+# ADST_* data type ids for the symbol entries.
+_DATA_TYPE_IDS = {
+    "BOOL": 33, "BYTE": 17, "USINT": 17, "SINT": 16, "WORD": 18, "UINT": 18,
+    "INT": 2, "DWORD": 19, "UDINT": 19, "DINT": 3, "LWORD": 21, "ULINT": 21,
+    "LINT": 20, "REAL": 4, "LREAL": 5,
+}
+
+_ARRAY_RE = re.compile(r"^ARRAY\s*\[\s*(-?\d+)\s*\.\.\s*(-?\d+)\s*\]\s*OF\s+(.+)$", re.IGNORECASE)
+
+
+def _type_size(type_name: str) -> int:
+    upper = type_name.upper().strip()
+    if upper in _SCALAR_FORMATS:
+        return struct.calcsize(_SCALAR_FORMATS[upper])
+    if upper.startswith("STRING"):
+        inner = upper[len("STRING"):].strip("()[] ")
+        return (int(inner) if inner else 80) + 1
+    m = _ARRAY_RE.match(type_name.strip())
+    if m:
+        low, high, element = int(m.group(1)), int(m.group(2)), m.group(3)
+        return (high - low + 1) * _type_size(element)
+    raise ValueError(f"fake PLC can't size {type_name}; pass size=")
+
+
+@dataclass
+class _Fault:
+    code: int
+    command: int | None
+    index_group: int | None
+    remaining: int
+
+
+class _Connection:
+    """One client connection: its writer, the client's AMS address and
+    the notifications it registered."""
+
+    def __init__(self, plc: "FakePlc", writer: asyncio.StreamWriter):
+        self.plc = plc
+        self.writer = writer
+        self.client_net_id = b"\0" * 6
+        self.client_port = 0
+        self.notifications: dict[int, asyncio.Task] = {}
+
+    def send(self, pkt: AmsPacket) -> None:
+        if not self.writer.is_closing():
+            self.writer.write(protocol.encode_frame(pkt))
+
+    def notify(self, handle: int, data: bytes) -> None:
+        self.send(AmsPacket(
+            self.client_net_id, self.client_port, self.plc.net_id_raw, self.plc.ams_port,
+            protocol.CMD_NOTIFICATION, protocol.STATE_FLAG_REQUEST, 0, 0,
+            protocol.encode_notification([NotificationSample(handle, protocol.filetime_now(), data)]),
+        ))
+
+    def close(self) -> None:
+        for task in self.notifications.values():
+            task.cancel()
+        self.notifications.clear()
+        self.writer.close()
+
+
+class FakePlc:
+    """
+    `symbols` maps name -> (type name, initial value). Values are stored
+    encoded, so reads return exactly what a PLC would.
+    """
+
+    def __init__(self, symbols: dict[str, tuple[str, object]] | None = None, *,
+                 net_id: str = "127.0.0.1.1.1", ams_port: int = 851,
+                 ads_state: int = protocol.ADS_STATE_RUN,
+                 latency: float = 0.0, jitter: float = 0.0, cycle_ms: float = 10.0,
+                 seed: int | None = None):
+        self.net_id = net_id
+        self.net_id_raw = protocol.net_id_bytes(net_id)
+        self.ams_port = ams_port
+        self.ads_state = ads_state
+        self.device_state = 0
+        self.symbol_version = 1
+        self.latency = latency
+        self.jitter = jitter
+        self.cycle_ms = cycle_ms
+        self.memory = bytearray()
+        self.symbols: dict[str, SymbolInfo] = {}
+        self.datatypes: dict[str, DataTypeEntry] = {}
+        self.handles: dict[int, str] = {}
+        self.requests: list[AmsPacket] = []
+        self.connections = 0
+        self._conns: set[_Connection] = set()
+        self._faults: list[_Fault] = []
+        self._rng = random.Random(seed)
+        self._next_handle = 1
+        self._next_notification = 1
+        self._server: asyncio.base_events.Server | None = None
+        self.host = "127.0.0.1"
+        self.port = 0
+        for name, (type_name, value) in (symbols or {}).items():
+            self.add_symbol(name, type_name, value)
+
+    # -- symbol table ----------------------------------------------------
+
+    def add_struct(self, type_name: str, members: dict[str, str]) -> DataTypeEntry:
+        """Declare a STRUCT of `members` (name -> type, which may be an
+        earlier struct), laid out back to back without padding."""
+        subs, offset = [], 0
+        for member, member_type in members.items():
+            size = self._size_of(member_type)
+            subs.append(DataTypeEntry(member, member_type, size, offset,
+                                      _DATA_TYPE_IDS.get(member_type.upper(), 65), protocol.DATATYPE_FLAG_DATAITEM))
+            offset += size
+        entry = DataTypeEntry(type_name, "", offset, 0, 65, protocol.DATATYPE_FLAG_DATATYPE, "", (), tuple(subs))
+        self.datatypes[type_name.upper()] = entry
+        return entry
+
+    def add_type(self, entry: DataTypeEntry) -> DataTypeEntry:
+        """Declare any data type (enum, aligned struct, bit fields, ...)
+        exactly as the upload should describe it."""
+        self.datatypes[entry.name.upper()] = entry
+        return entry
+
+    def add_symbol(self, name: str, type_name: str, value: object = 0, *,
+                   size: int | None = None) -> SymbolInfo:
+        """`size` is needed for types the fake can't size itself (function
+        blocks, structs not declared with `add_struct`); their `value` is
+        then given as raw bytes."""
+        size = size if size is not None else self._size_of(type_name)
+        info = SymbolInfo(name, IG_PLC_MEMORY, len(self.memory), size,
+                          _DATA_TYPE_IDS.get(type_name.upper(), 65), 0x8, type_name, "")
+        self.memory.extend(b"\0" * size)
+        self.symbols[name.upper()] = info
+        self.set_value(name, value)
+        return info
+
+    def set_value(self, name: str, value: object) -> None:
+        """Raw bytes are stored as-is (zero-padded), anything else is
+        encoded like a write-var of its str()."""
+        info = self._lookup(name)
+        if isinstance(value, (bytes, bytearray)):
+            raw = bytes(value[:info.size]).ljust(info.size, b"\0")
+        else:
+            raw = encode_value(info.type_name, info.size, str(value))
+        self.memory[info.index_offset:info.index_offset + info.size] = raw
+
+    def bump_symbol_version(self) -> None:
+        """Simulate an online change / re-activation: the symbol version
+        moves on and every handle handed out so far is invalid."""
+        self.symbol_version = (self.symbol_version + 1) & 0xFF
+        self.handles.clear()
+
+    def raw_value(self, name: str) -> bytes:
+        info = self._lookup(name)
+        return bytes(self.memory[info.index_offset:info.index_offset + info.size])
+
+    def set_state(self, ads_state: int, device_state: int | None = None) -> None:
+        """Change the ADS state, as if the runtime switched on its own.
+        Notifications on 0xF100 pick it up within a PLC cycle."""
+        self.ads_state = ads_state
+        if device_state is not None:
+            self.device_state = device_state
+
+    # -- fault injection -------------------------------------------------
+
+    def inject_error(self, code: int, *, command: int | None = None,
+                     index_group: int | None = None, count: int = 1) -> None:
+        """Answer the next `count` matching requests with ADS error `code`.
+        `index_group` also matches the sub-requests of a sum command, so a
+        fault can fail a single item of a sum read."""
+        self._faults.append(_Fault(code, command, index_group, count))
+
+    def clear_errors(self) -> None:
+        self._faults.clear()
+
+    def _take_fault(self, command: int, index_group: int | None) -> None:
+        for fault in self._faults:
+            if fault.command not in (None, command):
+                continue
+            if fault.index_group is not None and fault.index_group != index_group:
+                continue
+            fault.remaining -= 1
+            if fault.remaining <= 0:
+                self._faults.remove(fault)
+            raise _Fail(fault.code)
+
+    # -- server lifecycle ------------------------------------------------
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> "FakePlc":
+        self._server = await asyncio.start_server(self._serve_connection, host, port)
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self.drop_connections()
+            await self._server.wait_closed()
+            self._server = None
+
+    def drop_connections(self) -> None:
+        """Close every client connection, like a router restart."""
+        for conn in list(self._conns):
+            conn.close()
+
+    @property
+    def router(self) -> str:
+        """Value for TWINCAT_ADS_ROUTER."""
+        return f"{self.host}:{self.port}"
+
+    @property
+    def notification_count(self) -> int:
+        return sum(len(conn.notifications) for conn in self._conns)
+
+    async def _serve_connection(self, reader, writer):
+        self.connections += 1
+        conn = _Connection(self, writer)
+        self._conns.add(conn)
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                header = await reader.readexactly(protocol.TCP_HEADER_SIZE)
+                body = await reader.readexactly(protocol.frame_length(header))
+                pkt = protocol.decode_packet(body)
+                self.requests.append(pkt)
+                conn.client_net_id, conn.client_port = pkt.source_net_id, pkt.source_port
+                response = AmsPacket(
+                    pkt.source_net_id, pkt.source_port, pkt.target_net_id, pkt.target_port,
+                    pkt.command, protocol.STATE_FLAG_RESPONSE, 0, pkt.invoke_id,
+                    self.handle(pkt.command, pkt.data, conn),
+                )
+                delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+                if delay > 0:
+                    loop.call_later(delay, conn.send, response)
+                else:
+                    conn.send(response)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._conns.discard(conn)
+            conn.close()
+
+    # -- ADS services ----------------------------------------------------
+
+    def handle(self, command: int, data: bytes, conn: _Connection | None = None) -> bytes:
+        try:
+            index_group = struct.unpack_from("<I", data)[0] if len(data) >= 4 and command in (
+                protocol.CMD_READ, protocol.CMD_WRITE, protocol.CMD_READ_WRITE,
+                protocol.CMD_ADD_NOTIFICATION) else None
+            self._take_fault(command, index_group)
+            if command == protocol.CMD_READ_DEVICE_INFO:
+                return struct.pack("<IBBH16s", 0, 3, 1, 4024, b"Plc30 App")
+            if command == protocol.CMD_READ_STATE:
+                return struct.pack("<IHH", 0, self.ads_state, self.device_state)
+            if command == protocol.CMD_WRITE_CONTROL:
+                self.ads_state, self.device_state, _ = struct.unpack_from("<HHI", data)
+                return _ok()
+            if command == protocol.CMD_READ:
+                ig, io, length = struct.unpack_from("<III", data)
+                return _ok_data(self._read(ig, io, length))
+            if command == protocol.CMD_WRITE:
+                ig, io, length = struct.unpack_from("<III", data)
+                self._write(ig, io, data[12:12 + length])
+                return _ok()
+            if command == protocol.CMD_READ_WRITE:
+                ig, io, read_len, write_len = struct.unpack_from("<IIII", data)
+                return _ok_data(self._read_write(ig, io, read_len, data[16:16 + write_len]))
+            if command == protocol.CMD_ADD_NOTIFICATION and conn is not None:
+                return struct.pack("<II", 0, self._add_notification(conn, data))
+            if command == protocol.CMD_DEL_NOTIFICATION and conn is not None:
+                (handle,) = struct.unpack_from("<I", data)
+                task = conn.notifications.pop(handle, None)
+                if task is None:
+                    raise _Fail(protocol.ADSERR_DEVICE_NOTIFYHNDINVALID)
+                task.cancel()
+                return _ok()
+            return _error(protocol.ADSERR_DEVICE_SRVNOTSUPP)
+        except _Fail as e:
+            return _error(e.code)
+
+    def _size_of(self, type_name: str) -> int:
+        dt = self.datatypes.get(type_name.upper())
+        if dt is not None:
+            return dt.size
+        m = _ARRAY_RE.match(type_name.strip())
+        if m:
+            return (int(m.group(2)) - int(m.group(1)) + 1) * self._size_of(m.group(3))
+        return _type_size(type_name)
+
+    def _lookup(self, name: str) -> SymbolInfo | None:
+        """A top-level symbol, or a struct member below one by path."""
+        info = self.symbols.get(name.upper())
+        if info is not None or "." not in name:
+            return info
+        parent, _, member = name.rpartition(".")
+        outer = self._lookup(parent)
+        dt = self.datatypes.get(outer.type_name.upper()) if outer is not None else None
+        for sub in dt.sub_items if dt is not None else ():
+            if sub.name.upper() == member.upper():
+                return SymbolInfo(name, outer.index_group, outer.index_offset + sub.offset, sub.size,
+                                  sub.data_type, 0x8, sub.type_name, "")
+        return None
+
+    def _symbol_by_name(self, raw: bytes) -> SymbolInfo:
+        info = self._lookup(raw.split(b"\0", 1)[0].decode("latin-1"))
+        if info is None:
+            raise _Fail(protocol.ADSERR_DEVICE_SYMBOLNOTFOUND)
+        return info
+
+    def _symbol_by_handle(self, handle: int) -> SymbolInfo:
+        name = self.handles.get(handle)
+        if name is None:
+            raise _Fail(protocol.ADSERR_DEVICE_NOTFOUND)
+        return self._lookup(name)
+
+    def _upload(self) -> tuple[bytes, bytes]:
+        return (b"".join(protocol.encode_symbol_entry(info) for info in self.symbols.values()),
+                b"".join(protocol.encode_datatype_entry(dt) for dt in self.datatypes.values()))
+
+    def _memory(self, offset: int, length: int) -> bytes:
+        if offset + length > len(self.memory):
+            raise _Fail(protocol.ADSERR_DEVICE_INVALIDOFFSET)
+        return bytes(self.memory[offset:offset + length])
+
+    def _read(self, ig: int, io: int, length: int) -> bytes:
+        if ig == IG_PLC_MEMORY:
+            return self._memory(io, length)
+        if ig == protocol.IG_SYM_VALBYHND:
+            info = self._symbol_by_handle(io)
+            return self._memory(info.index_offset, min(length, info.size))
+        if ig in (protocol.IG_SYM_UPLOADINFO2, protocol.IG_SYM_UPLOAD, protocol.IG_SYM_DT_UPLOAD):
+            symbols, datatypes = self._upload()
+            if ig == protocol.IG_SYM_UPLOAD:
+                return symbols[:length]
+            if ig == protocol.IG_SYM_DT_UPLOAD:
+                return datatypes[:length]
+            return protocol.encode_upload_info(protocol.UploadInfo(
+                len(self.symbols), len(symbols), len(self.datatypes), len(datatypes), 0, 0))[:length]
+        if ig == protocol.IG_SYM_VERSION:
+            return struct.pack("<B", self.symbol_version)[:length]
+        if ig == protocol.IG_DEVICE_DATA:
+            state = struct.pack("<HH", self.ads_state, self.device_state)
+            if io + length > len(state):
+                raise _Fail(protocol.ADSERR_DEVICE_INVALIDSIZE)
+            return state[io:io + length]
+        raise _Fail(protocol.ADSERR_DEVICE_INVALIDGRP)
+
+    def _write(self, ig: int, io: int, payload: bytes) -> None:
+        if ig == IG_PLC_MEMORY:
+            offset = io
+        elif ig == protocol.IG_SYM_VALBYHND:
+            info = self._symbol_by_handle(io)
+            if len(payload) > info.size:
+                raise _Fail(protocol.ADSERR_DEVICE_INVALIDSIZE)
+            offset = info.index_offset
+        elif ig == protocol.IG_SYM_RELEASEHND:
+            (handle,) = struct.unpack_from("<I", payload)
+            if self.handles.pop(handle, None) is None:
+                raise _Fail(protocol.ADSERR_DEVICE_NOTFOUND)
+            return
+        else:
+            raise _Fail(protocol.ADSERR_DEVICE_INVALIDGRP)
+        self._memory(offset, len(payload))
+        self.memory[offset:offset + len(payload)] = payload
+
+    def _read_write(self, ig: int, io: int, read_len: int, payload: bytes) -> bytes:
+        if ig == protocol.IG_SYM_HNDBYNAME:
+            info = self._symbol_by_name(payload)
+            handle = self._next_handle
+            self._next_handle += 1
+            self.handles[handle] = info.name
+            return struct.pack("<I", handle)
+        if ig == protocol.IG_SYM_INFOBYNAMEEX:
+            entry = protocol.encode_symbol_entry(self._symbol_by_name(payload))
+            if len(entry) > read_len:
+                raise _Fail(protocol.ADSERR_DEVICE_INVALIDSIZE)
+            return entry
+        if ig == protocol.IG_SYM_VALBYNAME:
+            info = self._symbol_by_name(payload)
+            return self._memory(info.index_offset, info.size)
+        if ig == protocol.IG_SUMUP_READ:
+            return self._sum_read(io, read_len, payload)
+        if ig == protocol.IG_SUMUP_WRITE:
+            return self._sum_write(io, payload)
+        if ig == protocol.IG_SUMUP_READWRITE:
+            return self._sum_read_write(io, payload)
+        raise _Fail(protocol.ADSERR_DEVICE_INVALIDGRP)
+
+    def _sum_read(self, count: int, read_len: int, payload: bytes) -> bytes:
+        if count > protocol.MAX_SUM_ITEMS:
+            raise _Fail(protocol.ADSERR_DEVICE_INVALIDPARM)
+        if len(payload) < 12 * count:
+            raise _Fail(protocol.ADSERR_DEVICE_INVALIDSIZE)
+        items = protocol.parse_sum_read_request(payload, count)
+        if read_len < protocol.sum_read_length(items):
+            raise _Fail(protocol.ADSERR_DEVICE_INVALIDSIZE)
+        results = []
+        for ig, io, length in items:
+            try:
+                self._take_fault(protocol.CMD_READ, ig)
+                results.append((0, self._read(ig, io, length)))
+            except _Fail as e:
+                results.append((e.code, b""))
+        return protocol.encode_sum_read_response(results, [length for _, _, length in items])
+
+    def _sum_write(self, count: int, payload: bytes) -> bytes:
+        if count > protocol.MAX_SUM_ITEMS:
+            raise _Fail(protocol.ADSERR_DEVICE_INVALIDPARM)
+        if len(payload) < 12 * count:
+            raise _Fail(protocol.ADSERR_DEVICE_INVALIDSIZE)
+        codes = []
+        for ig, io, data in protocol.parse_sum_write_request(payload, count):
+            try:
+                self._take_fault(protocol.CMD_WRITE, ig)
+                self._write(ig, io, data)
+                codes.append(0)
+            except _Fail as e:
+                codes.append(e.code)
+        return struct.pack(f"<{count}I", *codes)
+
+    def _sum_read_write(self, count: int, payload: bytes) -> bytes:
+        if count > protocol.MAX_SUM_ITEMS:
+            raise _Fail(protocol.ADSERR_DEVICE_INVALIDPARM)
+        if len(payload) < 16 * count:
+            raise _Fail(protocol.ADSERR_DEVICE_INVALIDSIZE)
+        results = []
+        for ig, io, read_len, data in protocol.parse_sum_read_write_request(payload, count):
+            try:
+                self._take_fault(protocol.CMD_READ_WRITE, ig)
+                results.append((0, self._read_write(ig, io, read_len, data)[:read_len]))
+            except _Fail as e:
+                results.append((e.code, b""))
+        return protocol.encode_sum_read_write_response(results)
+
+    # -- notifications ---------------------------------------------------
+
+    def _add_notification(self, conn: _Connection, data: bytes) -> int:
+        req = protocol.parse_add_notification_request(data)
+        if req.mode not in (protocol.TRANS_SERVER_CYCLE, protocol.TRANS_SERVER_ON_CHANGE):
+            raise _Fail(protocol.ADSERR_DEVICE_TRANSMODENOTSUPP)
+        self._read(req.index_group, req.index_offset, req.length)  # validate the source now
+        handle = self._next_notification
+        self._next_notification += 1
+        conn.notifications[handle] = asyncio.get_running_loop().create_task(
+            self._notify_loop(conn, handle, req))
+        return handle
+
+    async def _notify_loop(self, conn: _Connection, handle: int, req: protocol.NotificationRequest) -> None:
+        """Sample once per cycle; like the runtime, the first sample is
+        always sent, on-change ones only when the bytes differ."""
+        period = max(req.cycle_time_ms, self.cycle_ms) / 1000
+        last = None
+        while True:
+            try:
+                data = self._read(req.index_group, req.index_offset, req.length)
+            except _Fail:
+                data = None
+            if data is not None and (req.mode == protocol.TRANS_SERVER_CYCLE or data != last):
+                last = data
+                conn.notify(handle, data)
+            await asyncio.sleep(period)
+
+
+class _Fail(Exception):
+    def __init__(self, code: int):
+        self.code = code
+
+
+def _ok() -> bytes:
+    return struct.pack("<I", 0)
+
+
+def _ok_data(payload: bytes) -> bytes:
+    return struct.pack("<II", 0, len(payload)) + payload
+
+
+def _error(code: int) -> bytes:
+    return struct.pack("<II", code, 0)
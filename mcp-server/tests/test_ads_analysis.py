@@ -0,0 +1,116 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from twincat_mcp.ads import analysis, protocol, recfile  # noqa: E402
+from twincat_mcp.handlers import ads as ads_handlers  # noqa: E402
+
+START = protocol.FILETIME_UNIX_EPOCH + 1704164645 * 10_000_000
+ROWS = 10_000
+
+
+def _signals():
+    """1 ms samples with one 5 ms gap: a 1 s square wave, a ramp that
+    rises over 400 ms and drops at once, and noise with two NaNs."""
+    rng = np.random.default_rng(1)
+    times = START + np.arange(ROWS, dtype=np.int64) * 10_000
+    times[4000:] += 40_000
+    square = (np.arange(ROWS) // 1000) % 2 == 1
+    ramp = np.minimum(np.arange(ROWS) % 2000 / 5.0, 100.0)
+    noise = rng.normal(size=ROWS)
+    noise[[10, 20]] = np.nan
+    return times, [square, ramp, noise]
+
+
+class AnalyzeTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "rec.tcrec")
+        self.times, self.columns = _signals()
+        dtypes = ["<?", "<f8", "<f8"]
+        with open(self.path, "wb") as fh:
+            fh.write(recfile.encode_header(["MAIN.bPulse", "GVL.fRamp", "GVL.fNoise"], dtypes,
+                                           ["BOOL", "LREAL", "LREAL"]))
+            for i in range(0, ROWS, 3000):  # chunk boundaries inside edges and the gap
+                fh.write(recfile.encode_chunk(self.times[i:i + 3000], [c[i:i + 3000] for c in self.columns], dtypes))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _channel(self, result, name):
+        return next(c for c in result["Channels"] if c["Name"] == name)
+
+    def test_statistics(self):
+        result = analysis.analyze(self.path)
+        self.assertEqual((ROWS, "tcrec"), (result["Rows"], result["Format"]))
+        self.assertAlmostEqual(10.003, result["DurationSeconds"], places=6)
+        interval = result["SampleIntervalMs"]
+        self.assertEqual((1.0, 5.0, 1), (interval["Min"], interval["Max"], interval["Gaps"]))
+
+        noise = self._channel(result, "GVL.fNoise")
+        values = self.columns[2][np.isfinite(self.columns[2])]
+        self.assertEqual((ROWS - 2, 2), (noise["Count"], noise["NaN"]))
+        self.assertAlmostEqual(values.mean(), noise["Mean"], places=12)
+        self.assertAlmostEqual(values.std(), noise["Std"], places=12)
+        self.assertEqual((values.min(), values.max()), (noise["Min"], noise["Max"]))
+        for q in analysis.DEFAULT_PERCENTILES:
+            self.assertAlmostEqual(np.percentile(values, q, method="lower"), noise["Percentiles"][f"P{q}"],
+                                   delta=noise["PercentileResolution"])
+
+    def test_integer_percentiles_are_exact(self):
+        result = analysis.analyze(self.path, ["MAIN.bPulse"], [0, 49.99, 50.01, 100])
+        pulse = self._channel(result, "MAIN.bPulse")
+        self.assertEqual({"P0": 0, "P49.99": 0, "P50.01": 1, "P100": 1}, pulse["Percentiles"])
+        self.assertEqual((0, "BOOL"), (pulse["PercentileResolution"], pulse["DataType"]))
+
+    def test_edges_and_transition_times(self):
+        result = analysis.analyze(self.path, ["MAIN.bPulse", "GVL.fRamp"])
+        pulse = self._channel(result, "MAIN.bPulse")
+        self.assertEqual((5, 4), (pulse["RisingEdges"], pulse["FallingEdges"]))
+        self.assertEqual({"Mean": 1.0, "Min": 1.0, "Max": 1.0}, pulse["RiseTimeMs"])
+        self.assertEqual(5.0, pulse["FallTimeMs"]["Max"])  # across the gap
+
+        ramp = self._channel(result, "GVL.fRamp")
+        self.assertEqual((5, 4), (ramp["RisingEdges"], ramp["FallingEdges"]))
+        self.assertEqual(400.0, ramp["RiseTimeMs"]["Min"])
+        self.assertEqual(1.0, ramp["FallTimeMs"]["Min"])
+
+    def test_csv_gives_the_same_answer(self):
+        target, _ = recfile.convert(self.path)
+        with mock.patch.object(recfile, "CONVERT_ROWS", 777):
+            from_csv = analysis.analyze(target)
+        from_tcrec = analysis.analyze(self.path)
+        self.assertEqual("csv", from_csv["Format"])
+        for a, b in zip(from_csv["Channels"], from_tcrec["Channels"]):
+            for key in ("Count", "NaN", "Min", "Max", "Percentiles", "RisingEdges", "FallingEdges"):
+                self.assertEqual(a[key], b[key], key)
+            for key in ("Mean", "Std"):  # merged over other chunk boundaries
+                self.assertAlmostEqual(a[key], b[key], places=9)
+
+    def test_refusals(self):
+        with self.assertRaisesRegex(ValueError, "No column 'GVL.nope'"):
+            analysis.analyze(self.path, ["GVL.nope"])
+        with self.assertRaisesRegex(ValueError, "between 0 and 100"):
+            analysis.analyze(self.path, percentiles=[101])
+
+    def test_handler(self):
+        text = asyncio.run(ads_handlers.handle_analyze_recording({"path": self.path}, time.time()))[0].text
+        self.assertIn("✅ Recording Analysis", text)
+        self.assertIn("**GVL.fRamp** (LREAL)", text)
+        self.assertIn("edges: 5 rising, 4 falling; rise 400 ms", text)
+        self.assertIn("1 gap(s)", text)
+        missing = asyncio.run(ads_handlers.handle_analyze_recording({"path": self.path + ".x"}, time.time()))
+        self.assertIn("❌ Analysis failed", missing[0].text)
+
+
+if __name__ == "__main__":
+    unittest.main()
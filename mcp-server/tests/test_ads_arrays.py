@@ -0,0 +1,123 @@
+import os
+import struct
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_plc import FakePlc  # noqa: E402
+from twincat_mcp import ads  # noqa: E402
+from twincat_mcp.ads import arrays, protocol  # noqa: E402
+from twincat_mcp.ads.steps import read_array  # noqa: E402
+from twincat_mcp.handlers import ads as ads_handlers  # noqa: E402
+
+BUFFER = numpy.sin(numpy.arange(10_000, dtype=numpy.float32) / 100).astype(numpy.float32)
+
+
+class ReadArrayTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = mock.patch.dict(os.environ, {"LOCALAPPDATA": self.tmp.name})
+        self.env.start()
+        self.plc = FakePlc({"MAIN.nCounter": ("DINT", 42)})
+        self.plc.add_symbol("GVL.aBuffer", "ARRAY [0..9999] OF REAL", BUFFER.tobytes())
+        self.plc.add_symbol("GVL.aCounts", "ARRAY [1..4] OF DINT", struct.pack("<4i", 5, -2, 9, 0))
+        self.plc.add_symbol("GVL.aNames", "ARRAY [0..1] OF STRING(10)", b"")
+        await self.plc.start()
+        self.client = ads.AdsClient("127.0.0.1.1.1", 851, host=self.plc.host, tcp_port=self.plc.port)
+        await self.client.connect()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.plc.stop()
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def _memory_reads(self):
+        return [struct.unpack_from("<III", p.data) for p in self.plc.requests if p.command == protocol.CMD_READ
+                and struct.unpack_from("<I", p.data)[0] == 0x4020]
+
+    async def test_range_reads_only_its_span(self):
+        base = self.plc.symbols["GVL.ABUFFER"].index_offset
+        result = await read_array(self.client, "GVL.aBuffer", start=2000, count=500)
+
+        self.assertTrue(result["Success"], result.get("ErrorMessage"))
+        self.assertEqual([(0x4020, base + 8000, 2000)], self._memory_reads())
+        expected = BUFFER[2000:2500]
+        stats = result["Stats"]
+        self.assertEqual((500, 2000, 10_000, "REAL"), (stats["Count"], result["Start"], result["Length"],
+                                                        result["ElementType"]))
+        self.assertAlmostEqual(float(expected.max()), stats["Max"], places=6)
+        self.assertEqual(2000 + int(expected.argmin()), stats["MinIndex"])
+        self.assertAlmostEqual(float(expected.mean()), stats["Mean"], places=5)
+        self.assertEqual(arrays.PREVIEW_VALUES, len(result["Head"]))
+        self.assertNotIn("Values", result)
+
+    async def test_huge_range_is_chunked(self):
+        with mock.patch.object(arrays, "MAX_READ_CHUNK", 4096):
+            result = await read_array(self.client, "GVL.aBuffer")
+        self.assertEqual((10_000, 10), (result["Count"], result["Reads"]))
+        self.assertEqual(10, len(self._memory_reads()))
+        self.assertAlmostEqual(float(BUFFER[-1]), result["Tail"][-1], places=6)
+
+    async def test_declared_bounds_and_inline_values(self):
+        result = await read_array(self.client, "GVL.aCounts", start=2, count=3)
+        self.assertEqual([-2, 9, 0], result["Values"])
+        self.assertEqual((-2, 2), (result["Stats"]["Min"], result["Stats"]["MinIndex"]))
+
+        for start, count in [(0, 1), (4, 2), (1, 0)]:
+            bad = await read_array(self.client, "GVL.aCounts", start=start, count=count)
+            self.assertFalse(bad["Success"])
+            self.assertIn("outside GVL.aCounts [1..4]", bad["ErrorMessage"])
+
+    async def test_non_numeric_or_scalar_is_refused(self):
+        names = await read_array(self.client, "GVL.aNames", start=0, count=1)
+        self.assertIn("no numeric elements", names["ErrorMessage"])
+        scalar = await read_array(self.client, "MAIN.nCounter", start=0)
+        self.assertIn("not an array", scalar["ErrorMessage"])
+
+    async def test_dump_to_npy_and_csv(self):
+        result = await read_array(self.client, "GVL.aBuffer", start=10, count=1000,
+                                  dump_path=os.path.join(self.tmp.name, "out", "buf"))
+        self.assertTrue(result["DumpPath"].endswith("buf.npy"))
+        numpy.testing.assert_array_equal(BUFFER[10:1010], numpy.load(result["DumpPath"]))
+
+        result = await read_array(self.client, "GVL.aCounts", dump_path=os.path.join(self.tmp.name, "c.csv"))
+        with open(result["DumpPath"]) as fh:
+            self.assertEqual(["index,value", "1,5", "2,-2", "3,9", "4,0"], fh.read().split())
+
+
+class ReadArrayHandlerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.plc = FakePlc()
+        self.plc.add_symbol("GVL.aBuffer", "ARRAY [0..9999] OF REAL", BUFFER.tobytes())
+        await self.plc.start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = mock.patch.dict(os.environ, {"TWINCAT_ADS_ROUTER": self.plc.router, "LOCALAPPDATA": self.tmp.name})
+        self.env.start()
+
+    async def asyncTearDown(self):
+        await ads.shutdown_pool()
+        self.env.stop()
+        self.tmp.cleanup()
+        await self.plc.stop()
+
+    async def test_range_runs_on_python_client_with_host_backend(self):
+        with mock.patch.object(ads, "BACKEND", "host"):
+            out = await ads_handlers.handle_read_var(
+                {"amsNetId": "127.0.0.1.1.1", "symbol": "GVL.aBuffer", "start": 0, "count": 200}, time.time())
+        text = out[0].text
+        self.assertIn("GVL.aBuffer[0..199]", text)
+        self.assertIn("200 of 10000 × REAL (800 bytes in 1 ADS read(s))", text)
+        self.assertIn("…", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_plc import FakePlc  # noqa: E402
+from twincat_mcp import ads  # noqa: E402
+from twincat_mcp.ads import protocol  # noqa: E402
+from twincat_mcp.ads.cache import SymbolCache  # noqa: E402
+from twincat_mcp.ads.steps import read_var, read_var_list  # noqa: E402
+
+SYMBOLS = {
+    "MAIN.nCounter": ("DINT", 42),
+    "MAIN.bStart": ("BOOL", False),
+    "MAIN.fSpeed": ("REAL", 0.5),
+}
+
+
+class SymbolCacheTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.plc = await FakePlc(SYMBOLS, cycle_ms=1).start()
+        self.client = ads.AdsClient("127.0.0.1.1.1", 851, host=self.plc.host, tcp_port=self.plc.port)
+        await self.client.connect()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.plc.stop()
+
+    async def _wait_for(self, predicate, timeout=2.0):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not predicate():
+            self.assertLess(asyncio.get_running_loop().time(), deadline, "timed out")
+            await asyncio.sleep(0.01)
+
+    async def test_hot_read_var_is_a_single_read(self):
+        await read_var(self.client, "MAIN.nCounter")
+        self.plc.requests.clear()
+
+        result = await read_var(self.client, "main.ncounter")  # names are case-insensitive
+
+        self.assertEqual("42", result["Value"])
+        self.assertEqual([protocol.CMD_READ], [p.command for p in self.plc.requests])
+        self.assertEqual((1, 1), (self.client.symbols.hits, self.client.symbols.misses))
+
+    async def test_symbol_version_change_invalidates(self):
+        first = await self.client.symbols.get("MAIN.nCounter")
+        self.plc.bump_symbol_version()
+        await self._wait_for(lambda: self.client.symbols.invalidations)
+
+        second = await self.client.symbols.get("MAIN.nCounter")
+        self.assertNotEqual(first.handle, second.handle)
+        self.assertEqual(2, self.client.symbols.version)
+
+    async def test_stale_handle_is_re_resolved_before_the_notification(self):
+        await read_var_list(self.client, ["MAIN.nCounter", "MAIN.fSpeed"])
+        # Handles gone, version unchanged: as if the notification hadn't arrived yet.
+        self.plc.handles.clear()
+
+        single = await read_var(self.client, "MAIN.nCounter")
+        listed = await read_var_list(self.client, ["MAIN.nCounter", "MAIN.fSpeed"])
+
+        self.assertTrue(single["Success"], single.get("ErrorMessage"))
+        self.assertEqual(0, listed["ErrorCount"])
+        self.assertEqual(1, self.client.symbols.invalidations)
+
+    async def test_least_recently_used_handles_are_released(self):
+        cache = SymbolCache(self.client, max_entries=2)
+        await cache.lookup(["MAIN.nCounter", "MAIN.bStart"])
+        await cache.get("MAIN.nCounter")
+        await cache.get("MAIN.fSpeed")
+        await self._wait_for(lambda: len(self.plc.handles) == 2)
+
+        self.assertEqual({"MAIN.nCounter", "MAIN.fSpeed"}, set(self.plc.handles.values()))
+        self.assertEqual(2, len(cache))
+
+    async def test_target_without_notifications_polls_the_version(self):
+        self.plc.inject_error(protocol.ADSERR_DEVICE_SRVNOTSUPP, command=protocol.CMD_ADD_NOTIFICATION)
+        await self.client.symbols.get("MAIN.nCounter")
+        self.plc.bump_symbol_version()
+
+        await self.client.symbols.get("MAIN.nCounter")
+        self.assertEqual(1, self.client.symbols.invalidations)
+
+    async def test_reconnect_starts_with_an_empty_cache(self):
+        await self.client.symbols.get("MAIN.nCounter")
+        await self.client.close()
+        self.assertEqual(0, len(self.client.symbols))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,229 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_host import FakeShellHost, default_responder  # noqa: E402
+from fake_plc import FakePlc  # noqa: E402
+from twincat_mcp import ads, host  # noqa: E402
+from twincat_mcp.ads import protocol, steps  # noqa: E402
+from twincat_mcp.ads.values import decode_value, encode_value, format_value  # noqa: E402
+from twincat_mcp.handlers import ads as ads_handlers  # noqa: E402
+
+SYMBOLS = {
+    "MAIN.nCounter": ("DINT", 42),
+    "MAIN.bStart": ("BOOL", False),
+    "MAIN.fSpeed": ("REAL", 0.1),
+    "MAIN.sName": ("STRING(20)", "conveyor"),
+}
+
+
+class AdsClientTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.plc = await FakePlc(SYMBOLS).start()
+        self.client = ads.AdsClient("127.0.0.1.1.1", 851, host=self.plc.host, tcp_port=self.plc.port)
+        await self.client.connect()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.plc.stop()
+
+    async def test_state_and_device_info(self):
+        self.assertEqual((protocol.ADS_STATE_RUN, 0), await self.client.read_state())
+        await self.client.write_control(protocol.ADS_STATE_STOP)
+        self.assertEqual(protocol.ADS_STATE_STOP, (await self.client.read_state())[0])
+        info = await self.client.read_device_info()
+        self.assertEqual(("Plc30 App", "3.1.4024"), (info.name, info.version))
+
+    async def test_symbol_info_and_handle_round_trip(self):
+        info = await self.client.read_symbol_info("main.ncounter")
+        self.assertEqual(("MAIN.nCounter", "DINT", 4), (info.name, info.type_name, info.size))
+
+        handle = await self.client.get_handle("MAIN.nCounter")
+        await self.client.write_by_handle(handle, encode_value("DINT", 4, "-7"))
+        self.assertEqual(-7, decode_value("DINT", await self.client.read_by_handle(handle, 4)))
+        await self.client.release_handle(handle)
+        self.assertEqual({}, self.plc.handles)
+
+    async def test_requests_are_pipelined_on_one_connection(self):
+        names = ["MAIN.nCounter", "MAIN.bStart", "MAIN.fSpeed", "MAIN.sName"]
+        infos = await asyncio.gather(*(self.client.read_symbol_info(n) for n in names))
+        self.assertEqual(names, [i.name for i in infos])
+        self.assertEqual(1, self.plc.connections)
+
+    async def test_unknown_symbol_raises_ads_error(self):
+        with self.assertRaises(ads.AdsError) as ctx:
+            await self.client.get_handle("MAIN.nope")
+        self.assertEqual(protocol.ADSERR_DEVICE_SYMBOLNOTFOUND, ctx.exception.code)
+        self.assertIn("MAIN.nope", str(ctx.exception))
+
+    async def test_unreachable_router_raises_connection_error(self):
+        await self.plc.stop()
+        client = ads.AdsClient("127.0.0.1.1.1", host=self.plc.host, tcp_port=self.plc.port, timeout=1)
+        with self.assertRaises(ads.AdsConnectionError):
+            await client.connect()
+
+    async def test_sum_read_is_chunked_and_keeps_item_order(self):
+        items = [(i.index_group, i.index_offset, i.size) for i in self.plc.symbols.values()]
+        with mock.patch.object(ads.client, "MAX_SUM_BYTES", 40):
+            results = await self.client.sum_read(items)
+
+        self.assertEqual([self.plc.raw_value(n) for n in SYMBOLS], [data for _, data in results])
+        self.assertEqual(3, len(self.plc.requests))
+
+    async def test_resolve_symbols_releases_handles_of_failed_items(self):
+        resolved = await self.client.resolve_symbols(["MAIN.bStart", "MAIN.nope", "MAIN.sName"])
+
+        self.assertEqual(["MAIN.bStart", None, "MAIN.sName"], [i and i.name for i, _, _ in resolved])
+        self.assertEqual(protocol.ADSERR_DEVICE_SYMBOLNOTFOUND, resolved[1][2])
+        await self.client.release_handles([h for _, h, _ in resolved if h is not None])
+        self.assertEqual({}, self.plc.handles)
+
+    async def test_dropped_connection_fails_pending_requests(self):
+        self.plc.drop_connections()
+        await asyncio.sleep(0.05)
+        with self.assertRaises(ads.AdsConnectionError):
+            await self.client.read_state()
+
+
+class AdsValueTests(unittest.TestCase):
+    def test_values_render_like_dotnet(self):
+        self.assertEqual("0.1", format_value("REAL", decode_value("REAL", encode_value("REAL", 4, "0.1"))))
+        self.assertEqual("1E+20", format_value("LREAL", 1e20))
+        self.assertEqual("True", format_value("BOOL", True))
+        self.assertEqual("abc", decode_value("STRING(5)", encode_value("STRING(5)", 6, "abc")))
+        self.assertEqual("01 0A", decode_value("ARRAY [0..1] OF BYTE", b"\x01\x0a"))
+
+    def test_out_of_range_write_is_rejected(self):
+        with self.assertRaises(ValueError):
+            encode_value("BYTE", 1, "300")
+
+
+class PythonBackendHandlerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.plc = await FakePlc(SYMBOLS).start()
+        self.env = mock.patch.dict(os.environ, {"TWINCAT_ADS_ROUTER": self.plc.router})
+        self.env.start()
+        self.backend = mock.patch.object(ads, "BACKEND", "python")
+        self.backend.start()
+
+    async def asyncTearDown(self):
+        await ads.shutdown_pool()
+        self.backend.stop()
+        self.env.stop()
+        await self.plc.stop()
+
+    async def test_read_var(self):
+        out = await ads_handlers.handle_read_var({"symbol": "MAIN.fSpeed"}, time.time())
+        self.assertIn("Value: `0.1`", out[0].text)
+        self.assertIn("REAL", out[0].text)
+
+    async def test_write_var_reports_previous_and_new(self):
+        out = await ads_handlers.handle_write_var(
+            {"symbol": "MAIN.nCounter", "value": "43"}, time.time())
+        self.assertIn("Previous: `42`", out[0].text)
+        self.assertIn("New Value: `43`", out[0].text)
+        self.assertEqual(b"\x2b\0\0\0", self.plc.raw_value("MAIN.nCounter"))
+
+    async def test_read_var_when_plc_stopped(self):
+        self.plc.ads_state = protocol.ADS_STATE_STOP
+        self.plc.symbols.clear()
+        out = await ads_handlers.handle_read_var({"symbol": "MAIN.fSpeed"}, time.time())
+        self.assertIn("PLC is not running (state: Stop)", out[0].text)
+
+    async def test_read_var_list_uses_constant_round_trips(self):
+        out = await ads_handlers.handle_read_var_list(
+            {"symbols": ["MAIN.nCounter", "MAIN.nope", "MAIN.sName"]}, time.time())
+
+        self.assertIn("`MAIN.nCounter` = **42** (DINT)", out[0].text)
+        self.assertIn("`MAIN.sName` = **conveyor**", out[0].text)
+        self.assertIn("`MAIN.nope` ❌ ADS Error: 0x710 - symbol not found", out[0].text)
+        # read state, symbol version (read + watch), sum read/write (infos + handles), sum read
+        self.assertEqual(5, len(self.plc.requests))
+        self.assertEqual(2, len(self.plc.handles))  # kept by the symbol cache
+
+        self.plc.requests.clear()
+        await ads_handlers.handle_read_var_list({"symbols": ["MAIN.nCounter", "MAIN.sName"]}, time.time())
+        # read state, sum read
+        self.assertEqual(2, len(self.plc.requests))
+
+    async def test_write_var_list_in_three_data_round_trips(self):
+        variables = {"MAIN.nCounter": "7", "MAIN.bStart": "TRUE", "MAIN.nope": "1", "MAIN.fSpeed": "abc"}
+        out = await ads_handlers.handle_write_var_list({"variables": variables}, time.time())
+
+        self.assertIn("`MAIN.nCounter`: 42 → **7**", out[0].text)
+        self.assertIn("`MAIN.bStart`: False → **True**", out[0].text)
+        self.assertIn("`MAIN.nope` ❌ ADS Error: 0x710", out[0].text)
+        self.assertIn("`MAIN.fSpeed` ❌", out[0].text)
+        self.assertEqual(b"\x07\0\0\0", self.plc.raw_value("MAIN.nCounter"))
+        # resolve, pre-read, write, verify
+        sums = [p for p in self.plc.requests if p.command == protocol.CMD_READ_WRITE]
+        self.assertEqual(4, len(sums))
+
+    async def test_write_var_list_without_verify(self):
+        out = await ads_handlers.handle_write_var_list(
+            {"variables": {"MAIN.sName": "belt"}, "verify": False}, time.time())
+
+        self.assertIn("`MAIN.sName`: conveyor → **belt**", out[0].text)
+        # read state, symbol version (read + watch), resolve, pre-read, write
+        self.assertEqual(6, len(self.plc.requests))
+
+    async def test_get_state(self):
+        out = await ads_handlers.handle_get_state({}, time.time())
+        self.assertIn("**Run**", out[0].text)
+
+    async def test_set_state_through_the_pool(self):
+        with mock.patch.object(steps, "SET_STATE_SETTLE_SEC", 0):
+            out = await ads_handlers.handle_set_state({"state": "Stop"}, time.time())
+            self.assertIn("🔄 Previous: Run", out[0].text)
+            self.assertIn("✅ Current: **Stop**", out[0].text)
+            self.assertEqual(protocol.ADS_STATE_STOP, self.plc.ads_state)
+
+            out = await ads_handlers.handle_set_state({"state": "config"}, time.time())
+            self.assertIn("✅ Current: **Config**", out[0].text)
+            self.assertIn("Configuration mode 🔧", out[0].text)
+            out = await ads_handlers.handle_set_state({"state": "Config"}, time.time())
+            self.assertIn("Already in requested state", out[0].text)
+        # Run and Config went to the system service, Stop to the PLC
+        ports = {p.target_port for p in self.plc.requests if p.command == protocol.CMD_WRITE_CONTROL}
+        self.assertEqual({851, 10000}, ports)
+        self.assertEqual({("127.0.0.1.1.1", 851), ("127.0.0.1.1.1", 10000)}, set(ads.get_pool().keys()))
+
+        out = await ads_handlers.handle_set_state({"state": "Pause"}, time.time())
+        self.assertIn("❌ Failed to set state: Invalid state 'Pause'", out[0].text)
+
+    async def test_ping_target(self):
+        out = await ads_handlers.handle_ping_target({}, time.time())
+        self.assertIn("🟢 Ping 127.0.0.1.1.1  →  **reachable**", out[0].text)
+        self.assertIn("runtime in Run", out[0].text)
+
+        self.plc.ads_state = protocol.ADS_STATE_STOP
+        out = await ads_handlers.handle_ping_target({}, time.time())
+        self.assertIn("**rebooting**", out[0].text)
+        self.assertIn("TwinCAT runtime is Stop", out[0].text)
+
+    async def test_unreachable_router_falls_back_to_host(self):
+        await self.plc.stop()
+
+        async def responder(proc, req):
+            if req["method"] == "execute-step":
+                return {"command": "get-state", "result": {"Success": True, "AdsState": "Config"}}
+            return await default_responder(proc, req)
+
+        original = host._ads_host
+        host._ads_host = FakeShellHost(responder, role="ads")
+        try:
+            out = await ads_handlers.handle_get_state({}, time.time())
+        finally:
+            host._ads_host = original
+        self.assertIn("**Config**", out[0].text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+import json
+import os
+import struct
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_plc import FakePlc  # noqa: E402
+from twincat_mcp import ads  # noqa: E402
+from twincat_mcp.ads import protocol  # noqa: E402
+from twincat_mcp.ads.codecs import EnumCodec, TypeRegistry  # noqa: E402
+from twincat_mcp.ads.protocol import DataTypeEntry  # noqa: E402
+from twincat_mcp.ads.steps import read_var, read_var_list, write_var, write_var_list  # noqa: E402
+
+ITEM = protocol.DATATYPE_FLAG_DATAITEM
+BIT = protocol.DATATYPE_FLAG_DATAITEM | protocol.DATATYPE_FLAG_BITVALUES
+
+E_STATE = DataTypeEntry("E_State", "INT", 2, 0, 2, protocol.DATATYPE_FLAG_DATATYPE | protocol.DATATYPE_FLAG_ENUMINFOS,
+                        enum_values=(("Idle", 0), ("Running", 1), ("Fault", -1)))
+# Aligned like TwinCAT lays it out (pack mode 8): 40 bytes with gaps.
+ST_MOTOR = DataTypeEntry("ST_Motor", "", 40, 0, 65, protocol.DATATYPE_FLAG_DATATYPE, sub_items=(
+    DataTypeEntry("bEnable", "BOOL", 1, 0, 33, ITEM),
+    DataTypeEntry("fSpeed", "LREAL", 8, 8, 5, ITEM),
+    DataTypeEntry("eState", "E_State", 2, 16, 2, ITEM),
+    DataTypeEntry("sName", "STRING(10)", 11, 18, 30, ITEM),
+    DataTypeEntry("tRamp", "TIME", 4, 32, 19, ITEM),
+))
+ST_FLAGS = DataTypeEntry("ST_Flags", "", 2, 0, 65, protocol.DATATYPE_FLAG_DATATYPE, sub_items=(
+    DataTypeEntry("bReady", "BIT", 1, 0, 33, BIT),
+    DataTypeEntry("bError", "BIT", 1, 3, 33, BIT),
+    DataTypeEntry("nCode", "USINT", 1, 1, 17, ITEM),
+))
+MOTOR = {"bEnable": True, "fSpeed": 1.5, "eState": "Running", "sName": "axis1", "tRamp": "T#1s500ms"}
+
+
+class CodecTests(unittest.TestCase):
+    def setUp(self):
+        self.types = TypeRegistry([E_STATE, ST_MOTOR, ST_FLAGS])
+
+    def test_aligned_struct_compiles_to_one_struct(self):
+        codec = self.types.codec("ST_Motor")
+        self.assertEqual("<?7xdh11s3xI4x", codec._struct.format)
+        data = codec.encode(MOTOR)
+        self.assertEqual(40, len(data))
+        self.assertEqual(1500, struct.unpack_from("<I", data, 32)[0])
+        self.assertEqual(MOTOR, codec.decode(data))
+
+    def test_arrays_of_structs_and_matrices(self):
+        codec = self.types.codec("ARRAY [1..3] OF ST_Motor")
+        motors = [dict(MOTOR, fSpeed=float(i)) for i in range(3)]
+        data = codec.encode(motors)
+        self.assertEqual(120, len(data))
+        self.assertEqual(motors, codec.decode(data))
+        self.assertEqual(motors, codec.decode_at(data, 0))
+
+        matrix = self.types.codec("ARRAY [0..1, 0..2] OF INT")
+        self.assertEqual("<6h", matrix._struct.format)
+        self.assertEqual([[1, 2, 3], [4, 5, 6]], matrix.decode(struct.pack("<6h", 1, 2, 3, 4, 5, 6)))
+        self.assertEqual(struct.pack("<6h", 9, 2, 3, 4, 5, 6), matrix.encode([[9]], base=struct.pack("<6h", 1, 2, 3, 4, 5, 6)))
+
+    def test_partial_struct_keeps_the_other_members(self):
+        codec = self.types.codec("ST_Motor")
+        base = codec.encode(MOTOR)
+        updated = codec.decode(codec.encode({"FSPEED": 3, "estate": "E_State.Fault"}, base=base))
+        self.assertEqual(dict(MOTOR, fSpeed=3.0, eState="Fault"), updated)
+
+    def test_bit_members_and_bit_arrays(self):
+        flags = self.types.codec("ST_Flags")
+        self.assertIsNone(flags._struct)
+        self.assertEqual({"bReady": True, "bError": True, "nCode": 7}, flags.decode(b"\x09\x07"))
+        self.assertEqual(b"\x01\x07", flags.encode({"bError": False}, base=b"\x09\x07"))
+
+        bits = self.types.codec("ARRAY [0..9] OF BIT", 2)
+        self.assertEqual([True, False, False, False, False, False, False, False, False, True], bits.decode(b"\x01\x02"))
+        self.assertEqual(b"\x03\x02", bits.encode([True, True], base=b"\x01\x02"))
+
+    def test_enums_strings_and_unknown_types(self):
+        enum = self.types.codec("E_State")
+        self.assertEqual("Fault", enum.decode(struct.pack("<h", -1)))
+        self.assertEqual(7, enum.decode(struct.pack("<h", 7)))
+        with self.assertRaises(ValueError):
+            enum.encode("Bogus")
+        self.assertEqual(b"\xff\xff", enum.encode("Fault"))
+
+        byte_enum = EnumCodec("E_Byte", 1, [("Low", 1), ("High", 200)])
+        self.assertEqual(b"\xc8", byte_enum.encode("High"))
+        self.assertEqual("High", byte_enum.decode(b"\xc8"))
+        self.assertEqual(b"\xfa", byte_enum.encode(250))
+
+        wide = self.types.codec("WSTRING(5)")
+        self.assertEqual(12, wide.size)
+        self.assertEqual("grüß", wide.decode(wide.encode("grüß")))
+        self.assertEqual("abcde", wide.decode(wide.encode("abcdefgh")))
+
+        raw = self.types.codec("POINTER TO INT", 8)
+        self.assertEqual("01 00 00 00 00 00 00 00", raw.decode(b"\x01" + b"\0" * 7))
+
+    def test_time_and_date_literals(self):
+        cases = [
+            ("TIME", 3_723_004, "T#1h2m3s4ms"),
+            ("TIME", 0, "T#0ms"),
+            ("LTIME", 1_500_000_250, "LTIME#1s500ms250ns"),
+            ("DATE", 1_714_521_600, "D#2024-05-01"),
+            ("DT", 1_714_564_800, "DT#2024-05-01-12:00:00"),
+            ("TOD", 43_200_500, "TOD#12:00:00.5"),
+            ("LDT", 1_714_564_800_123_456_789, "LDT#2024-05-01-12:00:00.123456789"),
+        ]
+        for type_name, ticks, literal in cases:
+            codec = self.types.codec(type_name)
+            data = codec.encode(ticks)
+            self.assertEqual(literal, codec.decode(data), type_name)
+            self.assertEqual(data, codec.encode(literal), type_name)
+        self.assertEqual(struct.pack("<I", 90_000), self.types.codec("TIME").encode("t#1.5m"))
+        with self.assertRaises(ValueError):
+            self.types.codec("TIME").encode("T#soon")
+
+    def test_enum_values_survive_the_upload_format(self):
+        data = protocol.encode_datatype_entry(E_STATE) + protocol.encode_datatype_entry(ST_MOTOR)
+        self.assertEqual([E_STATE, ST_MOTOR], protocol.parse_datatype_upload(data))
+
+
+class CodecStepTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = mock.patch.dict(os.environ, {"LOCALAPPDATA": self.tmp.name})
+        self.env.start()
+        self.plc = FakePlc({"MAIN.nCounter": ("DINT", 42)})
+        self.plc.add_type(E_STATE)
+        self.plc.add_type(ST_MOTOR)
+        self.plc.add_symbol("GVL.stMotor", "ST_Motor", TypeRegistry([E_STATE, ST_MOTOR]).codec("ST_Motor").encode(MOTOR))
+        self.plc.add_symbol("GVL.aSpeeds", "ARRAY [0..3] OF LREAL", struct.pack("<4d", 1, 2, 3, 4))
+        self.plc.add_symbol("GVL.eState", "E_State", struct.pack("<h", 1))
+        await self.plc.start()
+        self.client = ads.AdsClient("127.0.0.1.1.1", 851, host=self.plc.host, tcp_port=self.plc.port)
+        await self.client.connect()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.plc.stop()
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def _reads(self, index_group):
+        return sum(1 for p in self.plc.requests if p.command == protocol.CMD_READ
+                   and struct.unpack_from("<I", p.data)[0] == index_group)
+
+    async def test_struct_is_one_read_decoded_as_json(self):
+        await read_var(self.client, "GVL.stMotor")
+        self.plc.requests.clear()
+
+        result = await read_var(self.client, "GVL.stMotor")
+
+        self.assertTrue(result["Success"], result.get("ErrorMessage"))
+        self.assertEqual(MOTOR, json.loads(result["Value"]))
+        self.assertEqual(MOTOR, result["RawValue"])
+        self.assertEqual([protocol.CMD_READ], [p.command for p in self.plc.requests])
+
+    async def test_types_uploaded_once_and_scalars_never_need_them(self):
+        await read_var(self.client, "MAIN.nCounter")
+        self.assertEqual(0, self._reads(protocol.IG_SYM_DT_UPLOAD))
+
+        listed = await read_var_list(self.client, ["GVL.aSpeeds", "GVL.eState", "MAIN.nCounter"])
+        await read_var(self.client, "GVL.eState")
+
+        self.assertEqual(1, self._reads(protocol.IG_SYM_DT_UPLOAD))
+        values = {name: item["Value"] for name, item in listed["Results"].items()}
+        self.assertEqual({"GVL.aSpeeds": "[1.0, 2.0, 3.0, 4.0]", "GVL.eState": "Running", "MAIN.nCounter": "42"}, values)
+
+    async def test_write_partial_struct_and_enum(self):
+        result = await write_var(self.client, "GVL.stMotor", '{"fSpeed": 2.25, "tRamp": "T#2s"}')
+        self.assertTrue(result["Success"], result.get("ErrorMessage"))
+        self.assertEqual(dict(MOTOR, fSpeed=2.25, tRamp="T#2s"), json.loads(result["NewValue"]))
+        self.assertEqual(MOTOR, json.loads(result["PreviousValue"]))
+
+        listed = await write_var_list(self.client, {"GVL.eState": "Fault", "GVL.aSpeeds": "[0, 0]"})
+        self.assertEqual(0, listed["ErrorCount"], listed["Results"])
+        self.assertEqual("[0.0, 0.0, 3.0, 4.0]", listed["Results"]["GVL.aSpeeds"]["NewValue"])
+        self.assertEqual(struct.pack("<h", -1), self.plc.raw_value("GVL.eState"))
+
+    async def test_invalid_member_is_rejected_without_writing(self):
+        before = self.plc.raw_value("GVL.stMotor")
+        result = await write_var(self.client, "GVL.stMotor", '{"nope": 1}')
+        self.assertFalse(result["Success"])
+        self.assertIn("no member", result["ErrorMessage"])
+        self.assertEqual(before, self.plc.raw_value("GVL.stMotor"))
+
+
+if __name__ == "__main__":
+    unittest.main()
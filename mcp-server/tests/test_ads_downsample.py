@@ -0,0 +1,95 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from twincat_mcp.ads import downsample, protocol, recfile  # noqa: E402
+from twincat_mcp.ads.downsample import lttb, preview  # noqa: E402
+from twincat_mcp.handlers import ads as ads_handlers  # noqa: E402
+
+START = protocol.FILETIME_UNIX_EPOCH + 1704164645 * 10_000_000
+ROWS = 50_000
+SPIKE = 31_337
+
+
+class LttbTests(unittest.TestCase):
+    def test_keeps_the_ends_and_the_peaks(self):
+        x = np.arange(100, dtype=float)
+        y = np.zeros(100)
+        y[[30, 70]] = [5.0, -5.0]
+        keep = lttb(x, y, 10)
+        self.assertEqual(10, len(keep))
+        self.assertEqual((0, 99), (keep[0], keep[-1]))
+        self.assertIn(30, keep)
+        self.assertIn(70, keep)
+        self.assertTrue(np.all(np.diff(keep) > 0))
+        self.assertEqual(list(range(5)), list(lttb(x[:5], y[:5], 10)))
+
+
+class PreviewTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "rec.tcrec")
+        times = START + np.arange(ROWS, dtype=np.int64) * 10_000
+        wave = np.sin(np.arange(ROWS) / 2000)
+        wave[SPIKE] = 9.0  # one sample, far inside a chunk and a bucket
+        steps = (np.arange(ROWS) // 7).astype(float)
+        steps[:100] = np.nan
+        dtypes = ["<f4", "<f8"]
+        with open(self.path, "wb") as fh:
+            fh.write(recfile.encode_header(["GVL.fWave", "GVL.fSteps"], dtypes, ["REAL", "LREAL"]))
+            for i in range(0, ROWS, 4096):
+                fh.write(recfile.encode_chunk(times[i:i + 4096], [wave[i:i + 4096], steps[i:i + 4096]], dtypes))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_keeps_spikes(self):
+        for method, most in (("lttb", 100), ("minmax", 102)):
+            result = preview(self.path, ["GVL.fWave"], points=100, method=method)
+            wave = result["Channels"][0]
+            self.assertLessEqual(wave["Points"], most, method)
+            self.assertGreater(wave["Points"], 90, method)
+            self.assertEqual(9, max(wave["Values"]), method)
+            self.assertIn(SPIKE, wave["TimeMs"], method)
+            self.assertEqual((0, ROWS - 1), (wave["TimeMs"][0], wave["TimeMs"][-1]), method)
+            self.assertEqual(sorted(wave["TimeMs"]), wave["TimeMs"])
+
+    def test_nans_are_skipped(self):
+        steps = preview(self.path, ["GVL.fSteps"], points=50)["Channels"][0]
+        self.assertEqual(100, steps["TimeMs"][0])
+        self.assertEqual((14, (ROWS - 1) // 7), (steps["Values"][0], steps["Values"][-1]))
+
+    def test_short_recordings_come_back_whole(self):
+        csv_path, _ = recfile.convert(self.path)
+        short = os.path.join(self.tmp.name, "short.csv")
+        with open(csv_path, encoding="utf-8") as src, open(short, "w", encoding="utf-8") as dst:
+            dst.writelines(line for _, line in zip(range(41), src))
+        result = preview(short, ["GVL.fWave"], points=100)
+        self.assertEqual((40, 40), (result["Rows"], result["Channels"][0]["Points"]))
+
+    def test_refusals(self):
+        with self.assertRaisesRegex(ValueError, "Unknown method 'mean'"):
+            preview(self.path, method="mean")
+        with self.assertRaisesRegex(ValueError, "points must be between 3"):
+            preview(self.path, points=downsample.MAX_POINTS + 1)
+
+    def test_handler(self):
+        text = asyncio.run(ads_handlers.handle_preview_recording(
+            {"path": self.path, "variables": ["GVL.fWave"], "points": 20}, time.time()))[0].text
+        self.assertIn("✅ Recording Preview", text)
+        self.assertIn("**GVL.fWave** (REAL): 20 points [timeMs, value]", text)
+        self.assertIn("[0,0]", text)
+        bad = asyncio.run(ads_handlers.handle_preview_recording({"path": self.path, "method": "x"}, time.time()))
+        self.assertIn("❌ Preview failed", bad[0].text)
+
+
+if __name__ == "__main__":
+    unittest.main()
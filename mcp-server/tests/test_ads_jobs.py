@@ -0,0 +1,146 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_plc import FakePlc  # noqa: E402
+from twincat_mcp import ads  # noqa: E402
+from twincat_mcp.ads import jobs, watch  # noqa: E402
+from twincat_mcp.ads.recorder import Recorder  # noqa: E402
+from twincat_mcp.handlers import ads as ads_handlers  # noqa: E402
+
+NET_ID = "127.0.0.1.1.1"
+
+
+def _lines(path):
+    with open(path, encoding="utf-8") as fh:
+        return fh.read().splitlines()
+
+
+class RecordingJobTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.plc = await FakePlc({
+            "GVL.fSpeed": ("REAL", 1.5),
+            "GVL.nCount": ("DINT", 7),
+            "MAIN.bRun": ("BOOL", False),
+        }, cycle_ms=1).start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = mock.patch.dict(os.environ, {"TWINCAT_ADS_ROUTER": self.plc.router, "LOCALAPPDATA": self.tmp.name})
+        self.env.start()
+
+    async def asyncTearDown(self):
+        await jobs.shutdown_jobs()
+        await ads.shutdown_pool()
+        self.env.stop()
+        self.tmp.cleanup()
+        await self.plc.stop()
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    async def test_records_in_the_background_with_a_tail(self):
+        started = await jobs.start(NET_ID, 851, ["GVL.fSpeed", "GVL.nCount"], self._path("a.csv"),
+                                   sample_time_ms=1, tail_rows=5)
+        self.assertTrue(started["Success"], started)
+        self.assertEqual("recording", started["Status"])
+        job_id = started["JobId"]
+
+        await asyncio.sleep(0.2)  # the tool call returned; the recording goes on
+        self.plc.set_value("GVL.nCount", 8)
+        await asyncio.sleep(0.1)
+        status = jobs.status(job_id, tail=100)
+        self.assertEqual("recording", status["Status"])
+        self.assertEqual(5, len(status["Tail"]))  # bounded by tail_rows
+        self.assertEqual(["1.5", "8"], status["Tail"][-1][1:])
+        self.assertTrue(status["Tail"][-1][0].endswith("+00:00"))
+        self.assertNotIn("Result", status)
+
+        result = await jobs.stop(job_id)
+        self.assertTrue(result["Success"], result)
+        self.assertEqual(result["SamplesCollected"] + 1, len(_lines(self._path("a.csv"))))
+        self.assertEqual(1, self.plc.notification_count)  # only the symbol cache's own
+        self.assertFalse(jobs.status(job_id)["Success"])
+
+    async def test_concurrent_recordings_on_two_targets(self):
+        a = await jobs.start(NET_ID, 851, ["GVL.fSpeed"], self._path("a.csv"), sample_time_ms=1)
+        b = await jobs.start(NET_ID, 852, ["GVL.nCount"], self._path("b.tcrec"), sample_time_ms=1, duration_sec=0.1)
+        self.assertEqual(("r1", "r2"), (a["JobId"], b["JobId"]))
+        self.assertEqual(2, len(ads.get_pool()))
+        await asyncio.sleep(0.3)
+
+        listed = jobs.status()["Jobs"]
+        self.assertEqual([("r1", "recording"), ("r2", "done")], [(j["JobId"], j["Status"]) for j in listed])
+        finished = jobs.status("r2")
+        self.assertTrue(finished["Result"]["Success"])  # kept until stopped
+        self.assertTrue((await jobs.stop("r2"))["Success"])
+        self.assertTrue((await jobs.stop("r1"))["Success"])
+
+    async def test_start_trigger_and_refusals(self):
+        waiting = await jobs.start(NET_ID, 851, ["GVL.fSpeed"], self._path("t.csv"), sample_time_ms=1,
+                                   start_trigger="MAIN.bRun == TRUE", max_time_sec=5)
+        self.assertEqual("waiting", waiting["Status"])
+        result = await jobs.stop(waiting["JobId"])
+        self.assertEqual((True, "stopped"), (result["Success"], result["TriggerStatus"]))
+
+        bad = await jobs.start(NET_ID, 851, ["GVL.nope"], self._path("x.csv"))
+        self.assertFalse(bad["Success"])
+        self.assertIn("Failed to read symbol 'GVL.nope'", bad["ErrorMessage"])
+        self.assertEqual(0, len(jobs.get_jobs()))
+        bad = await jobs.start(NET_ID, 851, ["GVL.fSpeed"], self._path("x.csv"), tail_rows=-1)
+        self.assertIn("tailRows must be between 0", bad["ErrorMessage"])
+        with mock.patch.object(jobs, "MAX_JOBS", 0):
+            bad = await jobs.start(NET_ID, 851, ["GVL.fSpeed"], self._path("x.csv"))
+        self.assertIn("recordings running", bad["ErrorMessage"])
+        self.assertIn("No recording 'r9'", (await jobs.stop("r9"))["ErrorMessage"])
+
+    async def test_watches_and_recordings_leave_a_connection_free(self):
+        pool = ads.AdsConnectionPool(max_connections=2)
+        watches, recordings = watch.WatchManager(pool), jobs.RecordingJobs(pool)
+        try:
+            await watches.subscribe(NET_ID, 851, ["GVL.fSpeed"])
+            job, ended = await recordings.start(Recorder(NET_ID, 852, ["GVL.nCount"], self._path("b.csv")))
+            self.assertIn("hold connections to at most 1 targets", ended["ErrorMessage"])
+            self.assertEqual([(NET_ID, 851)], pool.held())
+
+            # the same target as the watch shares its connection
+            job, ended = await recordings.start(Recorder(NET_ID, 851, ["GVL.nCount"], self._path("a.csv")))
+            self.assertIsNone(ended)
+            # and a call to another target still gets a connection
+            state = await asyncio.wait_for(pool.run(NET_ID, 853, lambda client: client.read_state()), 2)
+            self.assertEqual(2, len(state))
+            await recordings.close_all()
+            await watches.close_all()
+            self.assertEqual([], pool.held())
+        finally:
+            await pool.close_all()
+
+    async def test_handlers(self):
+        path = self._path("h.csv")
+        out = await ads_handlers.handle_ads_record_start(
+            {"amsNetId": NET_ID, "variables": ["GVL.nCount"], "sampleTimeMs": 1, "outputPath": path}, time.time())
+        self.assertIn("⏺ Recording **r1** started", out[0].text)
+        await asyncio.sleep(0.1)
+
+        out = await ads_handlers.handle_ads_record_status({"jobId": "r1", "tail": 2}, time.time())
+        self.assertIn("⏺ Recording **r1**: recording", out[0].text)
+        self.assertIn("Last 2 row(s)", out[0].text)
+        self.assertIn("  Timestamp, GVL.nCount\n", out[0].text)
+        out = await ads_handlers.handle_ads_record_status({}, time.time())
+        self.assertIn("**r1** recording", out[0].text)
+
+        out = await ads_handlers.handle_ads_record_stop({"jobId": "r1"}, time.time())
+        self.assertIn("✅ ADS Recording Complete", out[0].text)
+        self.assertIn(path, out[0].text)
+        out = await ads_handlers.handle_ads_record_stop({"jobId": "r1"}, time.time())
+        self.assertIn("❌ No recording 'r1'", out[0].text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_plc import FakePlc  # noqa: E402
+from twincat_mcp import ads  # noqa: E402
+from twincat_mcp.ads import protocol  # noqa: E402
+from twincat_mcp.ads.steps import run_step  # noqa: E402
+
+NET_ID = "127.0.0.1.1.1"
+
+
+class AdsPoolTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.plc = await FakePlc({"MAIN.nCounter": ("DINT", 42)}).start()
+        self.env = mock.patch.dict(os.environ, {"TWINCAT_ADS_ROUTER": self.plc.router})
+        self.env.start()
+
+    async def asyncTearDown(self):
+        await ads.shutdown_pool()
+        self.env.stop()
+        await self.plc.stop()
+
+    def _read_var(self):
+        return run_step("read-var", {"amsNetId": NET_ID, "port": 851, "symbol": "MAIN.nCounter"})
+
+    async def test_steps_share_one_connection(self):
+        results = [await self._read_var() for _ in range(3)]
+        results += await asyncio.gather(*(self._read_var() for _ in range(5)))
+
+        self.assertTrue(all(r["Value"] == "42" for r in results))
+        self.assertEqual(1, self.plc.connections)
+        self.assertEqual([(NET_ID, 851)], ads.get_pool().keys())
+
+    async def test_dropped_connection_is_replaced_transparently(self):
+        await self._read_var()
+        self.plc.drop_connections()
+        await asyncio.sleep(0.05)
+
+        result = await self._read_var()
+
+        self.assertTrue(result["Success"])
+        self.assertEqual(2, self.plc.connections)
+        self.assertEqual(1, ads.get_pool().reconnects)
+
+    async def test_unreachable_target_is_not_retried(self):
+        await self.plc.stop()
+        with self.assertRaises(ads.AdsConnectionError):
+            await self._read_var()
+        self.assertEqual(0, len(ads.get_pool()))
+
+    async def test_idle_connection_is_probed_before_reuse(self):
+        pool = ads.AdsConnectionPool(health_check_seconds=0)
+        await pool.run(NET_ID, 851, lambda c: c.read_device_info())
+        await pool.run(NET_ID, 851, lambda c: c.read_device_info())
+
+        commands = [p.command for p in self.plc.requests]
+        self.assertEqual([protocol.CMD_READ_DEVICE_INFO, protocol.CMD_READ_STATE,
+                          protocol.CMD_READ_DEVICE_INFO], commands)
+        await pool.close_all()
+
+    async def test_idle_connections_are_evicted(self):
+        pool = ads.AdsConnectionPool(idle_seconds=60)
+        await pool.run(NET_ID, 851, lambda c: c.read_state())
+        self.assertEqual([], pool.evict_idle())
+
+        self.assertEqual([(NET_ID, 851)], pool.evict_idle(now=time.monotonic() + 61))
+        await asyncio.sleep(0.05)
+        self.assertEqual(0, len(pool))
+        self.assertEqual(0, len(self.plc._conns))
+        await pool.close_all()
+
+    async def test_cap_evicts_idle_and_waits_for_busy(self):
+        pool = ads.AdsConnectionPool(max_connections=1)
+        await pool.run(NET_ID, 851, lambda c: c.read_state())
+        await pool.run(NET_ID, 852, lambda c: c.read_state())
+        self.assertEqual([(NET_ID, 852)], pool.keys())
+
+        async with pool.connection(NET_ID, 852):
+            other = asyncio.create_task(pool.run(NET_ID, 853, lambda c: c.read_state()))
+            await asyncio.sleep(0.05)
+            self.assertFalse(other.done())
+        await other
+        self.assertEqual([(NET_ID, 853)], pool.keys())
+        await pool.close_all()
+
+
+if __name__ == "__main__":
+    unittest.main()
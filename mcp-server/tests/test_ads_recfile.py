@@ -0,0 +1,173 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_plc import FakePlc  # noqa: E402
+from twincat_mcp import ads  # noqa: E402
+from twincat_mcp.ads import protocol, recfile  # noqa: E402
+from twincat_mcp.ads.recfile import TIMESTAMP, TcrecFile  # noqa: E402
+from twincat_mcp.ads.recorder import Recorder  # noqa: E402
+from twincat_mcp.handlers import ads as ads_handlers  # noqa: E402
+
+NET_ID = "127.0.0.1.1.1"
+# 2024-01-02T03:04:05.1234567Z
+FILETIME = protocol.FILETIME_UNIX_EPOCH + 1704164645 * 10_000_000 + 1234567
+
+
+class TimestampTests(unittest.TestCase):
+    def test_round_trip_and_zones(self):
+        text = recfile.format_timestamp(FILETIME)
+        self.assertEqual("2024-01-02T03:04:05.1234567+00:00", text)
+        self.assertEqual(FILETIME, recfile.parse_timestamp(text))
+        self.assertEqual(FILETIME, recfile.parse_timestamp("2024-01-02T03:04:05.1234567Z"))
+        self.assertEqual(FILETIME, recfile.parse_timestamp("2024-01-02T05:04:05.1234567+02:00"))
+        self.assertEqual(FILETIME - 1234567, recfile.parse_timestamp("2024-01-02T03:04:05"))
+        with self.assertRaisesRegex(ValueError, "Not an ISO 8601 timestamp"):
+            recfile.parse_timestamp("yesterday")
+
+
+class TcrecFileTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "rec.tcrec")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, chunks, names=("GVL.fSpeed", "MAIN.bRun"), dtypes=("<f4", "<?")):
+        with open(self.path, "wb") as fh:
+            fh.write(recfile.encode_header(list(names), list(dtypes), ["REAL", "BOOL"]))
+            for times, columns in chunks:
+                fh.write(recfile.encode_chunk(times, columns, list(dtypes)))
+
+    def test_columns_are_typed_views(self):
+        self._write([([FILETIME, FILETIME + 1, FILETIME + 2], [[1.5, 2.5, 3.5], [0, 1, 1]])])
+        with TcrecFile(self.path) as rec:
+            self.assertEqual(([TIMESTAMP, "GVL.fSpeed", "MAIN.bRun"], 3, 1),
+                             (rec.columns, rec.rows, rec.chunk_count))
+            speed = rec.column("GVL.fSpeed")
+            self.assertEqual(np.float32, speed.dtype)
+            self.assertEqual([1.5, 2.5, 3.5], speed.tolist())
+            self.assertFalse(speed.flags.owndata)  # a view into the mapping
+            self.assertEqual([False, True, True], rec.column("MAIN.bRun").tolist())
+            self.assertEqual(FILETIME + 2, rec.column(TIMESTAMP)[-1])
+            self.assertEqual("REAL", rec.types["GVL.fSpeed"])
+            with self.assertRaisesRegex(ValueError, "No column 'GVL.nope'"):
+                rec.column("GVL.nope")
+
+    def test_chunks_and_a_torn_tail(self):
+        self._write([([FILETIME], [[1.0], [1]]), ([FILETIME + 1, FILETIME + 2], [[2.0, 3.0], [0, 0]])])
+        with open(self.path, "ab") as fh:  # a crash in the middle of a chunk
+            fh.write(recfile.encode_chunk([FILETIME + 3], [[4.0], [1]], ["<f4", "<?"])[:-4])
+        with TcrecFile(self.path) as rec:
+            self.assertEqual((3, 2), (rec.rows, rec.chunk_count))
+            self.assertEqual([1.0, 2.0, 3.0], rec.column("GVL.fSpeed").tolist())
+            self.assertEqual([["GVL.fSpeed"], ["GVL.fSpeed"]], [list(c) for c in rec.iter_chunks(["GVL.fSpeed"])])
+
+    def test_not_a_tcrec_file(self):
+        with open(self.path, "w") as fh:
+            fh.write("Timestamp,GVL.a\n")
+        with self.assertRaisesRegex(ValueError, "not a .tcrec file"):
+            TcrecFile(self.path)
+
+
+class ConvertTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv = os.path.join(self.tmp.name, "rec.csv")
+        lines = ["Timestamp,GVL.fSpeed,GVL.nCount"]
+        lines += [f"{recfile.format_timestamp(FILETIME + i * 10_000)},{recfile.format_number(i / 4)},{i}"
+                  for i in range(25)]
+        with open(self.csv, "w", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_csv_round_trip(self):
+        with mock.patch.object(recfile, "CONVERT_ROWS", 10):
+            target, rows = recfile.convert(self.csv)
+        self.assertEqual((os.path.join(self.tmp.name, "rec.tcrec"), 25), (target, rows))
+        with TcrecFile(target) as rec:
+            self.assertEqual((25, 3), (rec.rows, rec.chunk_count))
+            self.assertEqual(np.float64, rec.column("GVL.nCount").dtype)
+            self.assertEqual(6.0, rec.column("GVL.fSpeed")[24])
+
+        back, rows = recfile.convert(target, os.path.join(self.tmp.name, "back.csv"))
+        with open(self.csv, encoding="utf-8") as a, open(back, encoding="utf-8") as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_bad_csv(self):
+        with open(self.csv, "a", encoding="utf-8") as fh:
+            fh.write(f"{recfile.format_timestamp(FILETIME)},1\n")
+        with self.assertRaisesRegex(ValueError, "row 26: expected 2 values, got 1"):
+            recfile.convert(self.csv)
+        with self.assertRaisesRegex(ValueError, "output path is the input path"):
+            recfile.convert(self.csv, self.csv)
+
+
+class RecordTcrecTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.plc = await FakePlc({
+            "GVL.fSpeed": ("REAL", 1.5),
+            "GVL.nCount": ("DINT", -7),
+            "MAIN.bRun": ("BOOL", True),
+        }, cycle_ms=1).start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = mock.patch.dict(os.environ, {"TWINCAT_ADS_ROUTER": self.plc.router, "LOCALAPPDATA": self.tmp.name})
+        self.env.start()
+
+    async def asyncTearDown(self):
+        await ads.shutdown_pool()
+        self.env.stop()
+        self.tmp.cleanup()
+        await self.plc.stop()
+
+    async def test_records_typed_columns(self):
+        path = os.path.join(self.tmp.name, "rec.tcrec")
+        pool = ads.AdsConnectionPool()
+        rec = Recorder(NET_ID, 851, ["GVL.fSpeed", "GVL.nCount", "MAIN.bRun"], path, sample_time_ms=1,
+                       duration_sec=0.2)
+        result = await rec.run(pool)
+        await pool.close_all()
+
+        self.assertTrue(result["Success"], result)
+        with TcrecFile(path) as tcrec:
+            self.assertEqual(result["SamplesCollected"], tcrec.rows)
+            self.assertEqual(["<f4", "<i4", "|b1"], [tcrec.dtypes[n].str for n in tcrec.variables])
+            self.assertEqual((1.5, -7, True), tuple(tcrec.column(n)[0] for n in tcrec.variables))
+            self.assertTrue(np.all(np.diff(tcrec.column(TIMESTAMP)) > 0))
+
+    async def test_handlers(self):
+        path = os.path.join(self.tmp.name, "rec")
+        out = await ads_handlers.handle_ads_record(
+            {"amsNetId": NET_ID, "variables": ["GVL.nCount"], "sampleTimeMs": 1, "durationSec": 0.1,
+             "outputPath": path, "outputFormat": "tcrec"}, time.time())
+        self.assertIn("✅ ADS Recording Complete", out[0].text)
+
+        out = await ads_handlers.handle_convert_recording(
+            {"inputPath": path, "outputPath": path + ".csv"}, time.time())
+        self.assertIn("✅ Recording converted", out[0].text)
+        with open(path + ".csv", encoding="utf-8") as fh:
+            self.assertEqual("Timestamp,GVL.nCount", fh.readline().strip())
+            self.assertTrue(fh.readline().strip().endswith(",-7"))
+
+        out = await ads_handlers.handle_convert_recording({"inputPath": path + ".csv"}, time.time())
+        self.assertIn("✅", out[0].text)
+
+        bad = await ads_handlers.handle_ads_record(
+            {"amsNetId": NET_ID, "variables": ["GVL.nCount"], "outputFormat": "parquet"}, time.time())
+        self.assertIn("Unknown format 'parquet'", bad[0].text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from array import array
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_plc import FakePlc  # noqa: E402
+from twincat_mcp import ads, executor  # noqa: E402
+from twincat_mcp.ads import protocol, recorder  # noqa: E402
+from twincat_mcp.ads.recorder import CsvChunkWriter, Recorder  # noqa: E402
+from twincat_mcp.handlers import ads as ads_handlers  # noqa: E402
+
+NET_ID = "127.0.0.1.1.1"
+# 2024-01-02T03:04:05.1234567Z
+FILETIME = protocol.FILETIME_UNIX_EPOCH + 1704164645 * 10_000_000 + 1234567
+
+
+def _lines(path):
+    with open(path, encoding="utf-8") as fh:
+        return fh.read().splitlines()
+
+
+class CsvChunkWriterTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "sub", "rec.csv")
+
+    async def asyncTearDown(self):
+        self.tmp.cleanup()
+
+    async def test_chunks_are_written_in_order(self):
+        writer = CsvChunkWriter(self.path, ["GVL.a", "GVL.b"], chunk_rows=3)
+        self.assertEqual(["Timestamp,GVL.a,GVL.b"], _lines(self.path))  # header right away
+        with mock.patch.object(recorder, "run_blocking", wraps=recorder.run_blocking) as run:
+            for i in range(7):
+                writer.append(FILETIME + i, array("d", [i, i / 4]))
+            await writer.close()
+        self.assertEqual([executor.LANE_IO] * 3, [call.args[0] for call in run.call_args_list])
+
+        lines = _lines(self.path)
+        self.assertEqual(8, len(lines))
+        self.assertEqual("2024-01-02T03:04:05.1234567+00:00,0,0", lines[1])
+        self.assertEqual("2024-01-02T03:04:05.1234573+00:00,6,1.5", lines[7])
+        self.assertEqual((7, 3, 0), (writer.written, writer.chunks, writer.dropped))
+
+    async def test_rows_are_dropped_not_queued_when_the_disk_lags(self):
+        writer = CsvChunkWriter(self.path, ["GVL.a"], chunk_rows=2)
+        with mock.patch.object(recorder, "MAX_PENDING_CHUNKS", 1):
+            for i in range(6):  # no await in between: the first chunk is still pending
+                writer.append(FILETIME, array("d", [i]))
+            self.assertEqual(4, writer.dropped)
+            await writer.close()
+        self.assertEqual(["0", "1"], [line.split(",")[1] for line in _lines(self.path)[1:]])
+
+    async def test_open_chunk_is_flushed_after_flush_sec(self):
+        writer = CsvChunkWriter(self.path, ["GVL.a"])
+        writer.append(FILETIME, array("d", [1.25]))
+        writer.tick()
+        self.assertEqual(1, writer.buffered)
+        with mock.patch.object(recorder, "FLUSH_SEC", 0):
+            writer.tick()
+            await asyncio.sleep(0.05)
+        self.assertEqual(2, len(_lines(self.path)))
+        await writer.close()
+
+
+class RecorderTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.plc = await FakePlc({
+            "GVL.fSpeed": ("REAL", 1.5),
+            "GVL.nCount": ("DINT", 7),
+            "MAIN.bRun": ("BOOL", False),
+            "MAIN.nStep": ("INT", 0),
+            "GVL.sName": ("STRING(10)", "x"),
+        }, cycle_ms=1).start()
+        self.pool = ads.AdsConnectionPool()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "rec.csv")
+        self.env = mock.patch.dict(os.environ, {"TWINCAT_ADS_ROUTER": self.plc.router, "LOCALAPPDATA": self.tmp.name})
+        self.env.start()
+
+    async def asyncTearDown(self):
+        await self.pool.close_all()
+        self.env.stop()
+        self.tmp.cleanup()
+        await self.plc.stop()
+
+    def _recorder(self, variables, **kwargs):
+        return Recorder(NET_ID, 851, variables, self.path, sample_time_ms=1, **kwargs)
+
+    async def _later(self, delay, fn, *args):
+        await asyncio.sleep(delay)
+        fn(*args)
+
+    async def test_spills_to_disk_while_recording(self):
+        rec = self._recorder(["GVL.fSpeed", "GVL.nCount"], duration_sec=5)
+        with mock.patch.object(recorder, "FLUSH_SEC", 0.05):
+            task = asyncio.create_task(rec.run(self.pool))
+            await asyncio.sleep(0.4)
+            self.assertEqual("recording", rec.status)
+            lines = _lines(self.path)
+            self.assertGreater(len(lines), 10)
+            rec.stop()
+            result = await task
+
+        self.assertTrue(result["Success"], result)
+        self.assertLess(result["DurationSeconds"], 2)
+        self.assertEqual("Timestamp,GVL.fSpeed,GVL.nCount", lines[0])
+        self.assertTrue(lines[1].endswith("+00:00,1.5,7"), lines[1])
+        self.assertEqual(result["SamplesCollected"] + 1, len(_lines(self.path)))
+        self.assertEqual(0, result["DroppedRows"])
+        self.assertEqual(1, self.plc.notification_count)  # only the symbol cache's own
+
+    async def test_triggers(self):
+        rec = self._recorder(["MAIN.nStep"], start_trigger="MAIN.bRun == TRUE", stop_trigger="MAIN.nStep >= 2",
+                             max_time_sec=5)
+        task = asyncio.create_task(rec.run(self.pool))
+        await asyncio.sleep(0.1)
+        self.assertEqual(("waiting", ["Timestamp,MAIN.nStep"]), (rec.status, _lines(self.path)))
+        self.plc.set_value("MAIN.bRun", True)
+        await asyncio.sleep(0.1)
+        self.plc.set_value("MAIN.nStep", 1)
+        await asyncio.sleep(0.1)
+        self.plc.set_value("MAIN.nStep", 2)
+        result = await task
+
+        self.assertEqual((True, "both_triggered"), (result["Success"], result["TriggerStatus"]))
+        values = [line.split(",")[1] for line in _lines(self.path)[1:]]
+        self.assertEqual("0", values[0])
+        self.assertIn("1", values)
+
+    async def test_start_trigger_timeout(self):
+        rec = self._recorder(["GVL.fSpeed"], start_trigger="MAIN.bRun == TRUE", max_time_sec=0.1)
+        result = await rec.run(self.pool)
+        self.assertEqual((True, "start_trigger_timeout", 0), (result["Success"], result["TriggerStatus"],
+                                                             result["SamplesCollected"]))
+        self.assertIn("not reached within 0.1s", result["ErrorMessage"])
+
+    async def test_refusals(self):
+        for variables, kwargs, message in [
+            (["GVL.nope"], {}, "Failed to read symbol 'GVL.nope'"),
+            (["GVL.sName"], {}, "STRING(10) is not a number"),
+            (["GVL.fSpeed"], {"stop_trigger": "MAIN.bRun"}, "Invalid stop trigger: No operator"),
+        ]:
+            result = await self._recorder(variables, duration_sec=1, **kwargs).run(self.pool)
+            self.assertFalse(result["Success"])
+            self.assertIn(message, result["ErrorMessage"])
+
+        self.plc.set_state(protocol.ADS_STATE_CONFIG)
+        result = await self._recorder(["GVL.fSpeed"], duration_sec=1).run(self.pool)
+        self.assertIn("Target is in Config state", result["ErrorMessage"])
+
+    async def test_lost_connection_keeps_the_file(self):
+        rec = self._recorder(["GVL.fSpeed"], duration_sec=5)
+        task = asyncio.create_task(rec.run(self.pool))
+        await asyncio.sleep(0.2)
+        self.plc.drop_connections()
+        result = await task
+        self.assertFalse(result["Success"])
+        self.assertIn("holds the rows recorded until then", result["ErrorMessage"])
+        self.assertGreater(result["SamplesCollected"], 0)
+        self.assertEqual(result["SamplesCollected"] + 1, len(_lines(self.path)))
+
+    async def test_handler_records_without_the_host(self):
+        with mock.patch.object(ads_handlers, "run_blocking") as host:
+            record = asyncio.create_task(ads_handlers.handle_ads_record(
+                {"amsNetId": NET_ID, "variables": ["GVL.fSpeed"], "sampleTimeMs": 1, "durationSec": 0.2,
+                 "outputPath": self.path}, time.time()))
+            await asyncio.sleep(0.1)
+            self.assertEqual(0, executor.lane_usage()["ads"]["inUse"])  # recording holds no ADS slot
+            out = await record
+        await ads.shutdown_pool()
+        host.assert_not_called()
+        self.assertIn("✅ ADS Recording Complete", out[0].text)
+        self.assertIn(self.path, out[0].text)
+
+
+if __name__ == "__main__":
+    unittest.main()
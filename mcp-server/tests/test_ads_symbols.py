@@ -0,0 +1,227 @@
+import os
+import struct
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_plc import FakePlc  # noqa: E402
+from twincat_mcp import ads  # noqa: E402
+from twincat_mcp.ads import protocol  # noqa: E402
+from twincat_mcp.ads.protocol import DataTypeEntry  # noqa: E402
+from twincat_mcp.ads.steps import list_symbols  # noqa: E402
+from twincat_mcp.ads.symbol_file import (  # noqa: E402
+    MappedSymbolIndex, load_symbol_index, save_symbol_index, symbol_dir,
+)
+from twincat_mcp.ads.symbols import IndexEntry, SymbolIndex  # noqa: E402
+from twincat_mcp.handlers import ads as ads_handlers  # noqa: E402
+
+
+def _index(names):
+    return SymbolIndex(IndexEntry(name, "INT", 2, 0x4020, i * 2) for i, name in enumerate(names))
+
+
+class SymbolIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.index = _index([
+            "MAIN.nCounter", "MAIN.fbStateMachine.nState", "MAIN.fbStateMachine.Status",
+            "GVL.aBuffer", "GVL.stStatus.bBusy", "Main.bStart", "MAIN_2.x",
+        ])
+
+    def _names(self, result):
+        return [e.name for e in result.entries]
+
+    def test_prefix_is_case_insensitive_and_sorted(self):
+        result = self.index.search(prefix="main.")
+        self.assertEqual(["Main.bStart", "MAIN.fbStateMachine.nState", "MAIN.fbStateMachine.Status",
+                          "MAIN.nCounter"], self._names(result))
+        self.assertEqual(4, result.total_matched)
+        self.assertIsNone(result.next_cursor)
+
+    def test_contains_with_and_without_trigrams(self):
+        self.assertEqual(["GVL.stStatus.bBusy", "MAIN.fbStateMachine.Status"],
+                         self._names(self.index.search(contains="STATUS")))
+        self.assertEqual(["MAIN_2.x"], self._names(self.index.search(contains="_2")))
+        self.assertEqual([], self._names(self.index.search(contains="nomatch")))
+        self.assertEqual(["MAIN.fbStateMachine.Status"],
+                         self._names(self.index.search(prefix="MAIN.", contains="status")))
+
+    def test_cursor_pages_through_every_match_once(self):
+        index = _index([f"MAIN.a{i:04d}" for i in range(1000)] + ["GVL.x"])
+        seen, cursor = [], None
+        while True:
+            page = index.search(prefix="MAIN.", contains="a0", cursor=cursor, limit=64)
+            self.assertEqual(1000, page.total_matched)
+            seen += self._names(page)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        self.assertEqual([f"MAIN.a{i:04d}" for i in range(1000)], seen)
+
+    def test_large_table_queries_are_fast(self):
+        index = _index([f"GVL.fbStation{i // 100}.stAxis{i % 100}.fPos" for i in range(80_000)])
+        index.search(contains="axis")  # build the trigram index
+        started = time.perf_counter()
+        for _ in range(100):
+            index.search(prefix="GVL.fbStation7", limit=50)
+            index.search(contains="station42.staxis7", limit=50)
+        self.assertLess((time.perf_counter() - started) / 200, 0.005)
+
+
+class DataTypeEntryTests(unittest.TestCase):
+    def test_round_trip_with_members_and_array_bounds(self):
+        entry = DataTypeEntry("ST_Axis", "", 12, 0, 65, protocol.DATATYPE_FLAG_DATATYPE, "axis", (), (
+            DataTypeEntry("fPos", "LREAL", 8, 0, 5, protocol.DATATYPE_FLAG_DATAITEM),
+            DataTypeEntry("aErr", "ARRAY [-1..2] OF BYTE", 4, 8, 17, protocol.DATATYPE_FLAG_DATAITEM,
+                          array_dims=((-1, 4),)),
+        ))
+        data = protocol.encode_datatype_entry(entry) * 2
+        self.assertEqual([entry, entry], protocol.parse_datatype_upload(data))
+
+
+class SymbolFileTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "t_851_0.idx")
+        self.fingerprint = b"f" * 36
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_mapped_index_answers_like_the_in_memory_one(self):
+        index = _index([f"GVL.fbStation{i % 7}.stAxis{i}.fPos" for i in range(2000)] + ["MAIN.ä_x"])
+        save_symbol_index(index, self.path, self.fingerprint)
+        mapped = load_symbol_index(self.path, self.fingerprint, version=3)
+        try:
+            self.assertIsInstance(mapped, MappedSymbolIndex)
+            self.assertEqual((len(index), 3), (len(mapped), mapped.version))
+            for query in [dict(prefix="gvl.fbstation3"), dict(contains="axis19"), dict(contains="Ä_"),
+                          dict(prefix="GVL.", contains="station5.staxis1", cursor="GVL.fbStation5.stAxis1500.fPos"),
+                          dict(contains="nomatch")]:
+                self.assertEqual(index.search(**query, limit=30), mapped.search(**query, limit=30), query)
+        finally:
+            mapped.close()
+
+    def test_other_fingerprint_or_damaged_file_is_not_loaded(self):
+        save_symbol_index(_index(["MAIN.x"]), self.path, self.fingerprint)
+        self.assertIsNone(load_symbol_index(self.path, b"g" * 36))
+        with open(self.path, "r+b") as fh:
+            fh.truncate(100)
+        self.assertIsNone(load_symbol_index(self.path, self.fingerprint))
+        self.assertIsNone(load_symbol_index(self.path + ".missing", self.fingerprint))
+
+
+class SymbolUploadTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = mock.patch.dict(os.environ, {"LOCALAPPDATA": self.tmp.name})
+        self.env.start()
+        self.plc = FakePlc({"MAIN.nCounter": ("DINT", 42)})
+        self.plc.add_struct("ST_Status", {"bBusy": "BOOL", "nError": "UDINT"})
+        self.plc.add_struct("ST_Axis", {"fPos": "LREAL", "stStatus": "ST_Status"})
+        self.plc.add_symbol("GVL.stAxis", "ST_Axis", b"")
+        self.plc.set_value("GVL.stAxis.stStatus.nError", 17)
+        await self.plc.start()
+        self.client = ads.AdsClient("127.0.0.1.1.1", 851, host=self.plc.host, tcp_port=self.plc.port)
+        await self.client.connect()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.plc.stop()
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def _uploads(self):
+        return sum(1 for p in self.plc.requests if p.command == protocol.CMD_READ
+                   and struct.unpack_from("<I", p.data)[0] == protocol.IG_SYM_UPLOAD)
+
+    async def test_struct_members_are_indexed_with_their_address(self):
+        result = await list_symbols(self.client, prefix="gvl.", include_types=True)
+
+        names = [s["Name"] for s in result["Symbols"]]
+        self.assertEqual(["GVL.stAxis", "GVL.stAxis.fPos", "GVL.stAxis.stStatus",
+                          "GVL.stAxis.stStatus.bBusy", "GVL.stAxis.stStatus.nError"], names)
+        self.assertEqual(6, result["TotalScanned"])
+        n_error = result["Symbols"][-1]
+        self.assertEqual(("UDINT", 4), (n_error["TypeName"], n_error["Size"]))
+        raw = await self.client.read(n_error["IndexGroup"], n_error["IndexOffset"], 4)
+        self.assertEqual(17, struct.unpack("<I", raw)[0])
+
+    async def test_uploaded_once_per_symbol_version(self):
+        await list_symbols(self.client, contains="status")
+        await list_symbols(self.client, prefix="MAIN.")
+        self.assertEqual(1, self._uploads())
+
+        self.plc.add_symbol("MAIN.bNew", "BOOL")
+        self.plc.bump_symbol_version()
+        self.client.symbols.invalidate()  # don't wait for the notification
+        result = await list_symbols(self.client, prefix="MAIN.")
+
+        self.assertEqual(["MAIN.bNew", "MAIN.nCounter"], [s["Name"] for s in result["Symbols"]])
+        self.assertEqual(2, self._uploads())
+
+    async def test_new_session_maps_the_saved_index(self):
+        first = await list_symbols(self.client, contains="status", include_types=True)
+        fresh = ads.AdsClient("127.0.0.1.1.1", 851, host=self.plc.host, tcp_port=self.plc.port)
+        await fresh.connect()
+        try:
+            second = await list_symbols(fresh, contains="status", include_types=True)
+            self.assertIsInstance(await fresh.symbols.symbol_index(), MappedSymbolIndex)
+        finally:
+            await fresh.close()
+        self.assertEqual(first["Symbols"], second["Symbols"])
+        self.assertEqual(1, self._uploads())
+
+    async def test_online_change_replaces_the_saved_index(self):
+        self.plc.add_symbol("TwinCAT_SystemInfoVarList._AppInfo.OnlineChangeCnt", "UDINT", 0)
+        await list_symbols(self.client)
+        self.plc.set_value("TwinCAT_SystemInfoVarList._AppInfo.OnlineChangeCnt", 1)
+        self.client.symbols.invalidate()
+        await list_symbols(self.client)
+
+        self.assertEqual(2, self._uploads())
+        self.assertEqual(1, len(os.listdir(symbol_dir())))
+
+    async def test_config_mode_is_reported(self):
+        self.plc.set_state(protocol.ADS_STATE_CONFIG)
+        result = await list_symbols(self.client)
+        self.assertFalse(result["Success"])
+        self.assertEqual("Config", result["TargetState"])
+
+
+class ListSymbolsHandlerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.plc = await FakePlc({f"MAIN.n{i}": ("INT", i) for i in range(5)}).start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = mock.patch.dict(os.environ, {"TWINCAT_ADS_ROUTER": self.plc.router, "LOCALAPPDATA": self.tmp.name})
+        self.env.start()
+        self.backend = mock.patch.object(ads, "BACKEND", "python")
+        self.backend.start()
+
+    async def asyncTearDown(self):
+        await ads.shutdown_pool()
+        self.backend.stop()
+        self.env.stop()
+        self.tmp.cleanup()
+        await self.plc.stop()
+
+    async def test_pages_with_cursor(self):
+        first = await ads_handlers.handle_list_symbols({"prefix": "MAIN.", "max": 3}, time.time())
+        self.assertIn("Matched 5 of 5", first[0].text)
+        self.assertIn('pass `cursor: "MAIN.n2"`', first[0].text)
+
+        second = await ads_handlers.handle_list_symbols(
+            {"prefix": "MAIN.", "max": 3, "cursor": "MAIN.n2"}, time.time())
+        self.assertIn("• MAIN.n3", second[0].text)
+        self.assertIn("• MAIN.n4", second[0].text)
+        self.assertNotIn("MAIN.n2", second[0].text)
+        self.assertNotIn("cursor", second[0].text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_plc import FakePlc  # noqa: E402
+from twincat_mcp import ads, executor  # noqa: E402
+from twincat_mcp.ads import protocol, wait  # noqa: E402
+from twincat_mcp.ads.wait import compare, parse_condition  # noqa: E402
+from twincat_mcp.handlers import ads as ads_handlers  # noqa: E402
+
+NET_ID = "127.0.0.1.1.1"
+
+
+class ConditionTests(unittest.TestCase):
+    def test_parse_like_the_record_triggers(self):
+        self.assertEqual(("MAIN.nState", ">=", "3"), parse_condition(" MAIN.nState>=3 "))
+        self.assertEqual(("GVL.sName", "!=", "'idle'"), parse_condition("GVL.sName != 'idle'"))
+        for bad, message in [("MAIN.nState", "No operator"), ("== 3", "No operator"), ("MAIN.x <", "No value")]:
+            with self.assertRaisesRegex(ValueError, message):
+                parse_condition(bad)
+
+    def test_compare(self):
+        self.assertTrue(compare(0.1 + 0.2, "==", 0.3))
+        self.assertTrue(compare(5.0, ">", 4.5))
+        self.assertFalse(compare(5.0, "<=", 4.5))
+        self.assertTrue(compare("idle", "!=", "busy"))
+        self.assertFalse(compare("idle", ">", "busy"))
+
+
+class WaitTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.plc = await FakePlc({
+            "MAIN.nState": ("INT", 0),
+            "GVL.fTemp": ("REAL", 20.0),
+            "MAIN.bDone": ("BOOL", False),
+            "GVL.sMode": ("STRING(20)", "idle"),
+        }, cycle_ms=1).start()
+        self.pool = ads.AdsConnectionPool()
+        self.env = mock.patch.dict(os.environ, {"TWINCAT_ADS_ROUTER": self.plc.router})
+        self.env.start()
+
+    async def asyncTearDown(self):
+        await self.pool.close_all()
+        self.env.stop()
+        await self.plc.stop()
+
+    async def _wait(self, condition, timeout=2.0):
+        return await wait.wait_for(NET_ID, 851, condition, timeout, cycle_ms=1, pool=self.pool)
+
+    async def _later(self, delay, fn, *args):
+        await asyncio.sleep(delay)
+        fn(*args)
+
+    async def test_returns_when_the_condition_holds(self):
+        async def ramp():
+            while self.plc.notification_count < 2:  # the wait's own is in place, past its first sample
+                await asyncio.sleep(0.005)
+            for state in (1, 2, 3):
+                await asyncio.sleep(0.02)
+                self.plc.set_value("MAIN.nState", state)
+
+        task = asyncio.create_task(ramp())
+        result = await self._wait("MAIN.nState == 3")
+        await task
+
+        self.assertTrue(result["ConditionMet"], result)
+        self.assertEqual(("3", "notification", 4), (result["Value"], result["Method"], result["Changes"]))
+        self.assertEqual(["0", "1", "2", "3"], [e["Value"] for e in result["Trace"]])
+        self.assertGreater(result["ElapsedMs"], 40)
+        self.assertTrue(result["Trace"][-1]["Time"].endswith("Z"))
+        self.assertEqual(1, self.plc.notification_count)  # only the symbol cache's own
+
+    async def test_value_literals(self):
+        self.plc.set_value("MAIN.bDone", True)
+        self.plc.set_value("GVL.fTemp", 80.5)
+        self.assertTrue((await self._wait("MAIN.bDone == TRUE"))["ConditionMet"])
+        self.assertTrue((await self._wait("GVL.fTemp >= 80.5"))["ConditionMet"])
+        self.assertTrue((await self._wait("GVL.sMode == 'idle'"))["ConditionMet"])
+
+        bad = await self._wait("GVL.sMode > 'a'")
+        self.assertFalse(bad["Success"])
+        self.assertIn("only == and != apply", bad["ErrorMessage"])
+
+    async def test_ads_state(self):
+        self.plc.set_state(protocol.ADS_STATE_STOP)
+        task = asyncio.create_task(self._later(0.05, self.plc.set_state, protocol.ADS_STATE_RUN))
+        result = await self._wait("AdsState == Run")
+        await task
+        self.assertEqual((True, "Run"), (result["ConditionMet"], result["Value"]))
+        self.assertEqual(["Stop", "Run"], [e["Value"] for e in result["Trace"]])
+
+    async def test_timeout_is_not_a_failure(self):
+        result = await self._wait("MAIN.nState > 10", timeout=0.1)
+        self.assertTrue(result["Success"])
+        self.assertFalse(result["ConditionMet"])
+        self.assertEqual("0", result["Value"])
+        self.assertGreaterEqual(result["ElapsedMs"], 100)
+
+    async def test_falls_back_to_polling(self):
+        await self.pool.run(NET_ID, 851, lambda client: client.symbols.get("MAIN.nState"))  # version watch first
+        self.plc.inject_error(protocol.ADSERR_DEVICE_TRANSMODENOTSUPP, command=protocol.CMD_ADD_NOTIFICATION)
+        task = asyncio.create_task(self._later(0.1, self.plc.set_value, "MAIN.nState", 7))
+        result = await self._wait("MAIN.nState != 0")
+        await task
+
+        self.assertEqual((True, "polling", "7"), (result["ConditionMet"], result["Method"], result["Value"]))
+        self.assertGreater(result["Polls"], 2)
+        self.assertIn("0x713", result["NotificationError"])
+
+    async def test_unknown_symbol(self):
+        result = await self._wait("MAIN.nope == 1")
+        self.assertFalse(result["Success"])
+        self.assertIn("MAIN.nope", result["ErrorMessage"])
+
+
+class WaitHandlerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.plc = await FakePlc({"MAIN.nState": ("INT", 5)}, cycle_ms=1).start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = mock.patch.dict(os.environ, {"TWINCAT_ADS_ROUTER": self.plc.router, "LOCALAPPDATA": self.tmp.name})
+        self.env.start()
+
+    async def asyncTearDown(self):
+        await ads.shutdown_pool()
+        self.env.stop()
+        self.tmp.cleanup()
+        await self.plc.stop()
+
+    async def test_handler(self):
+        with mock.patch.object(ads, "BACKEND", "host"):
+            met = await ads_handlers.handle_wait_for_condition(
+                {"amsNetId": NET_ID, "condition": "MAIN.nState >= 5"}, time.time())
+            self.assertIn("Condition met: **MAIN.nState >= 5**", met[0].text)
+            self.assertIn("(already true)", met[0].text)
+
+            missed = await ads_handlers.handle_wait_for_condition(
+                {"amsNetId": NET_ID, "condition": "MAIN.nState < 0", "timeoutSec": 0.05}, time.time())
+            self.assertIn("⏱️ Condition **MAIN.nState < 0** not met within 0.05 s", missed[0].text)
+
+    async def test_pending_waits_leave_the_ads_lane_free(self):
+        waits = [asyncio.create_task(ads_handlers.handle_wait_for_condition(
+            {"amsNetId": NET_ID, "condition": "MAIN.nState < 0", "timeoutSec": 2}, time.time()))
+            for _ in range(executor.LANE_LIMITS[executor.LANE_ADS] + 1)]
+        await asyncio.sleep(0.2)  # all of them waiting on their notifications
+        started = time.perf_counter()
+        with mock.patch.object(ads, "BACKEND", "python"):
+            state = await ads_handlers.handle_get_state({"amsNetId": NET_ID}, time.time())
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertIn("**Run**", state[0].text)
+        self.assertFalse(any(task.done() for task in waits))
+        for task in waits:
+            task.cancel()
+        await asyncio.gather(*waits, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
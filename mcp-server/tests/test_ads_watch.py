@@ -0,0 +1,141 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_plc import FakePlc  # noqa: E402
+from twincat_mcp import ads  # noqa: E402
+from twincat_mcp.ads import watch  # noqa: E402
+from twincat_mcp.ads.watch import RingBuffer  # noqa: E402
+from twincat_mcp.handlers import ads as ads_handlers  # noqa: E402
+
+NET_ID = "127.0.0.1.1.1"
+
+
+class RingBufferTests(unittest.TestCase):
+    def test_cursor_and_overflow(self):
+        ring = RingBuffer(4)
+        for i in range(3):
+            ring.append(0, i, bytes([i]))
+        samples, dropped = ring.since(1, 10)
+        self.assertEqual(([2, 3], 0), ([s.seq for s in samples], dropped))
+
+        for i in range(3, 10):
+            ring.append(0, i, bytes([i]))
+        samples, dropped = ring.since(3, 2)
+        self.assertEqual(([7, 8], 3), ([s.seq for s in samples], dropped))
+        self.assertEqual((4, 7), (len(ring), ring.oldest_seq))
+        self.assertEqual(([], 0), ring.since(10, 10))
+
+
+class WatchTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.plc = await FakePlc({"MAIN.nState": ("INT", 0), "GVL.fSpeed": ("REAL", 0.5)}, cycle_ms=1).start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = mock.patch.dict(os.environ, {"TWINCAT_ADS_ROUTER": self.plc.router, "LOCALAPPDATA": self.tmp.name})
+        self.env.start()
+
+    async def asyncTearDown(self):
+        await watch.shutdown_watches()
+        await ads.shutdown_pool()
+        self.env.stop()
+        self.tmp.cleanup()
+        await self.plc.stop()
+
+    async def _wait_for(self, predicate, timeout=2.0):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not predicate():
+            self.assertLess(asyncio.get_running_loop().time(), deadline, "timed out")
+            await asyncio.sleep(0.005)
+
+    async def _set_and_wait(self, w, name, value):
+        seen = w.buffer.next_seq
+        self.plc.set_value(name, value)
+        await self._wait_for(lambda: w.buffer.next_seq > seen)
+
+    async def test_changes_since_cursor(self):
+        sub = await watch.subscribe(NET_ID, 851, ["MAIN.nState", "GVL.fSpeed"], cycle_ms=1)
+        self.assertTrue(sub["Success"], sub.get("ErrorMessage"))
+        w = watch.get_watches().get(sub["WatchId"])
+        await self._wait_for(lambda: w.buffer.next_seq > 2)  # initial values
+        for state in (1, 2, 3):
+            await self._set_and_wait(w, "MAIN.nState", state)
+
+        first = await watch.read(sub["WatchId"])
+        values = [(s["Symbol"], s["Value"]) for s in first["Samples"]]
+        self.assertEqual({("MAIN.nState", "0"), ("GVL.fSpeed", "0.5")}, set(values[:2]))
+        self.assertEqual([("MAIN.nState", "1"), ("MAIN.nState", "2"), ("MAIN.nState", "3")], values[2:])
+        self.assertTrue(first["Samples"][0]["Time"].endswith("Z"))
+
+        await self._set_and_wait(w, "GVL.fSpeed", 1.25)
+        second = await watch.read(sub["WatchId"], cursor=first["NextCursor"])
+        self.assertEqual([("GVL.fSpeed", "1.25")], [(s["Symbol"], s["Value"]) for s in second["Samples"]])
+        self.assertEqual((0, False), (second["Dropped"], second["More"]))
+
+    async def test_overflow_reports_dropped_samples(self):
+        sub = await watch.subscribe(NET_ID, 851, ["MAIN.nState"], cycle_ms=1, capacity=3)
+        w = watch.get_watches().get(sub["WatchId"])
+        await self._wait_for(lambda: w.buffer.next_seq > 1)
+        for state in range(1, 6):
+            await self._set_and_wait(w, "MAIN.nState", state)
+
+        result = await watch.read(sub["WatchId"], max_samples=2)
+        self.assertEqual(["3", "4"], [s["Value"] for s in result["Samples"]])
+        self.assertEqual((3, True), (result["Dropped"], result["More"]))
+
+    async def test_dead_connection_is_resubscribed(self):
+        sub = await watch.subscribe(NET_ID, 851, ["MAIN.nState"], cycle_ms=1)
+        w = watch.get_watches().get(sub["WatchId"])
+        await self._wait_for(lambda: w.buffer.next_seq > 1)
+        self.plc.drop_connections()
+        await self._wait_for(lambda: not w.live())
+
+        result = await watch.read(sub["WatchId"])
+        self.assertEqual(1, result["Resubscribed"])
+        await self._set_and_wait(w, "MAIN.nState", 7)
+        latest = await watch.read(sub["WatchId"], cursor=result["NextCursor"])
+        self.assertEqual("7", latest["Samples"][-1]["Value"])
+
+    async def test_unsubscribe_deletes_the_notifications(self):
+        sub = await watch.subscribe(NET_ID, 851, ["MAIN.nState", "GVL.fSpeed"])
+        # One each, plus the symbol cache's version watch.
+        await self._wait_for(lambda: self.plc.notification_count == 3)
+
+        result = await watch.unsubscribe(sub["WatchId"])
+        self.assertTrue(result["Success"])
+        await self._wait_for(lambda: self.plc.notification_count == 1)
+        self.assertFalse((await watch.read(sub["WatchId"]))["Success"])
+
+    async def test_unknown_symbol_fails_the_subscription(self):
+        result = await watch.subscribe(NET_ID, 851, ["MAIN.nState", "MAIN.nope"])
+        self.assertFalse(result["Success"])
+        self.assertIn("MAIN.nope", result["ErrorMessage"])
+        self.assertEqual(0, len(watch.get_watches()))
+        await self._wait_for(lambda: self.plc.notification_count == 1)  # the symbol version only
+
+    async def test_handlers(self):
+        with mock.patch.object(ads, "BACKEND", "host"):
+            started = await ads_handlers.handle_watch_subscribe(
+                {"amsNetId": NET_ID, "symbols": ["MAIN.nState"], "cycleTimeMs": 1}, time.time())
+            self.assertIn("Watch **w1** started", started[0].text)
+            w = watch.get_watches().get("w1")
+            await self._wait_for(lambda: w.buffer.next_seq > 1)
+            await self._set_and_wait(w, "MAIN.nState", 4)
+
+            read = await ads_handlers.handle_watch_read({"watchId": "w1"}, time.time())
+            self.assertIn("`MAIN.nState` = **4**", read[0].text)
+            self.assertIn("Next cursor: `2`", read[0].text)
+
+            stopped = await ads_handlers.handle_watch_unsubscribe({"watchId": "w1"}, time.time())
+            self.assertIn("2 sample(s) received", stopped[0].text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_host import FakeShellHost, default_responder  # noqa: E402
+from twincat_mcp import executor, host  # noqa: E402
+from twincat_mcp.dispatch import lane_for_command  # noqa: E402
+from twincat_mcp.handlers import ads, safety, shell  # noqa: E402
+
+
+def _slow_build_host(step_seconds):
+    async def responder(proc, req):
+        if req["method"] == "execute-step":
+            await asyncio.sleep(step_seconds)
+            return {"command": req["params"]["command"], "result": {"success": True, "summary": "ok"}}
+        return await default_responder(proc, req)
+
+    return FakeShellHost(responder)
+
+
+def _state_responder():
+    async def responder(proc, req):
+        if req["method"] == "execute-step":
+            return {"command": "get-state", "result": {"success": True, "adsState": "Run", "stateValue": 5}}
+        return await default_responder(proc, req)
+
+    return responder
+
+
+class ExecutionLaneTests(unittest.TestCase):
+    def test_ads_commands_run_on_ads_lane(self):
+        self.assertEqual(executor.LANE_ADS, lane_for_command("read-var"))
+        self.assertEqual(executor.LANE_ADS, lane_for_command("GET-STATE"))
+        self.assertEqual(executor.LANE_DTE, lane_for_command("build"))
+
+    def test_lane_limit_bounds_concurrency(self):
+        active = {"now": 0, "peak": 0}
+        guard = threading.Lock()
+
+        def work():
+            with guard:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.05)
+            with guard:
+                active["now"] -= 1
+
+        async def run():
+            await asyncio.gather(*(executor.run_blocking(executor.LANE_DTE, work) for _ in range(4)))
+
+        asyncio.run(run())
+        self.assertEqual(executor.LANE_LIMITS[executor.LANE_DTE], active["peak"])
+
+    def test_host_status_answers_while_build_runs(self):
+        original = host._shell_pool
+        build_host = _slow_build_host(step_seconds=0.5)
+        host._shell_pool = host.ShellHostPool(lambda: build_host)
+        try:
+            async def run():
+                build = asyncio.create_task(shell.handle_build(
+                    {"solutionPath": "C:/Solution.sln"}, time.time()))
+                await asyncio.sleep(0.1)
+                started = time.perf_counter()
+                status = await safety.handle_host_status({}, time.time())
+                status_latency = time.perf_counter() - started
+                self.assertFalse(build.done())
+                await build
+                return status[0].text, status_latency
+
+            text, latency = asyncio.run(run())
+        finally:
+            host._shell_pool = original
+
+        self.assertIn("BUSY", text)
+        self.assertIn("build", text)
+        self.assertLess(latency, 0.1)
+
+    def test_get_state_does_not_wait_behind_build(self):
+        originals = host._shell_pool, host._ads_host
+        shell_host = _slow_build_host(step_seconds=0.5)
+        ads_host = FakeShellHost(_state_responder(), role="ads")
+        host._shell_pool = host.ShellHostPool(lambda: shell_host)
+        host._ads_host = ads_host
+        try:
+            async def run():
+                build = asyncio.create_task(shell.handle_build(
+                    {"solutionPath": "C:/Solution.sln"}, time.time()))
+                await asyncio.sleep(0.1)
+                started = time.perf_counter()
+                await ads.handle_get_state({"amsNetId": "127.0.0.1.1.1"}, time.time())
+                state_latency = time.perf_counter() - started
+                self.assertFalse(build.done())
+                await build
+                return state_latency
+
+            latency = asyncio.run(run())
+        finally:
+            host._shell_pool, host._ads_host = originals
+
+        self.assertLess(latency, 0.1)
+        shell_steps = [r["params"]["command"] for r in shell_host.spawned[0].requests
+                       if r["method"] == "execute-step"]
+        self.assertEqual(["build"], shell_steps)
+        self.assertEqual("get-state", ads_host.spawned[0].requests[-1]["params"]["command"])
+
+    def test_ads_host_rejects_shell_commands(self):
+        ads_host = FakeShellHost(role="ads")
+
+        async def run():
+            await ads_host.execute_step("build", {}, "C:/Solution.sln", None)
+
+        with self.assertRaises(host.HostError):
+            asyncio.run(run())
+        self.assertEqual([], ads_host.spawned)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import asyncio
+import struct
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_plc import IG_PLC_MEMORY, FakePlc  # noqa: E402
+from twincat_mcp import ads  # noqa: E402
+from twincat_mcp.ads import protocol  # noqa: E402
+
+SYMBOLS = {
+    "MAIN.nCounter": ("DINT", 42),
+    "MAIN.bStart": ("BOOL", False),
+    "MAIN.aValues": ("ARRAY [1..10] OF INT", b""),
+}
+
+
+class FakePlcTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.plc = await FakePlc(SYMBOLS, cycle_ms=1).start()
+        self.client = ads.AdsClient("127.0.0.1.1.1", 851, host=self.plc.host, tcp_port=self.plc.port)
+        await self.client.connect()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.plc.stop()
+
+    def _item(self, name, length=None):
+        info = self.plc.symbols[name.upper()]
+        return info.index_group, info.index_offset, info.size if length is None else length
+
+    async def test_arrays_and_raw_struct_values(self):
+        self.assertEqual(20, self.plc.symbols["MAIN.AVALUES"].size)
+        self.plc.add_symbol("MAIN.stAxis", "ST_Axis", b"\x01\x02", size=8)
+        self.assertEqual(b"\x01\x02" + b"\0" * 6, await self.client.read(*self._item("MAIN.stAxis")))
+
+    async def test_sum_read_reports_per_item_errors(self):
+        items = [self._item("MAIN.nCounter"), (IG_PLC_MEMORY, 10_000, 4), self._item("MAIN.bStart")]
+        data = await self.client.read_write(
+            protocol.IG_SUMUP_READ, len(items), protocol.sum_read_length(items),
+            protocol.sum_read_request(items))
+
+        results = protocol.parse_sum_read_response(data, [n for _, _, n in items])
+        self.assertEqual((0, struct.pack("<i", 42)), results[0])
+        self.assertEqual(protocol.ADSERR_DEVICE_INVALIDOFFSET, results[1][0])
+        self.assertEqual((0, b"\0"), results[2])
+        self.assertEqual(1, len(self.plc.requests))
+
+    async def test_sum_write(self):
+        ig, io, _ = self._item("MAIN.nCounter")
+        items = [(ig, io, struct.pack("<i", 7)), (0x9999, 0, b"\x01")]
+        data = await self.client.read_write(
+            protocol.IG_SUMUP_WRITE, len(items), 4 * len(items), protocol.sum_write_request(items))
+
+        self.assertEqual([0, protocol.ADSERR_DEVICE_INVALIDGRP], protocol.parse_sum_write_response(data, 2))
+        self.assertEqual(struct.pack("<i", 7), self.plc.raw_value("MAIN.nCounter"))
+
+    async def test_injected_error_hits_matching_requests_only(self):
+        self.plc.inject_error(protocol.ADSERR_DEVICE_INVALIDSTATE, index_group=IG_PLC_MEMORY, count=2)
+        self.assertEqual((protocol.ADS_STATE_RUN, 0), await self.client.read_state())
+
+        items = [self._item("MAIN.nCounter"), self._item("MAIN.bStart")]
+        data = await self.client.read_write(
+            protocol.IG_SUMUP_READ, 2, protocol.sum_read_length(items), protocol.sum_read_request(items))
+        codes = [code for code, _ in protocol.parse_sum_read_response(data, [4, 1])]
+        self.assertEqual([protocol.ADSERR_DEVICE_INVALIDSTATE] * 2, codes)
+
+        self.assertEqual(struct.pack("<i", 42), await self.client.read(*self._item("MAIN.nCounter")))
+
+    async def test_on_change_notifications(self):
+        samples = asyncio.Queue()
+        handle = await self.client.add_notification(*self._item("MAIN.nCounter"), samples.put_nowait)
+
+        first = await asyncio.wait_for(samples.get(), 1)
+        self.plc.set_value("MAIN.nCounter", 43)
+        second = await asyncio.wait_for(samples.get(), 1)
+
+        self.assertEqual([42, 43], [struct.unpack("<i", s.data)[0] for s in (first, second)])
+        self.assertTrue(samples.empty())
+        self.assertLess(abs(protocol.filetime_to_unix(second.timestamp) - time.time()), 5)
+
+        await self.client.delete_notification(handle)
+        self.assertEqual(0, self.plc.notification_count)
+        with self.assertRaises(ads.AdsError):
+            await self.client.delete_notification(handle)
+
+    async def test_state_change_is_pushed(self):
+        states = asyncio.Queue()
+        await self.client.add_notification(
+            protocol.IG_DEVICE_DATA, protocol.IO_DEVDATA_ADSSTATE, 2,
+            lambda s: states.put_nowait(struct.unpack("<H", s.data)[0]))
+
+        self.assertEqual(protocol.ADS_STATE_RUN, await asyncio.wait_for(states.get(), 1))
+        self.plc.set_state(protocol.ADS_STATE_STOP)
+        self.assertEqual(protocol.ADS_STATE_STOP, await asyncio.wait_for(states.get(), 1))
+
+    async def test_latency_and_jitter_delay_responses(self):
+        self.plc.latency, self.plc.jitter = 0.03, 0.01
+        started = time.perf_counter()
+        await asyncio.gather(*(self.client.read_state() for _ in range(5)))
+        elapsed = time.perf_counter() - started
+
+        # Pipelined: five requests cost one latency, not five.
+        self.assertGreaterEqual(elapsed, 0.03)
+        self.assertLess(elapsed, 0.15)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_host import FakeShellHost, default_responder  # noqa: E402
+from twincat_mcp import cli, dispatch, executor, host  # noqa: E402
+
+
+def _build_responder(cooperative: bool, seconds: float = 10.0):
+    """`build` runs for `seconds`; a cooperative one stops once cancelled."""
+    async def responder(proc, req):
+        if req["method"] == "execute-step" and req["params"]["command"] == "build":
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                if cooperative and proc.is_cancelled(req):
+                    raise RuntimeError("Cancelled by client")
+                await asyncio.sleep(0.01)
+        return await default_responder(proc, req)
+
+    return responder
+
+
+class HostCancelTests(unittest.IsolatedAsyncioTestCase):
+    async def test_cancel_frees_waiter_and_stops_cooperative_step(self):
+        shell_host = FakeShellHost(_build_responder(cooperative=True))
+        build = asyncio.create_task(shell_host.execute_step("build", {}, "C:/A/A.sln", None))
+        await asyncio.sleep(0.05)
+
+        started = time.perf_counter()
+        build.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await build
+        self.assertLess(time.perf_counter() - started, 0.05)
+
+        # Still booked as running until the host answers the cancel.
+        self.assertEqual("build", shell_host.busy_step()[0])
+        await asyncio.sleep(0.1)
+
+        proc = shell_host.spawned[0]
+        self.assertEqual("cancel", proc.requests[-1]["method"])
+        self.assertIsNone(shell_host.busy_step())
+        self.assertEqual(0, shell_host.pending_count())
+        self.assertTrue(shell_host.is_alive())
+
+    async def test_cancelled_queued_request_is_dropped(self):
+        shell_host = FakeShellHost(_build_responder(cooperative=False, seconds=0.2))
+        build = asyncio.create_task(shell_host.execute_step("build", {}, "C:/A/A.sln", None))
+        await asyncio.sleep(0.05)
+        info = asyncio.create_task(shell_host.execute_step("info", {}, "C:/A/A.sln", None))
+        await asyncio.sleep(0.01)
+
+        info.cancel()
+        await build
+        await asyncio.sleep(0.01)
+
+        proc = shell_host.spawned[0]
+        self.assertEqual(
+            ["ensure-solution", "execute-step", "execute-step", "cancel"],
+            [r["method"] for r in proc.requests],
+        )
+        self.assertEqual(1, proc.max_in_flight)  # info never ran
+        self.assertEqual(0, shell_host.pending_count())
+
+    async def test_stuck_step_is_killed_and_queued_call_retried(self):
+        original_grace = host.CANCEL_GRACE_SEC
+        original_pool = host._shell_pool
+        host.CANCEL_GRACE_SEC = 0.2
+        shell_host = FakeShellHost(_build_responder(cooperative=False))
+        host._shell_pool = host.ShellHostPool(lambda: shell_host)
+        try:
+            build = asyncio.create_task(
+                dispatch.run_shell_step("build", {}, "C:/A/A.sln", None))
+            await asyncio.sleep(0.05)
+            info = asyncio.create_task(
+                dispatch.run_shell_step("info", {}, "C:/A/A.sln", None))
+            await asyncio.sleep(0.05)
+
+            started = time.perf_counter()
+            build.cancel()
+            result, _ = await asyncio.wait_for(info, 5)
+            elapsed = time.perf_counter() - started
+        finally:
+            host.CANCEL_GRACE_SEC = original_grace
+            host._shell_pool = original_pool
+            await shell_host.shutdown(timeout=1)
+
+        self.assertTrue(result["success"])
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(2, len(shell_host.spawned))
+        self.assertEqual(-9, shell_host.spawned[0].returncode)
+        second = [r["params"]["command"] for r in shell_host.spawned[1].requests
+                  if r["method"] == "execute-step"]
+        self.assertEqual(["info"], second)
+
+    async def test_timeout_also_cancels_on_host(self):
+        shell_host = FakeShellHost(_build_responder(cooperative=True))
+        with self.assertRaises(host.HostError):
+            await shell_host.execute_step("build", {}, "C:/A/A.sln", None, timeout=0.05)
+        await asyncio.sleep(0.1)
+
+        self.assertEqual("cancel", shell_host.spawned[0].requests[-1]["method"])
+        self.assertEqual(0, shell_host.pending_count())
+
+    async def test_cancelled_cli_fallback_kills_the_batch_before_freeing_the_lane(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            exe = Path(tmp) / "TcAutomation.exe"
+            pid_file = Path(tmp) / "pid"
+            exe.write_text(
+                f"#!{sys.executable}\n"
+                "import os, sys, time\n"
+                f"open({str(pid_file)!r}, 'w').write(str(os.getpid()))\n"
+                "time.sleep(30)\n"
+            )
+            exe.chmod(0o755)
+            with mock.patch.object(dispatch, "get_shell_host", return_value=None), \
+                    mock.patch.object(cli, "find_tc_automation_exe", return_value=exe):
+                build = asyncio.create_task(dispatch.run_shell_step("build", {}, "C:/A/A.sln", None))
+                while not pid_file.exists() or not pid_file.read_text():
+                    await asyncio.sleep(0.01)
+                pid = int(pid_file.read_text())
+
+                started = time.perf_counter()
+                build.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await build
+
+        self.assertLess(time.perf_counter() - started, 2.0)
+        with self.assertRaises(ProcessLookupError):
+            os.kill(pid, 0)  # killed and reaped before the lane slot was released
+        self.assertEqual(0, executor.lane_usage()["dte"]["inUse"])
+
+
+if __name__ == "__main__":
+    unittest.main()
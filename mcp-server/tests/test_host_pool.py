@@ -0,0 +1,117 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_host import FakeShellHost  # noqa: E402
+from twincat_mcp.host import ShellHostPool  # noqa: E402
+
+
+def _loads(shell_host):
+    """Solutions loaded by every process `shell_host` has spawned."""
+    return [
+        r["params"]["solutionPath"]
+        for proc in shell_host.spawned
+        for r in proc.requests
+        if r["method"] == "ensure-solution"
+    ]
+
+
+class ShellHostPoolTests(unittest.IsolatedAsyncioTestCase):
+    def _pool(self, **kwargs):
+        self.created: list[FakeShellHost] = []
+
+        def factory():
+            shell_host = FakeShellHost()
+            self.created.append(shell_host)
+            return shell_host
+
+        kwargs.setdefault("idle_seconds", 0)
+        kwargs.setdefault("memory_probe", lambda: None)
+        return ShellHostPool(factory, **kwargs)
+
+    async def _build(self, pool, solution, tc_version=None):
+        shell_host = pool.acquire(solution, tc_version)
+        await shell_host.execute_step("build", {}, solution, tc_version)
+        return shell_host
+
+    async def asyncTearDown(self):
+        for shell_host in getattr(self, "created", []):
+            await shell_host.shutdown(timeout=1)
+
+    async def test_switching_back_reuses_loaded_host(self):
+        pool = self._pool(max_size=3)
+        a = await self._build(pool, "C:/A/A.sln")
+        b = await self._build(pool, "C:/B/B.sln")
+        again = await self._build(pool, "c:/A/./A.sln" if sys.platform == "win32" else "C:/A/./A.sln")
+
+        self.assertIs(a, again)
+        self.assertIsNot(a, b)
+        self.assertEqual(1, len(_loads(a)))
+        self.assertEqual(1, len(_loads(b)))
+
+    async def test_tc_version_is_part_of_the_key(self):
+        pool = self._pool(max_size=3)
+        first = await self._build(pool, "C:/A/A.sln", "TC3.1.4024.56")
+        second = await self._build(pool, "C:/A/A.sln", "TC3.1.4026.12")
+        self.assertIsNot(first, second)
+
+    async def test_full_pool_rebinds_least_recently_used_host(self):
+        pool = self._pool(max_size=2)
+        a = await self._build(pool, "C:/A/A.sln")
+        b = await self._build(pool, "C:/B/B.sln")
+        await self._build(pool, "C:/A/A.sln")
+        c = await self._build(pool, "C:/C/C.sln")
+
+        self.assertIs(b, c)
+        self.assertEqual(2, len(self.created))
+        self.assertEqual(1, len(b.spawned))
+        self.assertEqual(["C:/B/B.sln", "C:/C/C.sln"], _loads(b))
+        self.assertIs(a, pool.acquire("C:/A/A.sln"))
+
+    async def test_low_memory_stops_growth(self):
+        pool = self._pool(max_size=4, min_free_mb=2048, memory_probe=lambda: 512)
+        a = await self._build(pool, "C:/A/A.sln")
+        b = await self._build(pool, "C:/B/B.sln")
+
+        self.assertIs(a, b)
+        self.assertEqual(1, len(pool))
+
+    async def test_host_without_solution_is_bound_first(self):
+        pool = self._pool(max_size=2)
+        unbound = pool.acquire()
+        await unbound.execute_step("get-state", {}, None, None)
+        bound = await self._build(pool, "C:/A/A.sln")
+
+        self.assertIs(unbound, bound)
+        self.assertEqual(1, len(pool))
+
+    async def test_idle_hosts_are_evicted_except_most_recent(self):
+        pool = self._pool(max_size=3, idle_seconds=60)
+        a = await self._build(pool, "C:/A/A.sln")
+        b = await self._build(pool, "C:/B/B.sln")
+        proc_a = a.spawned[0]
+
+        evicted = pool.evict_idle(now=a.last_active + 61)
+        await asyncio.sleep(0.01)
+
+        self.assertEqual([a], evicted)
+        self.assertEqual([b], [h for _, h in pool.entries()])
+        self.assertEqual("shutdown", proc_a.requests[-1]["method"])
+        self.assertFalse(a.is_alive())
+
+    async def test_discard_forgets_crashed_host(self):
+        pool = self._pool(max_size=2)
+        a = await self._build(pool, "C:/A/A.sln")
+        pool.discard(a)
+        fresh = await self._build(pool, "C:/A/A.sln")
+
+        self.assertIsNot(a, fresh)
+        self.assertEqual(1, len(pool))
+
+
+if __name__ == "__main__":
+    unittest.main()
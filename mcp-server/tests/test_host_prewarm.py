@@ -0,0 +1,106 @@
+import asyncio
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_host import FakeShellHost, default_responder  # noqa: E402
+from twincat_mcp import host  # noqa: E402
+from twincat_mcp.handlers import safety  # noqa: E402
+
+
+def _slow_load_host(load_seconds, fail=False):
+    async def responder(proc, req):
+        if req["method"] == "ensure-solution":
+            proc.progress("host: opening TwinCAT shell for Solution.sln ...")
+            await asyncio.sleep(load_seconds)
+            if fail:
+                raise RuntimeError("Solution file not found: C:/Missing.sln")
+        return await default_responder(proc, req)
+
+    return FakeShellHost(responder)
+
+
+class PrewarmTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.shell_host = None
+        self.originals = host._shell_pool, host._ads_host, host._prewarm_state
+        patches = [
+            mock.patch.object(host, "PREWARM_ENABLED", True),
+            mock.patch.object(host, "ADS_HOST_DISABLED", True),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    async def asyncTearDown(self):
+        await host.shutdown_shell_host()
+        host._shell_pool, host._ads_host, host._prewarm_state = self.originals
+
+    def _install(self, shell_host):
+        self.shell_host = shell_host
+        host._shell_pool = host.ShellHostPool(lambda: shell_host, idle_seconds=0)
+
+    async def test_disabled_by_default(self):
+        with mock.patch.object(host, "PREWARM_ENABLED", False):
+            self.assertIsNone(host.start_prewarm("C:/Solution.sln"))
+
+    async def test_preload_solution_is_loaded_in_background(self):
+        self._install(_slow_load_host(0.2))
+
+        started = time.perf_counter()
+        task = host.start_prewarm("C:/Solution.sln")
+        self.assertLess(time.perf_counter() - started, 0.01)
+        self.assertFalse(task.done())
+
+        await task
+        self.assertEqual("ready", host.prewarm_status()["phase"])
+
+        # The build reuses the loaded solution instead of loading it again.
+        await self.shell_host.execute_step("build", {}, "C:/Solution.sln", None)
+        methods = [r["method"] for r in self.shell_host.spawned[0].requests]
+        self.assertEqual(1, methods.count("ensure-solution"))
+
+    async def test_preload_solution_comes_from_config(self):
+        self._install(_slow_load_host(0))
+        with mock.patch.object(host, "get_preload_solution",
+                               return_value=("C:/Config.sln", "TC3.1.4024.56", "config")):
+            await host.start_prewarm()
+
+        st = host.prewarm_status()
+        self.assertEqual("C:/Config.sln", st["solutionPath"])
+        self.assertEqual("config", st["source"])
+        load = [r for r in self.shell_host.spawned[0].requests if r["method"] == "ensure-solution"][0]
+        self.assertEqual("TC3.1.4024.56", load["params"]["tcVersion"])
+
+    async def test_host_status_reports_warm_up_progress(self):
+        self._install(_slow_load_host(0.3))
+        task = host.start_prewarm("C:/Solution.sln")
+        await asyncio.sleep(0.1)
+
+        started = time.perf_counter()
+        text = (await safety.handle_host_status({}, time.time()))[0].text
+        latency = time.perf_counter() - started
+        await task
+
+        self.assertLess(latency, 0.05)
+        self.assertIn("Warm-up: loading solution", text)
+        self.assertIn("opening TwinCAT shell", text)
+
+    async def test_failed_preload_is_reported(self):
+        self._install(_slow_load_host(0, fail=True))
+        await host.start_prewarm("C:/Missing.sln")
+
+        st = host.prewarm_status()
+        self.assertEqual("failed", st["phase"])
+        self.assertIn("not found", st["error"])
+        text = (await safety.handle_host_status({}, time.time()))[0].text
+        self.assertIn("Warm-up: FAILED", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_host import FakeShellHost, default_responder  # noqa: E402
+from twincat_mcp import host  # noqa: E402
+from twincat_mcp.dispatch import run_shell_step  # noqa: E402
+
+SOLUTION = "C:/A/A.sln"
+
+
+class WarmSpareTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.original = host._shell_pool
+        self.created: list[FakeShellHost] = []
+        self.crash_next_build = False
+
+    async def asyncTearDown(self):
+        await host.shutdown_shell_host()
+        host._shell_pool = self.original
+
+    def _install(self, **kwargs):
+        async def responder(proc, req):
+            if (req["method"] == "execute-step" and req["params"]["command"] == "build"
+                    and self.crash_next_build):
+                self.crash_next_build = False
+                await asyncio.sleep(0.02)
+                proc.exit(1, stderr="Unhandled COM exception 0x800706BE")
+                await asyncio.sleep(10)
+            return await default_responder(proc, req)
+
+        def factory():
+            shell_host = FakeShellHost(responder)
+            self.created.append(shell_host)
+            return shell_host
+
+        kwargs.setdefault("idle_seconds", 0)
+        kwargs.setdefault("memory_probe", lambda: None)
+        host._shell_pool = host.ShellHostPool(factory, spare=True, **kwargs)
+        return host._shell_pool
+
+    async def _settle(self, pool):
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            if pool.spare_status()["state"] == "ready":
+                return
+
+    async def test_spare_warms_up_with_current_solution(self):
+        pool = self._install()
+        await run_shell_step("build", {}, SOLUTION)
+        await self._settle(pool)
+
+        spare = pool.spare_host
+        self.assertIsNotNone(spare)
+        self.assertIsNot(spare, pool.most_recent())
+        self.assertEqual("ready", pool.spare_status()["state"])
+        loads = [r for r in spare.spawned[0].requests if r["method"] == "ensure-solution"]
+        self.assertEqual(1, len(loads))
+
+    async def test_crash_promotes_spare_and_retries_step(self):
+        pool = self._install()
+        await run_shell_step("build", {}, SOLUTION)
+        await self._settle(pool)
+        crashed, spare = pool.most_recent(), pool.spare_host
+
+        self.crash_next_build = True
+        result, _ = await run_shell_step("build", {}, SOLUTION)
+
+        self.assertTrue(result.get("success"))
+        self.assertFalse(crashed.is_alive())
+        self.assertIs(spare, pool.most_recent())
+        self.assertEqual(1, pool.promotions)
+        # The promoted spare already had the solution loaded.
+        loads = [r for r in spare.spawned[0].requests if r["method"] == "ensure-solution"]
+        self.assertEqual(1, len(loads))
+
+        await self._settle(pool)
+        self.assertIsNotNone(pool.spare_host)
+        self.assertNotIn(pool.spare_host, (crashed, spare))
+
+    async def test_no_spare_unless_enabled(self):
+        pool = self._install()
+        pool.spare_enabled = False
+        await run_shell_step("build", {}, SOLUTION)
+        await asyncio.sleep(0.05)
+
+        self.assertIsNone(pool.spare_host)
+        self.assertIsNone(pool.spare_status())
+        self.assertEqual(1, len(self.created))
+
+    async def test_no_spare_when_memory_is_low(self):
+        pool = self._install(min_free_mb=2048, memory_probe=lambda: 512)
+        await run_shell_step("build", {}, SOLUTION)
+        await asyncio.sleep(0.05)
+
+        self.assertIsNone(pool.spare_host)
+        self.assertEqual("none", pool.spare_status()["state"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_host import FakeShellHost, default_responder  # noqa: E402
+from twincat_mcp import cli  # noqa: E402
+from twincat_mcp.progress import classify_progress, progress_callback, reporting  # noqa: E402
+
+
+class PhaseTests(unittest.TestCase):
+    def test_phases(self):
+        self.assertEqual("activating", classify_progress("Activating configuration...")[0])
+        self.assertEqual("restarting", classify_progress("Restarting TwinCAT runtime")[0])
+        self.assertEqual("waiting", classify_progress("Waiting for TcUnit results (12/40)")[0])
+        self.assertEqual("error", classify_progress("Activation failed")[0])
+        self.assertEqual("done", classify_progress("Build succeeded")[0])
+        self.assertEqual(("running", "▸"), classify_progress("Found 3 PLC projects"))
+
+
+class LiveProgressTests(unittest.IsolatedAsyncioTestCase):
+    async def test_host_progress_is_sent_while_step_runs(self):
+        received = []
+
+        async def send(progress, message):
+            received.append((time.perf_counter(), progress, message))
+
+        async def responder(proc, req):
+            if req["method"] == "execute-step":
+                proc.progress("Activating configuration...")
+                await asyncio.sleep(0.1)
+                proc.progress("Restarting TwinCAT runtime")
+                await asyncio.sleep(0.1)
+            return await default_responder(proc, req)
+
+        shell_host = FakeShellHost(responder)
+        async with reporting(send):
+            _, progress = await shell_host.execute_step("restart", {}, "C:/A/A.sln", None)
+            finished = time.perf_counter()
+
+        self.assertEqual(["Activating configuration...", "Restarting TwinCAT runtime"], progress)
+        self.assertEqual(
+            [(1, "activating: Activating configuration..."), (2, "restarting: Restarting TwinCAT runtime")],
+            [(n, m) for _, n, m in received],
+        )
+        self.assertLess(received[0][0], finished - 0.1)
+
+    async def test_no_reporter_without_progress_token(self):
+        self.assertIsNone(progress_callback())
+        shell_host = FakeShellHost()
+        _, progress = await shell_host.execute_step("build", {}, "C:/A/A.sln", None)
+        self.assertEqual([], progress)
+
+    async def test_send_errors_do_not_fail_the_call(self):
+        async def send(progress, message):
+            raise ConnectionResetError("client went away")
+
+        async def responder(proc, req):
+            if req["method"] == "execute-step":
+                proc.progress("Building solution...")
+                await asyncio.sleep(0.01)
+            return await default_responder(proc, req)
+
+        shell_host = FakeShellHost(responder)
+        async with reporting(send):
+            inner, _ = await shell_host.execute_step("build", {}, "C:/A/A.sln", None)
+        self.assertTrue(inner["success"])
+
+    @unittest.skipIf(os.name == "nt", "uses a POSIX shebang script as the stand-in executable")
+    async def test_cli_progress_is_forwarded_live(self):
+        received = []
+
+        async def send(progress, message):
+            received.append((time.perf_counter(), message))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            exe = Path(tmp) / "TcAutomation.exe"
+            exe.write_text(
+                f"#!{sys.executable}\n"
+                "import sys, time\n"
+                "print('[PROGRESS] Building solution...', file=sys.stderr, flush=True)\n"
+                "time.sleep(0.3)\n"
+                "print('{\"success\": true}')\n"
+            )
+            exe.chmod(0o755)
+            with mock.patch.object(cli, "find_tc_automation_exe", return_value=exe):
+                async with reporting(send):
+                    result, progress = await asyncio.to_thread(
+                        cli.run_tc_automation_with_progress, "batch", [], 1,
+                        on_progress=progress_callback(),
+                    )
+                    finished = time.perf_counter()
+
+        self.assertTrue(result["success"])
+        self.assertEqual(["Building solution..."], progress)
+        self.assertEqual("building: Building solution...", received[0][1])
+        self.assertLess(received[0][0], finished - 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
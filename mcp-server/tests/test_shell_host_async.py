@@ -0,0 +1,129 @@
+import asyncio
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_host import FakeShellHost, default_responder  # noqa: E402
+from twincat_mcp.host import HostError  # noqa: E402
+
+
+class AsyncShellHostTests(unittest.IsolatedAsyncioTestCase):
+    async def test_pipelined_requests_resolve_by_id(self):
+        delays = {"slow-var": 0.2, "fast-var": 0.01}
+
+        async def responder(proc, req):
+            if req["method"] == "execute-step":
+                symbol = req["params"]["args"]["symbol"]
+                await asyncio.sleep(delays[symbol])
+                return {"command": "read-var", "result": {"Value": symbol}}
+            return await default_responder(proc, req)
+
+        shell_host = FakeShellHost(responder, serial=False)
+        finished = []
+
+        async def read(symbol):
+            inner, _ = await shell_host.execute_step("read-var", {"symbol": symbol}, None, None, timeout=5)
+            finished.append(symbol)
+            return inner["Value"]
+
+        values = await asyncio.gather(read("slow-var"), read("fast-var"))
+
+        self.assertEqual(["slow-var", "fast-var"], values)
+        self.assertEqual(["fast-var", "slow-var"], finished)
+        self.assertEqual(2, shell_host.spawned[0].max_in_flight)
+        self.assertEqual(0, shell_host.pending_count())
+
+    async def test_response_wakes_caller_without_polling(self):
+        shell_host = FakeShellHost()
+        await shell_host.status()
+
+        started = time.perf_counter()
+        for _ in range(20):
+            await shell_host.status()
+        per_call = (time.perf_counter() - started) / 20
+
+        self.assertLess(per_call, 0.01)
+
+    async def test_shell_step_loads_solution_once(self):
+        shell_host = FakeShellHost()
+        await shell_host.execute_step("build", {}, "C:/A/A.sln", None)
+        await shell_host.execute_step("info", {}, "C:/A/A.sln", None)
+        await shell_host.execute_step("build", {}, "C:/B/B.sln", None)
+
+        methods = [
+            (r["method"], (r.get("params") or {}).get("command"))
+            for r in shell_host.spawned[0].requests
+        ]
+        self.assertEqual(
+            [
+                ("ensure-solution", None), ("execute-step", "build"),
+                ("execute-step", "info"),
+                ("ensure-solution", None), ("execute-step", "build"),
+            ],
+            methods,
+        )
+
+    async def test_progress_is_attributed_to_running_request(self):
+        async def responder(proc, req):
+            if req["method"] == "execute-step" and req["params"]["command"] == "build":
+                proc.progress("Building solution...")
+                await asyncio.sleep(0.05)
+                proc.progress("Build succeeded")
+            return await default_responder(proc, req)
+
+        shell_host = FakeShellHost(responder, serial=True)
+        build = asyncio.create_task(shell_host.execute_step("build", {}, "C:/A/A.sln", None))
+        while (shell_host.busy_step() or ("",))[0] != "build":
+            await asyncio.sleep(0.001)
+        state = asyncio.create_task(shell_host.execute_step("get-state", {}, None, None))
+
+        (_, build_progress), (_, state_progress) = await asyncio.gather(build, state)
+
+        self.assertEqual(["Building solution...", "Build succeeded"], build_progress)
+        self.assertEqual([], state_progress)
+
+    async def test_host_exit_fails_pending_calls(self):
+        async def responder(proc, req):
+            if req["method"] == "execute-step":
+                await asyncio.sleep(0.05)
+                proc.exit(1, stderr="Unhandled COM exception 0x800706BE")
+                await asyncio.sleep(10)
+            return await default_responder(proc, req)
+
+        shell_host = FakeShellHost(responder)
+        with self.assertRaises(HostError) as ctx:
+            await shell_host.execute_step("build", {}, "C:/A/A.sln", None, timeout=5)
+
+        self.assertIn("0x800706BE", str(ctx.exception))
+        self.assertFalse(shell_host.is_alive())
+        self.assertEqual(0, shell_host.pending_count())
+
+    async def test_error_response_raises_host_error(self):
+        async def responder(proc, req):
+            if req["method"] == "execute-step":
+                raise RuntimeError("Unsupported command: 'frobnicate'")
+            return await default_responder(proc, req)
+
+        shell_host = FakeShellHost(responder)
+        with self.assertRaises(HostError) as ctx:
+            await shell_host.execute_step("frobnicate", {}, None, None)
+        self.assertIn("frobnicate", str(ctx.exception))
+
+    async def test_shutdown_is_graceful(self):
+        shell_host = FakeShellHost()
+        await shell_host.status()
+        proc = shell_host.spawned[0]
+
+        await shell_host.shutdown(timeout=1)
+
+        self.assertEqual("shutdown", proc.requests[-1]["method"])
+        self.assertEqual(0, proc.returncode)
+        self.assertFalse(shell_host.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
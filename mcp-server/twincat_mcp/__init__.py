@@ -8,8 +8,13 @@ This package holds the reusable pieces it wires together:
 - formatting    human-readable duration / timing output
 - cli           TcAutomation.exe discovery + one-shot subprocess runners
 - host          the persistent `TcAutomation.exe host` subsystem
-                  (ShellHost class, singleton accessor, graceful shutdown)
+                  (ShellHost class, host pool, accessors, graceful shutdown)
+- executor      execution lanes (dte / ads / io) that keep blocking work
+                  off the asyncio event loop
+- progress      live step progress -> MCP progress notifications
 - dispatch      run_shell_step — unified "run one step through host or CLI"
+- ads           pure-Python ADS over AMS/TCP (client, protocol, value
+                  codecs) — the TWINCAT_ADS_BACKEND=python path
 - tools.schemas the 26 Tool() descriptors for list_tools()
 
 Nothing in this package imports `server`, so circular-import risk is zero.
@@ -0,0 +1,65 @@
+"""
+Pure-Python ADS over AMS/TCP.
+
+Talks to a TwinCAT AMS router directly on TCP 48898, without going
+through `TcAutomation.exe`. A `twincat_read_var` then costs one network
+round-trip per ADS request instead of a host round-trip plus a fresh
+.NET AdsClient connect.
+
+Modules:
+  - protocol   frame layout, command ids, index groups, error codes
+  - client     AdsClient (asyncio, pipelined by invoke id), open_client()
+  - values     PLC value <-> bytes, rendered like the C# commands
+  - codecs     compiled per-type codecs for structs, arrays, enums, times
+  - arrays     index-range reads of numeric arrays into NumPy
+  - cache      per-connection symbol handle/type cache, symbol-version aware
+  - symbols    whole-symbol-table upload and prefix/substring index
+  - symbol_file  the index saved per target and memory-mapped on load
+  - pool       persistent connections per (AMS Net ID, port)
+  - steps      get-state / read-var / write-var with C#-shaped results
+  - watch      notification subscriptions buffered server-side
+  - wait       block until a condition on a symbol or the ADS state holds
+  - recorder   twincat_ads_record, streamed to the file in chunks
+  - jobs       background recordings: start, status with a live tail, stop
+  - recfile    recording files: the CSV, columnar .tcrec, conversion
+  - analysis   statistics of a recording, two streaming passes
+  - downsample LTTB and min/max previews of a recording, streamed
+
+Backend selection: `TWINCAT_ADS_BACKEND=python` routes
+twincat_get_state, twincat_set_state, twincat_ping_target,
+twincat_read_var, twincat_write_var, twincat_read_var_list,
+twincat_write_var_list and twincat_list_symbols through this package.
+With "python", a target whose router can't be reached falls back to
+the host for that call. The default ("host") keeps them on the C# host:
+a direct AMS/TCP connection to a remote router needs a route on that
+router back to this machine's AMS Net ID, which the local TwinCAT
+router usually has but a bare TCP client doesn't, so every call would
+wait out a timeout before its fallback. twincat_read_plc_log stays on
+the host either way (see `steps`). Connections are kept open between
+calls (see `pool`), and so are resolved symbols (see `cache`).
+Index-range reads, watches, waits and recordings always run here,
+whatever the backend, because the host has no equivalent.
+"""
+
+import os
+
+from .client import AdsClient, open_client, router_address
+from .pool import AdsConnectionPool, get_pool, shutdown_pool
+from .protocol import ADS_STATES, AdsConnectionError, AdsError, DeviceInfo, SymbolInfo
+
+BACKEND = os.environ.get("TWINCAT_ADS_BACKEND", "host").strip().lower() or "host"
+
+__all__ = [
+    "ADS_STATES",
+    "AdsClient",
+    "AdsConnectionPool",
+    "AdsConnectionError",
+    "AdsError",
+    "BACKEND",
+    "DeviceInfo",
+    "get_pool",
+    "SymbolInfo",
+    "open_client",
+    "router_address",
+    "shutdown_pool",
+]
@@ -0,0 +1,232 @@
+"""
+Statistics of a recording, computed while streaming the file.
+
+`analyze()` reads a CSV or .tcrec recording (see `recfile`) one chunk at
+a time, in two passes, so memory stays at one chunk plus a fixed-size
+histogram per variable whatever the size of the file:
+
+  1. count, NaNs, min, max, mean and standard deviation (chunk results
+     merged with Chan's parallel update), whether every value is an
+     integer, and the sample intervals;
+  2. a histogram over [min, max] for the percentiles, the edges with
+     their rise and fall times, and the gaps between samples.
+
+Percentiles are the value at that rank, read from the histogram. They
+are exact for integer-valued variables that span fewer than
+HISTOGRAM_BINS values (BOOL, enums, counters), and within
+(max - min) / HISTOGRAM_BINS otherwise.
+
+An edge is a move across the band from LOW_LEVEL to HIGH_LEVEL of
+[min, max]. The band works as hysteresis: noise around one level is not
+counted. A rise or fall time runs from the last sample on one side of
+the band to the first sample on the other, so it resolves to the
+sample interval.
+"""
+
+import math
+from typing import Any
+
+import numpy
+
+from .recfile import TIMESTAMP, TcrecFile, format_timestamp, open_recording
+
+DEFAULT_PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+HISTOGRAM_BINS = 4096
+LOW_LEVEL = 0.1
+HIGH_LEVEL = 0.9
+# A sample interval longer than this many mean intervals is a gap.
+GAP_FACTOR = 1.5
+
+_TICKS_PER_MS = 10_000
+
+
+class _Moments:
+    """Count, mean, sum of squared deviations, min and max of a stream
+    of chunks."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, values: numpy.ndarray) -> None:
+        n = len(values)
+        if not n:
+            return
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / self.count) if self.count else math.nan
+
+    def summary(self) -> dict[str, float] | None:
+        if not self.count:
+            return None
+        return {"Mean": self.mean, "Min": self.min, "Max": self.max}
+
+
+class _Channel:
+    def __init__(self, name: str, data_type: str | None):
+        self.name = name
+        self.data_type = data_type
+        self.values = _Moments()
+        self.nans = 0
+        self.integral = True
+        self.rises = _Moments()
+        self.falls = _Moments()
+        # histogram: bin i holds [origin + i * width, origin + (i + 1) * width)
+        self.origin = 0.0
+        self.width = 1.0
+        self.counts: numpy.ndarray | None = None
+        self.exact = True
+        self.low = self.high = 0.0
+        # state (0 below the band, 2 above) and time of the last sample outside it
+        self.side: int | None = None
+        self.side_time = 0
+
+    def first_pass(self, values: numpy.ndarray) -> None:
+        finite = values[numpy.isfinite(values)]
+        self.nans += len(values) - len(finite)
+        self.values.add(finite)
+        if self.integral and len(finite):
+            self.integral = bool((finite == numpy.floor(finite)).all())
+
+    def prepare(self) -> None:
+        lo, hi = self.values.min, self.values.max
+        if not self.values.count or hi == lo:
+            return
+        if self.integral and hi - lo < HISTOGRAM_BINS:
+            self.origin, self.width, bins = lo - 0.5, 1.0, int(hi - lo) + 1
+        else:
+            self.origin, self.width, bins = lo, (hi - lo) / HISTOGRAM_BINS, HISTOGRAM_BINS
+            self.exact = False
+        self.counts = numpy.zeros(bins, dtype=numpy.int64)
+        self.low = lo + LOW_LEVEL * (hi - lo)
+        self.high = lo + HIGH_LEVEL * (hi - lo)
+
+    def second_pass(self, times: numpy.ndarray, values: numpy.ndarray) -> None:
+        if self.counts is None:
+            return
+        finite = values[numpy.isfinite(values)]
+        index = ((finite - self.origin) / self.width).astype(numpy.int64)
+        numpy.clip(index, 0, len(self.counts) - 1, out=index)
+        self.counts += numpy.bincount(index, minlength=len(self.counts))
+
+        # Samples outside the band, with the last one of the previous chunk
+        # in front; a rise is a sample below followed by one above.
+        side = numpy.where(values <= self.low, 0, numpy.where(values >= self.high, 2, 1))
+        outside = side != 1
+        side, when = side[outside], times[outside]
+        if not len(side):
+            return
+        if self.side is not None:
+            side = numpy.concatenate(([self.side], side))
+            when = numpy.concatenate(([self.side_time], when))
+        moves = numpy.flatnonzero(side[:-1] != side[1:])
+        durations = (when[moves + 1] - when[moves]) / _TICKS_PER_MS
+        rising = side[moves] == 0
+        self.rises.add(durations[rising])
+        self.falls.add(durations[~rising])
+        self.side, self.side_time = int(side[-1]), int(when[-1])
+
+    def percentile(self, q: float) -> float:
+        if self.counts is None:
+            return self.values.min
+        rank = q / 100 * (self.values.count - 1)
+        k = int(numpy.searchsorted(numpy.cumsum(self.counts), rank, side="right"))
+        value = self.origin + (k + 0.5) * self.width
+        return min(max(value, self.values.min), self.values.max)
+
+    def result(self, percentiles: list[float]) -> dict[str, Any]:
+        out: dict[str, Any] = {"Name": self.name, "DataType": self.data_type, "Count": self.values.count,
+                               "NaN": self.nans}
+        if not self.values.count:
+            return out
+        out.update({
+            "Min": _number(self.values.min), "Max": _number(self.values.max),
+            "Mean": self.values.mean, "Std": self.values.std,
+            "Percentiles": {f"P{q:g}": _number(self.percentile(q)) for q in percentiles},
+            "PercentileResolution": 0 if self.exact else self.width,
+            "RisingEdges": self.rises.count, "FallingEdges": self.falls.count,
+            "RiseTimeMs": self.rises.summary(), "FallTimeMs": self.falls.summary(),
+        })
+        return out
+
+
+def analyze(path: str, variables: list[str] | None = None,
+            percentiles: list[float] | None = None) -> dict[str, Any]:
+    """Statistics of the recording at `path`, for `variables` (default:
+    all). Raises ValueError for a file that isn't a recording or names
+    it doesn't have, OSError if it can't be read."""
+    percentiles = list(percentiles) if percentiles else list(DEFAULT_PERCENTILES)
+    for q in percentiles:
+        if not 0 <= q <= 100:
+            raise ValueError(f"Percentile {q} is not between 0 and 100")
+    with open_recording(path) as recording:
+        names = list(variables) if variables else recording.variables
+        channels = [_Channel(name, recording.types.get(name)) for name in names]
+        columns = [TIMESTAMP] + names
+        rows = 0
+        first = last = None
+        intervals = _Moments()
+
+        for chunk in recording.iter_chunks(columns):
+            times = chunk[TIMESTAMP]
+            if not len(times):
+                continue
+            intervals.add(_steps(times, last) / _TICKS_PER_MS)
+            if first is None:
+                first = int(times[0])
+            last = int(times[-1])
+            rows += len(times)
+            for channel in channels:
+                channel.first_pass(chunk[channel.name].astype("<f8"))
+
+        for channel in channels:
+            channel.prepare()
+        gaps = 0
+        previous = None
+        limit = GAP_FACTOR * intervals.mean * _TICKS_PER_MS
+        for chunk in recording.iter_chunks(columns):
+            times = chunk[TIMESTAMP]
+            if not len(times):
+                continue
+            gaps += int((_steps(times, previous) > limit).sum()) if intervals.count else 0
+            previous = int(times[-1])
+            for channel in channels:
+                channel.second_pass(times, chunk[channel.name].astype("<f8"))
+
+        result: dict[str, Any] = {
+            "Success": True, "Path": recording.path, "Rows": rows, "Variables": names,
+            "Format": "tcrec" if isinstance(recording, TcrecFile) else "csv",
+        }
+    if rows:
+        result.update({
+            "Start": format_timestamp(first), "End": format_timestamp(last),
+            "DurationSeconds": (last - first) / 10_000_000,
+        })
+    if intervals.count:
+        result["SampleIntervalMs"] = {
+            "Mean": intervals.mean, "Std": intervals.std, "Min": intervals.min, "Max": intervals.max, "Gaps": gaps,
+        }
+    result["Channels"] = [channel.result(percentiles) for channel in channels]
+    return result
+
+
+def _steps(times: numpy.ndarray, previous: int | None) -> numpy.ndarray:
+    """Intervals between `times`, and from the previous chunk's last time."""
+    return numpy.diff(times) if previous is None else numpy.diff(times, prepend=previous)
+
+
+def _number(value: float) -> float | int:
+    return int(value) if value == int(value) and abs(value) < 2**53 else value
@@ -0,0 +1,226 @@
+"""
+Per-connection cache of resolved symbols: name -> (SymbolInfo, handle).
+
+Every AdsClient owns one (`client.symbols`). With the pool keeping one
+client per target, that makes it a per-target cache, and a reconnect
+starts from an empty one, which is required: handles belong to the
+connection's AMS address and die with it.
+
+Invalidation follows the PLC's symbol version (IG_SYM_VERSION, 0xF008),
+which changes on activate, online change and PLC restart. On first use
+the cache subscribes to it with an on-change device notification, so a
+cached lookup costs no round-trip at all and a hot `read-var` is a single
+ADS read. If the target refuses the notification, the version is read
+alongside every lookup instead.
+
+The same version also governs the connection's `SymbolIndex` (the whole
+symbol table, for twincat_list_symbols): `symbol_index()` uploads it on
+first use and again only after the version moved, or maps it from the
+file a previous session saved (see `symbol_file`). Likewise `types()`,
+the value codecs for the target's data types (see `codecs`).
+
+As a second line of defence, callers that get a stale-handle error from
+a cached handle (see STALE_HANDLE_ERRORS) call `invalidate()` and retry
+once; the notification may trail the change by a PLC cycle.
+"""
+
+import asyncio
+import struct
+from collections import OrderedDict
+from typing import TYPE_CHECKING, NamedTuple
+
+from . import protocol
+from .codecs import TypeRegistry, upload_type_registry
+from .protocol import AdsError, NotificationSample, SymbolInfo
+from .symbol_file import open_symbol_index
+from .symbols import SymbolIndex
+
+if TYPE_CHECKING:
+    from .client import AdsClient
+
+# Handles hold resources in the PLC; keep at most this many per target
+# and release the least recently used beyond that.
+MAX_CACHED_SYMBOLS = 2000
+
+# Errors a read or write by a cached handle fails with once the symbol
+# table changed underneath it.
+STALE_HANDLE_ERRORS = frozenset({
+    protocol.ADSERR_DEVICE_NOTFOUND,
+    protocol.ADSERR_DEVICE_SYMBOLNOTFOUND,
+    protocol.ADSERR_DEVICE_SYMBOLVERSIONINVALID,
+})
+
+
+class CachedSymbol(NamedTuple):
+    info: SymbolInfo
+    handle: int
+
+
+class SymbolCache:
+    def __init__(self, client: "AdsClient", max_entries: int = MAX_CACHED_SYMBOLS):
+        self._client = client
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedSymbol]" = OrderedDict()
+        self._version: int | None = None
+        self._watching = False
+        self._watch_lock = asyncio.Lock()
+        self._index: SymbolIndex | None = None
+        self._index_lock = asyncio.Lock()
+        self._types: TypeRegistry | None = None
+        self._types_lock = asyncio.Lock()
+        # Bumped on every invalidation, so a resolve that was in flight
+        # across one doesn't store handles from the old symbol table.
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._tasks: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def version(self) -> int | None:
+        return self._version
+
+    async def get(self, name: str) -> CachedSymbol:
+        """Resolve one symbol. Raises AdsError if it can't be resolved."""
+        [(cached, code)] = await self.lookup([name])
+        if cached is None:
+            raise AdsError(code, name)
+        return cached
+
+    async def lookup(self, names: list[str], _retry: bool = True) -> list[tuple[CachedSymbol | None, int]]:
+        """(cached symbol, 0) or (None, error code) per name. Misses are
+        resolved together with one sum command."""
+        await self._check_version()
+        out: list[tuple[CachedSymbol | None, int]] = []
+        missing: dict[str, list[int]] = {}
+        for i, name in enumerate(names):
+            key = name.upper()
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                missing.setdefault(key, []).append(i)
+            out.append((cached, 0))
+        if not missing:
+            return out
+
+        self.misses += len(missing)
+        generation = self._generation
+        keys = list(missing)
+        resolved = await self._client.resolve_symbols([names[missing[k][0]] for k in keys])
+        if generation != self._generation and _retry:
+            # The symbol table changed while we were resolving; these
+            # handles may belong to the old one.
+            self._release_later([h for _, h, _ in resolved if h is not None])
+            return await self.lookup(names, _retry=False)
+        for key, (info, handle, code) in zip(keys, resolved):
+            cached = CachedSymbol(info, handle) if handle is not None else None
+            if cached is not None:
+                self._entries[key] = cached
+            for i in missing[key]:
+                out[i] = (cached, code)
+        self._evict()
+        return out
+
+    async def symbol_index(self) -> SymbolIndex:
+        """The target's whole symbol table, uploaded once per symbol version."""
+        await self._check_version()
+        async with self._index_lock:
+            if self._index is not None and self._index.version == self._version:
+                return self._index
+            generation = self._generation
+            index = await open_symbol_index(self._client, self._version)
+            if generation == self._generation:
+                self._drop_index()
+                self._index = index
+            return index
+
+    async def types(self) -> TypeRegistry:
+        """Codecs for the target's data types, uploaded once per symbol version."""
+        await self._check_version()
+        async with self._types_lock:
+            if self._types is not None and self._types.version == self._version:
+                return self._types
+            generation = self._generation
+            registry = await upload_type_registry(self._client, self._version)
+            if generation == self._generation:
+                self._types = registry
+            return registry
+
+    def invalidate(self) -> None:
+        """Forget every cached symbol. The handles are not released: after
+        a symbol-version change the PLC has already dropped them."""
+        self._entries.clear()
+        self._drop_index()
+        self._types = None
+        self._generation += 1
+        self.invalidations += 1
+
+    def clear(self) -> None:
+        """Forget everything, including the version watch (connection closed)."""
+        self._entries.clear()
+        self._drop_index()
+        self._types = None
+        self._generation += 1
+        self._version = None
+        self._watching = False
+
+    # ---------------- internals ----------------
+
+    async def _check_version(self) -> None:
+        if self._watching:
+            return
+        async with self._watch_lock:
+            if self._watching:
+                return
+            version = struct.unpack("<B", await self._client.read(protocol.IG_SYM_VERSION, 0, 1))[0]
+            self._on_version(version)
+            try:
+                await self._client.add_notification(
+                    protocol.IG_SYM_VERSION, 0, 1, self._on_version_sample,
+                    mode=protocol.TRANS_SERVER_ON_CHANGE, cycle_time_ms=100)
+            except AdsError:
+                return  # no notifications on this target: poll per lookup
+            self._watching = True
+
+    def _on_version_sample(self, sample: NotificationSample) -> None:
+        if sample.data:
+            self._on_version(sample.data[0])
+
+    def _on_version(self, version: int) -> None:
+        if self._version is not None and version != self._version:
+            self.invalidate()
+        self._version = version
+
+    def _drop_index(self) -> None:
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+    def _evict(self) -> None:
+        excess = len(self._entries) - self.max_entries
+        if excess <= 0:
+            return
+        handles = []
+        for _ in range(excess):
+            _, cached = self._entries.popitem(last=False)
+            handles.append(cached.handle)
+        self._release_later(handles)
+
+    def _release_later(self, handles: list[int]) -> None:
+        if not handles:
+            return
+
+        async def release():
+            try:
+                await self._client.release_handles(handles)
+            except Exception:
+                pass  # best effort; the handles die with the connection anyway
+
+        task = asyncio.get_running_loop().create_task(release())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
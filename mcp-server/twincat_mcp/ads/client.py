@@ -0,0 +1,424 @@
+"""
+Asyncio AMS/TCP client.
+
+`AdsClient` holds one TCP connection to an AMS router and talks to one
+ADS device behind it (AMS Net ID + ADS port, e.g. the PLC runtime on
+851). Requests are written immediately and matched to responses by
+invoke id, the same way `host.ShellHost` matches NDJSON ids, so several
+reads can be in flight on one connection and each caller wakes as soon
+as its own answer arrives.
+
+Router address: the first four octets of the AMS Net ID, which is how
+TwinCAT targets are usually numbered ("192.168.1.10.1.1" ->
+192.168.1.10:48898). Set `TWINCAT_ADS_ROUTER=host[:port]` when that
+doesn't hold (Net IDs like "5.62.110.4.1.1", or a test server).
+
+Local AMS Net ID: `TWINCAT_ADS_LOCAL_NET_ID`, else the local IP of the
+socket plus ".1.1". The target's router needs a route for it, exactly
+as for the C# AdsClient.
+"""
+
+import asyncio
+import contextlib
+import itertools
+import os
+import socket
+import struct
+import sys
+from typing import AsyncIterator, Callable
+
+from . import protocol
+from .cache import SymbolCache
+from .protocol import (AdsConnectionError, AdsError, AmsPacket, DeviceInfo,
+                       NotificationSample, SymbolInfo)
+
+# Per-request timeout. ADS requests normally answer in well under a
+# millisecond on a LAN; anything this slow means the router is gone.
+DEFAULT_TIMEOUT_SEC = 5.0
+
+# Sum commands are split so that no chunk's request or response exceeds
+# this many bytes (and no chunk exceeds protocol.MAX_SUM_ITEMS), well
+# under what AMS routers accept in one frame. Chunks are sent back to
+# back on the connection, so several still cost about one round-trip.
+MAX_SUM_BYTES = 64 * 1024
+
+# Read length for one symbol-info sub-request. Entries are ~30 bytes plus
+# name, type and comment; one that doesn't fit (a long comment) fails
+# with ADSERR_DEVICE_INVALIDSIZE and is read again on its own.
+SYMBOL_INFO_READ_LEN = 1024
+
+# Source AMS ports handed out to our connections, from the dynamic range
+# TwinCAT itself uses for ADS clients.
+_source_ports = itertools.count(32905)
+
+
+def router_address(ams_net_id: str) -> tuple[str, int]:
+    """(host, tcp_port) of the AMS router that serves `ams_net_id`."""
+    override = os.environ.get("TWINCAT_ADS_ROUTER", "").strip()
+    if override:
+        host, _, port = override.partition(":")
+        return host, int(port) if port else protocol.AMS_TCP_PORT
+    octets = ams_net_id.strip().split(".")
+    if len(octets) != 6:
+        raise ValueError(f"invalid AMS Net ID: {ams_net_id!r}")
+    return ".".join(octets[:4]), protocol.AMS_TCP_PORT
+
+
+class AdsClient:
+    """
+    One connection to one ADS device. `connect()` before use, `close()`
+    after; or use `open_client()`.
+
+    Every method raises AdsError when the device answers with an error
+    code, and AdsConnectionError when it can't be reached or doesn't
+    answer within `timeout` seconds.
+    """
+
+    def __init__(self, ams_net_id: str, ams_port: int = 851, *,
+                 host: str | None = None, tcp_port: int | None = None,
+                 timeout: float = DEFAULT_TIMEOUT_SEC,
+                 local_net_id: str | None = None):
+        self.ams_net_id = ams_net_id
+        self.ams_port = ams_port
+        if host is None:
+            host, default_port = router_address(ams_net_id)
+            tcp_port = tcp_port or default_port
+        self.host = host
+        self.tcp_port = tcp_port or protocol.AMS_TCP_PORT
+        self.timeout = timeout
+        self._target = protocol.net_id_bytes(ams_net_id)
+        self._local_net_id = local_net_id or os.environ.get("TWINCAT_ADS_LOCAL_NET_ID", "").strip() or None
+        self._source: bytes | None = None
+        self._source_port = next(_source_ports)
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._pending: dict[int, asyncio.Future] = {}
+        self._invoke_ids = itertools.count(1)
+        self._closed_error: str | None = None
+        # handle -> callback, or a list buffering the samples that arrive
+        # between the add-notification response and `add_notification`
+        # registering its callback.
+        self._notifications: dict[int, Callable[[NotificationSample], None] | list] = {}
+        self.symbols = SymbolCache(self)
+
+    # ---------------- connection ----------------
+
+    def is_connected(self) -> bool:
+        return self._writer is not None and self._reader_task is not None and not self._reader_task.done()
+
+    async def connect(self) -> None:
+        if self.is_connected():
+            return
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.tcp_port), self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise AdsConnectionError(
+                f"cannot reach AMS router {self.host}:{self.tcp_port} for {self.ams_net_id}: {e or 'timeout'}"
+            ) from None
+        sock = self._writer.get_extra_info("socket")
+        if sock is not None:
+            with contextlib.suppress(OSError):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        local = self._local_net_id
+        if not local:
+            local_ip = (self._writer.get_extra_info("sockname") or ("127.0.0.1",))[0]
+            local = f"{local_ip}.1.1" if local_ip.count(".") == 3 else "127.0.0.1.1.1"
+        self._source = protocol.net_id_bytes(local)
+        self._closed_error = None
+        self._reader_task = asyncio.get_running_loop().create_task(self._read_loop(self._reader))
+
+    async def close(self) -> None:
+        writer, task = self._writer, self._reader_task
+        self._writer = None
+        self._reader_task = None
+        if writer is not None:
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self._notifications.clear()
+        self.symbols.clear()
+        self._fail_pending(AdsConnectionError("connection closed"))
+
+    # ---------------- ADS services ----------------
+
+    async def read_device_info(self) -> DeviceInfo:
+        data = await self._request(protocol.CMD_READ_DEVICE_INFO, b"")
+        return protocol.parse_device_info_response(data)
+
+    async def read_state(self) -> tuple[int, int]:
+        """(ads_state, device_state). See protocol.ADS_STATES for names."""
+        data = await self._request(protocol.CMD_READ_STATE, b"")
+        return protocol.parse_state_response(data)
+
+    async def write_control(self, ads_state: int, device_state: int = 0, data: bytes = b"") -> None:
+        resp = await self._request(protocol.CMD_WRITE_CONTROL,
+                                   protocol.write_control_request(ads_state, device_state, data))
+        protocol.check_result(resp, "write control")
+
+    async def read(self, index_group: int, index_offset: int, length: int) -> bytes:
+        resp = await self._request(protocol.CMD_READ,
+                                   protocol.read_request(index_group, index_offset, length))
+        return protocol.parse_data_response(resp, f"read 0x{index_group:X}:0x{index_offset:X}")
+
+    async def write(self, index_group: int, index_offset: int, data: bytes) -> None:
+        resp = await self._request(protocol.CMD_WRITE,
+                                   protocol.write_request(index_group, index_offset, data))
+        protocol.check_result(resp, f"write 0x{index_group:X}:0x{index_offset:X}")
+
+    async def read_write(self, index_group: int, index_offset: int,
+                         read_length: int, data: bytes) -> bytes:
+        resp = await self._request(protocol.CMD_READ_WRITE,
+                                   protocol.read_write_request(index_group, index_offset, read_length, data))
+        return protocol.parse_data_response(resp, f"read/write 0x{index_group:X}:0x{index_offset:X}")
+
+    # ---------------- symbols ----------------
+
+    async def get_handle(self, name: str) -> int:
+        """Variable handle for a symbol name (e.g. "MAIN.bStart")."""
+        try:
+            data = await self.read_write(protocol.IG_SYM_HNDBYNAME, 0, 4, _encode_name(name))
+        except AdsError as e:
+            raise AdsError(e.code, name) from None
+        return struct.unpack("<I", data[:4])[0]
+
+    async def release_handle(self, handle: int) -> None:
+        await self.write(protocol.IG_SYM_RELEASEHND, 0, struct.pack("<I", handle))
+
+    async def read_by_handle(self, handle: int, length: int) -> bytes:
+        return await self.read(protocol.IG_SYM_VALBYHND, handle, length)
+
+    async def write_by_handle(self, handle: int, data: bytes) -> None:
+        await self.write(protocol.IG_SYM_VALBYHND, handle, data)
+
+    async def read_symbol_info(self, name: str) -> SymbolInfo:
+        """Address, size and type name of a symbol."""
+        try:
+            data = await self.read_write(protocol.IG_SYM_INFOBYNAMEEX, 0, 0xFFFF, _encode_name(name))
+        except AdsError as e:
+            raise AdsError(e.code, name) from None
+        info, _ = protocol.parse_symbol_entry(data)
+        return info
+
+    # ---------------- sum commands ----------------
+
+    async def sum_read(self, items: list[tuple[int, int, int]]) -> list[tuple[int, bytes]]:
+        """Read many (group, offset, length) in one request per chunk.
+        Returns (error_code, data) per item; per-item errors don't raise."""
+        chunks = _chunk(items, lambda item: 16 + item[2])
+        parts = await asyncio.gather(*(self._sum_read_chunk(chunk) for chunk in chunks))
+        return [result for part in parts for result in part]
+
+    async def sum_write(self, items: list[tuple[int, int, bytes]]) -> list[int]:
+        """Write many (group, offset, data). Returns the error code per item."""
+        chunks = _chunk(items, lambda item: 16 + len(item[2]))
+        parts = await asyncio.gather(*(self._sum_write_chunk(chunk) for chunk in chunks))
+        return [code for part in parts for code in part]
+
+    async def sum_read_write(self, items: list[tuple[int, int, int, bytes]]) -> list[tuple[int, bytes]]:
+        """ReadWrite many (group, offset, read_length, data). Returns
+        (error_code, data) per item."""
+        chunks = _chunk(items, lambda item: 24 + item[2] + len(item[3]))
+        parts = await asyncio.gather(*(self._sum_read_write_chunk(chunk) for chunk in chunks))
+        return [result for part in parts for result in part]
+
+    async def _sum_read_chunk(self, items):
+        data = await self.read_write(protocol.IG_SUMUP_READ, len(items),
+                                     protocol.sum_read_length(items), protocol.sum_read_request(items))
+        return protocol.parse_sum_read_response(data, [length for _, _, length in items])
+
+    async def _sum_write_chunk(self, items):
+        data = await self.read_write(protocol.IG_SUMUP_WRITE, len(items), 4 * len(items),
+                                     protocol.sum_write_request(items))
+        return protocol.parse_sum_write_response(data, len(items))
+
+    async def _sum_read_write_chunk(self, items):
+        data = await self.read_write(protocol.IG_SUMUP_READWRITE, len(items),
+                                     protocol.sum_read_write_length(items),
+                                     protocol.sum_read_write_request(items))
+        return protocol.parse_sum_read_write_response(data, len(items))
+
+    async def resolve_symbols(self, names: list[str]) -> list[tuple[SymbolInfo | None, int | None, int]]:
+        """
+        Symbol info and a variable handle for every name, as one sum
+        read/write (two sub-requests per name). Returns (info, handle,
+        error_code) per name; on error, info and handle are None. Handles
+        must be released with `release_handles`.
+        """
+        items = []
+        for name in names:
+            raw = _encode_name(name)
+            items.append((protocol.IG_SYM_INFOBYNAMEEX, 0, SYMBOL_INFO_READ_LEN, raw))
+            items.append((protocol.IG_SYM_HNDBYNAME, 0, 4, raw))
+        results = await self.sum_read_write(items)
+
+        out, orphans = [], []
+        for i, name in enumerate(names):
+            (info_code, info_data), (handle_code, handle_data) = results[2 * i], results[2 * i + 1]
+            handle = struct.unpack_from("<I", handle_data)[0] if not handle_code else None
+            info = None
+            if info_code == protocol.ADSERR_DEVICE_INVALIDSIZE and handle is not None:
+                try:
+                    info, info_code = await self.read_symbol_info(name), 0
+                except AdsError as e:
+                    info_code = e.code
+            elif not info_code:
+                info, _ = protocol.parse_symbol_entry(info_data)
+            code = info_code or handle_code
+            if code:
+                if handle is not None:
+                    orphans.append(handle)
+                out.append((None, None, code))
+            else:
+                out.append((info, handle, 0))
+        if orphans:
+            await self.release_handles(orphans)
+        return out
+
+    async def release_handles(self, handles: list[int]) -> None:
+        """Release variable handles with one sum write. Per-handle errors
+        are ignored: the handle is gone either way."""
+        if handles:
+            await self.sum_write([(protocol.IG_SYM_RELEASEHND, 0, struct.pack("<I", h)) for h in handles])
+
+    # ---------------- notifications ----------------
+
+    async def add_notification(self, index_group: int, index_offset: int, length: int,
+                               callback: Callable[[NotificationSample], None], *,
+                               mode: int = protocol.TRANS_SERVER_ON_CHANGE,
+                               cycle_time_ms: float = 10.0, max_delay_ms: float = 0.0) -> int:
+        """
+        Subscribe to `length` bytes at group/offset. The device checks
+        them every `cycle_time_ms` and sends a sample on each check
+        (TRANS_SERVER_CYCLE) or only when they changed
+        (TRANS_SERVER_ON_CHANGE). `callback` runs on the event loop, in
+        the connection's read loop, so it must not block. Returns the
+        notification handle for `delete_notification`.
+        """
+        resp = await self._request(protocol.CMD_ADD_NOTIFICATION, protocol.add_notification_request(
+            index_group, index_offset, length, mode, max_delay_ms, cycle_time_ms))
+        protocol.check_result(resp, f"add notification 0x{index_group:X}:0x{index_offset:X}")
+        (handle,) = struct.unpack_from("<I", resp, 4)
+        early = self._notifications.get(handle)
+        self._notifications[handle] = callback
+        for sample in early if isinstance(early, list) else ():
+            self._deliver(callback, sample)
+        return handle
+
+    async def delete_notification(self, handle: int) -> None:
+        self._notifications.pop(handle, None)
+        resp = await self._request(protocol.CMD_DEL_NOTIFICATION, struct.pack("<I", handle))
+        protocol.check_result(resp, f"delete notification {handle}")
+
+    # ---------------- internals ----------------
+
+    async def _request(self, command: int, data: bytes) -> bytes:
+        writer = self._writer
+        if writer is None or not self.is_connected():
+            raise AdsConnectionError(self._closed_error or f"not connected to {self.ams_net_id}")
+        invoke_id = next(self._invoke_ids) & 0xFFFFFFFF
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[invoke_id] = fut
+        frame = protocol.encode_frame(AmsPacket(
+            self._target, self.ams_port, self._source, self._source_port,
+            command, protocol.STATE_FLAG_REQUEST, 0, invoke_id, data,
+        ))
+        try:
+            writer.write(frame)
+            pkt = await asyncio.wait_for(fut, self.timeout)
+        except asyncio.TimeoutError:
+            raise AdsConnectionError(
+                f"no response from {self.ams_net_id}:{self.ams_port} within {self.timeout:g}s") from None
+        except (OSError, RuntimeError) as e:
+            raise AdsConnectionError(f"connection to {self.host}:{self.tcp_port} failed: {e}") from None
+        finally:
+            self._pending.pop(invoke_id, None)
+        if pkt.error_code:
+            # AMS-level error (no route, port not found, ...): the
+            # request never reached the ADS device.
+            raise AdsError(pkt.error_code, f"{self.ams_net_id}:{self.ams_port}")
+        return pkt.data
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                header = await reader.readexactly(protocol.TCP_HEADER_SIZE)
+                body = await reader.readexactly(protocol.frame_length(header))
+                pkt = protocol.decode_packet(body)
+                if pkt.state_flags & 0x0001:
+                    if pkt.command == protocol.CMD_ADD_NOTIFICATION and pkt.data[:4] == b"\0\0\0\0":
+                        self._notifications.setdefault(struct.unpack_from("<I", pkt.data, 4)[0], [])
+                    fut = self._pending.get(pkt.invoke_id)
+                    if fut is not None and not fut.done():
+                        fut.set_result(pkt)
+                else:
+                    self._on_device_request(pkt)
+        except asyncio.CancelledError:
+            raise
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            self._closed_error = f"AMS router {self.host}:{self.tcp_port} closed the connection"
+        except Exception as e:
+            self._closed_error = f"AMS/TCP stream error: {e}"
+        self.symbols.clear()
+        self._fail_pending(AdsConnectionError(self._closed_error))
+
+    def _on_device_request(self, pkt: AmsPacket) -> None:
+        """Requests the device sends us unprompted. Only notifications are
+        expected; samples for handles we no longer hold are dropped."""
+        if pkt.command != protocol.CMD_NOTIFICATION:
+            return
+        for sample in protocol.parse_notification(pkt.data):
+            callback = self._notifications.get(sample.handle)
+            if isinstance(callback, list):
+                callback.append(sample)
+            elif callback is not None:
+                self._deliver(callback, sample)
+
+    @staticmethod
+    def _deliver(callback: Callable[[NotificationSample], None], sample: NotificationSample) -> None:
+        try:
+            callback(sample)
+        except Exception as e:
+            sys.stderr.write(f"[mcp-server] ADS notification callback failed: {e}\n")
+            sys.stderr.flush()
+
+    def _fail_pending(self, exc: Exception) -> None:
+        for fut in self._pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
+        self._pending.clear()
+
+
+def _chunk(items: list, cost: Callable[[object], int]) -> list[list]:
+    """Split sum-command items into chunks within MAX_SUM_BYTES and
+    protocol.MAX_SUM_ITEMS. An item too big on its own gets its own chunk."""
+    chunks, current, size = [], [], 0
+    for item in items:
+        item_cost = cost(item)
+        if current and (len(current) >= protocol.MAX_SUM_ITEMS or size + item_cost > MAX_SUM_BYTES):
+            chunks.append(current)
+            current, size = [], 0
+        current.append(item)
+        size += item_cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _encode_name(name: str) -> bytes:
+    return name.encode("latin-1") + b"\0"
+
+
+@contextlib.asynccontextmanager
+async def open_client(ams_net_id: str, ams_port: int = 851, **kwargs) -> AsyncIterator[AdsClient]:
+    """Connected AdsClient for the duration of the block."""
+    client = AdsClient(ams_net_id, ams_port, **kwargs)
+    await client.connect()
+    try:
+        yield client
+    finally:
+        await client.close()
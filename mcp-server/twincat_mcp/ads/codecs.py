@@ -0,0 +1,594 @@
+"""
+Type-aware value codecs built from the PLC's data type table.
+
+`TypeRegistry` turns the uploaded AdsDatatypeEntry list (0xF00E) into one
+`Codec` per type name, built on first use and cached:
+
+  - elementary types, BIT, STRING(n) / WSTRING(n), ENUMs;
+  - TIME, LTIME, DATE, DT, TOD and their L- variants, as IEC literals
+    (`T#1s500ms`, `DT#2024-05-01-12:00:00`);
+  - STRUCTs and function blocks, as dicts of their members;
+  - ARRAYs of any of these, any number of dimensions, as nested lists.
+    ARRAY OF BIT is unpacked from its bit-packed bytes.
+
+A type whose layout is plain fields at fixed offsets (any nesting of
+the above without BIT members or overlapping members) is compiled into
+a single `struct.Struct`, with pad bytes for the gaps. A whole struct or
+array is then decoded with one `unpack_from` plus a walk over the flat
+tuple, and encoded with one `pack`. Arrays of compiled elements use
+`iter_unpack`. Other layouts are decoded member by member from their
+offsets. Types the table doesn't describe (pointers, interfaces, ...)
+stay raw hex, as in `values`.
+
+Decoded values are plain JSON types. `encode()` takes the same shapes
+back: a partial struct dict or a shorter list keeps the remaining
+members/elements from `base` (the variable's current bytes).
+
+`decode_symbol()` / `encode_symbol()` pick between `values` (elementary
+types and STRING, rendered like the C# commands) and a codec for one
+symbol, which is what the steps and watches use.
+"""
+
+import datetime
+import itertools
+import json
+import re
+import struct
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+from . import protocol
+from .protocol import DataTypeEntry, SymbolInfo
+from .values import decode_value, encode_value, format_value, is_elementary
+
+if TYPE_CHECKING:
+    from .client import AdsClient
+
+# Flattening an array into its parent's struct format costs one format
+# character per element; beyond this the array decodes itself instead.
+MAX_FLAT_ELEMENTS = 4096
+
+_SCALARS = {
+    "BOOL": "?", "BIT": "?",
+    "BYTE": "B", "USINT": "B", "SINT": "b",
+    "WORD": "H", "UINT": "H", "INT": "h",
+    "DWORD": "I", "UDINT": "I", "DINT": "i",
+    "LWORD": "Q", "ULINT": "Q", "LINT": "q",
+    "REAL": "f", "LREAL": "d",
+}
+
+# Integer type of an enum's underlying value, by size.
+_ENUM_BASES = {1: "B", 2: "h", 4: "i", 8: "q"}
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+# type -> (format, IEC prefix, unit in seconds)
+_TIMES = {
+    "TIME": ("I", "T#", 1e-3),
+    "LTIME": ("Q", "LTIME#", 1e-9),
+    "DATE": ("I", "D#", 1),
+    "DT": ("I", "DT#", 1), "DATE_AND_TIME": ("I", "DT#", 1),
+    "TOD": ("I", "TOD#", 1e-3), "TIME_OF_DAY": ("I", "TOD#", 1e-3),
+    "LDATE": ("Q", "LDATE#", 1e-9),
+    "LDT": ("Q", "LDT#", 1e-9), "LDATE_AND_TIME": ("Q", "LDT#", 1e-9),
+    "LTOD": ("Q", "LTOD#", 1e-9), "LTIME_OF_DAY": ("Q", "LTOD#", 1e-9),
+}
+
+_STRING_RE = re.compile(r"^(W?STRING)\s*(?:[(\[]\s*(\d+)\s*[)\]])?$")
+_ARRAY_RE = re.compile(r"^ARRAY\s*\[(.+?)\]\s*OF\s+(.+)$", re.IGNORECASE)
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(d|h|ms|m|s|us|ns)", re.IGNORECASE)
+_DURATION_UNITS_NS = {"d": 86_400 * 10**9, "h": 3_600 * 10**9, "m": 60 * 10**9, "s": 10**9,
+                      "ms": 10**6, "us": 10**3, "ns": 1}
+
+
+class Codec:
+    """Decoder/encoder for one PLC type.
+
+    `fmt` is the type's layout as struct format characters (no byte
+    order) when it has one, else None. Codecs with a `fmt` also convert
+    between their value and their slice of a flat tuple: `build()`
+    consumes it from an iterator, `flatten()` appends it to a list.
+    """
+
+    fmt: str | None = None
+
+    def __init__(self, type_name: str, size: int):
+        self.type_name = type_name
+        self.size = size
+        self._struct: struct.Struct | None = None
+
+    def _compile(self) -> None:
+        if self.fmt is not None:
+            compiled = struct.Struct("<" + self.fmt)
+            if compiled.size == self.size:
+                self._struct = compiled
+
+    def decode(self, data: bytes, offset: int = 0) -> Any:
+        if self._struct is not None:
+            return self.build(iter(self._struct.unpack_from(data, offset)))
+        return self.decode_at(data, offset)
+
+    def encode(self, value: Any, base: bytes | None = None) -> bytes:
+        """Bytes for `value`. Raises ValueError if it doesn't fit the type."""
+        base = bytes(base or b"")[:self.size].ljust(self.size, b"\0")
+        try:
+            value = self.merge(self.decode(base), value)
+            if self._struct is not None:
+                flat: list = []
+                self.flatten(value, flat)
+                return self._struct.pack(*flat)
+            buf = bytearray(base)
+            self.encode_into(buf, 0, value)
+            return bytes(buf)
+        except (struct.error, TypeError, OverflowError) as e:
+            raise ValueError(f"Value does not fit {self.type_name}: {e}") from None
+
+    def merge(self, old: Any, new: Any) -> Any:
+        return new
+
+    # Layout-specific parts.
+
+    def build(self, it: Iterator) -> Any:
+        raise NotImplementedError
+
+    def flatten(self, value: Any, out: list) -> None:
+        raise NotImplementedError
+
+    def decode_at(self, data: bytes, offset: int) -> Any:
+        st = struct.Struct("<" + self.fmt)
+        return self.build(iter(st.unpack_from(data, offset)))
+
+    def encode_into(self, buf: bytearray, offset: int, value: Any) -> None:
+        flat: list = []
+        self.flatten(value, flat)
+        struct.pack_into("<" + self.fmt, buf, offset, *flat)
+
+
+class ScalarCodec(Codec):
+    def __init__(self, type_name: str, char: str):
+        self.fmt = char
+        super().__init__(type_name, struct.calcsize("<" + char))
+        self._compile()
+
+    def build(self, it):
+        return next(it)
+
+    def flatten(self, value, out):
+        if self.fmt == "?":
+            out.append(value.strip().upper() in ("TRUE", "1") if isinstance(value, str) else bool(value))
+        elif self.fmt in "fd":
+            out.append(float(value))
+        else:
+            out.append(int(value, 10) if isinstance(value, str) else int(value))
+
+
+class StringCodec(Codec):
+    def __init__(self, type_name: str, size: int, wide: bool):
+        self.fmt = f"{size}s"
+        super().__init__(type_name, size)
+        self._encoding = "utf-16-le" if wide else "latin-1"
+        self._terminator = b"\0\0" if wide else b"\0"
+        self._compile()
+
+    def build(self, it):
+        raw = next(it)
+        end = len(raw)
+        step = len(self._terminator)
+        for i in range(0, len(raw) - step + 1, step):
+            if raw[i:i + step] == self._terminator:
+                end = i
+                break
+        return raw[:end].decode(self._encoding, errors="replace")
+
+    def flatten(self, value, out):
+        raw = str(value).encode(self._encoding, errors="replace")
+        limit = self.size - len(self._terminator)
+        out.append(raw[:limit - limit % len(self._terminator)])
+
+
+class EnumCodec(Codec):
+    """Value by member name; unknown values stay numbers."""
+
+    def __init__(self, type_name: str, size: int, values: Iterable[tuple[str, int]]):
+        self.fmt = _ENUM_BASES.get(size, "i")
+        super().__init__(type_name, size)
+        mask = (1 << (8 * size)) - 1
+        self._mask = mask
+        self._names = {value & mask: name for name, value in values}
+        self._values = {name.upper(): value for value, name in self._names.items()}
+        self._compile()
+
+    def build(self, it):
+        value = next(it)
+        return self._names.get(value & self._mask, value)
+
+    def flatten(self, value, out):
+        if isinstance(value, str) and not value.strip().lstrip("-").isdigit():
+            name = value.strip().rpartition(".")[2].upper()  # accept E_State.Running
+            if name not in self._values:
+                raise ValueError(f"{value!r} is not a member of {self.type_name}")
+            value = self._values[name]
+        value = int(value) & self._mask
+        bits = 8 * self.size
+        if self.fmt.islower() and value >= 1 << (bits - 1):  # signed base: back to negative
+            value -= 1 << bits
+        out.append(value)
+
+
+class TimeCodec(Codec):
+    def __init__(self, type_name: str):
+        char, self._prefix, self._unit = _TIMES[type_name.upper()]
+        self.fmt = char
+        super().__init__(type_name, struct.calcsize("<" + char))
+        self._per_ns = round(self._unit * 1e9)
+        self._kind = self._prefix.rstrip("#").lstrip("L")
+        self._compile()
+
+    def build(self, it):
+        ticks = next(it)
+        if self._kind in ("T", "TIME"):
+            return self._prefix + _format_duration(ticks * self._per_ns)
+        ns = ticks * self._per_ns
+        moment = _EPOCH + datetime.timedelta(microseconds=ns // 1000)
+        if self._kind == "D" or self._kind == "DATE":
+            return self._prefix + moment.strftime("%Y-%m-%d")
+        clock = moment.strftime("%H:%M:%S") + _fraction(ns % 10**9)
+        if self._kind == "TOD":
+            return self._prefix + clock
+        return self._prefix + moment.strftime("%Y-%m-%d-") + clock
+
+    def flatten(self, value, out):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            out.append(int(value))
+            return
+        text = str(value).strip()
+        literal = text.partition("#")[2] if "#" in text else text
+        if self._kind in ("T", "TIME"):
+            ns = _parse_duration(literal)
+        else:
+            ns = _parse_moment(literal, self._kind)
+        out.append(ns // self._per_ns)
+
+
+class RawCodec(Codec):
+    """Bytes of a type we can't interpret, as space-separated hex."""
+
+    def __init__(self, type_name: str, size: int):
+        self.fmt = f"{size}s"
+        super().__init__(type_name, size)
+        self._compile()
+
+    def build(self, it):
+        return next(it).hex(" ").upper()
+
+    def flatten(self, value, out):
+        out.append(bytes.fromhex(str(value)).ljust(self.size, b"\0"))
+
+
+class BitArrayCodec(Codec):
+    """ARRAY OF BIT: elements packed LSB first."""
+
+    def __init__(self, type_name: str, size: int, count: int):
+        self.count = count
+        self.fmt = f"{size}s"
+        super().__init__(type_name, size)
+        self._compile()
+
+    def build(self, it):
+        raw = next(it)
+        return [bool(raw[i >> 3] >> (i & 7) & 1) for i in range(self.count)]
+
+    def flatten(self, value, out):
+        raw = bytearray(self.size)
+        for i, bit in enumerate(value[:self.count]):
+            if bit:
+                raw[i >> 3] |= 1 << (i & 7)
+        out.append(bytes(raw))
+
+    def merge(self, old, new):
+        if isinstance(new, list) and len(new) < len(old):
+            return list(new) + old[len(new):]
+        return new
+
+
+class ArrayCodec(Codec):
+    def __init__(self, type_name: str, dims: list[tuple[int, int]], element: Codec):
+        self.dims = dims
+        self.element = element
+        self.count = 1
+        for _, n in dims:
+            self.count *= n
+        super().__init__(type_name, self.count * element.size)
+        char = element.fmt if element.fmt is not None and struct.calcsize("<" + element.fmt) == element.size else None
+        # A scalar element type repeats as "<count><char>"; anything else by
+        # concatenation, as long as that stays reasonably short.
+        self._scalar = char is not None and len(char) == 1 and isinstance(element, ScalarCodec)
+        if self._scalar:
+            self.fmt = f"{self.count}{char}"
+        elif char is not None and self.count <= MAX_FLAT_ELEMENTS:
+            self.fmt = char * self.count
+        self._compile()
+
+    def build(self, it):
+        if self._scalar:
+            flat = list(itertools.islice(it, self.count))
+        else:
+            flat = [self.element.build(it) for _ in range(self.count)]
+        return self._shape(flat)
+
+    def flatten(self, value, out):
+        flat = self._flat(value)
+        if len(flat) != self.count:
+            raise ValueError(f"{self.type_name} needs {self.count} elements, got {len(flat)}")
+        for item in flat:
+            self.element.flatten(item, out)
+
+    def decode_at(self, data, offset):
+        st = self.element._struct
+        if st is not None:
+            view = memoryview(data)[offset:offset + self.size]
+            return self._shape([self.element.build(iter(t)) for t in st.iter_unpack(view)])
+        step = self.element.size
+        return self._shape([self.element.decode(data, offset + i * step) for i in range(self.count)])
+
+    def encode_into(self, buf, offset, value):
+        step = self.element.size
+        for i, item in enumerate(self._flat(value)):
+            self.element.encode_into(buf, offset + i * step, item)
+
+    def merge(self, old, new):
+        if not isinstance(new, list):
+            return new
+        old_flat, new_flat = self._flat(old), self._flat(new)
+        if len(new_flat) > len(old_flat):
+            return new
+        merged = [self.element.merge(o, n) for o, n in zip(old_flat, new_flat)] + old_flat[len(new_flat):]
+        return self._shape(merged)
+
+    def _shape(self, flat: list) -> list:
+        for _, n in reversed(self.dims[1:]):
+            flat = [flat[i:i + n] for i in range(0, len(flat), n)]
+        return flat
+
+    def _flat(self, value) -> list:
+        flat = list(value)
+        for _ in self.dims[1:]:
+            flat = [item for row in flat for item in row]
+        return flat
+
+
+class StructCodec(Codec):
+    """Members as a dict, in declaration order. BIT members address
+    single bits (their offset counts bits)."""
+
+    def __init__(self, type_name: str, size: int, members: list[tuple[str, int, Codec, bool]]):
+        super().__init__(type_name, size)
+        self.members = members  # (name, offset, codec, is_bit)
+        self._by_upper = {name.upper(): name for name, _, _, _ in members}
+        self.fmt = self._layout()
+        self._compile()
+
+    def _layout(self) -> str | None:
+        fmt, pos = [], 0
+        for _, offset, codec, is_bit in sorted(self.members, key=lambda m: m[1]):
+            if is_bit or codec.fmt is None or offset < pos:
+                return None
+            if offset > pos:
+                fmt.append(f"{offset - pos}x")
+            fmt.append(codec.fmt)
+            pos = offset + codec.size
+        if pos > self.size:
+            return None
+        if pos < self.size:
+            fmt.append(f"{self.size - pos}x")
+        if sorted(self.members, key=lambda m: m[1]) != self.members:
+            return None  # build() must consume in layout order
+        return "".join(fmt)
+
+    def build(self, it):
+        return {name: codec.build(it) for name, _, codec, _ in self.members}
+
+    def flatten(self, value, out):
+        value = self._normalize(value)
+        for name, _, codec, _ in self.members:
+            if name not in value:
+                raise ValueError(f"{self.type_name}.{name} missing")
+            codec.flatten(value[name], out)
+
+    def decode_at(self, data, offset):
+        result = {}
+        for name, member_offset, codec, is_bit in self.members:
+            if is_bit:
+                result[name] = bool(data[offset + (member_offset >> 3)] >> (member_offset & 7) & 1)
+            else:
+                result[name] = codec.decode(data, offset + member_offset)
+        return result
+
+    def encode_into(self, buf, offset, value):
+        value = self._normalize(value)
+        for name, member_offset, codec, is_bit in self.members:
+            if name not in value:
+                continue
+            if is_bit:
+                byte, mask = offset + (member_offset >> 3), 1 << (member_offset & 7)
+                flat: list = []
+                ScalarCodec("BIT", "?").flatten(value[name], flat)
+                buf[byte] = buf[byte] | mask if flat[0] else buf[byte] & ~mask
+            else:
+                codec.encode_into(buf, offset + member_offset, value[name])
+
+    def merge(self, old, new):
+        if not isinstance(new, dict):
+            raise ValueError(f"{self.type_name} takes an object of its members")
+        merged = dict(old)
+        for key, item in new.items():
+            name = self._by_upper.get(str(key).upper())
+            if name is None:
+                raise ValueError(f"{self.type_name} has no member {key!r}")
+            codec = next(c for n, _, c, _ in self.members if n == name)
+            merged[name] = codec.merge(old[name], item)
+        return merged
+
+    def _normalize(self, value) -> dict:
+        if not isinstance(value, dict):
+            raise ValueError(f"{self.type_name} takes an object of its members")
+        return {self._by_upper.get(str(k).upper(), k): v for k, v in value.items()}
+
+
+class TypeRegistry:
+    """Codecs for the types of one symbol table (one symbol version)."""
+
+    def __init__(self, datatypes: Iterable[DataTypeEntry], version: int | None = None):
+        self.version = version
+        self._types = {dt.name.upper(): dt for dt in datatypes}
+        self._codecs: dict[str, Codec] = {}
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def codec(self, type_name: str, size: int | None = None) -> Codec:
+        key = " ".join(type_name.upper().split())
+        codec = self._codecs.get(key)
+        if codec is None:
+            codec = self._codecs[key] = self._build(type_name.strip(), key, size)
+        return codec
+
+    def _build(self, type_name: str, key: str, size: int | None) -> Codec:
+        if key in _SCALARS:
+            return ScalarCodec(type_name, _SCALARS[key])
+        if key in _TIMES:
+            return TimeCodec(type_name)
+        m = _STRING_RE.match(key)
+        if m:
+            chars = int(m.group(2) or 80) + 1
+            wide = m.group(1) == "WSTRING"
+            return StringCodec(type_name, chars * (2 if wide else 1), wide)
+        dt = self._types.get(key)
+        if dt is not None:
+            return self._from_entry(type_name, dt)
+        m = _ARRAY_RE.match(type_name)
+        if m:
+            dims = []
+            for bounds in m.group(1).split(","):
+                low, _, high = bounds.partition("..")
+                dims.append((int(low), int(high) - int(low) + 1))
+            return self._array(type_name, dims, m.group(2).strip(), size)
+        return RawCodec(type_name, size or 0)
+
+    def _from_entry(self, type_name: str, dt: DataTypeEntry) -> Codec:
+        if dt.enum_values:
+            return EnumCodec(type_name, dt.size, dt.enum_values)
+        if dt.array_dims:
+            return self._array(type_name, list(dt.array_dims), dt.type_name, dt.size)
+        if dt.sub_items:
+            members = []
+            for sub in dt.sub_items:
+                if sub.flags & (protocol.DATATYPE_FLAG_PROPITEM | protocol.DATATYPE_FLAG_STATIC):
+                    continue
+                is_bit = bool(sub.flags & protocol.DATATYPE_FLAG_BITVALUES)
+                members.append((sub.name, sub.offset, self.codec(sub.type_name, sub.size), is_bit))
+            return StructCodec(type_name, dt.size, members)
+        if dt.type_name and dt.type_name.upper() != dt.name.upper():
+            return self.codec(dt.type_name, dt.size)  # alias
+        return RawCodec(type_name, dt.size)
+
+    def _array(self, type_name: str, dims: list[tuple[int, int]], element: str, size: int | None) -> Codec:
+        if " ".join(element.upper().split()) == "BIT":
+            count = 1
+            for _, n in dims:
+                count *= n
+            return BitArrayCodec(type_name, size or (count + 7) // 8, count)
+        count = 1
+        for _, n in dims:
+            count *= n
+        element_size = size // count if size and count else None
+        return ArrayCodec(type_name, dims, self.codec(element, element_size))
+
+
+async def upload_type_registry(client: "AdsClient", version: int | None = None) -> TypeRegistry:
+    """Upload the target's data type table (0xF00E) and wrap it."""
+    info = protocol.parse_upload_info(
+        await client.read(protocol.IG_SYM_UPLOADINFO2, 0, protocol.UPLOAD_INFO_SIZE))
+    data = await client.read(protocol.IG_SYM_DT_UPLOAD, 0, info.datatype_size) if info.datatype_size else b""
+    return TypeRegistry(protocol.parse_datatype_upload(data), version)
+
+
+# -----------------------------------------------------------------------------
+# Symbol values: `values` for what the C# commands handle, codecs for the rest
+# -----------------------------------------------------------------------------
+
+async def types_for(client: "AdsClient", infos: list[SymbolInfo]) -> TypeRegistry | None:
+    """The target's type codecs if any of `infos` needs them."""
+    if all(is_elementary(info.type_name) for info in infos):
+        return None
+    return await client.symbols.types()
+
+
+def decode_symbol(info: SymbolInfo, types: TypeRegistry | None, data: bytes) -> tuple[str, object]:
+    """(Value text, RawValue) of a variable's bytes."""
+    codec = None if types is None or is_elementary(info.type_name) else types.codec(info.type_name, info.size)
+    if codec is None or codec.size > len(data):
+        value = decode_value(info.type_name, data)
+        return format_value(info.type_name, value), value
+    value = codec.decode(data)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False), value
+    return format_value(info.type_name, value), value
+
+
+def encode_symbol(info: SymbolInfo, types: TypeRegistry | None, text: str, base: bytes | None) -> bytes:
+    """Bytes to write for `text`: plain text for elementary types, else
+    JSON (an object for a struct, a list for an array) or a bare literal
+    (enum member, T#.., hex bytes). Raises ValueError."""
+    if types is None or is_elementary(info.type_name):
+        return encode_value(info.type_name, info.size, text)
+    try:
+        value = json.loads(text)
+    except ValueError:
+        value = text.strip()
+    return types.codec(info.type_name, info.size).encode(value, base)
+
+
+# -----------------------------------------------------------------------------
+# IEC time literals
+# -----------------------------------------------------------------------------
+
+def _format_duration(ns: int) -> str:
+    if ns == 0:
+        return "0ms"
+    parts = []
+    for unit in ("d", "h", "m", "s", "ms", "us", "ns"):
+        n, ns = divmod(ns, _DURATION_UNITS_NS[unit])
+        if n:
+            parts.append(f"{n}{unit}")
+    return "".join(parts)
+
+
+def _parse_duration(text: str) -> int:
+    text = text.replace("_", "").strip()
+    parts = _DURATION_RE.findall(text)
+    if not parts or "".join(a + b for a, b in parts).lower() != re.sub(r"\s+", "", text).lower():
+        raise ValueError(f"Invalid duration {text!r} (expected e.g. T#1s500ms)")
+    return round(sum(float(n) * _DURATION_UNITS_NS[unit.lower()] for n, unit in parts))
+
+
+def _fraction(ns: int) -> str:
+    if not ns:
+        return ""
+    return "." + f"{ns:09d}".rstrip("0")
+
+
+def _parse_moment(text: str, kind: str) -> int:
+    text = text.strip()
+    if kind in ("D", "DATE"):
+        date_part, clock = text, "00:00:00"
+    elif kind == "TOD":
+        date_part, clock = "1970-01-01", text
+    else:
+        date_part, clock = text[:10], text[11:]
+    whole, _, fraction = clock.partition(".")
+    try:
+        moment = datetime.datetime.strptime(f"{date_part} {whole}", "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        raise ValueError(f"Invalid {kind} literal {text!r}") from None
+    seconds = (moment - _EPOCH) // datetime.timedelta(seconds=1)
+    return seconds * 10**9 + int((fraction + "000000000")[:9] or 0)
@@ -0,0 +1,213 @@
+"""
+Background recordings: twincat_ads_record_start / _status / _stop.
+
+twincat_ads_record holds the tool call for the whole recording. A job
+runs the same `Recorder` as a task on the server's event loop instead,
+so the agent can go on (trigger the machine, read variables) while it
+records. `start()` returns once the notifications are in place, with
+the job's id; `status()` reports progress and the last rows recorded;
+`stop()` ends the recording and returns the recorder's result.
+
+Each job is a `Recorder` of its own: its own connection checkout, its
+own bounded chunk queue (see `recorder`) and its own ring of the last
+`tail_rows` rows for status. Jobs on different targets record side by
+side. A job that finishes on its own (duration, stop trigger, error)
+keeps its result until stopped. When MAX_JOBS are kept, starting one
+more drops the oldest finished job.
+
+Limits: MAX_JOBS jobs, each with at most MAX_TAIL_ROWS rows of tail.
+Recordings and watches together hold connections to fewer targets than
+the pool has connections (see `pool`); a job past that fails to start.
+"""
+
+import asyncio
+import contextlib
+import itertools
+import time
+
+from .pool import AdsConnectionPool, get_pool
+from .protocol import AdsConnectionError
+from .recfile import format_number, format_timestamp
+from .recorder import Recorder
+
+MAX_JOBS = 16
+DEFAULT_TAIL_ROWS = 1000
+MAX_TAIL_ROWS = 100_000
+DEFAULT_STATUS_ROWS = 10
+
+
+class RecordingJob:
+    def __init__(self, job_id: str, recorder: Recorder):
+        self.id = job_id
+        self.recorder = recorder
+        self.created = time.time()
+        self.task: asyncio.Task | None = None
+
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def result(self) -> dict | None:
+        """The recorder's result once the recording is over."""
+        if self.running() or self.task is None or self.task.cancelled():
+            return None
+        error = self.task.exception()
+        if error is not None:
+            return {"Success": False, "ErrorMessage": str(error)}
+        return self.task.result()
+
+
+class RecordingJobs:
+    def __init__(self, pool: AdsConnectionPool | None = None):
+        self._pool = pool
+        self._jobs: dict[str, RecordingJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    @property
+    def pool(self) -> AdsConnectionPool:
+        return self._pool if self._pool is not None else get_pool()
+
+    def get(self, job_id: str) -> RecordingJob | None:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> list[RecordingJob]:
+        return list(self._jobs.values())
+
+    async def start(self, recorder: Recorder) -> tuple[RecordingJob, dict | None]:
+        """Start `recorder` in the background. Returns the job and, if the
+        recording ended before it started (bad variable, unreachable
+        target, no connection left to hold...), its result; the job is
+        not kept then. Raises ValueError if there is no room for another
+        job, AdsConnectionError if the target can't be reached."""
+        async with self._lock:
+            running = [job for job in self._jobs.values() if job.running()]
+            if len(running) >= MAX_JOBS:
+                raise ValueError(f"Already {MAX_JOBS} recordings running; stop one first")
+            if len(self._jobs) >= MAX_JOBS:
+                oldest = min((job for job in self._jobs.values() if not job.running()), key=lambda job: job.created)
+                del self._jobs[oldest.id]
+            job = RecordingJob(f"r{next(self._ids)}", recorder)
+            job.task = asyncio.get_running_loop().create_task(recorder.run(self.pool))
+            started = asyncio.ensure_future(recorder.started.wait())
+            await asyncio.wait([job.task, started], return_when=asyncio.FIRST_COMPLETED)
+            started.cancel()
+            if job.task.done():
+                if isinstance(job.task.exception(), AdsConnectionError):
+                    raise job.task.exception()
+                return job, job.result()
+            self._jobs[job.id] = job
+        return job, None
+
+    async def stop(self, job_id: str) -> RecordingJob | None:
+        """Stop the job, wait for its file to be complete and drop it."""
+        job = self._jobs.pop(job_id, None)
+        if job is not None and job.task is not None:
+            job.recorder.stop()
+            with contextlib.suppress(Exception):
+                await job.task
+        return job
+
+    async def close_all(self) -> None:
+        for job_id in list(self._jobs):
+            await self.stop(job_id)
+
+
+# -----------------------------------------------------------------------------
+# Steps (PascalCase results, like steps.py)
+# -----------------------------------------------------------------------------
+
+def _describe(job: RecordingJob) -> dict:
+    recorder = job.recorder
+    out = {
+        "JobId": job.id, "AmsNetId": recorder.ams_net_id, "Port": recorder.ams_port,
+        "Variables": list(recorder.variables), "Status": recorder.status,
+        "ElapsedSeconds": round(time.time() - job.created, 1),
+    }
+    writer = recorder.writer
+    if writer is not None:
+        out.update({"OutputPath": writer.path, "RowsWritten": writer.written, "RowsBuffered": writer.buffered,
+                    "DroppedRows": writer.dropped})
+    return out
+
+
+async def start(ams_net_id: str, ams_port: int, variables: list[str], output_path: str, *,
+                tail_rows: int = DEFAULT_TAIL_ROWS, **options) -> dict:
+    """Start a background recording; `options` are the `Recorder`'s.
+    Raises AdsConnectionError if the target can't be reached."""
+    result = {"AmsNetId": ams_net_id, "Port": ams_port, "Success": False}
+    try:
+        if not 0 <= tail_rows <= MAX_TAIL_ROWS:
+            raise ValueError(f"tailRows must be between 0 and {MAX_TAIL_ROWS}")
+        recorder = Recorder(ams_net_id, ams_port, variables, output_path, tail_rows=tail_rows, **options)
+        job, ended = await get_jobs().start(recorder)
+    except ValueError as e:
+        result["ErrorMessage"] = str(e)
+        return result
+    if ended is not None:
+        result.update(ended)
+        result["Success"] = False
+        result.setdefault("ErrorMessage", "The recording ended before it started")
+        return result
+    result.update(_describe(job))
+    result["Success"] = True
+    return result
+
+
+def status(job_id: str | None = None, tail: int = DEFAULT_STATUS_ROWS) -> dict:
+    """Progress of the job `job_id` with its last `tail` rows, or of
+    every job if `job_id` is empty."""
+    manager = get_jobs()
+    if not job_id:
+        return {"Success": True, "Jobs": [_describe(job) for job in manager.jobs()]}
+    job = manager.get(job_id)
+    if job is None:
+        return _missing(job_id, manager)
+    result = {"Success": True, **_describe(job)}
+    rows = job.recorder.tail(max(0, int(tail)))
+    result["Tail"] = [[format_timestamp(filetime)] + [format_number(v) for v in values] for filetime, values in rows]
+    final = job.result()
+    if final is not None:
+        result["Result"] = final
+    return result
+
+
+async def stop(job_id: str) -> dict:
+    """Stop the job and return the recording's result."""
+    manager = get_jobs()
+    job = await manager.stop(job_id)
+    if job is None:
+        return _missing(job_id, manager)
+    result = job.result() or {"Success": False, "ErrorMessage": "The recording was cancelled"}
+    return {"JobId": job_id, **result}
+
+
+def _missing(job_id: str, manager: RecordingJobs) -> dict:
+    return {"JobId": job_id, "Success": False, "ErrorMessage": f"No recording {job_id!r}" + (
+        f" (jobs: {', '.join(job.id for job in manager.jobs())})" if len(manager) else "")}
+
+
+# Process-wide jobs, on the process-wide pool.
+_jobs: RecordingJobs | None = None
+
+
+def get_jobs() -> RecordingJobs:
+    global _jobs
+    if _jobs is None:
+        _jobs = RecordingJobs()
+    return _jobs
+
+
+def get_jobs_if_alive() -> RecordingJobs | None:
+    return _jobs
+
+
+async def shutdown_jobs() -> None:
+    """Stop every recording, finishing its file (idempotent). Call before
+    `shutdown_pool()`."""
+    global _jobs
+    manager, _jobs = _jobs, None
+    if manager is not None:
+        await manager.close_all()
@@ -0,0 +1,286 @@
+"""
+Persistent ADS connections, one per target (AMS Net ID, ADS port).
+
+`AdsClient` pipelines requests by invoke id, so a single connection
+serves any number of concurrent callers; the pool only decides when to
+open, keep, check and drop it:
+
+  - open lazily on first use, keep it for later calls;
+  - health check: a connection unused for `health_check_seconds` is
+    probed with a ReadState before it is handed out, and replaced if the
+    probe gets no answer;
+  - reconnect on error: a connection that raised AdsConnectionError is
+    dropped. `run()` retries once on a fresh one when the failing
+    connection was a reused one (the usual stale-socket case);
+  - idle TTL: connections unused for `idle_seconds` are closed by a
+    background reaper;
+  - cap: at most `max_connections` targets are connected. Opening
+    another closes the least recently used idle one, or waits for one to
+    go idle;
+  - held connections: watches and recordings keep their connection
+    checked out for as long as they run (`connection(..., hold=True)`).
+    Held connections may take at most `max_connections - 1` targets, so
+    there is always one left for other calls; past that a hold is
+    refused with ValueError instead of waiting for a connection that
+    won't come back.
+
+Environment knobs:
+  - TWINCAT_ADS_POOL_SIZE          max connections (default 8)
+  - TWINCAT_ADS_POOL_IDLE_SECONDS  idle TTL (default 300, 0 = never)
+
+Must be used from a single event loop.
+"""
+
+import asyncio
+import contextlib
+import os
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+
+from .client import AdsClient
+from .protocol import AdsConnectionError, AdsError
+
+T = TypeVar("T")
+PoolKey = tuple[str, int]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+POOL_MAX_CONNECTIONS = max(1, _env_int("TWINCAT_ADS_POOL_SIZE", 8))
+POOL_IDLE_SECONDS = max(0, _env_int("TWINCAT_ADS_POOL_IDLE_SECONDS", 300))
+
+# A connection that saw no traffic for this long is probed before reuse;
+# a router restart or cable pull otherwise only shows up as a timeout on
+# the real request.
+HEALTH_CHECK_SECONDS = 10.0
+HEALTH_CHECK_TIMEOUT_SEC = 1.0
+
+
+class _Entry:
+    def __init__(self, client: AdsClient):
+        self.client = client
+        self.in_use = 0
+        self.uses = 0
+        self.last_used = time.monotonic()
+
+
+class AdsConnectionPool:
+    def __init__(self, max_connections: int = POOL_MAX_CONNECTIONS,
+                 idle_seconds: float = POOL_IDLE_SECONDS,
+                 health_check_seconds: float = HEALTH_CHECK_SECONDS,
+                 factory: Callable[[str, int], AdsClient] = AdsClient):
+        self.max_connections = max(1, max_connections)
+        self.idle_seconds = idle_seconds
+        self.health_check_seconds = health_check_seconds
+        self._factory = factory
+        # key -> entry, least recently used first.
+        self._entries: "OrderedDict[PoolKey, _Entry]" = OrderedDict()
+        self._opening: dict[PoolKey, asyncio.Lock] = {}
+        # key -> number of holds on it
+        self._held: dict[PoolKey, int] = {}
+        self._released = asyncio.Event()
+        self._reaper: asyncio.Task | None = None
+        self.opened = 0
+        self.reconnects = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def keys(self) -> list[PoolKey]:
+        return list(self._entries)
+
+    def held(self) -> list[PoolKey]:
+        """Targets whose connection a watch or recording holds."""
+        return list(self._held)
+
+    # ---------------- use ----------------
+
+    @contextlib.asynccontextmanager
+    async def connection(self, ams_net_id: str, ams_port: int = 851, *,
+                         hold: bool = False) -> AsyncIterator[AdsClient]:
+        """Connected client for the target, for the duration of the block.
+        The connection is dropped if the block raises AdsConnectionError.
+        Pass `hold` for a block that lasts (a watch, a recording); it
+        raises ValueError if held connections would fill the pool."""
+        key = (ams_net_id, int(ams_port))
+        if hold:
+            self._hold(key)
+        try:
+            entry = await self._checkout(key)
+            try:
+                yield entry.client
+            except AdsConnectionError:
+                self._discard(key, entry)
+                raise
+            finally:
+                self._checkin(entry)
+        finally:
+            if hold:
+                self._unhold(key)
+
+    async def run(self, ams_net_id: str, ams_port: int,
+                  fn: Callable[[AdsClient], Awaitable[T]]) -> T:
+        """`await fn(client)` on the target's connection. Retried once on a
+        new connection if a reused one turns out to be dead."""
+        key = (ams_net_id, int(ams_port))
+        for attempt in range(2):
+            entry = await self._checkout(key)
+            reused = entry.uses > 1
+            try:
+                return await fn(entry.client)
+            except AdsConnectionError:
+                self._discard(key, entry)
+                if attempt or not reused:
+                    raise
+                self.reconnects += 1
+            finally:
+                self._checkin(entry)
+        raise AssertionError("unreachable")
+
+    # ---------------- housekeeping ----------------
+
+    def evict_idle(self, now: float | None = None) -> list[PoolKey]:
+        """Close connections unused for longer than `idle_seconds`."""
+        if self.idle_seconds <= 0:
+            return []
+        now = time.monotonic() if now is None else now
+        evicted = []
+        for key, entry in list(self._entries.items()):
+            if not entry.in_use and now - entry.last_used >= self.idle_seconds:
+                self._discard(key, entry)
+                evicted.append(key)
+        return evicted
+
+    async def close_all(self) -> None:
+        if self._reaper is not None and not self._reaper.done():
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+        self._reaper = None
+        entries = list(self._entries.values())
+        self._entries.clear()
+        for entry in entries:
+            await entry.client.close()
+
+    def status(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {"amsNetId": key[0], "port": key[1], "inUse": entry.in_use,
+             "idleSeconds": round(now - entry.last_used, 1), "connected": entry.client.is_connected()}
+            for key, entry in self._entries.items()
+        ]
+
+    # ---------------- internals ----------------
+
+    async def _checkout(self, key: PoolKey) -> _Entry:
+        self._start_reaper()
+        lock = self._opening.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(key)
+            if entry is not None and not await self._healthy(entry):
+                self._discard(key, entry)
+                self.reconnects += 1
+                entry = None
+            if entry is None:
+                await self._make_room()
+                client = self._factory(key[0], key[1])
+                await client.connect()
+                entry = _Entry(client)
+                self._entries[key] = entry
+                self.opened += 1
+            self._entries.move_to_end(key)
+            entry.in_use += 1
+            entry.uses += 1
+            return entry
+
+    def _hold(self, key: PoolKey) -> None:
+        if key not in self._held and len(self._held) >= self.max_connections - 1:
+            raise ValueError(f"Watches and recordings can hold connections to at most {self.max_connections - 1} "
+                             f"targets (TWINCAT_ADS_POOL_SIZE minus one); already held: "
+                             f"{', '.join(f'{net_id}:{port}' for net_id, port in self._held)}")
+        self._held[key] = self._held.get(key, 0) + 1
+
+    def _unhold(self, key: PoolKey) -> None:
+        self._held[key] -= 1
+        if not self._held[key]:
+            del self._held[key]
+
+    def _checkin(self, entry: _Entry) -> None:
+        entry.in_use -= 1
+        entry.last_used = time.monotonic()
+        if not entry.in_use:
+            self._released.set()
+
+    async def _healthy(self, entry: _Entry) -> bool:
+        if not entry.client.is_connected():
+            return False
+        if entry.in_use or time.monotonic() - entry.last_used < self.health_check_seconds:
+            return True
+        try:
+            await asyncio.wait_for(entry.client.read_state(), HEALTH_CHECK_TIMEOUT_SEC)
+        except (AdsConnectionError, asyncio.TimeoutError):
+            return False
+        except AdsError:
+            pass  # any ADS answer, even an error, proves the link is up
+        return True
+
+    async def _make_room(self) -> None:
+        while len(self._entries) >= self.max_connections:
+            victim = next((k for k, e in self._entries.items() if not e.in_use), None)
+            if victim is not None:
+                self._discard(victim, self._entries[victim])
+                return
+            self._released.clear()
+            await self._released.wait()
+
+    def _discard(self, key: PoolKey, entry: _Entry) -> None:
+        if self._entries.get(key) is entry:
+            del self._entries[key]
+        self._released.set()
+        try:
+            asyncio.get_running_loop().create_task(entry.client.close())
+        except RuntimeError:
+            pass
+
+    def _start_reaper(self) -> None:
+        if self.idle_seconds <= 0:
+            return
+        if self._reaper is not None and not self._reaper.done():
+            return
+        self._reaper = asyncio.get_running_loop().create_task(self._reap_loop())
+
+    async def _reap_loop(self) -> None:
+        interval = max(1.0, min(self.idle_seconds / 2, 60.0))
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+            if not self._entries:
+                return
+
+
+# Process-wide pool used by the handlers.
+_pool: AdsConnectionPool | None = None
+
+
+def get_pool() -> AdsConnectionPool:
+    global _pool
+    if _pool is None:
+        _pool = AdsConnectionPool()
+    return _pool
+
+
+def get_pool_if_alive() -> AdsConnectionPool | None:
+    return _pool
+
+
+async def shutdown_pool() -> None:
+    """Close every pooled connection (idempotent)."""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        await pool.close_all()
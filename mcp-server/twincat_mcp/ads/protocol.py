@@ -0,0 +1,653 @@
+"""
+AMS/TCP wire format: constants, frame encoding and response decoding.
+
+Everything here is pure (bytes in, bytes out) so the client and the
+stand-in server in the tests share one implementation of the protocol.
+
+Frame layout (all little-endian):
+
+    AMS/TCP header   6 bytes   reserved u16 (0), length u32
+    AMS header      32 bytes   target netid[6], target port u16,
+                               source netid[6], source port u16,
+                               command id u16, state flags u16,
+                               data length u32, error code u32, invoke id u32
+    ADS data         n bytes   command-specific
+"""
+
+import struct
+import time
+from typing import NamedTuple
+
+# -----------------------------------------------------------------------------
+# Constants
+# -----------------------------------------------------------------------------
+
+AMS_TCP_PORT = 48898
+
+# ADS command ids.
+CMD_READ_DEVICE_INFO = 1
+CMD_READ = 2
+CMD_WRITE = 3
+CMD_READ_STATE = 4
+CMD_WRITE_CONTROL = 5
+CMD_ADD_NOTIFICATION = 6
+CMD_DEL_NOTIFICATION = 7
+CMD_NOTIFICATION = 8
+CMD_READ_WRITE = 9
+
+# State flags: 0x0004 = ADS command, 0x0001 = response.
+STATE_FLAG_REQUEST = 0x0004
+STATE_FLAG_RESPONSE = 0x0005
+
+# Symbol index groups.
+IG_SYM_HNDBYNAME = 0xF003
+IG_SYM_VALBYNAME = 0xF004
+IG_SYM_VALBYHND = 0xF005
+IG_SYM_RELEASEHND = 0xF006
+# Symbol version (u8): changes whenever the symbol table does (activate,
+# online change, PLC restart). Old handles are then stale.
+IG_SYM_VERSION = 0xF008
+IG_SYM_INFOBYNAMEEX = 0xF009
+# Whole symbol table: every AdsSymbolEntry back to back (0xF00B) and every
+# AdsDatatypeEntry back to back (0xF00E). 0xF00F says how big both are.
+IG_SYM_UPLOAD = 0xF00B
+IG_SYM_DT_UPLOAD = 0xF00E
+IG_SYM_UPLOADINFO2 = 0xF00F
+
+# AdsDatatypeEntry flags.
+DATATYPE_FLAG_DATATYPE = 0x1
+DATATYPE_FLAG_DATAITEM = 0x2
+DATATYPE_FLAG_BITVALUES = 0x20    # offset and size count bits, not bytes
+DATATYPE_FLAG_PROPITEM = 0x40
+DATATYPE_FLAG_TYPEGUID = 0x80
+DATATYPE_FLAG_COPYMASK = 0x200
+DATATYPE_FLAG_METHODINFOS = 0x800
+DATATYPE_FLAG_ATTRIBUTES = 0x1000
+DATATYPE_FLAG_ENUMINFOS = 0x2000
+DATATYPE_FLAG_STATIC = 0x20000
+
+# Sum commands: several sub-requests in one ReadWrite round-trip. The
+# index offset carries the number of sub-requests.
+IG_SUMUP_READ = 0xF080
+IG_SUMUP_WRITE = 0xF081
+IG_SUMUP_READWRITE = 0xF082
+
+# TwinCAT accepts at most 500 sub-requests per sum command.
+MAX_SUM_ITEMS = 500
+
+# Device data: ADS state (u16) and device state (u16) of the target, also
+# usable as a notification source to watch for state changes.
+IG_DEVICE_DATA = 0xF100
+IO_DEVDATA_ADSSTATE = 0x0000
+IO_DEVDATA_DEVSTATE = 0x0002
+
+# Notification transmission modes.
+TRANS_SERVER_CYCLE = 3
+TRANS_SERVER_ON_CHANGE = 4
+
+# ADS states, as TwinCAT.Ads.AdsState names them (GetStateCommand uses
+# the same names in its result).
+ADS_STATES = {
+    0: "Invalid", 1: "Idle", 2: "Reset", 3: "Init", 4: "Start", 5: "Run",
+    6: "Stop", 7: "SaveConfig", 8: "LoadConfig", 9: "PowerFailure",
+    10: "PowerGood", 11: "Error", 12: "Shutdown", 13: "Suspend",
+    14: "Resume", 15: "Config", 16: "Reconfig", 17: "Stopping",
+    18: "Incompatible", 19: "Exception",
+}
+ADS_STATE_RUN = 5
+ADS_STATE_STOP = 6
+ADS_STATE_ERROR = 11
+ADS_STATE_CONFIG = 15
+
+# The subset of ADS error codes the tools are likely to see.
+ADS_ERRORS = {
+    0x6: "target port not found",
+    0x7: "target machine not found",
+    0x700: "general device error",
+    0x701: "service not supported",
+    0x702: "invalid index group",
+    0x703: "invalid index offset",
+    0x704: "reading/writing not permitted",
+    0x705: "parameter size not correct",
+    0x706: "invalid parameter value(s)",
+    0x707: "device not ready",
+    0x708: "device busy",
+    0x70A: "out of memory",
+    0x70C: "not found",
+    0x70D: "syntax error",
+    0x70E: "objects do not match",
+    0x70F: "object already exists",
+    0x710: "symbol not found",
+    0x711: "symbol version invalid",
+    0x712: "server is in invalid state",
+    0x713: "transmission mode not supported",
+    0x714: "notification handle is invalid",
+    0x715: "notification client not registered",
+    0x716: "no more notification handles",
+    0x717: "notification size too large",
+    0x718: "device not initialized",
+    0x719: "device has a timeout",
+    0x71E: "request pending",
+    0x71F: "request aborted",
+    0x721: "invalid array index",
+    0x722: "symbol not active",
+    0x723: "access denied",
+    0x745: "timeout elapsed",
+}
+ADSERR_DEVICE_SRVNOTSUPP = 0x701
+ADSERR_DEVICE_INVALIDGRP = 0x702
+ADSERR_DEVICE_INVALIDOFFSET = 0x703
+ADSERR_DEVICE_INVALIDSIZE = 0x705
+ADSERR_DEVICE_INVALIDPARM = 0x706
+ADSERR_DEVICE_NOTFOUND = 0x70C
+ADSERR_DEVICE_SYMBOLNOTFOUND = 0x710
+ADSERR_DEVICE_SYMBOLVERSIONINVALID = 0x711
+ADSERR_DEVICE_INVALIDSTATE = 0x712
+ADSERR_DEVICE_TRANSMODENOTSUPP = 0x713
+ADSERR_DEVICE_NOTIFYHNDINVALID = 0x714
+
+
+# -----------------------------------------------------------------------------
+# Exceptions
+# -----------------------------------------------------------------------------
+
+class AdsError(Exception):
+    """The target answered with a non-zero ADS error code."""
+
+    def __init__(self, code: int, context: str = ""):
+        self.code = code
+        text = ADS_ERRORS.get(code, "unknown error")
+        msg = f"ADS Error: 0x{code:X} - {text}"
+        super().__init__(f"{msg} ({context})" if context else msg)
+
+
+class AdsConnectionError(Exception):
+    """The AMS router could not be reached, dropped the connection, or
+    didn't answer in time. Unlike AdsError, the target never saw (or
+    never answered) the request."""
+
+
+# -----------------------------------------------------------------------------
+# Addresses
+# -----------------------------------------------------------------------------
+
+def net_id_bytes(net_id: str) -> bytes:
+    """'192.168.1.10.1.1' -> 6 raw bytes. Raises ValueError if malformed."""
+    parts = net_id.strip().split(".")
+    if len(parts) != 6:
+        raise ValueError(f"invalid AMS Net ID: {net_id!r}")
+    try:
+        return bytes(int(p) for p in parts)
+    except ValueError:
+        raise ValueError(f"invalid AMS Net ID: {net_id!r}") from None
+
+
+def net_id_str(raw: bytes) -> str:
+    return ".".join(str(b) for b in raw)
+
+
+# -----------------------------------------------------------------------------
+# Frames
+# -----------------------------------------------------------------------------
+
+_TCP_HEADER = struct.Struct("<HI")
+_AMS_HEADER = struct.Struct("<6sH6sHHHIII")
+TCP_HEADER_SIZE = _TCP_HEADER.size
+AMS_HEADER_SIZE = _AMS_HEADER.size
+
+
+class AmsPacket(NamedTuple):
+    target_net_id: bytes
+    target_port: int
+    source_net_id: bytes
+    source_port: int
+    command: int
+    state_flags: int
+    error_code: int
+    invoke_id: int
+    data: bytes
+
+
+def encode_frame(pkt: AmsPacket) -> bytes:
+    """AMS/TCP header + AMS header + data, ready for the socket."""
+    header = _AMS_HEADER.pack(
+        pkt.target_net_id, pkt.target_port, pkt.source_net_id, pkt.source_port,
+        pkt.command, pkt.state_flags, len(pkt.data), pkt.error_code, pkt.invoke_id,
+    )
+    return _TCP_HEADER.pack(0, len(header) + len(pkt.data)) + header + pkt.data
+
+
+def frame_length(tcp_header: bytes) -> int:
+    """Length of the AMS part that follows a 6-byte AMS/TCP header."""
+    _, length = _TCP_HEADER.unpack(tcp_header)
+    return length
+
+
+def decode_packet(body: bytes) -> AmsPacket:
+    """Decode the AMS header + data that follows an AMS/TCP header."""
+    if len(body) < AMS_HEADER_SIZE:
+        raise ValueError("short AMS header")
+    (tnet, tport, snet, sport, cmd, flags, length, err, invoke) = _AMS_HEADER.unpack_from(body)
+    data = body[AMS_HEADER_SIZE:AMS_HEADER_SIZE + length]
+    return AmsPacket(tnet, tport, snet, sport, cmd, flags, err, invoke, data)
+
+
+# -----------------------------------------------------------------------------
+# Request payloads
+# -----------------------------------------------------------------------------
+
+def read_request(index_group: int, index_offset: int, length: int) -> bytes:
+    return struct.pack("<III", index_group, index_offset, length)
+
+
+def write_request(index_group: int, index_offset: int, data: bytes) -> bytes:
+    return struct.pack("<III", index_group, index_offset, len(data)) + data
+
+
+def read_write_request(index_group: int, index_offset: int, read_length: int, data: bytes) -> bytes:
+    return struct.pack("<IIII", index_group, index_offset, read_length, len(data)) + data
+
+
+def write_control_request(ads_state: int, device_state: int, data: bytes = b"") -> bytes:
+    return struct.pack("<HHI", ads_state, device_state, len(data)) + data
+
+
+# -----------------------------------------------------------------------------
+# Response payloads
+# -----------------------------------------------------------------------------
+
+def check_result(data: bytes, context: str = "") -> None:
+    """Raise AdsError if the leading u32 result code is non-zero."""
+    if len(data) < 4:
+        raise AdsError(ADSERR_DEVICE_INVALIDSIZE, context or "short response")
+    (code,) = struct.unpack_from("<I", data)
+    if code:
+        raise AdsError(code, context)
+
+
+def parse_data_response(data: bytes, context: str = "") -> bytes:
+    """Read / ReadWrite response: result u32, length u32, data."""
+    check_result(data, context)
+    (length,) = struct.unpack_from("<I", data, 4)
+    return bytes(data[8:8 + length])
+
+
+def parse_state_response(data: bytes) -> tuple[int, int]:
+    check_result(data, "read state")
+    ads_state, device_state = struct.unpack_from("<HH", data, 4)
+    return ads_state, device_state
+
+
+class DeviceInfo(NamedTuple):
+    name: str
+    version: str
+
+
+def parse_device_info_response(data: bytes) -> DeviceInfo:
+    check_result(data, "read device info")
+    major, minor, build = struct.unpack_from("<BBH", data, 4)
+    name = data[8:24].split(b"\0", 1)[0].decode("latin-1")
+    return DeviceInfo(name, f"{major}.{minor}.{build}")
+
+
+# -----------------------------------------------------------------------------
+# Sum commands
+# -----------------------------------------------------------------------------
+
+_SUM_ITEM = struct.Struct("<III")
+
+
+def sum_read_request(items: list[tuple[int, int, int]]) -> bytes:
+    """Write payload of an IG_SUMUP_READ: one (group, offset, length) per item."""
+    return b"".join(_SUM_ITEM.pack(ig, io, length) for ig, io, length in items)
+
+
+def sum_read_length(items: list[tuple[int, int, int]]) -> int:
+    """Read length of an IG_SUMUP_READ: a u32 result per item, then data."""
+    return 4 * len(items) + sum(length for _, _, length in items)
+
+
+def parse_sum_read_request(data: bytes, count: int) -> list[tuple[int, int, int]]:
+    return [_SUM_ITEM.unpack_from(data, i * _SUM_ITEM.size) for i in range(count)]
+
+
+def encode_sum_read_response(results: list[tuple[int, bytes]], lengths: list[int]) -> bytes:
+    """Error codes first, then each item's data at its requested length
+    (zero-filled for failed items), as the PLC lays it out."""
+    head = b"".join(struct.pack("<I", code) for code, _ in results)
+    body = b"".join(data[:n].ljust(n, b"\0") for (_, data), n in zip(results, lengths))
+    return head + body
+
+
+def parse_sum_read_response(data: bytes, lengths: list[int]) -> list[tuple[int, bytes]]:
+    """[(error_code, data)] per item, from an IG_SUMUP_READ response."""
+    count = len(lengths)
+    codes = struct.unpack_from(f"<{count}I", data)
+    out, pos = [], 4 * count
+    for code, n in zip(codes, lengths):
+        out.append((code, bytes(data[pos:pos + n])))
+        pos += n
+    return out
+
+
+def sum_write_request(items: list[tuple[int, int, bytes]]) -> bytes:
+    """Write payload of an IG_SUMUP_WRITE: all headers, then all data."""
+    head = b"".join(_SUM_ITEM.pack(ig, io, len(data)) for ig, io, data in items)
+    return head + b"".join(data for _, _, data in items)
+
+
+def parse_sum_write_request(data: bytes, count: int) -> list[tuple[int, int, bytes]]:
+    out, pos = [], count * _SUM_ITEM.size
+    for ig, io, length in parse_sum_read_request(data, count):
+        out.append((ig, io, bytes(data[pos:pos + length])))
+        pos += length
+    return out
+
+
+def parse_sum_write_response(data: bytes, count: int) -> list[int]:
+    """Error code per item of an IG_SUMUP_WRITE."""
+    return list(struct.unpack_from(f"<{count}I", data))
+
+
+_SUM_RW_ITEM = struct.Struct("<IIII")
+
+
+def sum_read_write_request(items: list[tuple[int, int, int, bytes]]) -> bytes:
+    """Write payload of an IG_SUMUP_READWRITE: (group, offset, read
+    length, write length) per item, then all write data."""
+    head = b"".join(_SUM_RW_ITEM.pack(ig, io, read_len, len(data)) for ig, io, read_len, data in items)
+    return head + b"".join(data for *_, data in items)
+
+
+def sum_read_write_length(items: list[tuple[int, int, int, bytes]]) -> int:
+    """Read length of an IG_SUMUP_READWRITE: (result, length) per item,
+    then at most each item's read length of data."""
+    return 8 * len(items) + sum(read_len for _, _, read_len, _ in items)
+
+
+def parse_sum_read_write_request(data: bytes, count: int) -> list[tuple[int, int, int, bytes]]:
+    out, pos = [], count * _SUM_RW_ITEM.size
+    for i in range(count):
+        ig, io, read_len, write_len = _SUM_RW_ITEM.unpack_from(data, i * _SUM_RW_ITEM.size)
+        out.append((ig, io, read_len, bytes(data[pos:pos + write_len])))
+        pos += write_len
+    return out
+
+
+def encode_sum_read_write_response(results: list[tuple[int, bytes]]) -> bytes:
+    """Unlike a sum read, the data is packed: each item takes only the
+    length it actually returned."""
+    head = b"".join(struct.pack("<II", code, len(data)) for code, data in results)
+    return head + b"".join(data for _, data in results)
+
+
+def parse_sum_read_write_response(data: bytes, count: int) -> list[tuple[int, bytes]]:
+    """[(error_code, data)] per item, from an IG_SUMUP_READWRITE response."""
+    out, pos = [], 8 * count
+    for i in range(count):
+        code, length = struct.unpack_from("<II", data, 8 * i)
+        out.append((code, bytes(data[pos:pos + length])))
+        pos += length
+    return out
+
+
+# -----------------------------------------------------------------------------
+# Device notifications
+# -----------------------------------------------------------------------------
+
+# FILETIME (100 ns ticks since 1601-01-01) of the Unix epoch.
+FILETIME_UNIX_EPOCH = 116444736000000000
+
+
+def filetime_now() -> int:
+    return FILETIME_UNIX_EPOCH + time.time_ns() // 100
+
+
+def filetime_to_unix(filetime: int) -> float:
+    return (filetime - FILETIME_UNIX_EPOCH) / 1e7
+
+
+def add_notification_request(index_group: int, index_offset: int, length: int,
+                             mode: int, max_delay_ms: float, cycle_time_ms: float) -> bytes:
+    """AddDeviceNotification payload. Delay and cycle time travel in
+    100 ns units, like AdsNotificationAttrib in the C ADS API."""
+    return struct.pack("<IIIIII", index_group, index_offset, length, mode,
+                       int(max_delay_ms * 10_000), int(cycle_time_ms * 10_000)) + b"\0" * 16
+
+
+class NotificationRequest(NamedTuple):
+    index_group: int
+    index_offset: int
+    length: int
+    mode: int
+    max_delay_ms: float
+    cycle_time_ms: float
+
+
+def parse_add_notification_request(data: bytes) -> NotificationRequest:
+    ig, io, length, mode, delay, cycle = struct.unpack_from("<IIIIII", data)
+    return NotificationRequest(ig, io, length, mode, delay / 10_000, cycle / 10_000)
+
+
+class NotificationSample(NamedTuple):
+    handle: int
+    timestamp: int  # FILETIME
+    data: bytes
+
+
+def encode_notification(samples: list[NotificationSample]) -> bytes:
+    """DeviceNotification payload: one stamp per distinct timestamp."""
+    stamps: dict[int, list[NotificationSample]] = {}
+    for sample in samples:
+        stamps.setdefault(sample.timestamp, []).append(sample)
+    body = b""
+    for ts, group in stamps.items():
+        body += struct.pack("<QI", ts, len(group))
+        for sample in group:
+            body += struct.pack("<II", sample.handle, len(sample.data)) + sample.data
+    return struct.pack("<II", len(body) + 4, len(stamps)) + body
+
+
+def parse_notification(data: bytes) -> list[NotificationSample]:
+    _, stamp_count = struct.unpack_from("<II", data)
+    samples, pos = [], 8
+    for _ in range(stamp_count):
+        ts, sample_count = struct.unpack_from("<QI", data, pos)
+        pos += 12
+        for _ in range(sample_count):
+            handle, size = struct.unpack_from("<II", data, pos)
+            pos += 8
+            samples.append(NotificationSample(handle, ts, bytes(data[pos:pos + size])))
+            pos += size
+    return samples
+
+
+class SymbolInfo(NamedTuple):
+    """One AdsSymbolEntry, as returned by IG_SYM_INFOBYNAMEEX."""
+    name: str
+    index_group: int
+    index_offset: int
+    size: int
+    data_type: int
+    flags: int
+    type_name: str
+    comment: str
+
+
+_SYMBOL_ENTRY = struct.Struct("<IIIIIIHHH")
+
+
+def parse_symbol_entry(data: bytes, offset: int = 0) -> tuple[SymbolInfo, int]:
+    """Decode one AdsSymbolEntry at `offset`. Returns (info, entry_length)."""
+    (entry_len, ig, io, size, dtype, flags,
+     name_len, type_len, comment_len) = _SYMBOL_ENTRY.unpack_from(data, offset)
+    pos = offset + _SYMBOL_ENTRY.size
+    name = data[pos:pos + name_len].decode("latin-1")
+    pos += name_len + 1
+    type_name = data[pos:pos + type_len].decode("latin-1")
+    pos += type_len + 1
+    comment = data[pos:pos + comment_len].decode("latin-1")
+    return SymbolInfo(name, ig, io, size, dtype, flags, type_name, comment), entry_len
+
+
+def encode_symbol_entry(info: SymbolInfo) -> bytes:
+    """Inverse of parse_symbol_entry (used by the stand-in server)."""
+    name = info.name.encode("latin-1")
+    type_name = info.type_name.encode("latin-1")
+    comment = info.comment.encode("latin-1")
+    tail = name + b"\0" + type_name + b"\0" + comment + b"\0"
+    entry_len = _SYMBOL_ENTRY.size + len(tail)
+    return _SYMBOL_ENTRY.pack(
+        entry_len, info.index_group, info.index_offset, info.size, info.data_type,
+        info.flags, len(name), len(type_name), len(comment),
+    ) + tail
+
+
+class UploadInfo(NamedTuple):
+    """IG_SYM_UPLOADINFO2: counts and byte sizes of the two uploads."""
+    symbol_count: int
+    symbol_size: int
+    datatype_count: int
+    datatype_size: int
+    max_dyn_symbols: int
+    used_dyn_symbols: int
+
+
+_UPLOAD_INFO = struct.Struct("<IIIIII")
+UPLOAD_INFO_SIZE = _UPLOAD_INFO.size
+
+
+def parse_upload_info(data: bytes) -> UploadInfo:
+    return UploadInfo(*_UPLOAD_INFO.unpack_from(data))
+
+
+def encode_upload_info(info: UploadInfo) -> bytes:
+    return _UPLOAD_INFO.pack(*info)
+
+
+def parse_symbol_upload(data: bytes) -> list[SymbolInfo]:
+    """Every AdsSymbolEntry of an IG_SYM_UPLOAD response."""
+    symbols, pos = [], 0
+    while pos + _SYMBOL_ENTRY.size <= len(data):
+        info, entry_len = parse_symbol_entry(data, pos)
+        if entry_len <= 0:
+            break
+        symbols.append(info)
+        pos += entry_len
+    return symbols
+
+
+class DataTypeEntry(NamedTuple):
+    """One AdsDatatypeEntry. At top level `name` is the type's name and
+    `type_name` its base type; in `sub_items` `name` is the member name,
+    `type_name` the member's type and `offset` its byte offset in the
+    parent."""
+    name: str
+    type_name: str
+    size: int
+    offset: int
+    data_type: int
+    flags: int
+    comment: str = ""
+    array_dims: tuple[tuple[int, int], ...] = ()  # (lower bound, element count)
+    sub_items: tuple["DataTypeEntry", ...] = ()
+    enum_values: tuple[tuple[str, int], ...] = ()
+
+
+_DATATYPE_ENTRY = struct.Struct("<IIIIIIIIHHHHH")
+
+
+def parse_datatype_entry(data: bytes, offset: int = 0) -> tuple[DataTypeEntry, int]:
+    """Decode one AdsDatatypeEntry (with its sub-items) at `offset`.
+    Returns (entry, entry_length). Of the optional sections after the
+    sub-items only the enum values are kept; the rest (GUID, copy mask,
+    methods, attributes) is walked over."""
+    (entry_len, _version, _hash, _type_hash, size, offs, dtype, flags,
+     name_len, type_len, comment_len, array_dim, sub_count) = _DATATYPE_ENTRY.unpack_from(data, offset)
+    pos = offset + _DATATYPE_ENTRY.size
+    name = data[pos:pos + name_len].decode("latin-1")
+    pos += name_len + 1
+    type_name = data[pos:pos + type_len].decode("latin-1")
+    pos += type_len + 1
+    comment = data[pos:pos + comment_len].decode("latin-1")
+    pos += comment_len + 1
+    dims = []
+    for _ in range(array_dim):
+        lower, elements = struct.unpack_from("<iI", data, pos)
+        dims.append((lower, elements))
+        pos += 8
+    subs = []
+    for _ in range(sub_count):
+        sub, sub_len = parse_datatype_entry(data, pos)
+        subs.append(sub)
+        pos += sub_len
+    enums = _parse_enum_infos(data, pos, offset + entry_len, flags, size) if flags & DATATYPE_FLAG_ENUMINFOS else ()
+    return DataTypeEntry(name, type_name, size, offs, dtype, flags, comment,
+                         tuple(dims), tuple(subs), enums), entry_len
+
+
+def _parse_enum_infos(data: bytes, pos: int, end: int, flags: int, size: int) -> tuple[tuple[str, int], ...]:
+    try:
+        if flags & DATATYPE_FLAG_TYPEGUID:
+            pos += 16
+        if flags & DATATYPE_FLAG_COPYMASK:
+            pos += size
+        if flags & DATATYPE_FLAG_METHODINFOS:
+            (count,) = struct.unpack_from("<H", data, pos)
+            pos += 2
+            for _ in range(count):
+                pos += struct.unpack_from("<I", data, pos)[0]
+        if flags & DATATYPE_FLAG_ATTRIBUTES:
+            (count,) = struct.unpack_from("<H", data, pos)
+            pos += 2
+            for _ in range(count):
+                name_len, value_len = struct.unpack_from("<BB", data, pos)
+                pos += 2 + name_len + 1 + value_len + 1
+        (count,) = struct.unpack_from("<H", data, pos)
+        pos += 2
+        values = []
+        for _ in range(count):
+            name_len = data[pos]
+            name = data[pos + 1:pos + 1 + name_len].decode("latin-1")
+            pos += 1 + name_len + 1
+            if pos + size > end:
+                return ()
+            values.append((name, int.from_bytes(data[pos:pos + size], "little", signed=True)))
+            pos += size
+        return tuple(values)
+    except (struct.error, IndexError):
+        return ()
+
+
+def encode_datatype_entry(entry: DataTypeEntry) -> bytes:
+    """Inverse of parse_datatype_entry (used by the stand-in server)."""
+    name = entry.name.encode("latin-1")
+    type_name = entry.type_name.encode("latin-1")
+    comment = entry.comment.encode("latin-1")
+    tail = name + b"\0" + type_name + b"\0" + comment + b"\0"
+    tail += b"".join(struct.pack("<iI", lower, elements) for lower, elements in entry.array_dims)
+    tail += b"".join(encode_datatype_entry(sub) for sub in entry.sub_items)
+    flags = entry.flags & ~(DATATYPE_FLAG_TYPEGUID | DATATYPE_FLAG_COPYMASK | DATATYPE_FLAG_METHODINFOS
+                            | DATATYPE_FLAG_ATTRIBUTES | DATATYPE_FLAG_ENUMINFOS)
+    if entry.enum_values:
+        flags |= DATATYPE_FLAG_ENUMINFOS
+        tail += struct.pack("<H", len(entry.enum_values))
+        for enum_name, value in entry.enum_values:
+            raw = enum_name.encode("latin-1")
+            tail += bytes([len(raw)]) + raw + b"\0" + value.to_bytes(entry.size, "little", signed=True)
+    return _DATATYPE_ENTRY.pack(
+        _DATATYPE_ENTRY.size + len(tail), 1, 0, 0, entry.size, entry.offset, entry.data_type,
+        flags, len(name), len(type_name), len(comment), len(entry.array_dims), len(entry.sub_items),
+    ) + tail
+
+
+def parse_datatype_upload(data: bytes) -> list[DataTypeEntry]:
+    """Every top-level AdsDatatypeEntry of an IG_SYM_DT_UPLOAD response."""
+    types, pos = [], 0
+    while pos + _DATATYPE_ENTRY.size <= len(data):
+        entry, entry_len = parse_datatype_entry(data, pos)
+        if entry_len <= 0:
+            break
+        types.append(entry)
+        pos += entry_len
+    return types
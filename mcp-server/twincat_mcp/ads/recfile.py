@@ -0,0 +1,334 @@
+"""
+Recording files: the CSV written by twincat_ads_record, the columnar
+.tcrec format, and conversion between the two.
+
+The CSV is what AdsRecordCommand writes: a `Timestamp,<variables>`
+header, ISO 8601 UTC timestamps with 100 ns resolution and shortest
+round-trip numbers. Every value costs 5-10x its binary size as text,
+and reading it back means parsing all of it.
+
+A .tcrec file stores the same rows column by column, each variable in
+its PLC type:
+
+    prelude  b"TCREC\\0\\1\\0" (format 1), uint32 length of the header
+    header   JSON: {"columns": [{"name", "dtype", "type"}, ...]}, padded
+             with spaces so the first chunk starts at a multiple of 64
+    chunk    b"CHNK", uint32 rows, uint64 payload size, then the payload:
+             the Timestamp column (int64 FILETIME, 100 ns ticks since
+             1601 UTC), then one column per variable in its NumPy dtype
+             (REAL float32, DINT int32, BOOL bool, enums and times as
+             their raw integer), each padded to 8 bytes
+    chunk    ...
+
+Everything is little-endian. The recorder appends a chunk each time one
+fills, so a .tcrec file can be read while it is being written, and a
+chunk cut short by a crash is ignored.
+
+`TcrecFile` maps the file with `numpy.memmap` and reads only the chunk
+headers, so a large recording opens at once. Columns are views into the
+mapping: only the pages of the columns you touch are read from disk.
+"""
+
+import calendar
+import csv
+import functools
+import json
+import os
+import re
+import struct
+import time
+from typing import Iterator
+
+import numpy
+
+from .protocol import FILETIME_UNIX_EPOCH
+
+EXTENSION = ".tcrec"
+FORMATS = ("csv", "tcrec")
+MAGIC = b"TCREC\x00\x01\x00"
+TIMESTAMP = "Timestamp"
+
+# Rows per chunk when converting a CSV; the recorder uses its CHUNK_ROWS.
+CONVERT_ROWS = 65536
+
+_PRELUDE = struct.Struct("<8sI")
+_CHUNK = struct.Struct("<4sIQ")
+_CHUNK_TAG = b"CHNK"
+_ALIGN = 8
+_HEADER_ALIGN = 64
+_TIMESTAMP_RE = re.compile(r"(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(?:\.(\d{1,7})\d*)?(Z|[+-]\d\d:\d\d)?$")
+
+
+def format_for(path: str, output_format: str | None = None) -> str:
+    """"csv" or "tcrec": `output_format` if given, else by extension."""
+    if output_format:
+        output_format = output_format.strip().lower()
+        if output_format not in FORMATS:
+            raise ValueError(f"Unknown format '{output_format}' (one of {', '.join(FORMATS)})")
+        return output_format
+    return "tcrec" if path.lower().endswith(EXTENSION) else "csv"
+
+
+# -- CSV ---------------------------------------------------------------
+
+def format_timestamp(filetime: int) -> str:
+    """FILETIME in .NET's round-trip ("o") format, as the C# CSV has it."""
+    seconds, ticks = divmod(filetime - FILETIME_UNIX_EPOCH, 10_000_000)
+    return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))}.{ticks:07d}+00:00"
+
+
+def format_number(value: float) -> str:
+    """Shortest round-trip text, without .NET's trailing ".0"."""
+    text = repr(value)
+    return text[:-2] if text.endswith(".0") else text
+
+
+@functools.lru_cache(maxsize=64)
+def _unix_seconds(text: str, zone: str) -> int:
+    seconds = calendar.timegm(time.strptime(text, "%Y-%m-%dT%H:%M:%S"))
+    if zone and zone != "Z":
+        offset = int(zone[1:3]) * 3600 + int(zone[4:6]) * 60
+        seconds += -offset if zone[0] == "+" else offset
+    return seconds
+
+
+def parse_timestamp(text: str) -> int:
+    """FILETIME of an ISO 8601 timestamp as the CSV has it (no zone: UTC)."""
+    match = _TIMESTAMP_RE.match(text.strip())
+    if match is None:
+        raise ValueError(f"Not an ISO 8601 timestamp: '{text}'")
+    seconds = _unix_seconds(match[1], match[3] or "")
+    return FILETIME_UNIX_EPOCH + seconds * 10_000_000 + int((match[2] or "").ljust(7, "0"))
+
+
+def csv_lines(times, columns: list) -> list[str]:
+    """CSV lines of rows given as a FILETIME sequence and value columns."""
+    return [
+        format_timestamp(filetime) + "," + ",".join(format_number(float(column[i])) for column in columns)
+        for i, filetime in enumerate(times)
+    ]
+
+
+# -- .tcrec ------------------------------------------------------------
+
+def encode_header(names: list[str], dtypes: list[str], types: list[str | None] | None = None) -> bytes:
+    columns = [{"name": TIMESTAMP, "dtype": "<i8", "type": "FILETIME"}]
+    for i, name in enumerate(names):
+        columns.append({"name": name, "dtype": numpy.dtype(dtypes[i]).str, "type": types[i] if types else None})
+    text = json.dumps({"columns": columns}).encode("utf-8")
+    pad = -(_PRELUDE.size + len(text)) % _HEADER_ALIGN
+    return _PRELUDE.pack(MAGIC, len(text) + pad) + text + b" " * pad
+
+
+def encode_chunk(times, columns: list, dtypes: list[str]) -> bytes:
+    """One chunk: `times` as FILETIMEs, `columns[i]` cast to `dtypes[i]`."""
+    parts = [numpy.asarray(times, dtype="<i8").tobytes()]
+    for column, dtype in zip(columns, dtypes):
+        parts.append(numpy.asarray(column).astype(dtype).tobytes())
+    payload = b"".join(part + bytes(-len(part) % _ALIGN) for part in parts)
+    return _CHUNK.pack(_CHUNK_TAG, len(times), len(payload)) + payload
+
+
+class TcrecFile:
+    """A .tcrec file, memory-mapped. Raises ValueError if it isn't one.
+
+    Arrays returned are read-only views into the mapping (`column()` of
+    a multi-chunk file excepted) and keep it open while they live."""
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(os.path.expanduser(path))
+        if os.path.getsize(self.path) < _PRELUDE.size:
+            raise ValueError(f"{self.path} is not a .tcrec file")
+        self._map = numpy.memmap(self.path, dtype="u1", mode="r")
+        magic, length = _PRELUDE.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a .tcrec file")
+        header = json.loads(bytes(self._map[_PRELUDE.size:_PRELUDE.size + length]))
+        self.columns: list[str] = [column["name"] for column in header["columns"]]
+        self.dtypes = {column["name"]: numpy.dtype(column["dtype"]) for column in header["columns"]}
+        self.types = {column["name"]: column.get("type") for column in header["columns"]}
+        # (payload offset, rows) of every complete chunk
+        self._chunks: list[tuple[int, int]] = []
+        offset, size = _PRELUDE.size + length, len(self._map)
+        while offset + _CHUNK.size <= size:
+            tag, rows, payload = _CHUNK.unpack_from(self._map, offset)
+            if tag != _CHUNK_TAG or offset + _CHUNK.size + payload > size:
+                break
+            self._chunks.append((offset + _CHUNK.size, rows))
+            offset += _CHUNK.size + payload
+        self.rows = sum(rows for _, rows in self._chunks)
+
+    def __enter__(self) -> "TcrecFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map = None
+
+    @property
+    def variables(self) -> list[str]:
+        return self.columns[1:]
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self._chunks)
+
+    def chunk(self, index: int, names: list[str] | None = None) -> dict[str, numpy.ndarray]:
+        """Views of chunk `index`'s columns (all, or `names`)."""
+        wanted = set(_check(self, names or self.columns))
+        offset, rows = self._chunks[index]
+        views = {}
+        for name in self.columns:
+            dtype = self.dtypes[name]
+            if name in wanted:
+                views[name] = numpy.frombuffer(self._map, dtype, rows, offset)
+            length = rows * dtype.itemsize
+            offset += length + (-length % _ALIGN)
+        return views
+
+    def iter_chunks(self, names: list[str] | None = None) -> Iterator[dict[str, numpy.ndarray]]:
+        for index in range(len(self._chunks)):
+            yield self.chunk(index, names)
+
+    def column(self, name: str) -> numpy.ndarray:
+        """The whole column `name` (or TIMESTAMP, as FILETIMEs): a view if
+        the file has one chunk, else a copy of that column only."""
+        _check(self, [name])
+        parts = [chunk[name] for chunk in self.iter_chunks([name])]
+        if len(parts) == 1:
+            return parts[0]
+        return numpy.concatenate(parts) if parts else numpy.empty(0, self.dtypes[name])
+
+
+def timestamps_to_datetime64(filetimes: numpy.ndarray) -> numpy.ndarray:
+    """FILETIME column -> numpy datetime64[ns] (UTC)."""
+    return ((filetimes - FILETIME_UNIX_EPOCH) * 100).astype("datetime64[ns]")
+
+
+class CsvRecording:
+    """A recording CSV, read CONVERT_ROWS rows at a time with the same
+    interface as TcrecFile. Every variable is float64: the CSV has no
+    types. Each `iter_chunks()` reads the file again from the top."""
+
+    def __init__(self, path: str, chunk_rows: int | None = None):
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.chunk_rows = chunk_rows or CONVERT_ROWS
+        with open(self.path, newline="", encoding="utf-8-sig") as fh:
+            header = next(csv.reader(fh), None)
+        if not header or header[0].strip() != TIMESTAMP:
+            raise ValueError(f"{self.path} is not a twincat_ads_record CSV (no {TIMESTAMP} column)")
+        self.columns = [TIMESTAMP] + [name.strip() for name in header[1:]]
+        self.dtypes = {name: numpy.dtype("<f8") for name in self.columns}
+        self.dtypes[TIMESTAMP] = numpy.dtype("<i8")
+        self.types: dict[str, str | None] = {name: None for name in self.columns}
+
+    def __enter__(self) -> "CsvRecording":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    @property
+    def variables(self) -> list[str]:
+        return self.columns[1:]
+
+    def iter_chunks(self, names: list[str] | None = None) -> Iterator[dict[str, numpy.ndarray]]:
+        wanted = _check(self, names or self.columns)
+        with open(self.path, newline="", encoding="utf-8-sig") as fh:
+            reader = csv.reader(fh)
+            next(reader, None)
+            block: list[list[str]] = []
+            first = 0
+            for line in reader:
+                if line:
+                    block.append(line)
+                if len(block) >= self.chunk_rows:
+                    yield self._parse(block, first, wanted)
+                    first += len(block)
+                    block = []
+            if block:
+                yield self._parse(block, first, wanted)
+
+    def _parse(self, block: list[list[str]], first: int, wanted: list[str]) -> dict[str, numpy.ndarray]:
+        width = len(self.columns)
+        for i, line in enumerate(block):
+            if len(line) != width:
+                raise ValueError(f"{self.path}, row {first + i + 1}: expected {width - 1} values, got {len(line) - 1}")
+        try:
+            times = numpy.array([parse_timestamp(line[0]) for line in block], dtype="<i8")
+            values = numpy.array([line[1:] for line in block], dtype="<f8")
+        except ValueError as e:
+            raise ValueError(f"{self.path}, rows {first + 1}-{first + len(block)}: {e}") from None
+        chunk = {TIMESTAMP: times}
+        for j, name in enumerate(self.variables):
+            if name in wanted:
+                chunk[name] = values[:, j]
+        return chunk
+
+
+def _check(recording, names: list[str]) -> list[str]:
+    for name in names:
+        if name not in recording.dtypes:
+            raise ValueError(f"No column '{name}' in {recording.path} (columns: {', '.join(recording.columns)})")
+    return names
+
+
+def is_tcrec(path: str) -> bool:
+    with open(path, "rb") as fh:
+        return fh.read(len(MAGIC)) == MAGIC
+
+
+def open_recording(path: str) -> "TcrecFile | CsvRecording":
+    """The recording at `path`, .tcrec or CSV by its first bytes."""
+    path = os.path.abspath(os.path.expanduser(path))
+    return TcrecFile(path) if is_tcrec(path) else CsvRecording(path)
+
+
+# -- conversion --------------------------------------------------------
+
+def csv_to_tcrec(source: str, target: str, chunk_rows: int | None = None) -> int:
+    """Convert a recording CSV to .tcrec, CONVERT_ROWS rows at a time.
+    The CSV has no types, so every variable becomes float64. Returns the
+    row count."""
+    recording = CsvRecording(source, chunk_rows)
+    dtypes = ["<f8"] * len(recording.variables)
+    rows = 0
+    with open(target, "wb") as out:
+        out.write(encode_header(recording.variables, dtypes))
+        for chunk in recording.iter_chunks():
+            out.write(encode_chunk(chunk[TIMESTAMP], [chunk[name] for name in recording.variables], dtypes))
+            rows += len(chunk[TIMESTAMP])
+    return rows
+
+
+def tcrec_to_csv(source: str, target: str) -> int:
+    """Write a .tcrec file as the recorder's CSV, a chunk at a time.
+    Returns the row count."""
+    with TcrecFile(source) as recording, open(target, "w", encoding="utf-8") as out:
+        out.write(",".join(recording.columns) + "\n")
+        for chunk in recording.iter_chunks():
+            columns = [chunk[name].tolist() for name in recording.variables]
+            lines = csv_lines(chunk[TIMESTAMP].tolist(), columns)
+            if lines:
+                out.write("\n".join(lines) + "\n")
+        return recording.rows
+
+
+def convert(source: str, target: str | None = None) -> tuple[str, int]:
+    """.tcrec -> CSV or CSV -> .tcrec, by `source`'s first bytes. `target`
+    defaults to `source` with the other extension. Returns the target
+    path and the row count."""
+    source = os.path.abspath(os.path.expanduser(source))
+    to_csv = is_tcrec(source)
+    if not target:
+        target = os.path.splitext(source)[0] + (".csv" if to_csv else EXTENSION)
+    target = os.path.abspath(os.path.expanduser(target))
+    if target == source:
+        raise ValueError("The output path is the input path")
+    dirname = os.path.dirname(target)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    rows = tcrec_to_csv(source, target) if to_csv else csv_to_tcrec(source, target)
+    return target, rows
@@ -0,0 +1,419 @@
+"""
+Streaming recorder behind twincat_ads_record.
+
+AdsRecordCommand keeps every row in memory and writes the CSV once the
+recording stops, so memory grows with duration × rate × channels and a
+crash loses the whole capture. `Recorder` appends each row to a chunk of
+CHUNK_ROWS rows instead. Full chunks are handed to the "io" execution
+lane (see `executor`), which formats them, appends them to the file
+and flushes; a chunk that isn't full is flushed after FLUSH_SEC anyway.
+Memory stays at a few chunks whatever the duration, and after a crash
+the file holds everything up to the last flush. Chunks are written in
+order. If the disk falls more than MAX_PENDING_CHUNKS chunks behind,
+further chunks are dropped and counted (DroppedRows) rather than
+queued.
+
+Same behaviour as the C# command otherwise:
+
+  - one cyclic notification per variable every sampleTimeMs;
+  - a row is the latest value of every variable, taken when a sample of
+    the first one arrives, stamped with its PLC time;
+  - values as numbers (enums and times by their raw value);
+  - optional start/stop triggers (`wait` syntax, `MAIN.bRunning == 1`),
+    with maxTimeSec capping the wait for the start trigger and an
+    open-ended recording;
+  - the same CSV: a `Timestamp,<variables>` header, ISO 8601 UTC
+    timestamps with 100 ns resolution, shortest round-trip numbers;
+  - the same result keys (AdsRecordResult), plus DroppedRows and Chunks.
+
+With outputFormat "tcrec" (or a .tcrec output path) the chunks go to
+the columnar binary format of `recfile` instead, each variable in its
+PLC type.
+
+With `tail_rows`, the recorder also keeps the last `tail_rows` rows in
+memory (`tail()`), for looking at a recording while it runs (see `jobs`).
+"""
+
+import asyncio
+import os
+import time
+from array import array
+from collections import deque
+from typing import Callable
+
+from ..executor import LANE_IO, run_blocking
+from .client import AdsClient
+from .pool import AdsConnectionPool, get_pool
+from .protocol import (ADS_STATE_CONFIG, ADS_STATE_ERROR, ADS_STATES, TRANS_SERVER_CYCLE, AdsConnectionError,
+                       AdsError, NotificationSample)
+from .recfile import TIMESTAMP, csv_lines, encode_chunk, encode_header, format_for
+from .wait import STATE_SUBJECT, Subject, compare, parse_condition, state_subject, symbol_subject
+from .watch import delete_notifications
+
+CHUNK_ROWS = 4096
+FLUSH_SEC = 1.0
+MAX_PENDING_CHUNKS = 8
+PROGRESS_SEC = 5.0
+
+# How often the recording loop checks the caps, the connection and the
+# age of the open chunk.
+_TICK_SEC = 0.1
+
+
+class ChunkWriter:
+    """Rows appended on the event loop, written in chunks on the "io"
+    lane. Create it and call `append` on the loop. Subclasses give the
+    file's header and the encoding of a chunk."""
+
+    binary = False
+
+    def __init__(self, path: str, columns: list[str], chunk_rows: int | None = None):
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.columns = list(columns)
+        self.chunk_rows = chunk_rows or CHUNK_ROWS
+        self.written = 0
+        self.dropped = 0
+        self.chunks = 0
+        self.error: OSError | None = None
+        header = self._header()
+        dirname = os.path.dirname(self.path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self._fh = open(self.path, "wb") if self.binary else open(self.path, "w", encoding="utf-8")
+        self._fh.write(header)
+        self._fh.flush()
+        self._times = array("q")
+        self._values = array("d")
+        self._opened = 0.0
+        self._pending = 0
+        self._tail: asyncio.Task | None = None
+
+    @property
+    def buffered(self) -> int:
+        """Rows not on disk yet: the open chunk plus the queued ones."""
+        return len(self._times) + self._pending * self.chunk_rows
+
+    def append(self, filetime: int, values: array) -> None:
+        if not self._times:
+            self._opened = time.monotonic()
+        self._times.append(filetime)
+        self._values.extend(values)
+        if len(self._times) >= self.chunk_rows:
+            self.flush()
+
+    def tick(self) -> None:
+        """Flush the open chunk if it has been open for FLUSH_SEC."""
+        if self._times and time.monotonic() - self._opened >= FLUSH_SEC:
+            self.flush()
+
+    def flush(self) -> None:
+        """Queue the open chunk for writing."""
+        times, values = self._times, self._values
+        if not times:
+            return
+        self._times, self._values = array("q"), array("d")
+        if self._pending >= MAX_PENDING_CHUNKS or self.error is not None:
+            self.dropped += len(times)
+            return
+        self._pending += 1
+        self._tail = asyncio.get_running_loop().create_task(self._write_after(self._tail, times, values))
+
+    async def close(self) -> None:
+        """Write what is left and close the file."""
+        self.flush()
+        if self._tail is not None:
+            await self._tail
+        self._fh.close()
+
+    async def _write_after(self, previous: asyncio.Task | None, times: array, values: array) -> None:
+        try:
+            if previous is not None:
+                await previous
+            if self.error is None:
+                await run_blocking(LANE_IO, self._write, times, values)
+        except OSError as e:
+            self.error = e
+        finally:
+            self._pending -= 1
+
+    def _write(self, times: array, values: array) -> None:
+        width = len(self.columns)
+        self._fh.write(self._encode(times, [values[i::width] for i in range(width)]))
+        self._fh.flush()
+        self.written += len(times)
+        self.chunks += 1
+
+    def _header(self) -> str | bytes:
+        raise NotImplementedError
+
+    def _encode(self, times: array, columns: list[array]) -> str | bytes:
+        raise NotImplementedError
+
+
+class CsvChunkWriter(ChunkWriter):
+    """The C# command's CSV."""
+
+    def _header(self) -> str:
+        return TIMESTAMP + "," + ",".join(self.columns) + "\n"
+
+    def _encode(self, times: array, columns: list[array]) -> str:
+        return "\n".join(csv_lines(times, columns)) + "\n"
+
+
+class TcrecChunkWriter(ChunkWriter):
+    """A .tcrec file (see `recfile`), each column in `dtypes`."""
+
+    binary = True
+
+    def __init__(self, path: str, columns: list[str], dtypes: list[str], types: list[str] | None = None,
+                 chunk_rows: int | None = None):
+        self.dtypes = list(dtypes)
+        self.types = types
+        super().__init__(path, columns, chunk_rows)
+
+    def _header(self) -> bytes:
+        return encode_header(self.columns, self.dtypes, self.types)
+
+    def _encode(self, times: array, columns: list[array]) -> bytes:
+        return encode_chunk(times, columns, self.dtypes)
+
+
+class Recorder:
+    """One twincat_ads_record run. `run()` records and returns the result;
+    `stop()` ends the recording early."""
+
+    def __init__(self, ams_net_id: str, ams_port: int, variables: list[str], output_path: str, *,
+                 sample_time_ms: int = 10, duration_sec: float = 0.0, start_trigger: str | None = None,
+                 stop_trigger: str | None = None, max_time_sec: float = 60.0, output_format: str | None = None,
+                 tail_rows: int = 0):
+        self.ams_net_id = ams_net_id
+        self.ams_port = ams_port
+        self.variables = list(variables)
+        self.output_path = output_path
+        self.sample_time_ms = sample_time_ms
+        self.duration_sec = duration_sec
+        self.start_trigger = start_trigger or None
+        self.stop_trigger = stop_trigger or None
+        self.max_time_sec = max_time_sec
+        self.output_format = output_format
+        self.writer: ChunkWriter | None = None
+        self.status = "starting"  # -> waiting (for the start trigger) -> recording -> done
+        # set once the notifications are in place, or the run ended
+        self.started = asyncio.Event()
+        self._recent: deque[tuple[int, tuple[float, ...]]] | None = (
+            deque(maxlen=tail_rows) if tail_rows > 0 else None)
+        self._recording = False
+        self._stop = asyncio.Event()
+        self._stopped_by_trigger = False
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def tail(self, rows: int) -> list[tuple[int, tuple[float, ...]]]:
+        """The last `rows` rows recorded, as (FILETIME, values), oldest
+        first; at most `tail_rows` of them."""
+        if self._recent is None or rows <= 0:
+            return []
+        return list(self._recent)[-rows:]
+
+    async def run(self, pool: AdsConnectionPool | None = None,
+                  on_progress: Callable[[str], None] | None = None) -> dict:
+        """Record. Raises AdsConnectionError only if the target can't be
+        reached at all; a connection lost mid-recording ends it with an
+        error and the rows written so far."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        result = {
+            "Success": False, "OutputPath": self.output_path, "Variables": list(self.variables),
+            "ChannelCount": len(self.variables), "SampleTimeMs": self.sample_time_ms,
+        }
+        pool = pool if pool is not None else get_pool()
+        try:
+            if not self.variables:
+                raise ValueError("No variables specified")
+            if self.sample_time_ms < 1:
+                raise ValueError("sampleTimeMs must be at least 1")
+            self.output_format = format_for(self.output_path, self.output_format)
+            async with pool.connection(self.ams_net_id, self.ams_port, hold=True) as client:
+                channels, initial, triggers = await self._prepare(client)
+                await self._record(client, channels, initial, triggers, result, on_progress)
+        except ValueError as e:
+            result["ErrorMessage"] = str(e)
+        except OSError as e:
+            result["ErrorMessage"] = f"Cannot write {self.output_path}: {e}"
+        except AdsConnectionError as e:
+            if self.writer is None:
+                raise
+            result["Success"] = False
+            result["ErrorMessage"] = (f"Connection lost during the recording ({e}); "
+                                      f"{self.writer.path} holds the rows recorded until then")
+        finally:
+            self.status = "done"
+            self.started.set()
+            result["DurationSeconds"] = round(loop.time() - started, 3)
+            writer = self.writer
+            if writer is not None:
+                result.update({
+                    "OutputPath": writer.path,
+                    "SamplesCollected": writer.written,
+                    "DroppedRows": writer.dropped,
+                    "Chunks": writer.chunks,
+                })
+                if os.path.exists(writer.path):
+                    result["FileSizeKB"] = os.path.getsize(writer.path) // 1024
+                if writer.error is not None:
+                    result["Success"] = False
+                    result["ErrorMessage"] = f"Writing {writer.path} failed: {writer.error}"
+        return result
+
+    async def _prepare(self, client: AdsClient) -> tuple[list[Subject], list[bytes], dict[str, tuple]]:
+        """Resolve the variables and triggers, and read the variables once.
+        Raises ValueError with the C# command's messages."""
+        ads_state, _ = await client.read_state()
+        if ads_state in (ADS_STATE_ERROR, ADS_STATE_CONFIG):
+            raise ValueError(f"Target is in {ADS_STATES[ads_state]} state — cannot record")
+        channels = []
+        for name in self.variables:
+            try:
+                subject = await symbol_subject(client, name)
+            except AdsError as e:
+                raise ValueError(f"Failed to read symbol '{name}': {e}") from None
+            if not subject.numeric:
+                raise ValueError(f"Cannot record '{name}': {subject.data_type} is not a number")
+            channels.append(subject)
+        try:
+            initial = await asyncio.gather(*(client.read(s.index_group, s.index_offset, s.size) for s in channels))
+        except AdsError as e:
+            raise ValueError(f"Failed to read the variables: {e}") from None
+        triggers = {}
+        for kind, text in (("start", self.start_trigger), ("stop", self.stop_trigger)):
+            if text:
+                try:
+                    condition = parse_condition(text)
+                    subject = (state_subject() if condition.subject.upper() == STATE_SUBJECT.upper()
+                               else await symbol_subject(client, condition.subject))
+                    triggers[kind] = (subject, condition.op, subject.threshold(condition.op, condition.threshold))
+                except (ValueError, AdsError) as e:
+                    raise ValueError(f"Invalid {kind} trigger: {e}") from None
+        return channels, initial, triggers
+
+    async def _record(self, client: AdsClient, channels: list[Subject], initial: list[bytes],
+                      triggers: dict[str, tuple], result: dict, on_progress: Callable[[str], None] | None) -> None:
+        loop = asyncio.get_running_loop()
+        if self.output_format == "tcrec":
+            writer = self.writer = TcrecChunkWriter(self.output_path, self.variables,
+                                                    ["<" + (s.fmt or "d") for s in channels],
+                                                    [s.data_type for s in channels])
+        else:
+            writer = self.writer = CsvChunkWriter(self.output_path, self.variables)
+        # Start from the current values, so the first rows don't show 0 for
+        # variables whose first sample hasn't arrived yet.
+        latest = array("d", (s.key(data) for s, data in zip(channels, initial)))
+        triggered = asyncio.Event()
+        self._recording = "start" not in triggers
+
+        def on_start():
+            if not self._recording:
+                self._recording = True
+                triggered.set()
+
+        def on_stop():
+            if self._recording:
+                self._stopped_by_trigger = True
+                self._stop.set()
+
+        handles: list[int] = []
+        try:
+            for kind, fire in (("start", on_start), ("stop", on_stop)):
+                if kind in triggers:
+                    subject, op, threshold = triggers[kind]
+                    handles.append(await self._subscribe(client, subject, _trigger(subject, op, threshold, fire)))
+            for i, subject in enumerate(channels):
+                handles.append(await self._subscribe(client, subject, self._channel(i, subject, latest, writer)))
+
+            if "start" in triggers:
+                self.status = "waiting"
+                self.started.set()
+                result["StartTrigger"] = self.start_trigger
+                await self._wait(client, writer, triggered, loop.time() + self.max_time_sec, None)
+                if not triggered.is_set():
+                    result["Success"] = True
+                    if self._stop.is_set():
+                        result["TriggerStatus"] = "stopped"
+                        return
+                    result["TriggerStatus"] = "start_trigger_timeout"
+                    result["ErrorMessage"] = f"Start trigger not reached within {self.max_time_sec:g}s"
+                    return
+                result["TriggerStatus"] = "start_triggered"
+
+            self.status = "recording"
+            self.started.set()
+            cap = self.duration_sec if self.duration_sec > 0 else self.max_time_sec
+            await self._wait(client, writer, self._stop, loop.time() + cap, on_progress)
+            if self._stopped_by_trigger:
+                result["StopTrigger"] = self.stop_trigger
+                result["TriggerStatus"] = ("both_triggered" if result.get("TriggerStatus") == "start_triggered"
+                                           else "stop_triggered")
+            result["Success"] = True
+        finally:
+            self._recording = False
+            if client.is_connected():
+                await delete_notifications(client, handles)
+            await writer.close()
+
+    async def _subscribe(self, client: AdsClient, subject: Subject,
+                         callback: Callable[[NotificationSample], None]) -> int:
+        try:
+            return await client.add_notification(
+                subject.index_group, subject.index_offset, subject.size, callback,
+                mode=TRANS_SERVER_CYCLE, cycle_time_ms=self.sample_time_ms)
+        except AdsError as e:
+            raise ValueError(f"Cannot subscribe to '{subject.name}': {e}") from None
+
+    def _channel(self, i: int, subject: Subject, latest: array,
+                 writer: ChunkWriter) -> Callable[[NotificationSample], None]:
+        key = subject.key
+        if i > 0:
+            def update(sample: NotificationSample) -> None:
+                if self._recording:
+                    latest[i] = key(sample.data)
+            return update
+
+        append = writer.append
+        recent = self._recent
+
+        def snapshot(sample: NotificationSample) -> None:
+            if self._recording:
+                latest[0] = key(sample.data)
+                append(sample.timestamp, latest)
+                if recent is not None:
+                    recent.append((sample.timestamp, tuple(latest)))
+        return snapshot
+
+    async def _wait(self, client: AdsClient, writer: ChunkWriter, event: asyncio.Event, deadline: float,
+                    on_progress: Callable[[str], None] | None) -> None:
+        """Tick until `event` is set, `stop()` is called or `deadline`."""
+        loop = asyncio.get_running_loop()
+        started = next_report = loop.time()
+        while not event.is_set() and not self._stop.is_set():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(event.wait(), min(_TICK_SEC, remaining))
+            except asyncio.TimeoutError:
+                pass
+            writer.tick()
+            if not client.is_connected():
+                raise AdsConnectionError("the AMS router closed the connection")
+            if on_progress is not None and loop.time() >= next_report + PROGRESS_SEC:
+                next_report = loop.time()
+                on_progress(f"recording {next_report - started:.0f}s: {writer.written + writer.buffered} rows")
+
+
+def _trigger(subject: Subject, op: str, threshold: float | str,
+             fire: Callable[[], None]) -> Callable[[NotificationSample], None]:
+    def check(sample: NotificationSample) -> None:
+        if compare(subject.key(sample.data), op, threshold):
+            fire()
+    return check
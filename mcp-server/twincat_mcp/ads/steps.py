@@ -0,0 +1,601 @@
+"""
+Python implementations of the ADS-only StepDispatcher commands.
+
+Each function takes the same args as the C# step and returns a dict with
+the same PascalCase keys as its C# result class (GetStateResult,
+SetStateResult, PingTargetResult, ReadVariableResult,
+WriteVariableResult, ReadVariableListResult, WriteVariableListResult,
+ListSymbolsResult), so the handlers in handlers/ads.py format the answer
+identically whichever backend ran it. set-state and ping-target pick
+the target's port themselves (TARGET_STEPS): set-state goes to the
+system service for Run and Config, like SetStateCommand, and
+ping-target probes the system service and then the runtime.
+
+read-plc-log stays on the host: ReadPlcLogCommand listens through
+Beckhoff's TcEventLogger COM proxy, whose protocol isn't published.
+
+Symbols are resolved through the connection's symbol cache (see
+`cache`), so a repeated read-var is a single ADS read. List steps use
+sum commands: a fixed number of round-trips whatever the list length,
+instead of two or three per symbol. list-symbols answers from the
+connection's symbol index, uploaded once per symbol version, and pages
+with a cursor instead of truncating.
+
+Elementary types and STRING are converted by `values`, exactly like the
+C# commands. Structs, arrays, enums, TIME/DATE types and WSTRING go
+through the target's type codecs (`codecs`, via `client.symbols.types()`):
+still one ADS read for the whole variable, decoded in one pass, with
+`Value` as JSON (or an enum name / IEC time literal) instead of hex
+bytes. Writes take the same shapes; a partial struct keeps its other
+members. read-array (index ranges of numeric arrays, see `arrays`) has
+no C# counterpart; it runs here on either backend, and so do the watch
+steps (device-notification subscriptions, see `watch`) and wait-condition
+(block until a condition holds, see `wait`).
+
+ADS errors become `Success: False` results, like on the C# side.
+AdsConnectionError propagates: the caller falls back to the host.
+"""
+
+import asyncio
+import json
+import time
+from typing import Awaitable, Callable, TypeVar
+
+from ..executor import offload
+from . import wait, watch
+from .arrays import dump, read_array_range, summarize
+from .cache import STALE_HANDLE_ERRORS, CachedSymbol
+from .client import AdsClient
+from .codecs import TypeRegistry, decode_symbol, encode_symbol, types_for
+from .pool import AdsConnectionPool, get_pool
+from .protocol import (ADS_STATE_CONFIG, ADS_STATE_RUN, ADS_STATE_STOP, ADS_STATES, ADSERR_DEVICE_SRVNOTSUPP,
+                       IG_SYM_VALBYHND, AdsConnectionError, AdsError)
+from .values import encode_value
+
+T = TypeVar("T")
+
+# Same wording as GetStateCommand.GetStateDescription.
+_STATE_DESCRIPTIONS = {
+    "Invalid": "Invalid state",
+    "Idle": "Idle - System idle",
+    "Reset": "Reset - System reset",
+    "Init": "Init - Initializing",
+    "Start": "Start - Starting up",
+    "Run": "Run - Running normally",
+    "Stop": "Stop - Stopped",
+    "SaveConfig": "SaveConfig - Saving configuration",
+    "LoadConfig": "LoadConfig - Loading configuration",
+    "PowerFailure": "PowerFailure - Power failure detected",
+    "PowerGood": "PowerGood - Power restored",
+    "Error": "Error - Error state",
+    "Shutdown": "Shutdown - Shutting down",
+    "Suspend": "Suspend - Suspended",
+    "Resume": "Resume - Resuming",
+    "Config": "Config - Configuration mode",
+    "Reconfig": "Reconfig - Reconfiguring",
+}
+
+
+# SetStateCommand.TryParseState
+_REQUESTED_STATES = {
+    "run": ADS_STATE_RUN, "running": ADS_STATE_RUN,
+    "stop": ADS_STATE_STOP, "stopped": ADS_STATE_STOP,
+    "config": ADS_STATE_CONFIG, "configuration": ADS_STATE_CONFIG,
+    "reset": 2, "reconfig": 16,
+}
+# SetStateCommand.GetStateDescription marks these.
+_STATE_MARKS = {"Run": " 🟢", "Stop": " 🔴", "Error": " ⚠️", "Config": " 🔧"}
+
+SYSTEM_SERVICE_PORT = 10000
+# How long set-state gives the target to change state before reading it back.
+SET_STATE_SETTLE_SEC = 1.0
+DEFAULT_PING_TIMEOUT_MS = 2500
+
+
+def state_name(ads_state: int) -> str:
+    return ADS_STATES.get(ads_state, str(ads_state))
+
+
+async def get_state(client: AdsClient) -> dict:
+    result = {"AmsNetId": client.ams_net_id, "Port": client.ams_port, "Success": False}
+    try:
+        ads_state, device_state = await client.read_state()
+    except AdsError as e:
+        result["ErrorMessage"] = str(e)
+        return result
+    name = state_name(ads_state)
+    result.update({
+        "Success": True,
+        "AdsState": name,
+        "DeviceState": device_state,
+        "IsRunning": ads_state == ADS_STATE_RUN,
+        "StateDescription": _STATE_DESCRIPTIONS.get(name, f"Unknown state: {name}"),
+    })
+    return result
+
+
+def set_state_port(port: int, state: str) -> int:
+    """The port set-state talks to: Run and Config are system states,
+    so a request for the PLC port goes to the system service."""
+    if port == 851 and _REQUESTED_STATES.get(state.strip().lower()) in (ADS_STATE_RUN, ADS_STATE_CONFIG):
+        return SYSTEM_SERVICE_PORT
+    return port
+
+
+async def set_state(client: AdsClient, state: str) -> dict:
+    result = {
+        "AmsNetId": client.ams_net_id, "Port": client.ams_port, "RequestedState": state,
+        "PreviousState": "", "CurrentState": "", "StateDescription": "", "Success": False,
+    }
+    requested = _REQUESTED_STATES.get(state.strip().lower())
+    if requested is None:
+        result["ErrorMessage"] = f"Invalid state '{state}'. Valid states: Run, Stop, Config, Reset"
+        return result
+    try:
+        ads_state, device_state = await client.read_state()
+        result["PreviousState"] = state_name(ads_state)
+        if ads_state == requested:
+            result.update({"CurrentState": state_name(ads_state), "StateDescription": _set_state_description(ads_state),
+                           "Success": True, "Warning": "Already in requested state"})
+            return result
+        try:
+            await client.write_control(requested, device_state)
+        except AdsError as e:
+            if e.code != ADSERR_DEVICE_SRVNOTSUPP:
+                raise
+            result["ErrorMessage"] = ("State change not supported via ADS on this target. Use 'twincat_restart' "
+                                      "(which uses Automation Interface) for remote state changes, or control the "
+                                      "target locally.")
+            return result
+        await asyncio.sleep(SET_STATE_SETTLE_SEC)
+        ads_state, _ = await client.read_state()
+    except AdsError as e:
+        result["ErrorMessage"] = str(e)
+        return result
+    result.update({"CurrentState": state_name(ads_state), "StateDescription": _set_state_description(ads_state),
+                   "Success": True})
+    if ads_state != requested:
+        result["Warning"] = f"State is {state_name(ads_state)}, may still be transitioning to {state}"
+    return result
+
+
+def _set_state_description(ads_state: int) -> str:
+    name = state_name(ads_state)
+    return _STATE_DESCRIPTIONS.get(name, f"Unknown state: {name}") + _STATE_MARKS.get(name, "")
+
+
+async def ping_target(pool: AdsConnectionPool, ams_net_id: str, port: int = 851,
+                      timeout_ms: int = DEFAULT_PING_TIMEOUT_MS) -> dict:
+    """PingTargetCommand: a ReadState on the system service, then on the
+    runtime port, each within `timeout_ms`. Raises AdsConnectionError if
+    the system service's router can't be reached, so the host (which
+    goes through the local router and can tell a missing route from a
+    dead target) classifies that case."""
+    timeout_ms = timeout_ms if timeout_ms > 0 else DEFAULT_PING_TIMEOUT_MS
+    result = {"AmsNetId": ams_net_id, "RuntimePort": port, "TimeoutMs": timeout_ms, "Success": False}
+
+    async def probe(probe_port: int) -> tuple[str | None, str | None, int, int]:
+        """(state name or None, error, ADS error code, duration in ms)."""
+        started = time.perf_counter()
+        try:
+            ads_state, _ = await asyncio.wait_for(
+                pool.run(ams_net_id, probe_port, lambda client: client.read_state()), timeout_ms / 1000)
+            return state_name(ads_state), None, 0, _ms_since(started)
+        except AdsError as e:
+            return None, str(e), e.code, _ms_since(started)
+        except asyncio.TimeoutError:
+            raise AdsConnectionError(f"no answer from {ams_net_id}:{probe_port} within {timeout_ms} ms") from None
+
+    state, error, code, result["SystemServiceDurationMs"] = await probe(SYSTEM_SERVICE_PORT)
+    result["SystemServiceReachable"] = state is not None
+    if error:
+        result["SystemServiceError"] = error
+    if state is None:
+        result["Classification"] = "routeMissing" if code in (0x6, 0x7) else "unreachable"
+    else:
+        try:
+            state, error, _, result["RuntimeDurationMs"] = await probe(port)
+        except AdsConnectionError as e:
+            state, error = None, str(e)
+        result["RuntimeReachable"] = state is not None
+        result["RuntimeState"] = state
+        if error:
+            result["RuntimeError"] = error
+        result["Classification"] = "reachable" if state == "Run" else "rebooting"
+    result["Message"] = _ping_message(result)
+    result["Success"] = True
+    return result
+
+
+def _ms_since(started: float) -> int:
+    return int((time.perf_counter() - started) * 1000)
+
+
+def _ping_message(r: dict) -> str:
+    """PingTargetCommand.BuildMessage."""
+    net_id = r["AmsNetId"]
+    classification = r["Classification"]
+    if classification == "reachable":
+        return f"Target {net_id} reachable; runtime in Run ({r.get('RuntimeDurationMs', 0)}ms)."
+    if classification == "rebooting":
+        return (f"Target {net_id} OS is up but TwinCAT runtime is {r.get('RuntimeState') or 'unresponsive'} — "
+                "likely rebooting, stopped, or just activated. Retry in a few seconds.")
+    if classification == "unreachable":
+        return (f"Target {net_id} not answering on the AMS system service. Target is likely powered off, "
+                "the network cable is pulled, a firewall is in the way, or (after a crash) the Windows OS "
+                "hasn't come back yet.")
+    return (f"Local AMS router has no route to {net_id}. Add the route in TwinCAT System Manager → "
+            "Routes before retrying.")
+
+
+async def read_var(client: AdsClient, symbol: str) -> dict:
+    result = {
+        "AmsNetId": client.ams_net_id, "Port": client.ams_port, "SymbolName": symbol,
+        "Success": False, "Value": "", "DataType": "", "Size": 0,
+    }
+    try:
+        cached, data = await _with_symbol(
+            client, symbol, lambda c: client.read_by_handle(c.handle, c.info.size))
+    except AdsError as e:
+        result["ErrorMessage"] = await _explain(client, e, "read")
+        return result
+    info = cached.info
+    try:
+        text, value = decode_symbol(info, await types_for(client, [info]), data)
+    except AdsError as e:
+        result["ErrorMessage"] = str(e)
+        return result
+    result.update({
+        "Success": True,
+        "DataType": info.type_name,
+        "Size": info.size,
+        "Value": text,
+        "RawValue": value,
+    })
+    return result
+
+
+async def write_var(client: AdsClient, symbol: str, value: str) -> dict:
+    result = {
+        "AmsNetId": client.ams_net_id, "Port": client.ams_port, "SymbolName": symbol,
+        "Success": False, "ValueWritten": value, "PreviousValue": "", "NewValue": "", "DataType": "",
+    }
+
+    async def write(cached: CachedSymbol) -> tuple[TypeRegistry | None, bytes, bytes]:
+        info = cached.info
+        result["DataType"] = info.type_name
+        types = await types_for(client, [info])
+        if types is None:
+            payload = encode_value(info.type_name, info.size, value)
+        before = await client.read_by_handle(cached.handle, info.size)
+        if types is not None:
+            payload = encode_symbol(info, types, value, before)
+        await client.write_by_handle(cached.handle, payload)
+        return types, before, await client.read_by_handle(cached.handle, info.size)
+
+    try:
+        cached, (types, before, after) = await _with_symbol(client, symbol, write)
+    except ValueError as e:
+        result["ErrorMessage"] = str(e)
+        return result
+    except AdsError as e:
+        result["ErrorMessage"] = await _explain(client, e, "write")
+        return result
+    info = cached.info
+    result.update({
+        "Success": True,
+        "PreviousValue": decode_symbol(info, types, before)[0],
+        "NewValue": decode_symbol(info, types, after)[0],
+    })
+    return result
+
+
+async def read_array(client: AdsClient, symbol: str, start: int | None = None, count: int | None = None,
+                     dump_path: str | None = None) -> dict:
+    """Elements [start, start + count) of a numeric array, read as one
+    byte span (see `arrays`): statistics and a preview, and with
+    `dump_path` every value written to a .npy/.csv file. No C# equivalent."""
+    result = {
+        "AmsNetId": client.ams_net_id, "Port": client.ams_port, "SymbolName": symbol,
+        "Success": False, "DataType": "", "ElementType": "",
+    }
+    try:
+        cached = await client.symbols.get(symbol)
+        info = cached.info
+        result["DataType"] = info.type_name
+        read = await read_array_range(client, info, await client.symbols.types(), start, count)
+    except ValueError as e:
+        result["ErrorMessage"] = str(e)
+        return result
+    except AdsError as e:
+        result["ErrorMessage"] = await _explain(client, e, "read")
+        return result
+    result.update({
+        "Success": True,
+        "ElementType": read.codec.element.type_name,
+        "Length": read.codec.count,
+        "Start": read.index(0),
+        "Count": int(read.values.size),
+        "BytesRead": int(read.values.nbytes),
+        "Reads": read.reads,
+        **summarize(read),
+    })
+    if dump_path:
+        try:
+            result["DumpPath"] = await offload(dump, read, dump_path)
+        except OSError as e:
+            result["DumpError"] = str(e)
+    return result
+
+
+async def read_var_list(client: AdsClient, symbols: list[str]) -> dict:
+    """Uncached symbols resolved in one sum read/write, all values in one
+    sum read (each chunked if the list is long)."""
+    result = {
+        "AmsNetId": client.ams_net_id, "Port": client.ams_port, "Success": False,
+        "SymbolCount": len(symbols), "SuccessCount": 0, "ErrorCount": 0, "Results": {},
+    }
+    if not symbols:
+        result["ErrorMessage"] = "No symbols specified"
+        return result
+    try:
+        ads_state, _ = await client.read_state()
+        if ads_state != ADS_STATE_RUN:
+            result["ErrorMessage"] = f"PLC is not running (state: {state_name(ads_state)}). Cannot read variables."
+            return result
+        looked_up, values = await _sum_read_symbols(client, symbols)
+        types = await types_for(client, [cached.info for cached, _ in looked_up if cached is not None])
+    except AdsError as e:
+        result["ErrorMessage"] = str(e)
+        return result
+
+    values = iter(values)
+    for symbol, (cached, code) in zip(symbols, looked_up):
+        item = {"Success": False, "Value": "", "DataType": "", "Size": 0}
+        if cached is not None:
+            info = cached.info
+            item.update({"DataType": info.type_name, "Size": info.size})
+            code, data = next(values)
+        if code:
+            item["ErrorMessage"] = str(AdsError(code, symbol))
+            result["ErrorCount"] += 1
+        else:
+            text, value = decode_symbol(info, types, data)
+            item.update({"Success": True, "Value": text, "RawValue": value})
+            result["SuccessCount"] += 1
+        result["Results"][symbol] = item
+    result["Success"] = True
+    return result
+
+
+async def write_var_list(client: AdsClient, variables: dict[str, str], verify: bool = True) -> dict:
+    """
+    Previous values in one sum read, all new values in one sum write and,
+    with `verify`, the values read back in one more sum read; plus the
+    state check and resolving uncached symbols. The previous values are
+    one consistent snapshot, and all writes land in the same request.
+    """
+    result = {
+        "AmsNetId": client.ams_net_id, "Port": client.ams_port, "Success": False,
+        "SymbolCount": len(variables), "SuccessCount": 0, "ErrorCount": 0, "Results": {},
+    }
+    if not variables:
+        result["ErrorMessage"] = "No variables specified"
+        return result
+    symbols = list(variables)
+    items = {symbol: {"Success": False, "PreviousValue": "", "NewValue": "", "DataType": ""} for symbol in symbols}
+    try:
+        ads_state, _ = await client.read_state()
+        if ads_state != ADS_STATE_RUN:
+            result["ErrorMessage"] = f"PLC is not running (state: {state_name(ads_state)}). Cannot write variables."
+            return result
+        looked_up, values = await _sum_read_symbols(client, symbols)
+        types = await types_for(client, [cached.info for cached, _ in looked_up if cached is not None])
+        values = iter(values)
+        pending = {}  # symbol -> (info, handle, previous (code, data), payload)
+        for symbol, (cached, code) in zip(symbols, looked_up):
+            if cached is None:
+                items[symbol]["ErrorMessage"] = str(AdsError(code, symbol))
+                continue
+            info = cached.info
+            previous = next(values)
+            items[symbol]["DataType"] = info.type_name
+            try:
+                payload = encode_symbol(info, types, str(variables[symbol]), None if previous[0] else previous[1])
+            except ValueError as e:
+                items[symbol]["ErrorMessage"] = str(e)
+                continue
+            pending[symbol] = (info, cached.handle, previous, payload)
+        codes = await client.sum_write([(IG_SYM_VALBYHND, handle, payload)
+                                        for _, handle, _, payload in pending.values()])
+        after = None
+        if verify:
+            after = await client.sum_read([(IG_SYM_VALBYHND, handle, info.size)
+                                           for info, handle, _, _ in pending.values()])
+    except AdsError as e:
+        result["ErrorMessage"] = str(e)
+        return result
+
+    changed = []
+    for i, (symbol, (info, _, (read_code, old), payload)) in enumerate(pending.items()):
+        item = items[symbol]
+        if not read_code:
+            item["PreviousValue"] = decode_symbol(info, types, old)[0]
+        if codes[i]:
+            item["ErrorMessage"] = str(AdsError(codes[i], symbol))
+            continue
+        new = payload
+        if after is not None and not after[i][0]:
+            new = after[i][1]
+            if new != payload:
+                changed.append(symbol)
+        item["NewValue"] = decode_symbol(info, types, new)[0]
+        item["Success"] = True
+
+    for symbol in symbols:
+        result["Results"][symbol] = items[symbol]
+        result["SuccessCount" if items[symbol]["Success"] else "ErrorCount"] += 1
+    if changed:
+        result["Warning"] = (f"{len(changed)} variable(s) read back a different value than written "
+                             f"(overwritten by the PLC program?): {', '.join(changed)}")
+    result["Success"] = True
+    return result
+
+
+async def list_symbols(client: AdsClient, prefix: str = "", contains: str = "", max_results: int = 200,
+                       include_types: bool = False, cursor: str | None = None) -> dict:
+    result = {
+        "AmsNetId": client.ams_net_id, "Port": client.ams_port, "Prefix": prefix, "Contains": contains,
+        "MaxResults": max_results, "Success": False, "TotalScanned": 0, "TotalMatched": 0,
+        "Truncated": False, "Symbols": [],
+    }
+    try:
+        ads_state, _ = await client.read_state()
+        result["TargetState"] = state_name(ads_state)
+        if ads_state not in (ADS_STATE_RUN, ADS_STATE_STOP):
+            result["ErrorMessage"] = (
+                f"PLC is in {state_name(ads_state)} state — symbol enumeration requires Run or Stop. "
+                "If the target is rebooting after activation, retry in a few seconds.")
+            return result
+        index = await client.symbols.symbol_index()
+    except AdsError as e:
+        result["ErrorMessage"] = str(e)
+        return result
+
+    found = index.search(prefix, contains, cursor, max_results)
+    for entry in found.entries:
+        item = {"Name": entry.name}
+        if include_types:
+            item.update({"TypeName": entry.type_name, "Size": entry.size,
+                         "IndexGroup": entry.index_group, "IndexOffset": entry.index_offset})
+        result["Symbols"].append(item)
+    result.update({
+        "Success": True,
+        "TotalScanned": len(index),
+        "TotalMatched": found.total_matched,
+        "Truncated": found.next_cursor is not None,
+        "NextCursor": found.next_cursor,
+    })
+    return result
+
+
+async def _with_symbol(client: AdsClient, symbol: str,
+                       action: Callable[[CachedSymbol], Awaitable[T]]) -> tuple[CachedSymbol, T]:
+    """Run `action` with the cached handle for `symbol`; if the handle
+    turns out stale (symbol table changed), re-resolve and run it again."""
+    for attempt in range(2):
+        cached = await client.symbols.get(symbol)
+        try:
+            return cached, await action(cached)
+        except AdsError as e:
+            if attempt or e.code not in STALE_HANDLE_ERRORS:
+                raise
+            client.symbols.invalidate()
+    raise AssertionError("unreachable")
+
+
+async def _sum_read_symbols(client: AdsClient, symbols: list[str]):
+    """Look up `symbols` in the cache and sum-read the ones that resolved.
+    Returns ([(cached, code)] per symbol, [(code, data)] per resolved one)."""
+    for attempt in range(2):
+        looked_up = await client.symbols.lookup(symbols)
+        values = await client.sum_read([(IG_SYM_VALBYHND, cached.handle, cached.info.size)
+                                        for cached, _ in looked_up if cached is not None])
+        if attempt or not any(code in STALE_HANDLE_ERRORS for code, _ in values):
+            return looked_up, values
+        client.symbols.invalidate()
+    raise AssertionError("unreachable")
+
+
+def _optional_int(raw) -> int | None:
+    return None if raw is None or raw == "" else int(raw)
+
+
+def _split_symbols(raw) -> list[str]:
+    """The host step takes a comma-separated string; accept a list too."""
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    return [str(s).strip() for s in raw or [] if str(s).strip()]
+
+
+def _variables(raw) -> dict[str, str]:
+    """The host step takes the variables as a JSON string; accept a dict too."""
+    if isinstance(raw, str):
+        raw = json.loads(raw) if raw.strip() else {}
+    return {str(k): str(v) for k, v in (raw or {}).items()}
+
+
+async def _explain(client: AdsClient, error: AdsError, verb: str) -> str:
+    """Symbol access fails with a generic code when the PLC isn't in Run;
+    say so the way Read/WriteVariableCommand do."""
+    try:
+        ads_state, _ = await client.read_state()
+    except AdsError:
+        return str(error)
+    if ads_state != ADS_STATE_RUN:
+        return f"PLC is not running (state: {state_name(ads_state)}). Cannot {verb} variables."
+    return str(error)
+
+
+# StepDispatcher command -> coroutine(client, step_args).
+STEPS = {
+    "get-state": lambda client, args: get_state(client),
+    "read-var": lambda client, args: read_var(client, str(args.get("symbol", ""))),
+    "write-var": lambda client, args: write_var(client, str(args.get("symbol", "")), str(args.get("value", ""))),
+    "read-array": lambda client, args: read_array(
+        client, str(args.get("symbol", "")), _optional_int(args.get("start")), _optional_int(args.get("count")),
+        args.get("dumpPath") or None),
+    "read-var-list": lambda client, args: read_var_list(client, _split_symbols(args.get("symbols"))),
+    "write-var-list": lambda client, args: write_var_list(
+        client, _variables(args.get("variables")), bool(args.get("verify", True))),
+    "list-symbols": lambda client, args: list_symbols(
+        client, str(args.get("prefix") or ""), str(args.get("contains") or ""), int(args.get("max", 200)),
+        bool(args.get("includeTypes", False)), args.get("cursor") or None),
+}
+
+
+# Steps that pick the target's port themselves: coroutine(pool, step_args).
+TARGET_STEPS = {
+    "set-state": lambda pool, args: pool.run(
+        args["amsNetId"], set_state_port(int(args.get("port", 851)), str(args.get("state", ""))),
+        lambda client: set_state(client, str(args.get("state", "")))),
+    "ping-target": lambda pool, args: ping_target(
+        pool, args["amsNetId"], int(args.get("port", 851)), int(args.get("timeoutMs", DEFAULT_PING_TIMEOUT_MS))),
+}
+
+
+# Notification steps manage their connections themselves (see `watch`
+# and `wait`): coroutine(step_args).
+NOTIFICATION_STEPS = {
+    "watch-subscribe": lambda args: watch.subscribe(
+        args["amsNetId"], int(args.get("port", 851)), _split_symbols(args.get("symbols")),
+        str(args.get("mode") or "change"), float(args.get("cycleTimeMs", 100)),
+        int(args.get("capacity", watch.DEFAULT_CAPACITY))),
+    "watch-read": lambda args: watch.read(
+        str(args.get("watchId", "")), int(args.get("cursor") or 0), int(args.get("max", watch.DEFAULT_READ_SAMPLES))),
+    "watch-unsubscribe": lambda args: watch.unsubscribe(str(args.get("watchId", ""))),
+    "wait-condition": lambda args: wait.wait_for(
+        args["amsNetId"], int(args.get("port", 851)), str(args.get("condition", "")),
+        float(args.get("timeoutSec", wait.DEFAULT_TIMEOUT_SEC)), float(args.get("cycleTimeMs", wait.DEFAULT_CYCLE_MS))),
+}
+
+# Steps the C# host doesn't have: they run on this client whatever
+# TWINCAT_ADS_BACKEND says.
+PYTHON_ONLY_STEPS = frozenset({"read-array", *NOTIFICATION_STEPS})
+
+# Steps that spend up to their timeout awaiting notifications or polls,
+# without a thread: they run outside the ADS lane, so a few pending
+# waits can't hold every slot and stall the other ADS calls.
+UNLANED_STEPS = frozenset({"wait-condition"})
+
+
+async def run_step(command: str, step_args: dict) -> dict:
+    """Run one of STEPS on the pooled connection to the step's target,
+    or one of TARGET_STEPS or NOTIFICATION_STEPS."""
+    if command in NOTIFICATION_STEPS:
+        return await NOTIFICATION_STEPS[command](step_args)
+    if command in TARGET_STEPS:
+        return await TARGET_STEPS[command](get_pool(), step_args)
+    step = STEPS[command]
+    return await get_pool().run(step_args["amsNetId"], int(step_args.get("port", 851)),
+                                lambda client: step(client, step_args))
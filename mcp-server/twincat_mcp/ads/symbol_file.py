@@ -0,0 +1,271 @@
+"""
+On-disk symbol index: a `SymbolIndex` written to one binary file and
+memory-mapped on load, so a new session answers twincat_list_symbols
+without uploading the target's symbol table again.
+
+Files live in `symbols/` under the MCP state directory
+(`defaults._config_dir()`, i.e. `%LOCALAPPDATA%\\twincat-mcp`), one per
+target and fingerprint: `<AMS Net ID>_<port>_<crc32 of fingerprint>.idx`.
+The fingerprint is what the target can tell us about its symbol table
+without an upload:
+
+  - the symbol version (0xF008), already tracked by `SymbolCache`;
+  - the upload info (0xF00F): symbol and data type counts and byte sizes;
+  - the PLC application's online-change counter and timestamp
+    (TwinCAT_SystemInfoVarList._AppInfo), where the runtime has them.
+
+The last two cost two pipelined requests, about one round-trip.
+
+A file with another fingerprint is simply never opened. After an upload
+the new file replaces the target's older ones.
+
+Layout (native byte order, every section 8-byte aligned):
+
+    header      magic, format, fingerprint, counts, section offset/length
+    name_offs   u32[count + 1]   into names
+    names       UTF-8 symbol names, in index (name) order
+    key_offs    u32[count + 1]   into keys
+    keys        UTF-8 lower-cased names, what searches compare
+    records     u32[count * 4]   type id, size, index group, index offset
+    type_offs   u32[types + 1]   into types
+    types       UTF-8 type names
+    gram_keys   u64[grams]       trigram code, ascending
+    gram_offs   u32[grams + 1]   into postings
+    postings    u32[...]         ascending ids per trigram
+
+`MappedSymbolIndex` searches those sections in place: a prefix bisect
+decodes only the keys it probes, a substring query reads only the
+postings of its rarest trigram, and a page decodes only its own entries.
+"""
+
+import asyncio
+import bisect
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from typing import TYPE_CHECKING, Sequence
+
+from .. import defaults
+from ..executor import offload
+from . import protocol
+from .symbols import IndexEntry, SymbolIndex, upload_symbol_index
+
+if TYPE_CHECKING:
+    from .client import AdsClient
+
+_MAGIC = b"TCSYMIDX"
+_FORMAT = 1
+_SECTIONS = ("name_offs", "names", "key_offs", "keys", "records",
+             "type_offs", "types", "gram_keys", "gram_offs", "postings")
+_FINGERPRINT = struct.Struct("<I24s8s")
+_HEADER = struct.Struct(f"<8sI{_FINGERPRINT.size}s3I{2 * len(_SECTIONS)}Q")
+
+# Read alongside the upload info for the fingerprint; 4 bytes each
+# (OnlineChangeCnt UDINT, AppTimestamp DT).
+_APP_INFO_SYMBOLS = (
+    "TwinCAT_SystemInfoVarList._AppInfo.OnlineChangeCnt",
+    "TwinCAT_SystemInfoVarList._AppInfo.AppTimestamp",
+)
+
+
+def symbol_dir() -> str:
+    return os.path.join(defaults._config_dir(), "symbols")
+
+
+def index_path(ams_net_id: str, ams_port: int, fingerprint: bytes) -> str:
+    return os.path.join(symbol_dir(), f"{_target_prefix(ams_net_id, ams_port)}{zlib.crc32(fingerprint):08x}.idx")
+
+
+def _target_prefix(ams_net_id: str, ams_port: int) -> str:
+    return f"{ams_net_id}_{ams_port}_"
+
+
+async def read_fingerprint(client: "AdsClient", version: int | None) -> tuple[bytes, protocol.UploadInfo]:
+    """(fingerprint, upload info) of the target's current symbol table."""
+    raw_info, app_info = await asyncio.gather(
+        client.read(protocol.IG_SYM_UPLOADINFO2, 0, protocol.UPLOAD_INFO_SIZE),
+        client.sum_read_write([(protocol.IG_SYM_VALBYNAME, 0, 4, name.encode("latin-1") + b"\0")
+                               for name in _APP_INFO_SYMBOLS]),
+    )
+    stamp = b"".join(data[:4].ljust(4, b"\0") if not code else b"\0" * 4 for code, data in app_info)
+    info = protocol.parse_upload_info(raw_info)
+    return _FINGERPRINT.pack(version or 0, raw_info[:protocol.UPLOAD_INFO_SIZE], stamp), info
+
+
+async def open_symbol_index(client: "AdsClient", version: int | None) -> SymbolIndex:
+    """The target's symbol index: mapped from disk when a file with the
+    current fingerprint exists, else uploaded and written for next time."""
+    fingerprint, info = await read_fingerprint(client, version)
+    path = index_path(client.ams_net_id, client.ams_port, fingerprint)
+    index = load_symbol_index(path, fingerprint, version)
+    if index is not None:
+        return index
+    index = await upload_symbol_index(client, version, info)
+    try:
+        await offload(save_symbol_index, index, path, fingerprint)
+    except OSError as e:
+        sys.stderr.write(f"[mcp-server] could not save symbol index {path}: {e}\n")
+        sys.stderr.flush()
+    return index
+
+
+# -----------------------------------------------------------------------------
+# Writing
+# -----------------------------------------------------------------------------
+
+def _trigram_code(gram: str) -> int:
+    return (ord(gram[0]) << 42) | (ord(gram[1]) << 21) | ord(gram[2])
+
+
+def _strings(values: Sequence[str]) -> tuple[array, bytes]:
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = array("I", [0])
+    total = 0
+    for data in encoded:
+        total += len(data)
+        offsets.append(total)
+    return offsets, b"".join(encoded)
+
+
+def save_symbol_index(index: SymbolIndex, path: str, fingerprint: bytes) -> None:
+    """Write `index` to `path` atomically (temp file + os.replace) and
+    remove the same target's files with other fingerprints."""
+    entries = [index.entry(i) for i in range(len(index))]
+    type_ids: dict[str, int] = {}
+    records = array("I")
+    for e in entries:
+        type_id = type_ids.setdefault(e.type_name, len(type_ids))
+        records.extend((type_id, e.size, e.index_group, e.index_offset))
+    name_offs, names = _strings([e.name for e in entries])
+    key_offs, keys = _strings([e.name.lower() for e in entries])
+    type_offs, types = _strings(list(type_ids))
+    grams = sorted((_trigram_code(gram), ids) for gram, ids in index.trigram_index().items())
+    gram_keys = array("Q", (code for code, _ in grams))
+    gram_offs = array("I", [0])
+    postings = array("I")
+    for _, ids in grams:
+        postings.extend(ids)
+        gram_offs.append(len(postings))
+    sections = [name_offs.tobytes(), names, key_offs.tobytes(), keys, records.tobytes(),
+                type_offs.tobytes(), types, gram_keys.tobytes(), gram_offs.tobytes(), postings.tobytes()]
+
+    layout, pos = [], _align(_HEADER.size)
+    for data in sections:
+        layout += [pos, len(data)]
+        pos = _align(pos + len(data))
+    header = _HEADER.pack(_MAGIC, _FORMAT, fingerprint, len(entries), len(type_ids), len(grams), *layout)
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".symbols.", suffix=".idx.tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(header)
+            for offset, data in zip(layout[::2], sections):
+                fh.write(b"\0" * (offset - fh.tell()))
+                fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    name = os.path.basename(path)
+    prefix = name[:name.rindex("_") + 1]
+    for other in os.listdir(directory):
+        if other.startswith(prefix) and other.endswith(".idx") and other != name:
+            try:
+                os.remove(os.path.join(directory, other))
+            except OSError:
+                pass  # still mapped by another session; replaced next time
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+# -----------------------------------------------------------------------------
+# Reading
+# -----------------------------------------------------------------------------
+
+class _Strings(Sequence[str]):
+    """Read-only list of strings over an offsets section and a blob."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8")
+
+
+class MappedSymbolIndex(SymbolIndex):
+    """A SymbolIndex backed by a memory-mapped index file."""
+
+    def __init__(self, mapped: mmap.mmap, sections: dict[str, memoryview], version: int | None):
+        self.version = version
+        self._mmap = mapped
+        self._views = sections
+        self._keys = _Strings(sections["key_offs"].cast("I"), sections["keys"])
+        self._names = _Strings(sections["name_offs"].cast("I"), sections["names"])
+        self._type_names = _Strings(sections["type_offs"].cast("I"), sections["types"])
+        self._records = sections["records"].cast("I")
+        self._gram_keys = sections["gram_keys"].cast("Q")
+        self._gram_offs = sections["gram_offs"].cast("I")
+        self._postings_view = sections["postings"].cast("I")
+        self._trigrams = None
+
+    def entry(self, i: int) -> IndexEntry:
+        type_id, size, group, offset = self._records[4 * i:4 * i + 4]
+        return IndexEntry(self._names[i], self._type_names[type_id], size, group, offset)
+
+    def close(self) -> None:
+        views = [self._records, self._gram_keys, self._gram_offs, self._postings_view,
+                 *(s._offsets for s in (self._keys, self._names, self._type_names)),
+                 *self._views.values()]
+        try:
+            for view in views:
+                view.release()
+            self._mmap.close()
+        except BufferError:
+            pass  # a caller still holds a slice; the mapping goes with it
+
+    def _postings(self, trigram: str) -> Sequence[int] | None:
+        code = _trigram_code(trigram)
+        i = bisect.bisect_left(self._gram_keys, code)
+        if i == len(self._gram_keys) or self._gram_keys[i] != code:
+            return None
+        return self._postings_view[self._gram_offs[i]:self._gram_offs[i + 1]]
+
+
+def load_symbol_index(path: str, fingerprint: bytes, version: int | None = None) -> MappedSymbolIndex | None:
+    """Map the index file at `path` if it exists and matches `fingerprint`."""
+    try:
+        with open(path, "rb") as fh:
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        magic, fmt, stored, _count, _types, _grams, *layout = _HEADER.unpack_from(mapped)
+        if magic != _MAGIC or fmt != _FORMAT or stored != fingerprint:
+            raise ValueError("stale or foreign index file")
+        if any(offset + length > len(mapped) for offset, length in zip(layout[::2], layout[1::2])):
+            raise ValueError("truncated index file")
+    except (ValueError, struct.error):
+        mapped.close()
+        return None
+    with memoryview(mapped) as view:
+        sections = {name: view[offset:offset + length]
+                    for name, offset, length in zip(_SECTIONS, layout[::2], layout[1::2])}
+    return MappedSymbolIndex(mapped, sections, version)
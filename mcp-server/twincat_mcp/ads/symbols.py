@@ -0,0 +1,193 @@
+"""
+Searchable index of a target's whole symbol table.
+
+`upload_symbol_index()` fetches the symbol and data type uploads
+(0xF00B / 0xF00E, sized by 0xF00F) in three reads and flattens them:
+every top-level symbol plus the members of its structs and function
+blocks, recursively (`MAIN.fbAxis.stStatus.bBusy`). Array elements are
+not expanded; the array itself is one entry.
+
+`SymbolIndex` keeps the flattened table in name order, as a list of
+names and parallel arrays, and answers:
+
+  - prefix queries by bisecting the sorted names;
+  - substring queries through a trigram index (built on first use),
+    checking only the names that contain the query's rarest trigram;
+  - pagination by name: a page's `next_cursor` is its last name, and the
+    next page starts after it. The cursor stays valid if the table is
+    re-uploaded in between (it just skips names that sort before it).
+
+The index is tied to the symbol version it was uploaded at; `SymbolCache`
+keeps one per connection and re-uploads when the version changes.
+`symbol_file` persists it between sessions and maps it back in.
+"""
+
+import bisect
+from array import array
+from typing import TYPE_CHECKING, Iterable, NamedTuple, Sequence
+
+from . import protocol
+from .protocol import DataTypeEntry, SymbolInfo
+
+if TYPE_CHECKING:
+    from .client import AdsClient
+
+# Struct/FB members deeper than this are not indexed (recursive types
+# through references would otherwise never end).
+MAX_MEMBER_DEPTH = 16
+
+
+class IndexEntry(NamedTuple):
+    name: str
+    type_name: str
+    size: int
+    index_group: int
+    index_offset: int
+
+
+class SearchResult(NamedTuple):
+    entries: list[IndexEntry]
+    total_matched: int
+    next_cursor: str | None
+
+
+class SymbolIndex:
+    def __init__(self, entries: Iterable[IndexEntry], version: int | None = None):
+        ordered = sorted(entries, key=lambda e: e.name.lower())
+        self.version = version
+        self._names = [e.name for e in ordered]
+        self._keys = [name.lower() for name in self._names]
+        types: dict[str, int] = {}
+        self._type_names: list[str] = []
+        self._types = array("I")
+        self._sizes = array("I")
+        self._groups = array("I")
+        self._offsets = array("I")
+        for e in ordered:
+            type_id = types.get(e.type_name)
+            if type_id is None:
+                type_id = types[e.type_name] = len(self._type_names)
+                self._type_names.append(e.type_name)
+            self._types.append(type_id)
+            self._sizes.append(e.size)
+            self._groups.append(e.index_group)
+            self._offsets.append(e.index_offset)
+        self._trigrams: dict[str, array] | None = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def entry(self, i: int) -> IndexEntry:
+        return IndexEntry(self._names[i], self._type_names[self._types[i]], self._sizes[i],
+                          self._groups[i], self._offsets[i])
+
+    def search(self, prefix: str = "", contains: str = "", cursor: str | None = None,
+               limit: int = 200) -> SearchResult:
+        """Case-insensitive `prefix` and/or `contains` match, in name
+        order, at most `limit` entries starting after `cursor`.
+        `total_matched` counts every match, not just this page."""
+        prefix, contains = prefix.lower(), contains.lower()
+        lo, hi = 0, len(self._keys)
+        if prefix:
+            lo = bisect.bisect_left(self._keys, prefix)
+            hi = bisect.bisect_left(self._keys, prefix + "\uffff", lo)
+        start = max(lo, bisect.bisect_right(self._keys, cursor.lower())) if cursor else lo
+
+        if not contains:
+            total = hi - lo
+            page = range(start, min(hi, start + max(0, limit)))
+            ids = list(page)
+            more = start + len(ids) < hi
+        else:
+            matches = [i for i in self._candidates(contains, lo, hi) if contains in self._keys[i]]
+            total = len(matches)
+            first = bisect.bisect_left(matches, start)
+            ids = matches[first:first + max(0, limit)]
+            more = first + len(ids) < len(matches)
+        entries = [self.entry(i) for i in ids]
+        return SearchResult(entries, total, entries[-1].name if more and entries else None)
+
+    def close(self) -> None:
+        """Release the storage behind the index (see symbol_file)."""
+
+    def trigram_index(self) -> dict[str, array]:
+        """Trigram -> ascending ids of the names containing it (built on
+        first use)."""
+        if self._trigrams is None:
+            trigrams: dict[str, array] = {}
+            for i, key in enumerate(self._keys):
+                for gram in {key[j:j + 3] for j in range(len(key) - 2)}:
+                    ids = trigrams.get(gram)
+                    if ids is None:
+                        ids = trigrams[gram] = array("I")
+                    ids.append(i)
+            self._trigrams = trigrams
+        return self._trigrams
+
+    # ---------------- internals ----------------
+    # Subclasses with other storage provide `_keys` (lower-cased names,
+    # any sequence), `entry()` and `_postings()`.
+
+    def _candidates(self, needle: str, lo: int, hi: int) -> Iterable[int]:
+        """Ids in [lo, hi) that may contain `needle`, ascending."""
+        if len(needle) < 3:
+            return range(lo, hi)
+        postings = []
+        for i in range(len(needle) - 2):
+            ids = self._postings(needle[i:i + 3])
+            if ids is None:
+                return ()
+            postings.append(ids)
+        rarest = min(postings, key=len)
+        return rarest[bisect.bisect_left(rarest, lo):bisect.bisect_left(rarest, hi)]
+
+    def _postings(self, trigram: str) -> Sequence[int] | None:
+        """Ascending ids of the names containing `trigram`."""
+        return self.trigram_index().get(trigram)
+
+
+def flatten_symbols(symbols: list[SymbolInfo], datatypes: list[DataTypeEntry]) -> list[IndexEntry]:
+    """Top-level symbols plus their struct/FB members, recursively."""
+    types = {dt.name.upper(): dt for dt in datatypes}
+    out: list[IndexEntry] = []
+
+    def members(dt: DataTypeEntry | None, depth: int = 0) -> DataTypeEntry | None:
+        # Follow aliases (TYPE T_Speed : LREAL) down to the type with members.
+        while dt is not None and not dt.sub_items and not dt.array_dims and depth < MAX_MEMBER_DEPTH:
+            base = types.get(dt.type_name.upper())
+            if base is None or base is dt:
+                return None
+            dt, depth = base, depth + 1
+        return dt if dt is not None and dt.sub_items and not dt.array_dims else None
+
+    def expand(path: str, type_name: str, group: int, offset: int, depth: int) -> None:
+        if depth >= MAX_MEMBER_DEPTH:
+            return
+        dt = members(types.get(type_name.upper()))
+        if dt is None:
+            return
+        for sub in dt.sub_items:
+            if sub.flags & (protocol.DATATYPE_FLAG_PROPITEM | protocol.DATATYPE_FLAG_STATIC):
+                continue
+            name = f"{path}.{sub.name}"
+            out.append(IndexEntry(name, sub.type_name, sub.size, group, offset + sub.offset))
+            expand(name, sub.type_name, group, offset + sub.offset, depth + 1)
+
+    for sym in symbols:
+        out.append(IndexEntry(sym.name, sym.type_name, sym.size, sym.index_group, sym.index_offset))
+        expand(sym.name, sym.type_name, sym.index_group, sym.index_offset, 0)
+    return out
+
+
+async def upload_symbol_index(client: "AdsClient", version: int | None = None,
+                              info: protocol.UploadInfo | None = None) -> SymbolIndex:
+    """Upload the target's symbol and data type tables and index them.
+    `info` saves the 0xF00F read if the caller already has it."""
+    if info is None:
+        info = protocol.parse_upload_info(
+            await client.read(protocol.IG_SYM_UPLOADINFO2, 0, protocol.UPLOAD_INFO_SIZE))
+    symbols = protocol.parse_symbol_upload(
+        await client.read(protocol.IG_SYM_UPLOAD, 0, info.symbol_size)) if info.symbol_size else []
+    datatypes = protocol.parse_datatype_upload(
+        await client.read(protocol.IG_SYM_DT_UPLOAD, 0, info.datatype_size)) if info.datatype_size else []
+    return SymbolIndex(flatten_symbols(symbols, datatypes), version)
@@ -0,0 +1,109 @@
+"""
+PLC value <-> bytes conversion for the read/write tools.
+
+Mirrors `ReadTypedValue` / `WriteTypedValue` in ReadVariableCommand.cs and
+WriteVariableCommand.cs, including how values are rendered as text, so a
+tool answers the same whichever ADS backend served it: elementary types
+are decoded, STRING(n) is read up to its terminator, and anything else
+(arrays, structs, TIME, ...) comes back as space-separated hex bytes.
+
+The Python backend hands those other types to `codecs` instead; see
+`is_elementary()`.
+"""
+
+import struct
+
+# IEC type name -> struct format (little-endian).
+_SCALAR_FORMATS = {
+    "BOOL": "<?",
+    "BYTE": "<B", "USINT": "<B",
+    "SINT": "<b",
+    "WORD": "<H", "UINT": "<H",
+    "INT": "<h",
+    "DWORD": "<I", "UDINT": "<I",
+    "DINT": "<i",
+    "LWORD": "<Q", "ULINT": "<Q",
+    "LINT": "<q",
+    "REAL": "<f",
+    "LREAL": "<d",
+}
+
+
+def is_elementary(type_name: str) -> bool:
+    """Whether `type_name` is one this module converts (else: `codecs`)."""
+    upper = type_name.upper()
+    return upper in _SCALAR_FORMATS or upper.startswith("STRING")
+
+
+def scalar_format(type_name: str) -> str | None:
+    """struct format character of a numeric elementary type, else None."""
+    fmt = _SCALAR_FORMATS.get(type_name.upper())
+    return fmt[1:] if fmt is not None else None
+
+
+def decode_value(type_name: str, data: bytes) -> object:
+    """Python value of a variable of `type_name` from its raw bytes."""
+    upper = type_name.upper()
+    fmt = _SCALAR_FORMATS.get(upper)
+    if fmt is not None:
+        return struct.unpack_from(fmt, data)[0]
+    if upper.startswith("STRING"):
+        return data.split(b"\0", 1)[0].decode("latin-1")
+    return data.hex(" ").upper()
+
+
+def format_value(type_name: str, value: object) -> str:
+    """Text rendering of a decoded value, matching .NET's ToString()."""
+    if isinstance(value, bool):
+        return "True" if value else "False"
+    if isinstance(value, float):
+        if type_name.upper() == "REAL":
+            return _format_float(value, single=True)
+        return _format_float(value, single=False)
+    return str(value)
+
+
+def encode_value(type_name: str, size: int, text: str) -> bytes:
+    """Raw bytes to write for `text` into a variable of `type_name`.
+    Raises ValueError for unparsable, out-of-range or unsupported input."""
+    upper = type_name.upper()
+    text = str(text).strip()
+    if upper == "BOOL":
+        return struct.pack("<?", text.upper() == "TRUE" or text == "1")
+    fmt = _SCALAR_FORMATS.get(upper)
+    if fmt is not None:
+        if upper in ("REAL", "LREAL"):
+            value: object = float(text)
+        else:
+            value = int(text, 10)
+        try:
+            return struct.pack(fmt, value)
+        except struct.error:
+            raise ValueError(f"Value {text} is out of range for {type_name}") from None
+    if upper.startswith("STRING"):
+        raw = text.encode("latin-1")[:max(size - 1, 0)]
+        return raw + b"\0" * (size - len(raw))
+    raise ValueError(f"Writing values of type {type_name} is not supported")
+
+
+def _format_float(value: float, single: bool) -> str:
+    """Shortest text that round-trips, like .NET Core's float.ToString()."""
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "∞" if value > 0 else "-∞"
+    if single:
+        packed = struct.pack("<f", value)
+        for digits in range(1, 10):
+            text = f"{value:.{digits}g}"
+            if struct.pack("<f", float(text)) == packed:
+                break
+    else:
+        text = repr(value)
+    mantissa, _, exponent = text.partition("e")
+    if "." in mantissa:
+        mantissa = mantissa.rstrip("0").rstrip(".")
+    if exponent:
+        sign = "-" if exponent.startswith("-") else "+"
+        return f"{mantissa}E{sign}{exponent.lstrip('+-').rjust(2, '0')}"
+    return mantissa
@@ -0,0 +1,324 @@
+"""
+Server-side waits: return as soon as a PLC condition holds.
+
+After a state change or a write, an agent would otherwise poll
+twincat_read_var until something flips, one LLM round-trip per poll.
+`wait_for()` takes a condition in AdsRecordCommand's trigger syntax,
+``<symbol> <op> <value>`` with op one of >, <, >=, <=, ==, !=, e.g.
+``MAIN.nState == 3`` or ``GVL.fTemp >= 80.5``. It registers an on-change
+device notification on the symbol and returns at the first sample that
+satisfies the condition, or when the timeout runs out.
+
+If the target refuses the notification, the value is polled instead:
+every MIN_POLL_SEC while it keeps changing, backing off to MAX_POLL_SEC
+while it doesn't. Either way the result lists the values seen (the
+trace) and how long the condition took.
+
+The value may also be an enum member (``MAIN.eMode == Auto``), a time
+literal (``MAIN.tElapsed > T#5s``), TRUE/FALSE or a string. Numbers,
+enums and times compare as numbers, == within 1e-10 like the C#
+trigger; anything else only with == and != on its text. The subject
+``AdsState`` waits for the runtime state instead of a symbol:
+``AdsState == Run``.
+
+A connection lost during the wait (a runtime restart) is reopened until
+the timeout.
+"""
+
+import asyncio
+import collections
+import contextlib
+import struct
+from typing import Callable, NamedTuple
+
+from .client import AdsClient
+from .codecs import EnumCodec, ScalarCodec, TimeCodec, decode_symbol, encode_symbol, types_for
+from .pool import AdsConnectionPool, get_pool
+from .protocol import (ADS_STATES, IG_DEVICE_DATA, IO_DEVDATA_ADSSTATE, TRANS_SERVER_ON_CHANGE,
+                       AdsConnectionError, AdsError)
+from .values import decode_value, is_elementary, scalar_format
+from .watch import format_timestamp
+
+# Longest first, so ">=" isn't read as ">" (as AdsRecordCommand.ParseTrigger).
+OPERATORS = (">=", "<=", "!=", "==", ">", "<")
+STATE_SUBJECT = "AdsState"
+
+DEFAULT_TIMEOUT_SEC = 10.0
+MAX_TIMEOUT_SEC = 300.0
+DEFAULT_CYCLE_MS = 10.0
+MIN_POLL_SEC = 0.01
+MAX_POLL_SEC = 0.5
+# Most recent values kept in the trace.
+MAX_TRACE = 50
+
+# Tolerance of == and != on numbers, as AdsRecordCommand.EvaluateCondition.
+_EPSILON = 1e-10
+# How often a notification wait checks that its connection is still up.
+_LIVENESS_SEC = 0.25
+
+
+class Condition(NamedTuple):
+    subject: str
+    op: str
+    threshold: str
+
+    def __str__(self) -> str:
+        return f"{self.subject} {self.op} {self.threshold}"
+
+
+def parse_condition(text: str) -> Condition:
+    """Split ``symbol op value``. Raises ValueError."""
+    text = str(text or "").strip()
+    for op in OPERATORS:
+        idx = text.find(op)
+        if idx > 0:
+            subject, threshold = text[:idx].strip(), text[idx + len(op):].strip()
+            break
+    else:
+        raise ValueError(f"No operator found in '{text}'. Use format: 'Variable > 10.0' "
+                         f"(operators: {', '.join(sorted(OPERATORS, key=len))})")
+    if not subject:
+        raise ValueError("Variable name is empty in condition")
+    if not threshold:
+        raise ValueError(f"No value to compare {subject} with")
+    return Condition(subject, op, threshold)
+
+
+def compare(value: float | str, op: str, threshold: float | str) -> bool:
+    if isinstance(value, str) or isinstance(threshold, str):
+        equal = str(value) == str(threshold)
+        return equal if op == "==" else not equal if op == "!=" else False
+    if op == "==":
+        return abs(value - threshold) < _EPSILON
+    if op == "!=":
+        return abs(value - threshold) >= _EPSILON
+    return {">": value > threshold, "<": value < threshold,
+            ">=": value >= threshold, "<=": value <= threshold}[op]
+
+
+class Subject:
+    """What a condition reads: where, how many bytes, and how to turn
+    them into text and into the value compared (a float if numeric,
+    else the text). `fmt` is the struct format character of a numeric
+    subject's raw value."""
+
+    def __init__(self, name: str, data_type: str, index_group: int, index_offset: int, size: int,
+                 text: Callable[[bytes], str], number: Callable[[bytes], float] | None,
+                 encode: Callable[[str], bytes], fmt: str | None = None):
+        self.name = name
+        self.data_type = data_type
+        self.index_group = index_group
+        self.index_offset = index_offset
+        self.size = size
+        self.text = text
+        self._number = number
+        self._encode = encode
+        self.fmt = fmt
+
+    @property
+    def numeric(self) -> bool:
+        return self._number is not None
+
+    def key(self, data: bytes) -> float | str:
+        return self._number(data) if self._number is not None else self.text(data)
+
+    def threshold(self, op: str, text: str) -> float | str:
+        """The compared value of the condition's right-hand side. Raises
+        ValueError if it doesn't fit the subject's type."""
+        if self._number is None:
+            if op not in ("==", "!="):
+                raise ValueError(f"{self.name} ({self.data_type}) is not numeric; only == and != apply")
+            if len(text) > 1 and text[0] == text[-1] and text[0] in "'\"":
+                text = text[1:-1]
+            return self.text(self._encode(text))
+        try:
+            return float(text)
+        except ValueError:
+            return self._number(self._encode(text))
+
+
+async def symbol_subject(client: AdsClient, name: str) -> Subject:
+    """Raises AdsError if the symbol can't be resolved."""
+    info = (await client.symbols.get(name)).info
+    types = await types_for(client, [info])
+    codec = None if types is None or is_elementary(info.type_name) else types.codec(info.type_name, info.size)
+    number = None
+    fmt = None
+    if codec is None:
+        fmt = scalar_format(info.type_name)
+        if isinstance(decode_value(info.type_name, bytes(info.size)), (int, float)):
+            number = lambda data: float(decode_value(info.type_name, data))  # noqa: E731
+    elif isinstance(codec, (ScalarCodec, EnumCodec, TimeCodec)):
+        fmt = codec.fmt
+        unpack = struct.Struct("<" + codec.fmt).unpack_from
+        number = lambda data: float(unpack(data)[0])  # noqa: E731
+    return Subject(name, info.type_name, info.index_group, info.index_offset, info.size,
+                   lambda data: decode_symbol(info, types, data)[0], number,
+                   lambda text: encode_symbol(info, types, text, None), fmt)
+
+
+def state_subject() -> Subject:
+    by_name = {name.upper(): state for state, name in ADS_STATES.items()}
+
+    def encode(text: str) -> bytes:
+        state = by_name.get(text.upper())
+        if state is None:
+            raise ValueError(f"Unknown ADS state '{text}' (one of {', '.join(ADS_STATES.values())})")
+        return struct.pack("<H", state)
+
+    def state(data: bytes) -> int:
+        return struct.unpack_from("<H", data)[0]
+
+    return Subject(STATE_SUBJECT, "ADS state", IG_DEVICE_DATA, IO_DEVDATA_ADSSTATE, 2,
+                   lambda data: ADS_STATES.get(state(data), str(state(data))),
+                   lambda data: float(state(data)), encode, "H")
+
+
+class _Waiter:
+    """Collects the subject's values and notices the first one that
+    satisfies the condition."""
+
+    def __init__(self, subject: Subject, op: str, threshold: float | str, started: float):
+        self.subject = subject
+        self.op = op
+        self.threshold = threshold
+        self.loop = asyncio.get_running_loop()
+        self.started = started
+        self.trace: collections.deque[dict] = collections.deque(maxlen=MAX_TRACE)
+        self.changes = 0
+        self.last: bytes | None = None
+        self.met: dict | None = None
+        self.event = asyncio.Event()
+
+    def elapsed_ms(self) -> float:
+        return round((self.loop.time() - self.started) * 1000, 1)
+
+    def offer(self, data: bytes, plc_time: int | None = None) -> bool:
+        """Record `data` if it differs from the last value. Returns
+        whether it did."""
+        if data == self.last:
+            return False
+        self.last = data
+        self.changes += 1
+        entry = {"ElapsedMs": self.elapsed_ms(), "Value": self.subject.text(data)}
+        if plc_time is not None:
+            entry["Time"] = format_timestamp(plc_time)
+        self.trace.append(entry)
+        if self.met is None and compare(self.subject.key(data), self.op, self.threshold):
+            self.met = entry
+            self.event.set()
+        return True
+
+
+async def _wait_notified(client: AdsClient, waiter: _Waiter, deadline: float, cycle_ms: float) -> str | None:
+    """Wait on an on-change notification. Returns None, or why the
+    target refused the notification (the caller polls then)."""
+    subject = waiter.subject
+    try:
+        handle = await client.add_notification(
+            subject.index_group, subject.index_offset, subject.size,
+            lambda sample: waiter.offer(sample.data, sample.timestamp),
+            mode=TRANS_SERVER_ON_CHANGE, cycle_time_ms=cycle_ms)
+    except AdsError as e:
+        return str(e)
+    try:
+        while not waiter.event.is_set():
+            remaining = deadline - waiter.loop.time()
+            if remaining <= 0:
+                break
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(waiter.event.wait(), min(remaining, _LIVENESS_SEC))
+            if not client.is_connected():
+                raise AdsConnectionError("connection lost while waiting")
+    finally:
+        if client.is_connected():
+            with contextlib.suppress(AdsError, AdsConnectionError):
+                await client.delete_notification(handle)
+    return None
+
+
+async def _wait_polled(client: AdsClient, waiter: _Waiter, deadline: float) -> int:
+    """Poll until the condition holds or `deadline`: quickly while the
+    value moves, backing off while it doesn't. Returns the read count."""
+    subject = waiter.subject
+    interval, reads = MIN_POLL_SEC, 0
+    while True:
+        changed = False
+        try:
+            data = await client.read(subject.index_group, subject.index_offset, subject.size)
+        except AdsError:
+            pass  # e.g. the PLC restarting; keep trying until the deadline
+        else:
+            changed = waiter.offer(data)
+        reads += 1
+        remaining = deadline - waiter.loop.time()
+        if waiter.met is not None or remaining <= 0:
+            return reads
+        interval = MIN_POLL_SEC if changed else min(interval * 2, MAX_POLL_SEC)
+        await asyncio.sleep(min(interval, remaining))
+
+
+async def wait_for(ams_net_id: str, ams_port: int, condition: str, timeout_sec: float = DEFAULT_TIMEOUT_SEC,
+                   cycle_ms: float = DEFAULT_CYCLE_MS, pool: AdsConnectionPool | None = None) -> dict:
+    """Wait until `condition` holds on the target, at most `timeout_sec`.
+    A timeout is a successful result with ConditionMet False.
+    AdsConnectionError propagates if the target can't be reached at all."""
+    result = {"AmsNetId": ams_net_id, "Port": ams_port, "Condition": str(condition).strip(), "Success": False}
+    try:
+        parsed = parse_condition(condition)
+        if not 0 < timeout_sec <= MAX_TIMEOUT_SEC:
+            raise ValueError(f"timeoutSec must be greater than 0 and at most {MAX_TIMEOUT_SEC:g}")
+    except ValueError as e:
+        result["ErrorMessage"] = str(e)
+        return result
+    pool = pool if pool is not None else get_pool()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + timeout_sec
+    waiter: _Waiter | None = None
+    refused: str | None = None
+    reads = reconnects = 0
+    while True:
+        try:
+            async with pool.connection(ams_net_id, ams_port) as client:
+                if waiter is None:
+                    try:
+                        subject = (state_subject() if parsed.subject.upper() == STATE_SUBJECT.upper()
+                                   else await symbol_subject(client, parsed.subject))
+                        waiter = _Waiter(subject, parsed.op, subject.threshold(parsed.op, parsed.threshold), started)
+                    except (AdsError, ValueError) as e:
+                        result["ErrorMessage"] = str(e)
+                        return result
+                if refused is None:
+                    refused = await _wait_notified(client, waiter, deadline, cycle_ms)
+                if refused is not None:
+                    reads += await _wait_polled(client, waiter, deadline)
+            break
+        except AdsConnectionError:
+            if waiter is None:
+                raise
+            remaining = deadline - loop.time()
+            if waiter.met is not None or remaining <= 0:
+                break
+            reconnects += 1
+            await asyncio.sleep(min(MAX_POLL_SEC, remaining))
+
+    met = waiter.met
+    result.update({
+        "Success": True,
+        "Condition": str(parsed),
+        "Symbol": waiter.subject.name,
+        "DataType": waiter.subject.data_type,
+        "ConditionMet": met is not None,
+        "Value": met["Value"] if met else waiter.trace[-1]["Value"] if waiter.trace else "",
+        "ElapsedMs": met["ElapsedMs"] if met else waiter.elapsed_ms(),
+        "TimeoutSec": timeout_sec,
+        "Method": "notification" if refused is None else "polling",
+        "Changes": waiter.changes,
+        "Trace": list(waiter.trace),
+    })
+    if refused is not None:
+        result.update({"Polls": reads, "NotificationError": refused})
+    if reconnects:
+        result["Reconnects"] = reconnects
+    return result
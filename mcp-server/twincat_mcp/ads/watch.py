@@ -0,0 +1,315 @@
+"""
+Watch subscriptions: ADS device notifications buffered in the server.
+
+Instead of polling twincat_read_var, an agent subscribes once to a list
+of symbols. Each symbol gets a device notification (on change, or every
+cycle) on the target's pooled connection. Every sample lands in the
+watch's `RingBuffer`, numbered in arrival order. A later read returns
+everything after the caller's cursor in one response. Samples are
+decoded only then; the notification callback just stores bytes.
+
+The buffer keeps the last `capacity` samples. A reader that falls
+further behind gets the oldest ones still there, and `dropped` tells it
+how many it missed.
+
+A watch holds its connection checked out of the pool, so the pool
+neither reaps nor evicts it. If the connection dies, or the symbol
+table changes (the notification offsets may have moved), the next read
+subscribes again on a fresh connection and counts it in `resubscribed`.
+Samples that would have arrived in between are lost.
+
+Limits: MAX_WATCHES watches, each at most MAX_CAPACITY samples. Watches
+and recordings together hold connections to fewer targets than the pool
+has connections (see `pool`).
+"""
+
+import asyncio
+import contextlib
+import datetime
+import itertools
+import time
+from typing import Callable, NamedTuple
+
+from . import protocol
+from .client import AdsClient
+from .codecs import decode_symbol, types_for
+from .pool import AdsConnectionPool, get_pool
+from .protocol import AdsConnectionError, AdsError, NotificationSample, SymbolInfo
+
+MAX_WATCHES = 32
+DEFAULT_CAPACITY = 10_000
+MAX_CAPACITY = 1_000_000
+DEFAULT_READ_SAMPLES = 1000
+
+MODES = {"change": protocol.TRANS_SERVER_ON_CHANGE, "cyclic": protocol.TRANS_SERVER_CYCLE}
+
+
+class WatchSample(NamedTuple):
+    seq: int
+    symbol: int  # index into Watch.symbols
+    timestamp: int  # FILETIME
+    data: bytes
+
+
+class RingBuffer:
+    """The last `capacity` samples, numbered from 1 in arrival order."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._slots: list[WatchSample | None] = [None] * capacity
+        self.next_seq = 1
+
+    def __len__(self) -> int:
+        return min(self.next_seq - 1, self.capacity)
+
+    @property
+    def oldest_seq(self) -> int:
+        return self.next_seq - len(self)
+
+    def append(self, symbol: int, timestamp: int, data: bytes) -> None:
+        seq = self.next_seq
+        self._slots[(seq - 1) % self.capacity] = WatchSample(seq, symbol, timestamp, data)
+        self.next_seq = seq + 1
+
+    def since(self, cursor: int, limit: int) -> tuple[list[WatchSample], int]:
+        """(samples numbered after `cursor`, at most `limit`; how many
+        after `cursor` were already overwritten)."""
+        first = max(cursor + 1, self.oldest_seq)
+        dropped = first - (cursor + 1)
+        last = min(self.next_seq, first + max(0, limit))
+        return [self._slots[(seq - 1) % self.capacity] for seq in range(first, last)], dropped
+
+
+class Watch:
+    def __init__(self, watch_id: str, ams_net_id: str, ams_port: int, names: list[str],
+                 mode: str, cycle_ms: float, capacity: int):
+        self.id = watch_id
+        self.ams_net_id = ams_net_id
+        self.ams_port = ams_port
+        self.names = names
+        self.mode = mode
+        self.cycle_ms = cycle_ms
+        self.buffer = RingBuffer(capacity)
+        self.symbols: list[SymbolInfo] = []
+        self.created = time.time()
+        self.resubscribed = 0
+        self.client: AdsClient | None = None
+        self._handles: list[int] = []
+        self._invalidations = 0
+        self._stack: contextlib.AsyncExitStack | None = None
+
+    def live(self) -> bool:
+        return (self.client is not None and self.client.is_connected()
+                and self.client.symbols.invalidations == self._invalidations)
+
+    async def start(self, pool: AdsConnectionPool) -> None:
+        """Check out the connection, resolve the symbols and add one
+        notification each. Raises AdsError / AdsConnectionError, or
+        ValueError if the pool has no connection left to hold."""
+        stack = contextlib.AsyncExitStack()
+        client = await stack.enter_async_context(pool.connection(self.ams_net_id, self.ams_port, hold=True))
+        try:
+            looked_up = await client.symbols.lookup(self.names)
+            for name, (cached, code) in zip(self.names, looked_up):
+                if cached is None:
+                    raise AdsError(code, name)
+            self.symbols = [cached.info for cached, _ in looked_up]
+            self._invalidations = client.symbols.invalidations
+            self._handles = []
+            for i, info in enumerate(self.symbols):
+                self._handles.append(await client.add_notification(
+                    info.index_group, info.index_offset, info.size, self._callback(i),
+                    mode=MODES[self.mode], cycle_time_ms=self.cycle_ms))
+        except BaseException:
+            await delete_notifications(client, self._handles)
+            self._handles = []
+            await stack.aclose()
+            raise
+        self.client, self._stack = client, stack
+
+    async def stop(self) -> None:
+        client, stack, handles = self.client, self._stack, self._handles
+        self.client, self._stack, self._handles = None, None, []
+        if client is not None and client.is_connected():
+            await delete_notifications(client, handles)
+        if stack is not None:
+            await stack.aclose()
+
+    def _callback(self, symbol: int) -> Callable[[NotificationSample], None]:
+        append = self.buffer.append
+        return lambda sample: append(symbol, sample.timestamp, sample.data)
+
+
+class WatchManager:
+    def __init__(self, pool: AdsConnectionPool | None = None):
+        self._pool = pool
+        self._watches: dict[str, Watch] = {}
+        self._ids = itertools.count(1)
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._watches)
+
+    @property
+    def pool(self) -> AdsConnectionPool:
+        return self._pool if self._pool is not None else get_pool()
+
+    def get(self, watch_id: str) -> Watch | None:
+        return self._watches.get(watch_id)
+
+    def watches(self) -> list[Watch]:
+        return list(self._watches.values())
+
+    async def subscribe(self, ams_net_id: str, ams_port: int, names: list[str], mode: str = "change",
+                        cycle_ms: float = 100.0, capacity: int = DEFAULT_CAPACITY) -> Watch:
+        """Start a watch. Raises ValueError for bad arguments, AdsError if
+        a symbol can't be resolved or subscribed, AdsConnectionError."""
+        if not names:
+            raise ValueError("No symbols specified")
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}, not {mode!r}")
+        if not 1 <= capacity <= MAX_CAPACITY:
+            raise ValueError(f"capacity must be between 1 and {MAX_CAPACITY}")
+        async with self._lock:
+            if len(self._watches) >= MAX_WATCHES:
+                raise ValueError(f"Already {MAX_WATCHES} watches open; unsubscribe one first")
+            watch = Watch(f"w{next(self._ids)}", ams_net_id, int(ams_port), names, mode, cycle_ms, capacity)
+            await watch.start(self.pool)
+            self._watches[watch.id] = watch
+        return watch
+
+    async def ensure_live(self, watch: Watch) -> str | None:
+        """Resubscribe `watch` if its connection died or the symbol table
+        changed. Returns an error message if that failed."""
+        if watch.live():
+            return None
+        await watch.stop()
+        try:
+            await watch.start(self.pool)
+        except (ValueError, AdsError, AdsConnectionError) as e:
+            return f"Watch is not receiving samples: {e}"
+        watch.resubscribed += 1
+        return None
+
+    async def unsubscribe(self, watch_id: str) -> Watch | None:
+        watch = self._watches.pop(watch_id, None)
+        if watch is not None:
+            await watch.stop()
+        return watch
+
+    async def close_all(self) -> None:
+        watches = list(self._watches.values())
+        self._watches.clear()
+        for watch in watches:
+            await watch.stop()
+
+
+async def delete_notifications(client: AdsClient, handles: list[int]) -> None:
+    """Delete `handles`, skipping any the device no longer knows."""
+    for handle in handles:
+        try:
+            await client.delete_notification(handle)
+        except (AdsError, AdsConnectionError):
+            pass  # gone with the connection or the symbol table anyway
+
+
+def format_timestamp(filetime: int) -> str:
+    """FILETIME as ISO 8601 UTC with microseconds."""
+    moment = datetime.datetime.fromtimestamp(protocol.filetime_to_unix(filetime), datetime.timezone.utc)
+    return moment.isoformat(timespec="microseconds").replace("+00:00", "Z")
+
+
+# -----------------------------------------------------------------------------
+# Steps (PascalCase results, like steps.py)
+# -----------------------------------------------------------------------------
+
+async def subscribe(ams_net_id: str, ams_port: int, names: list[str], mode: str = "change",
+                    cycle_ms: float = 100.0, capacity: int = DEFAULT_CAPACITY) -> dict:
+    result = {"AmsNetId": ams_net_id, "Port": ams_port, "Success": False}
+    try:
+        watch = await get_watches().subscribe(ams_net_id, ams_port, names, mode, cycle_ms, capacity)
+    except (ValueError, AdsError) as e:
+        result["ErrorMessage"] = str(e)
+        return result
+    result.update({
+        "Success": True,
+        "WatchId": watch.id,
+        "Mode": watch.mode,
+        "CycleTimeMs": watch.cycle_ms,
+        "Capacity": watch.buffer.capacity,
+        "Symbols": [{"Name": name, "DataType": info.type_name, "Size": info.size}
+                    for name, info in zip(watch.names, watch.symbols)],
+    })
+    return result
+
+
+async def read(watch_id: str, cursor: int = 0, max_samples: int = DEFAULT_READ_SAMPLES) -> dict:
+    """Samples after `cursor`, oldest first. Pass the result's NextCursor
+    to the next read."""
+    result = {"WatchId": watch_id, "Success": False}
+    manager = get_watches()
+    watch = manager.get(watch_id)
+    if watch is None:
+        result["ErrorMessage"] = f"No watch {watch_id!r}" + (
+            f" (open: {', '.join(w.id for w in manager.watches())})" if len(manager) else "")
+        return result
+    warning = await manager.ensure_live(watch)
+    samples, dropped = watch.buffer.since(int(cursor), int(max_samples))
+    types = None
+    if watch.client is not None:
+        try:
+            types = await types_for(watch.client, watch.symbols)
+        except (AdsError, AdsConnectionError):
+            pass  # fall back to values' rendering (hex for composites)
+    items = []
+    for sample in samples:
+        info = watch.symbols[sample.symbol]
+        text, _ = decode_symbol(info, types, sample.data)
+        items.append({"Seq": sample.seq, "Symbol": watch.names[sample.symbol],
+                      "Time": format_timestamp(sample.timestamp), "Value": text})
+    next_cursor = samples[-1].seq if samples else int(cursor)
+    result.update({
+        "Success": True,
+        "AmsNetId": watch.ams_net_id,
+        "Port": watch.ams_port,
+        "Samples": items,
+        "NextCursor": next_cursor,
+        "Dropped": dropped,
+        "More": next_cursor < watch.buffer.next_seq - 1,
+        "Buffered": len(watch.buffer),
+        "Resubscribed": watch.resubscribed,
+    })
+    if warning:
+        result["Warning"] = warning
+    return result
+
+
+async def unsubscribe(watch_id: str) -> dict:
+    watch = await get_watches().unsubscribe(watch_id)
+    if watch is None:
+        return {"WatchId": watch_id, "Success": False, "ErrorMessage": f"No watch {watch_id!r}"}
+    return {"WatchId": watch_id, "Success": True, "SampleCount": watch.buffer.next_seq - 1,
+            "DurationSeconds": round(time.time() - watch.created, 1)}
+
+
+# Process-wide watches, on the process-wide pool.
+_watches: WatchManager | None = None
+
+
+def get_watches() -> WatchManager:
+    global _watches
+    if _watches is None:
+        _watches = WatchManager()
+    return _watches
+
+
+def get_watches_if_alive() -> WatchManager | None:
+    return _watches
+
+
+async def shutdown_watches() -> None:
+    """Stop every watch (idempotent). Call before `shutdown_pool()`."""
+    global _watches
+    manager, _watches = _watches, None
+    if manager is not None:
+        await manager.close_all()
@@ -15,10 +15,11 @@ These wrappers are legacy as the primary call path, but they stay in use:
 """
 
 import json
-import queue
 import subprocess
 import threading
+import time
 from pathlib import Path
+from typing import Callable
 
 # -----------------------------------------------------------------------------
 # Executable discovery
@@ -102,15 +103,27 @@ def run_tc_automation(command: str, args: list[str]) -> dict:
         }
 
 
+# How often run_tc_automation_with_progress checks its `cancel` event.
+CANCEL_POLL_SEC = 0.2
+
+
 def run_tc_automation_with_progress(
     command: str,
     args: list[str],
     timeout_minutes: int = 10,
+    on_progress: Callable[[str], None] | None = None,
+    cancel: threading.Event | None = None,
 ) -> tuple[dict, list[str]]:
     """
     Run TcAutomation.exe and stream [PROGRESS] lines off stderr while the
     command runs. Returns (result_dict, progress_messages).
 
+    `on_progress(message)` is called from the stderr reader thread for
+    each [PROGRESS] line as it arrives (see progress.progress_callback).
+
+    Setting `cancel` (from any thread) kills the process within
+    CANCEL_POLL_SEC and returns a failed result.
+
     Timeout: `timeout_minutes * 60 + 180` seconds. The extra 3 min covers
     VS startup / activate / restart sleeps that are always present even
     for very short user-requested timeouts.
@@ -128,43 +141,60 @@ def run_tc_automation_with_progress(
             cwd=str(exe_path.parent),
         )
 
-        stderr_queue: "queue.Queue[str]" = queue.Queue()
+        # The reader thread owns stderr. Detach it from the Popen object so
+        # communicate() only collects stdout and doesn't race the thread
+        # for progress lines.
+        stderr_pipe = process.stderr
+        process.stderr = None
 
         def read_stderr():
             try:
-                for line in iter(process.stderr.readline, ""):
-                    if line:
-                        stderr_queue.put(line.strip())
+                for line in iter(stderr_pipe.readline, ""):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    if line.startswith("[PROGRESS]"):
+                        message = line[10:].strip()
+                        progress_messages.append(message)
+                        if on_progress is not None:
+                            try:
+                                on_progress(message)
+                            except Exception:
+                                pass
+                    else:
+                        progress_messages.append(line)
             except ValueError:
                 pass  # stderr closed before thread finished reading
             finally:
                 try:
-                    process.stderr.close()
+                    stderr_pipe.close()
                 except Exception:
                     pass
 
         stderr_thread = threading.Thread(target=read_stderr, daemon=True)
         stderr_thread.start()
 
-        timeout_seconds = timeout_minutes * 60 + 180
-        try:
-            stdout, _ = process.communicate(timeout=timeout_seconds)
-        except subprocess.TimeoutExpired:
-            process.kill()
-            return {
-                "success": False,
-                "errorMessage": f"Command timed out after {timeout_minutes} minutes",
-            }, progress_messages
-
-        while not stderr_queue.empty():
+        deadline = time.monotonic() + timeout_minutes * 60 + 180
+        while True:
             try:
-                line = stderr_queue.get_nowait()
-                if line.startswith("[PROGRESS]"):
-                    progress_messages.append(line[10:].strip())
-                else:
-                    progress_messages.append(line)
-            except queue.Empty:
+                stdout, _ = process.communicate(
+                    timeout=CANCEL_POLL_SEC if cancel is not None else max(0.0, deadline - time.monotonic()))
                 break
+            except subprocess.TimeoutExpired:
+                if cancel is not None and cancel.is_set():
+                    process.kill()
+                    process.communicate()
+                    return {"success": False, "errorMessage": "Cancelled by client"}, progress_messages
+                if time.monotonic() >= deadline:
+                    process.kill()
+                    return {
+                        "success": False,
+                        "errorMessage": f"Command timed out after {timeout_minutes} minutes",
+                    }, progress_messages
+
+        # The pipe is at EOF once the process has exited; let the reader
+        # hand over its last lines before we return the list.
+        stderr_thread.join(timeout=5)
 
         if stdout.strip():
             try:
@@ -46,6 +46,9 @@ Public API
   module re-resolves from env / hardcoded.
 - `get_default_status()` — structured summary of what each source
   says and which one is active. Used by the handler for human output.
+- `get_preload_solution()` — the solution the shell host pre-warm
+  should load at server start (config key `preloadSolution`, else
+  `TWINCAT_PRELOAD_SOLUTION`), with its optional TwinCAT version.
 """
 
 from __future__ import annotations
@@ -95,6 +98,13 @@ def _config_dir() -> str:
 _CONFIG_FILE = os.path.join(_config_dir(), "config.json")
 _CONFIG_KEY = "defaultAmsNetId"
 
+# Pre-warm preload solution (see host.start_prewarm). Same precedence as
+# the default target: config file first, then env var.
+_PRELOAD_CONFIG_KEY = "preloadSolution"
+_PRELOAD_TC_VERSION_CONFIG_KEY = "preloadTcVersion"
+_PRELOAD_ENV_VAR = "TWINCAT_PRELOAD_SOLUTION"
+_PRELOAD_TC_VERSION_ENV_VAR = "TWINCAT_PRELOAD_TC_VERSION"
+
 
 # ---------------------------------------------------------------------------
 # Validation + IO helpers
@@ -351,6 +361,26 @@ def get_default_status() -> dict:
     }
 
 
+def get_preload_solution() -> tuple[Optional[str], Optional[str], str]:
+    """
+    Return (solution_path, tc_version, source) for the shell host
+    pre-warm. `source` ∈ {"config", "env", "none"}; the path is None
+    when neither source sets one. Read on every call so a config edit
+    takes effect on the next server start without code changes.
+    """
+    data = _read_config()
+    value = data.get(_PRELOAD_CONFIG_KEY)
+    if isinstance(value, str) and value.strip():
+        tc_version = data.get(_PRELOAD_TC_VERSION_CONFIG_KEY)
+        if not isinstance(tc_version, str) or not tc_version.strip():
+            tc_version = None
+        return value.strip(), tc_version and tc_version.strip(), "config"
+    env = os.environ.get(_PRELOAD_ENV_VAR, "").strip()
+    if env:
+        return env, os.environ.get(_PRELOAD_TC_VERSION_ENV_VAR, "").strip() or None, "env"
+    return None, None, "none"
+
+
 # ---------------------------------------------------------------------------
 # Startup log — once per process, stderr only (stdout is the JSON-RPC stream)
 # ---------------------------------------------------------------------------
@@ -2,31 +2,80 @@
 Unified step dispatch — the single entry point tool handlers use to run a
 StepDispatcher command against the TwinCAT automation interface.
 
-`run_shell_step` prefers the persistent shell host (one DTE for the MCP
-server's lifetime). If the host is unavailable — disabled, failed to
-start, crashed mid-call, exe missing, etc. — it transparently falls back
-to a one-shot CLI invocation via `TcAutomation.exe batch`.
+`run_shell_step` prefers the persistent shell host (a small pool of
+DTEs, one per recently used solution, kept for the MCP server's
+lifetime). If the host is unavailable — disabled, failed to start,
+crashed mid-call, exe missing, etc. — it transparently falls back to a
+one-shot CLI invocation via `TcAutomation.exe batch`.
 
 The CLI fallback wraps the single command as a one-step batch, so the C#
 side only has to support the batch flow — no per-command argparse
 scaffolding is required in the wrapper.
+
+`run_shell_step` is a coroutine holding a slot of the command's
+execution lane (see `executor.py`) for the whole call: ADS-only commands
+take the "ads" lane, all other commands the "dte" lane. The host
+round-trip is awaited natively; only the blocking CLI fallback is
+offloaded to the thread pool, so a long build never stalls the MCP
+event loop.
+
+ADS-only commands prefer the dedicated ADS host (see
+`host.get_ads_host`) so they run concurrently with whatever the DTE is
+doing; they fall back to the shell host when the ADS host is disabled,
+and to the CLI after that.
+
+If a shell host crashes mid-call and a warm spare is configured
+(TWINCAT_HOST_SPARE=1), the spare is promoted and the step retried on it
+before the CLI fallback is considered.
+
+Cancelling a tool call (MCP `notifications/cancelled`) cancels the
+handler task: the host client releases the waiter and the lane slot at
+once and sends the host a `cancel` for the step. If the host has to be
+restarted because the step ignored the cancel, the calls queued behind
+it are retried once on the respawned host (`HostRestarted`). A cancelled
+CLI fallback kills its `TcAutomation.exe batch` and frees the lane slot
+once the process is gone.
 """
 
+import asyncio
+import contextlib
 import json
 import os
 import sys
 import tempfile
+import threading
+from typing import Callable
 
 from .cli import run_tc_automation_with_progress
+from .executor import LANE_ADS, LANE_DTE, lane_slot, offload
 from .host import (
     HostError,
+    HostRestarted,
+    ShellHost,
     _ci_wrap,
+    drop_ads_host,
     drop_shell_host,
+    get_ads_host,
     get_shell_host,
+    promote_spare_host,
 )
+from .progress import progress_callback
+
+# Commands that talk to the PLC over ADS only and never touch the DTE.
+# Mirrors StepDispatcher.AdsCommands on the C# side.
+ADS_COMMANDS = frozenset({
+    "get-state", "set-state", "read-var", "write-var",
+    "ping-target", "list-symbols", "read-plc-log",
+    "read-var-list", "write-var-list",
+})
 
 
-def run_shell_step(
+def lane_for_command(command: str) -> str:
+    """Execution lane a StepDispatcher command should run on."""
+    return LANE_ADS if (command or "").lower() in ADS_COMMANDS else LANE_DTE
+
+
+async def run_shell_step(
     command: str,
     step_args: dict | None,
     solution_path: str | None = None,
@@ -44,25 +93,92 @@ def run_shell_step(
     """
     step_args = step_args or {}
 
-    host = get_shell_host()
-    if host is not None:
+    lane = lane_for_command(command)
+    async with lane_slot(lane):
+        host = get_ads_host() if lane == LANE_ADS else None
+        if host is None:
+            host = get_shell_host(solution_path, tc_version)
+        if host is not None:
+            try:
+                inner, progress = await _execute_on_host(
+                    host, command, step_args, solution_path, tc_version, timeout_minutes)
+                return _ci_wrap(inner), progress
+            except HostError as e:
+                # If the process died, drop the stale instance so the next
+                # call gets a fresh start attempt — or, if a warm spare is
+                # standing by, promote it and retry there instead of the CLI.
+                spare = None
+                if not host.is_alive():
+                    if host.role == "ads":
+                        drop_ads_host()
+                    else:
+                        spare = promote_spare_host(host)
+
+                # Log once to stderr and fall through. Subsequent calls
+                # will re-attempt host; this matters if the host crashed but
+                # can be restarted.
+                fallback = "promoting warm spare host" if spare is not None else "falling back to CLI"
+                sys.stderr.write(f"[mcp-server] shell host unavailable ({e}); {fallback}\n")
+                sys.stderr.flush()
+
+                if spare is not None:
+                    try:
+                        inner, progress = await _execute_on_host(
+                            spare, command, step_args, solution_path, tc_version, timeout_minutes)
+                        return _ci_wrap(inner), progress
+                    except HostError as spare_error:
+                        sys.stderr.write(
+                            f"[mcp-server] promoted spare host failed too ({spare_error}); falling back to CLI\n")
+                        sys.stderr.flush()
+                        if not spare.is_alive():
+                            drop_shell_host(spare)
+
+        # A cancelled call kills the TcAutomation.exe batch and keeps the
+        # lane slot until it is gone, so the next DTE call can't start
+        # alongside it.
+        cancel = threading.Event()
+        cli_call = asyncio.ensure_future(offload(
+            _run_cli_step, command, step_args, solution_path, tc_version, timeout_minutes,
+            progress_callback(), cancel,
+        ))
         try:
-            inner, progress = host.execute_step(
-                command, step_args, solution_path, tc_version,
-                timeout=timeout_minutes * 60 + 180,
-            )
-            return _ci_wrap(inner), progress
-        except HostError as e:
-            # Log once to stderr and fall through to CLI. Subsequent calls
-            # will re-attempt host; this matters if the host crashed but
-            # can be restarted.
-            sys.stderr.write(f"[mcp-server] shell host unavailable ({e}); falling back to CLI\n")
-            sys.stderr.flush()
-            # If the process died, drop the stale instance so the next
-            # call gets a fresh start attempt.
-            if not host.is_alive():
-                drop_shell_host()
+            return await asyncio.shield(cli_call)
+        except asyncio.CancelledError:
+            cancel.set()
+            with contextlib.suppress(Exception):
+                await cli_call
+            raise
+
 
+async def _execute_on_host(
+    host: ShellHost,
+    command: str,
+    step_args: dict,
+    solution_path: str | None,
+    tc_version: str | None,
+    timeout_minutes: int,
+) -> tuple[dict, list[str]]:
+    """`host.execute_step`, retried once if the host was restarted under
+    us to get rid of a cancelled step (the retry respawns it)."""
+    timeout = timeout_minutes * 60 + 180
+    try:
+        return await host.execute_step(command, step_args, solution_path, tc_version, timeout=timeout)
+    except HostRestarted as e:
+        sys.stderr.write(f"[mcp-server] {e}; retrying {command} on a fresh host\n")
+        sys.stderr.flush()
+        return await host.execute_step(command, step_args, solution_path, tc_version, timeout=timeout)
+
+
+def _run_cli_step(
+    command: str,
+    step_args: dict,
+    solution_path: str | None,
+    tc_version: str | None,
+    timeout_minutes: int,
+    on_progress: Callable[[str], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> tuple[dict, list[str]]:
+    """CLI fallback for `run_shell_step`. Blocking; runs on the thread pool."""
     # --- CLI fallback: spawn a single-step batch ---------------------------
     # We reuse the existing batch CLI to avoid having to build per-command
     # flag construction for every tool. One batch step = one tool call.
@@ -83,7 +199,7 @@ def run_shell_step(
         tmp.flush()
         tmp.close()
         batch_result, progress = run_tc_automation_with_progress(
-            "batch", ["--input", tmp.name], timeout_minutes
+            "batch", ["--input", tmp.name], timeout_minutes, on_progress=on_progress, cancel=cancel,
         )
     finally:
         try: os.unlink(tmp.name)
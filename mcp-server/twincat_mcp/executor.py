@@ -0,0 +1,125 @@
+"""
+Execution lanes for blocking work.
+
+Every tool handler is an `async def`, but most of the work underneath —
+shell-host round-trips, `TcAutomation.exe` subprocesses, file reads — is
+synchronous. Running it inline blocks the MCP stdio loop, so a 10-minute
+build would also stall `twincat_host_status`, `twincat_get_state` and
+even the client's cancellation messages.
+
+`run_blocking(lane, fn, *args)` moves the call onto a shared, bounded
+thread pool. Each lane has its own concurrency limit so one kind of work
+can't starve another (`lane_slot(lane)` holds a slot across several awaits
+when the work is partly async, e.g. a host round-trip with CLI fallback):
+
+  - "dte"  steps that need the STA-bound TcXaeShell (build, activate, ...)
+  - "ads"  ADS-only steps (get-state, read-var, ...) — no DTE involved
+  - "io"   everything else: file I/O, one-shot CLI helpers, scope session
+
+Limits are read once at import from `TWINCAT_DTE_CONCURRENCY`,
+`TWINCAT_ADS_CONCURRENCY` and `TWINCAT_IO_CONCURRENCY`. The pool is sized
+to the sum of the lane limits, so it can never grow beyond what the lanes
+are allowed to use.
+"""
+
+import asyncio
+import functools
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+# -----------------------------------------------------------------------------
+# Configuration
+# -----------------------------------------------------------------------------
+
+LANE_DTE = "dte"
+LANE_ADS = "ads"
+LANE_IO = "io"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+
+# One DTE lane slot by default: the shell host owns a single STA-affine
+# DTE, so a second concurrent shell step would only queue inside it.
+LANE_LIMITS: dict[str, int] = {
+    LANE_DTE: _env_int("TWINCAT_DTE_CONCURRENCY", 1),
+    LANE_ADS: _env_int("TWINCAT_ADS_CONCURRENCY", 4),
+    LANE_IO: _env_int("TWINCAT_IO_CONCURRENCY", 4),
+}
+
+_executor = ThreadPoolExecutor(
+    max_workers=sum(LANE_LIMITS.values()),
+    thread_name_prefix="twincat-lane",
+)
+
+# asyncio.Semaphore binds to the loop it is first used on, so keep one set
+# per running loop. In production there is exactly one; tests that call
+# asyncio.run() repeatedly get a fresh set each time.
+_loop_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _lane_semaphore(lane: str) -> asyncio.Semaphore:
+    if lane not in LANE_LIMITS:
+        raise ValueError(f"unknown execution lane: {lane!r}")
+    loop = asyncio.get_running_loop()
+    sems = _loop_semaphores.get(loop)
+    if sems is None:
+        sems = {name: asyncio.Semaphore(limit) for name, limit in LANE_LIMITS.items()}
+        _loop_semaphores[loop] = sems
+    return sems[lane]
+
+
+# -----------------------------------------------------------------------------
+# Public API
+# -----------------------------------------------------------------------------
+
+def lane_slot(lane: str) -> asyncio.Semaphore:
+    """Async context manager holding one slot of `lane` for its duration."""
+    return _lane_semaphore(lane)
+
+
+async def offload(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run `fn(*args, **kwargs)` on the shared thread pool WITHOUT taking a
+    lane slot. Only for callers that already hold one via `lane_slot`.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+async def run_blocking(lane: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run `fn(*args, **kwargs)` on the shared thread pool, gated by the
+    concurrency limit of `lane`. The event loop stays free while it runs.
+    """
+    async with _lane_semaphore(lane):
+        return await offload(fn, *args, **kwargs)
+
+
+def lane_usage() -> dict[str, dict[str, int]]:
+    """
+    Snapshot of `{lane: {"limit": n, "inUse": k}}` for the running loop.
+    Used by `twincat_host_status` to show what's currently occupied.
+    """
+    try:
+        sems = _loop_semaphores.get(asyncio.get_running_loop()) or {}
+    except RuntimeError:
+        sems = {}
+    usage = {}
+    for name, limit in LANE_LIMITS.items():
+        sem = sems.get(name)
+        # Semaphore._value is the number of free slots; there is no public
+        # accessor, and this is display-only.
+        free = getattr(sem, "_value", limit) if sem is not None else limit
+        usage[name] = {"limit": limit, "inUse": limit - free}
+    return usage
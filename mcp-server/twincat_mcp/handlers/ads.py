@@ -7,28 +7,82 @@ its CLI-fallback on crash.
 Note: the C# commands for this family emit PascalCase JSON keys
 (Success, AdsState, etc.), so the formatters below use PascalCase too.
 
+With TWINCAT_ADS_BACKEND=python, get-state / set-state / ping-target /
+read-var / write-var / read-var-list / write-var-list / list-symbols run
+on the pure-Python ADS client (`twincat_mcp.ads`) and its connection
+pool instead, which returns the same keys; see `_run_ads_step`.
+twincat_read_var with an index range (read-array), the watches and
+twincat_wait_for_condition only exist there. read-plc-log needs the
+host's TcEventLogger proxy on either backend.
+twincat_ads_record runs on its streaming `Recorder` whatever the backend,
+and on the host's AdsRecordCommand only if the router can't be reached.
+twincat_ads_record_start / _status / _stop run the same recorder in the
+background (see `jobs`); they have no host fallback.
+
 Handlers covered: twincat_get_state, twincat_set_state,
 twincat_read_var, twincat_write_var, twincat_ping_target,
-twincat_list_symbols, twincat_read_plc_log.
+twincat_list_symbols, twincat_read_plc_log, twincat_watch_subscribe,
+twincat_watch_read, twincat_watch_unsubscribe, twincat_wait_for_condition,
+twincat_ads_record, twincat_ads_record_start, twincat_ads_record_status,
+twincat_ads_record_stop, twincat_convert_recording, twincat_analyze_recording,
+twincat_preview_recording.
 """
 
+import contextlib
+import sys
+
 from mcp.types import TextContent
 
+from .. import ads as ads_client
+from ..ads import jobs
+from ..ads.analysis import analyze
+from ..ads.downsample import DEFAULT_POINTS, preview
+from ..ads.recfile import EXTENSION, convert, csv_to_tcrec, format_for
+from ..ads.recorder import Recorder
+from ..ads.steps import PYTHON_ONLY_STEPS, TARGET_STEPS, UNLANED_STEPS
+from ..ads.steps import STEPS as PYTHON_ADS_STEPS
+from ..ads.steps import run_step as run_python_ads_step
 from ..defaults import resolve_ams_net_id
 from ..dispatch import run_shell_step
+from ..executor import LANE_ADS, LANE_IO, lane_slot, run_blocking
 from ..formatting import add_timing_to_output
+from ..progress import progress_callback
+from ..host import _ci_wrap
 from ._registry import register
 
 
+async def _run_ads_step(command: str, step_args: dict, timeout_minutes: int = 1) -> dict:
+    """
+    Run an ADS-only step. Uses the Python ADS client when
+    TWINCAT_ADS_BACKEND=python and it implements the command, otherwise
+    (or if the AMS router can't be reached) `run_shell_step`. Steps only
+    the Python client has (PYTHON_ONLY_STEPS) always use it, and
+    UNLANED_STEPS run without an ADS lane slot.
+    """
+    python_only = command in PYTHON_ONLY_STEPS
+    python_step = command in PYTHON_ADS_STEPS or command in TARGET_STEPS
+    if (ads_client.BACKEND == "python" and python_step) or python_only:
+        try:
+            async with contextlib.nullcontext() if command in UNLANED_STEPS else lane_slot(LANE_ADS):
+                return _ci_wrap(await run_python_ads_step(command, step_args))
+        except ads_client.AdsConnectionError as e:
+            if python_only:
+                return _ci_wrap({"Success": False, "ErrorMessage": (
+                    f"Cannot reach the AMS router for {step_args.get('amsNetId')} ({e}). "
+                    "This call needs direct ADS access; set TWINCAT_ADS_ROUTER if the router "
+                    "isn't at the Net ID's IP address.")})
+            sys.stderr.write(f"[mcp-server] python ADS client unavailable ({e}); using host\n")
+            sys.stderr.flush()
+    result, _ = await run_shell_step(command, step_args, timeout_minutes=timeout_minutes)
+    return result
+
+
 @register("twincat_get_state")
 async def handle_get_state(arguments: dict, tool_start_time: float) -> list[TextContent]:
     ams_net_id = resolve_ams_net_id(arguments.get("amsNetId"))
     port = arguments.get("port", 851)
 
-    result, _ = run_shell_step(
-        "get-state", {"amsNetId": ams_net_id, "port": port},
-        timeout_minutes=1,
-    )
+    result = await _run_ads_step("get-state", {"amsNetId": ams_net_id, "port": port})
 
     if result.get("Success"):
         state = result.get("AdsState", "Unknown")
@@ -51,10 +105,7 @@ async def handle_set_state(arguments: dict, tool_start_time: float) -> list[Text
     state = arguments.get("state", "")
     port = arguments.get("port", 851)
 
-    result, _ = run_shell_step(
-        "set-state", {"amsNetId": ams_net_id, "state": state, "port": port},
-        timeout_minutes=1,
-    )
+    result = await _run_ads_step("set-state", {"amsNetId": ams_net_id, "state": state, "port": port})
 
     if result.get("Success"):
         prev_state = result.get("PreviousState", "Unknown")
@@ -79,10 +130,10 @@ async def handle_read_var(arguments: dict, tool_start_time: float) -> list[TextC
     symbol = arguments.get("symbol", "")
     port = arguments.get("port", 851)
 
-    result, _ = run_shell_step(
-        "read-var", {"amsNetId": ams_net_id, "symbol": symbol, "port": port},
-        timeout_minutes=1,
-    )
+    if any(arguments.get(key) is not None for key in ("start", "count", "dumpPath")):
+        return await _read_array(arguments, ams_net_id, symbol, port, tool_start_time)
+
+    result = await _run_ads_step("read-var", {"amsNetId": ams_net_id, "symbol": symbol, "port": port})
 
     if result.get("Success"):
         output = f"✅ Variable Read: **{symbol}**\n\n"
@@ -95,6 +146,43 @@ async def handle_read_var(arguments: dict, tool_start_time: float) -> list[TextC
     return [TextContent(type="text", text=add_timing_to_output(output, tool_start_time))]
 
 
+async def _read_array(arguments: dict, ams_net_id: str, symbol: str, port: int,
+                      tool_start_time: float) -> list[TextContent]:
+    """twincat_read_var with an index range: statistics instead of values."""
+    step_args = {"amsNetId": ams_net_id, "symbol": symbol, "port": port}
+    for key in ("start", "count", "dumpPath"):
+        if arguments.get(key) is not None:
+            step_args[key] = arguments[key]
+
+    result = await _run_ads_step("read-array", step_args)
+
+    if not result.get("Success"):
+        output = f"❌ Failed to read '{symbol}': {result.get('ErrorMessage', 'Unknown error')}"
+        return [TextContent(type="text", text=add_timing_to_output(output, tool_start_time))]
+
+    start, count = result.get("Start", 0), result.get("Count", 0)
+    stats = result.get("Stats", {})
+    output = f"✅ Array Read: **{symbol}[{start}..{start + count - 1}]**\n\n"
+    output += (f"📋 {count} of {result.get('Length')} × {result.get('ElementType')} "
+               f"({result.get('BytesRead')} bytes in {result.get('Reads')} ADS read(s))\n")
+    if "Min" in stats:
+        output += (f"📊 min {stats['Min']} at [{stats['MinIndex']}], max {stats['Max']} at [{stats['MaxIndex']}], "
+                   f"mean {stats['Mean']:.6g}, std {stats['Std']:.6g}\n")
+    if stats.get("NonFinite"):
+        output += f"⚠️ {stats['NonFinite']} NaN/Inf value(s)\n"
+    if "Values" in result:
+        output += f"🔢 Values: `{result['Values']}`\n"
+    else:
+        head = ", ".join(str(v) for v in result.get("Head", []))
+        tail = ", ".join(str(v) for v in result.get("Tail", []))
+        output += f"🔢 Values: `[{head}, …, {tail}]`\n"
+    if result.get("DumpPath"):
+        output += f"💾 All {count} values written to {result['DumpPath']}\n"
+    elif result.get("DumpError"):
+        output += f"⚠️ Could not write the dump file: {result['DumpError']}\n"
+    return [TextContent(type="text", text=add_timing_to_output(output.rstrip(), tool_start_time))]
+
+
 @register("twincat_list_symbols")
 async def handle_list_symbols(arguments: dict, tool_start_time: float) -> list[TextContent]:
     ams_net_id = resolve_ams_net_id(arguments.get("amsNetId"))
@@ -103,6 +191,7 @@ async def handle_list_symbols(arguments: dict, tool_start_time: float) -> list[T
     contains = arguments.get("contains")
     max_results = arguments.get("max", 200)
     include_types = arguments.get("includeTypes", False)
+    cursor = arguments.get("cursor")
 
     step_args: dict = {
         "amsNetId": ams_net_id,
@@ -114,10 +203,10 @@ async def handle_list_symbols(arguments: dict, tool_start_time: float) -> list[T
         step_args["prefix"] = str(prefix)
     if contains:
         step_args["contains"] = str(contains)
+    if cursor:
+        step_args["cursor"] = str(cursor)
 
-    result, _ = run_shell_step(
-        "list-symbols", step_args, timeout_minutes=1,
-    )
+    result = await _run_ads_step("list-symbols", step_args)
 
     if not result.get("Success"):
         err = result.get("ErrorMessage", "Unknown error")
@@ -137,10 +226,16 @@ async def handle_list_symbols(arguments: dict, tool_start_time: float) -> list[T
     total_scanned = result.get("TotalScanned", 0)
     truncated = result.get("Truncated", False)
     symbols = result.get("Symbols", [])
+    next_cursor = result.get("NextCursor")
 
     output = f"🔎 Symbol listing on {ams_net_id}:{port}\n"
     output += f"📊 Matched {total_matched} of {total_scanned} scanned\n"
-    if truncated:
+    if next_cursor:
+        output += (
+            f"📄 Showing {len(symbols)} — pass `cursor: \"{next_cursor}\"` "
+            "for the next page.\n"
+        )
+    elif truncated:
         output += (
             f"⚠️  Truncated to {len(symbols)} entries — raise `max` or "
             "tighten `prefix`/`contains` to see the rest.\n"
@@ -183,7 +278,7 @@ async def handle_read_plc_log(arguments: dict, tool_start_time: float) -> list[T
     if contains:
         step_args["contains"] = str(contains)
 
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "read-plc-log", step_args,
         # Give the CLI fallback enough headroom to actually complete the
         # listening window. step_args.waitSeconds is the listen duration;
@@ -241,7 +336,7 @@ async def handle_ping_target(arguments: dict, tool_start_time: float) -> list[Te
     port = arguments.get("port", 851)
     timeout_ms = arguments.get("timeoutMs", 2500)
 
-    result, _ = run_shell_step(
+    result = await _run_ads_step(
         "ping-target", {
             "amsNetId": ams_net_id, "port": port, "timeoutMs": timeout_ms
         },
@@ -300,13 +395,10 @@ async def handle_write_var(arguments: dict, tool_start_time: float) -> list[Text
     value = arguments.get("value", "")
     port = arguments.get("port", 851)
 
-    result, _ = run_shell_step(
-        "write-var", {
-            "amsNetId": ams_net_id, "symbol": symbol,
-            "value": value, "port": port,
-        },
-        timeout_minutes=1,
-    )
+    result = await _run_ads_step("write-var", {
+        "amsNetId": ams_net_id, "symbol": symbol,
+        "value": value, "port": port,
+    })
 
     if result.get("Success"):
         output = f"✅ Variable Written: **{symbol}**\n\n"
@@ -326,13 +418,12 @@ async def handle_read_var_list(arguments: dict, tool_start_time: float) -> list[
     port = arguments.get("port", 851)
 
     # StepDispatcher expects a comma-separated string for the symbols arg
-    result, _ = run_shell_step(
+    result = await _run_ads_step(
         "read-var-list", {
             "amsNetId": ams_net_id,
             "symbols": ",".join(str(s) for s in symbols),
             "port": port,
         },
-        timeout_minutes=1,
     )
 
     if result.get("Success"):
@@ -357,13 +448,14 @@ async def handle_write_var_list(arguments: dict, tool_start_time: float) -> list
     variables: dict = arguments.get("variables", {})
     port = arguments.get("port", 851)
 
-    result, _ = run_shell_step(
+    # `verify` only matters to the Python backend; the host always reads back.
+    result = await _run_ads_step(
         "write-var-list", {
             "amsNetId": ams_net_id,
             "variables": _json.dumps(variables),
             "port": port,
+            "verify": arguments.get("verify", True),
         },
-        timeout_minutes=1,
     )
 
     if result.get("Success"):
@@ -383,11 +475,122 @@ async def handle_write_var_list(arguments: dict, tool_start_time: float) -> list
     return [TextContent(type="text", text=add_timing_to_output(output, tool_start_time))]
 
 
+@register("twincat_watch_subscribe")
+async def handle_watch_subscribe(arguments: dict, tool_start_time: float) -> list[TextContent]:
+    ams_net_id = resolve_ams_net_id(arguments.get("amsNetId"))
+    port = arguments.get("port", 851)
+    symbols: list = arguments.get("symbols", [])
+
+    result = await _run_ads_step(
+        "watch-subscribe", {
+            "amsNetId": ams_net_id,
+            "port": port,
+            "symbols": [str(s) for s in symbols],
+            "mode": arguments.get("mode", "change"),
+            "cycleTimeMs": arguments.get("cycleTimeMs", 100),
+            "capacity": arguments.get("capacity", 10000),
+        },
+    )
+
+    if result.get("Success"):
+        watch_id = result.get("WatchId")
+        output = f"👁️ Watch **{watch_id}** started on {ams_net_id}:{port}\n\n"
+        for sym in result.get("Symbols", []):
+            output += f"  `{sym.get('Name')}` ({sym.get('DataType')})\n"
+        output += (f"\n🔁 Mode: {result.get('Mode')}, every {result.get('CycleTimeMs'):g} ms, "
+                   f"buffer {result.get('Capacity')} samples\n")
+        output += f'➡️ Read with twincat_watch_read `watchId: "{watch_id}"`, `cursor: 0`'
+    else:
+        output = f"❌ Failed to start watch: {result.get('ErrorMessage', 'Unknown error')}"
+
+    return [TextContent(type="text", text=add_timing_to_output(output, tool_start_time))]
+
+
+@register("twincat_watch_read")
+async def handle_watch_read(arguments: dict, tool_start_time: float) -> list[TextContent]:
+    watch_id = str(arguments.get("watchId", ""))
+
+    result = await _run_ads_step(
+        "watch-read", {"watchId": watch_id, "cursor": arguments.get("cursor", 0), "max": arguments.get("max", 1000)},
+    )
+
+    if result.get("Success"):
+        samples = result.get("Samples", [])
+        output = f"👁️ Watch **{watch_id}**: {len(samples)} sample(s)\n\n"
+        for sample in samples:
+            output += f"  #{sample.get('Seq')} {sample.get('Time')} `{sample.get('Symbol')}` = **{sample.get('Value')}**\n"
+        if result.get("Dropped"):
+            output += f"\n⚠️ {result.get('Dropped')} older sample(s) were dropped (buffer full); read more often or raise capacity"
+        if result.get("Warning"):
+            output += f"\n⚠️ {result.get('Warning')}"
+        more = " (more buffered — read again)" if result.get("More") else ""
+        output += f'\n📍 Next cursor: `{result.get("NextCursor")}`{more}'
+    else:
+        output = f"❌ Failed to read watch: {result.get('ErrorMessage', 'Unknown error')}"
+
+    return [TextContent(type="text", text=add_timing_to_output(output, tool_start_time))]
+
+
+@register("twincat_watch_unsubscribe")
+async def handle_watch_unsubscribe(arguments: dict, tool_start_time: float) -> list[TextContent]:
+    watch_id = str(arguments.get("watchId", ""))
+
+    result = await _run_ads_step("watch-unsubscribe", {"watchId": watch_id})
+
+    if result.get("Success"):
+        output = (f"✅ Watch **{watch_id}** stopped after {result.get('DurationSeconds')} s, "
+                  f"{result.get('SampleCount')} sample(s) received")
+    else:
+        output = f"❌ Failed: {result.get('ErrorMessage', 'Unknown error')}"
+
+    return [TextContent(type="text", text=add_timing_to_output(output, tool_start_time))]
+
+
+@register("twincat_wait_for_condition")
+async def handle_wait_for_condition(arguments: dict, tool_start_time: float) -> list[TextContent]:
+    ams_net_id = resolve_ams_net_id(arguments.get("amsNetId"))
+    port = arguments.get("port", 851)
+    condition = str(arguments.get("condition", ""))
+
+    result = await _run_ads_step(
+        "wait-condition", {
+            "amsNetId": ams_net_id,
+            "port": port,
+            "condition": condition,
+            "timeoutSec": arguments.get("timeoutSec", 10),
+            "cycleTimeMs": arguments.get("cycleTimeMs", 10),
+        },
+    )
+
+    if result.get("Success"):
+        shown = result.get("Condition", condition)
+        if result.get("ConditionMet"):
+            already = " (already true)" if result.get("Changes") == 1 else ""
+            output = f"✅ Condition met: **{shown}** after {result.get('ElapsedMs')} ms{already}\n\n"
+        else:
+            output = f"⏱️ Condition **{shown}** not met within {result.get('TimeoutSec'):g} s\n\n"
+        output += f"📊 Value: `{result.get('Value')}` ({result.get('DataType')})\n"
+        if result.get("Method") == "polling":
+            output += (f"🔄 Polled {result.get('Polls')} time(s); notification refused: "
+                       f"{result.get('NotificationError')}\n")
+        else:
+            output += "📡 Via ADS notification\n"
+        if result.get("Reconnects"):
+            output += f"🔌 Reconnected {result.get('Reconnects')} time(s)\n"
+        trace = result.get("Trace", [])
+        changes = result.get("Changes", len(trace))
+        output += f"\n📈 Trace ({changes} value(s){f', last {len(trace)}' if changes > len(trace) else ''}):\n"
+        for entry in trace:
+            output += f"  +{entry.get('ElapsedMs')} ms `{entry.get('Value')}`\n"
+    else:
+        output = f"❌ Failed to wait for '{condition}': {result.get('ErrorMessage', 'Unknown error')}"
+
+    return [TextContent(type="text", text=add_timing_to_output(output.rstrip("\n"), tool_start_time))]
+
+
 @register("twincat_ads_record")
 async def handle_ads_record(arguments: dict, tool_start_time: float) -> list[TextContent]:
-    import json as _json
     import os
-    from datetime import datetime
     from ..cli import find_tc_automation_exe, run_tc_automation_with_progress
 
     ams_net_id = resolve_ams_net_id(arguments.get("amsNetId"))
@@ -395,13 +598,17 @@ async def handle_ads_record(arguments: dict, tool_start_time: float) -> list[Tex
     variables: list = arguments.get("variables", [])
     sample_time_ms = arguments.get("sampleTimeMs", 10)
     duration_sec = arguments.get("durationSec", 0)
-    output_path = arguments.get("outputPath") or os.path.join(
-        os.environ.get("TEMP", "/tmp"),
-        f"ads_record_{datetime.now():%Y%m%d_%H%M%S}.csv"
-    )
+    output_format = arguments.get("outputFormat")
+    output_path = arguments.get("outputPath") or _default_record_path(output_format)
     start_trigger = arguments.get("startTrigger")
     stop_trigger = arguments.get("stopTrigger")
     max_time_sec = arguments.get("maxTimeSec", 60)
+    try:
+        output_format = format_for(output_path, output_format)
+    except ValueError as e:
+        return [TextContent(type="text", text=f"❌ ADS recording failed: {e}")]
+    # The host only writes CSV; a .tcrec recording is converted afterwards.
+    host_path = output_path + ".csv" if output_format == "tcrec" else output_path
 
     args = [
         "--amsnetid", ams_net_id,
@@ -409,7 +616,7 @@ async def handle_ads_record(arguments: dict, tool_start_time: float) -> list[Tex
         "--variables", ",".join(variables),
         "--sampletime", str(sample_time_ms),
         "--duration", str(duration_sec),
-        "--output", output_path,
+        "--output", host_path,
         "--max-time", str(max_time_sec),
     ]
     if start_trigger:
@@ -417,21 +624,244 @@ async def handle_ads_record(arguments: dict, tool_start_time: float) -> list[Tex
     if stop_trigger:
         args.extend(["--stop-trigger", stop_trigger])
 
-    # Use generous timeout: duration + max_time + 30s buffer
-    timeout_minutes = int((max(duration_sec, 0) + max(max_time_sec, 0) + 30) / 60) + 1
-    result, _ = run_tc_automation_with_progress("ads-record", args, timeout_minutes)
-
-    if result.get("success"):
-        csv_path = result.get("outputPath", output_path)
-        sample_count = result.get("samplesCollected", result.get("sampleCount", "?"))
-        actual_duration = result.get("durationSeconds", duration_sec)
-        output = f"✅ ADS Recording Complete\n\n"
-        output += f"📡 Target: {ams_net_id}:{port}\n"
-        output += f"📊 Variables: {', '.join(variables)}\n"
-        output += f"⏱ Duration: {actual_duration:.1f}s at {sample_time_ms}ms intervals\n"
-        output += f"📈 Samples: {sample_count}\n"
-        output += f"💾 Output: `{csv_path}`"
+    recorder = Recorder(
+        ams_net_id, int(port), [str(v) for v in variables], output_path,
+        sample_time_ms=int(sample_time_ms), duration_sec=float(duration_sec), start_trigger=start_trigger,
+        stop_trigger=stop_trigger, max_time_sec=float(max_time_sec), output_format=output_format,
+    )
+    # The recorder only awaits notifications and writes its chunks on the
+    # "io" lane, so the recording itself holds no ADS lane slot.
+    try:
+        result = _ci_wrap(await recorder.run(on_progress=progress_callback()))
+    except ads_client.AdsConnectionError as e:
+        sys.stderr.write(f"[mcp-server] python ADS client unavailable ({e}); recording with TcAutomation\n")
+        sys.stderr.flush()
+        # Use generous timeout: duration + max_time + 30s buffer
+        timeout_minutes = int((max(duration_sec, 0) + max(max_time_sec, 0) + 30) / 60) + 1
+        result, _ = await run_blocking(
+            LANE_ADS, run_tc_automation_with_progress, "ads-record", args, timeout_minutes,
+            on_progress=progress_callback(),
+        )
+        if output_format == "tcrec" and result.get("success"):
+            try:
+                await run_blocking(LANE_IO, csv_to_tcrec, host_path, output_path)
+                os.remove(host_path)
+                result["outputPath"] = output_path
+            except (OSError, ValueError) as e:
+                result["outputPath"] = host_path
+                result["errorMessage"] = f"Recorded to CSV, but converting it to {EXTENSION} failed: {e}"
+
+    output = _format_record_result(result, f"{ams_net_id}:{port}", variables, sample_time_ms, duration_sec,
+                                   output_path)
+    return [TextContent(type="text", text=add_timing_to_output(output, tool_start_time))]
+
+
+def _default_record_path(output_format: str | None) -> str:
+    import os
+    from datetime import datetime
+
+    return os.path.join(
+        os.environ.get("TEMP", "/tmp"),
+        f"ads_record_{datetime.now():%Y%m%d_%H%M%S}{EXTENSION if output_format == 'tcrec' else '.csv'}"
+    )
+
+
+def _format_record_result(result: dict, target: str, variables: list, sample_time_ms, duration_sec,
+                          output_path: str) -> str:
+    """A finished recording's result (case-insensitive keys), as text."""
+    if not result.get("success"):
+        return f"❌ ADS recording failed: {result.get('errorMessage', 'Unknown error')}"
+    csv_path = result.get("outputPath", output_path)
+    sample_count = result.get("samplesCollected", result.get("sampleCount", "?"))
+    actual_duration = result.get("durationSeconds", duration_sec)
+    output = f"✅ ADS Recording Complete\n\n"
+    output += f"📡 Target: {target}\n"
+    output += f"📊 Variables: {', '.join(variables)}\n"
+    output += f"⏱ Duration: {actual_duration:.1f}s at {sample_time_ms}ms intervals\n"
+    output += f"📈 Samples: {sample_count}\n"
+    if result.get("droppedRows"):
+        output += f"⚠️ {result.get('droppedRows')} row(s) dropped: the disk could not keep up\n"
+    if result.get("triggerStatus"):
+        output += f"🎯 Trigger: {result.get('triggerStatus')}\n"
+    if result.get("errorMessage"):
+        output += f"⚠️ {result.get('errorMessage')}\n"
+    output += f"💾 Output: `{csv_path}`"
+    return output
+
+
+@register("twincat_ads_record_start")
+async def handle_ads_record_start(arguments: dict, tool_start_time: float) -> list[TextContent]:
+    ams_net_id = resolve_ams_net_id(arguments.get("amsNetId"))
+    port = arguments.get("port", 851)
+    variables: list = arguments.get("variables", [])
+    output_format = arguments.get("outputFormat")
+    output_path = arguments.get("outputPath") or _default_record_path(output_format)
+
+    try:
+        async with lane_slot(LANE_ADS):
+            result = await jobs.start(
+                ams_net_id, int(port), [str(v) for v in variables], output_path,
+                sample_time_ms=int(arguments.get("sampleTimeMs", 10)),
+                duration_sec=float(arguments.get("durationSec", 0)),
+                start_trigger=arguments.get("startTrigger"), stop_trigger=arguments.get("stopTrigger"),
+                max_time_sec=float(arguments.get("maxTimeSec", 60)), output_format=output_format,
+                tail_rows=int(arguments.get("tailRows", jobs.DEFAULT_TAIL_ROWS)),
+            )
+    except ads_client.AdsConnectionError as e:
+        # The host can only record in the foreground.
+        output = (f"❌ Background recording needs the Python ADS client, and the AMS router can't be "
+                  f"reached ({e}). twincat_ads_record can still record through TcAutomation.")
+        return [TextContent(type="text", text=output)]
+
+    if result.get("Success"):
+        job_id = result["JobId"]
+        status = "waiting for the start trigger" if result["Status"] == "waiting" else "recording"
+        output = f"⏺ Recording **{job_id}** started on {ams_net_id}:{port} ({status})\n\n"
+        output += f"📊 Variables: {', '.join(result['Variables'])}\n"
+        output += f"💾 Output: `{result['OutputPath']}`\n"
+        output += (f'➡️ Check with twincat_ads_record_status `jobId: "{job_id}"`, '
+                   f'finish with twincat_ads_record_stop `jobId: "{job_id}"`')
     else:
-        output = f"❌ ADS recording failed: {result.get('errorMessage', 'Unknown error')}"
+        output = f"❌ Failed to start recording: {result.get('ErrorMessage', 'Unknown error')}"
 
     return [TextContent(type="text", text=add_timing_to_output(output, tool_start_time))]
+
+
+@register("twincat_ads_record_status")
+async def handle_ads_record_status(arguments: dict, tool_start_time: float) -> list[TextContent]:
+    job_id = str(arguments.get("jobId") or "")
+    result = jobs.status(job_id, int(arguments.get("tail", jobs.DEFAULT_STATUS_ROWS)))
+
+    if not result.get("Success"):
+        output = f"❌ {result.get('ErrorMessage', 'Unknown error')}"
+    elif not job_id:
+        listed = result["Jobs"]
+        output = f"⏺ {len(listed)} recording(s)\n\n" if listed else "⏺ No recordings"
+        for job in listed:
+            output += (f"  **{job['JobId']}** {job['Status']} on {job['AmsNetId']}:{job['Port']}, "
+                       f"{job.get('RowsWritten', 0) + job.get('RowsBuffered', 0)} rows, "
+                       f"{job['ElapsedSeconds']}s: {', '.join(job['Variables'])}\n")
+    else:
+        rows = result.get("RowsWritten", 0) + result.get("RowsBuffered", 0)
+        output = f"⏺ Recording **{job_id}**: {result['Status']}, {rows} rows in {result['ElapsedSeconds']}s\n"
+        if result.get("DroppedRows"):
+            output += f"⚠️ {result['DroppedRows']} row(s) dropped: the disk could not keep up\n"
+        if result.get("OutputPath"):
+            output += f"💾 Output: `{result['OutputPath']}`\n"
+        final = result.get("Result")
+        if final is not None:
+            outcome = ("finished" if final.get("Success")
+                       else f"failed: {final.get('ErrorMessage', 'Unknown error')}")
+            output += f"🏁 Recording {outcome}; twincat_ads_record_stop returns the result\n"
+        if result["Tail"]:
+            output += f"\n📈 Last {len(result['Tail'])} row(s):\n"
+            output += f"  Timestamp, {', '.join(result['Variables'])}\n"
+            for row in result["Tail"]:
+                output += f"  {', '.join(row)}\n"
+
+    return [TextContent(type="text", text=add_timing_to_output(output.rstrip("\n"), tool_start_time))]
+
+
+@register("twincat_ads_record_stop")
+async def handle_ads_record_stop(arguments: dict, tool_start_time: float) -> list[TextContent]:
+    job_id = str(arguments.get("jobId") or "")
+    job = jobs.get_jobs().get(job_id)
+    result = await jobs.stop(job_id)
+
+    if job is None:
+        output = f"❌ {result.get('ErrorMessage', 'Unknown error')}"
+    else:
+        recorder = job.recorder
+        output = _format_record_result(_ci_wrap(result), f"{recorder.ams_net_id}:{recorder.ams_port}",
+                                       recorder.variables, recorder.sample_time_ms, recorder.duration_sec,
+                                       recorder.output_path)
+    return [TextContent(type="text", text=add_timing_to_output(output, tool_start_time))]
+
+
+@register("twincat_convert_recording")
+async def handle_convert_recording(arguments: dict, tool_start_time: float) -> list[TextContent]:
+    import os
+
+    input_path = arguments.get("inputPath")
+    if not input_path:
+        return [TextContent(type="text", text="❌ inputPath is required")]
+    try:
+        output_path, rows = await run_blocking(LANE_IO, convert, input_path, arguments.get("outputPath"))
+    except (OSError, ValueError) as e:
+        return [TextContent(type="text", text=f"❌ Conversion failed: {e}")]
+
+    before = os.path.getsize(os.path.abspath(os.path.expanduser(input_path))) // 1024
+    after = os.path.getsize(output_path) // 1024
+    output = f"✅ Recording converted\n\n"
+    output += f"📈 Rows: {rows}\n"
+    output += f"📦 Size: {before} KB → {after} KB\n"
+    output += f"💾 Output: `{output_path}`"
+    return [TextContent(type="text", text=add_timing_to_output(output, tool_start_time))]
+
+
+@register("twincat_analyze_recording")
+async def handle_analyze_recording(arguments: dict, tool_start_time: float) -> list[TextContent]:
+    path = arguments.get("path")
+    if not path:
+        return [TextContent(type="text", text="❌ path is required")]
+    try:
+        result = await run_blocking(LANE_IO, analyze, path, arguments.get("variables") or None,
+                                    arguments.get("percentiles") or None)
+    except (OSError, ValueError) as e:
+        return [TextContent(type="text", text=f"❌ Analysis failed: {e}")]
+
+    output = f"✅ Recording Analysis: `{result['Path']}`\n\n"
+    output += f"📈 {result['Rows']} rows ({result['Format']})"
+    if result.get("DurationSeconds") is not None:
+        output += f" over {result['DurationSeconds']:.3f}s, {result['Start']} to {result['End']}"
+    output += "\n"
+    interval = result.get("SampleIntervalMs")
+    if interval:
+        output += (f"⏱ Sample interval: mean {interval['Mean']:.4g} ms, jitter (std) {interval['Std']:.4g} ms, "
+                   f"min {interval['Min']:.4g} ms, max {interval['Max']:.4g} ms")
+        output += f", {interval['Gaps']} gap(s)\n" if interval["Gaps"] else "\n"
+    for channel in result["Channels"]:
+        data_type = f" ({channel['DataType']})" if channel.get("DataType") else ""
+        output += f"\n📊 **{channel['Name']}**{data_type}\n"
+        if not channel["Count"]:
+            output += "   no values\n"
+            continue
+        output += (f"   min {channel['Min']:.6g}, max {channel['Max']:.6g}, mean {channel['Mean']:.6g}, "
+                   f"std {channel['Std']:.6g}\n")
+        if channel["NaN"]:
+            output += f"   ⚠️ {channel['NaN']} NaN/Inf value(s)\n"
+        percentiles = ", ".join(f"{name.lower()} {value:.6g}" for name, value in channel["Percentiles"].items())
+        resolution = channel["PercentileResolution"]
+        output += f"   {percentiles}" + (f" (±{resolution:.3g})\n" if resolution else "\n")
+        output += f"   edges: {channel['RisingEdges']} rising, {channel['FallingEdges']} falling"
+        for label, key in (("rise", "RiseTimeMs"), ("fall", "FallTimeMs")):
+            times = channel.get(key)
+            if times:
+                output += f"; {label} {times['Mean']:.4g} ms ({times['Min']:.4g}–{times['Max']:.4g})"
+        output += "\n"
+    return [TextContent(type="text", text=add_timing_to_output(output.rstrip(), tool_start_time))]
+
+
+@register("twincat_preview_recording")
+async def handle_preview_recording(arguments: dict, tool_start_time: float) -> list[TextContent]:
+    import json as _json
+
+    path = arguments.get("path")
+    if not path:
+        return [TextContent(type="text", text="❌ path is required")]
+    try:
+        result = await run_blocking(LANE_IO, preview, path, arguments.get("variables") or None,
+                                    int(arguments.get("points", DEFAULT_POINTS)), arguments.get("method", "lttb"))
+    except (OSError, ValueError) as e:
+        return [TextContent(type="text", text=f"❌ Preview failed: {e}")]
+
+    output = f"✅ Recording Preview: `{result['Path']}`\n\n"
+    output += f"📈 {result['Rows']} rows, {result['Method']} to about {result['RequestedPoints']} points per variable"
+    if result.get("Start"):
+        output += f"; time in ms from {result['Start']}"
+    output += "\n"
+    for channel in result["Channels"]:
+        data_type = f" ({channel['DataType']})" if channel.get("DataType") else ""
+        pairs = _json.dumps([list(p) for p in zip(channel["TimeMs"], channel["Values"])], separators=(",", ":"))
+        output += f"\n📉 **{channel['Name']}**{data_type}: {channel['Points']} points [timeMs, value]\n`{pairs}`\n"
+    return [TextContent(type="text", text=add_timing_to_output(output.rstrip(), tool_start_time))]
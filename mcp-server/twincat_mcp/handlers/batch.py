@@ -18,7 +18,9 @@ import tempfile
 from mcp.types import TextContent
 
 from ..cli import run_tc_automation_with_progress
+from ..executor import LANE_DTE, run_blocking
 from ..formatting import add_timing_to_output, format_duration
+from ..progress import progress_callback
 from ..safety import (
     ARMED_MODE_TTL,
     CONFIRM_TOKEN,
@@ -123,8 +125,10 @@ async def handle_batch(arguments: dict, tool_start_time: float) -> list[TextCont
         tmp_file.flush()
         tmp_file.close()
 
-        result, progress_messages = run_tc_automation_with_progress(
-            "batch", ["--input", tmp_file.name], timeout_minutes
+        result, progress_messages = await run_blocking(
+            LANE_DTE, run_tc_automation_with_progress,
+            "batch", ["--input", tmp_file.name], timeout_minutes,
+            on_progress=progress_callback(),
         )
     finally:
         try:
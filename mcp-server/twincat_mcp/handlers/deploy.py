@@ -30,7 +30,7 @@ async def handle_deploy(arguments: dict, tool_start_time: float) -> list[TextCon
     if dry_run:
         step_args["dryRun"] = True
 
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "deploy", step_args,
         solution_path=solution_path,
         tc_version=tc_version,
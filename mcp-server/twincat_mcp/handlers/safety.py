@@ -7,25 +7,40 @@ Safety / meta handlers:
   - twincat_set_default_target         change the persistent default PLC
 
 None of these go through `run_shell_step` — they're either pure Python,
-file reads, or direct subprocess calls against the CLI helpers.
+file reads, or direct subprocess calls against the CLI helpers. Blocking
+work (janitor subprocess) runs on the "io" execution lane so these stay
+responsive during long shell steps.
 """
 
 import json
 import os
 import subprocess
+import time
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
 from mcp.types import TextContent
 
+from ..ads.jobs import get_jobs_if_alive
+from ..ads.pool import get_pool_if_alive as get_ads_pool_if_alive
+from ..ads.watch import get_watches_if_alive
 from ..cli import find_tc_automation_exe
 from ..defaults import (
     clear_persistent_default,
     get_default_status,
     set_persistent_default,
 )
-from ..formatting import add_timing_to_output
-from ..host import HOST_DISABLED, drop_shell_host, get_shell_host_if_alive
+from ..executor import LANE_IO, lane_usage, run_blocking
+from ..formatting import add_timing_to_output, format_duration
+from ..host import (
+    HOST_DISABLED,
+    drop_ads_host,
+    drop_shell_host,
+    get_ads_host_if_alive,
+    get_shell_host_if_alive,
+    get_shell_pool_if_alive,
+    prewarm_status,
+)
 from ..safety import arm_dangerous_operations, disarm_dangerous_operations
 from ._registry import register
 
@@ -72,7 +87,8 @@ async def handle_kill_stale(arguments: dict, tool_start_time: float) -> list[Tex
     every other automation's shell on the box.
 
     Safety model (defense in depth):
-      1) Kill our own persistent shell host + its DTE (we own those PIDs).
+      1) Kill our own persistent shell host + its DTE (we own those PIDs),
+         and the ADS host next to it.
       2) Run the janitor for session files from *crashed* MCP instances.
          Those are guaranteed-dead MCPs; their hosts/DTEs are orphans.
       3) NO title-based "headless sweep". The heuristic is unsafe —
@@ -82,39 +98,72 @@ async def handle_kill_stale(arguments: dict, tool_start_time: float) -> list[Tex
          file, it isn't ours.
     """
     output_parts: list[str] = []
-    killed_own_dte_pid = None
 
-    host = get_shell_host_if_alive()  # never triggers lazy start
-    if host is not None and host.is_alive():
+    pool = get_shell_pool_if_alive()  # never triggers lazy start
+    dte_pids: list[int] = []
+    hosts = [h for _, h in pool.entries()] + [pool.spare_host] if pool is not None else []
+    for host in hosts:
+        if host is None or not host.is_alive():
+            continue
         # Capture the DTE PID from status BEFORE shutting down, so we can
-        # force-kill in case graceful Quit hangs.
-        dte_pid = None
+        # force-kill in case graceful Quit hangs. A busy host would only
+        # answer after its current step, so don't ask it then.
+        if host.busy_step() is None:
+            try:
+                st = await host.status()
+                if isinstance(st, dict) and st.get("dtePid"):
+                    dte_pids.append(st.get("dtePid"))
+            except Exception:
+                pass
+        host_pid = host.local_status().get("hostPid")
         try:
-            st = host.status()
-            dte_pid = st.get("dtePid") if isinstance(st, dict) else None
+            await host.shutdown(timeout=8.0)
         except Exception:
-            dte_pid = None
+            pass
+        output_parts.append(f"🔪 Shut down our own shell host (PID {host_pid})")
+    if pool is not None:
+        await pool.shutdown_all()
+        drop_shell_host()
+
+    ads_host = get_ads_host_if_alive()
+    if ads_host is not None and ads_host.is_alive():
+        # The ADS host never opens a DTE, so there is nothing to force-kill
+        # behind it; a graceful shutdown is enough.
         try:
-            host.shutdown(timeout=8.0)
+            await ads_host.shutdown(timeout=8.0)
         except Exception:
             pass
-        drop_shell_host()
+        drop_ads_host()
+        output_parts.append("🔪 Shut down our own ADS host")
 
-        if dte_pid:
-            try:
-                subprocess.run(
-                    ["taskkill", "/F", "/PID", str(dte_pid)],
-                    capture_output=True, text=True, timeout=10,
-                    creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
-                )
-                killed_own_dte_pid = dte_pid
-            except Exception:
-                pass
+    output_parts += await run_blocking(LANE_IO, _kill_stale_blocking, dte_pids)
+
+    if not output_parts:
+        output_parts.append("✅ Nothing to clean up. Your Visual Studio / TcXaeShell sessions were not touched.")
+    else:
         output_parts.append(
-            "🔪 Shut down our own shell host"
-            + (f" (DTE PID {killed_own_dte_pid})" if killed_own_dte_pid else "")
+            "\nℹ️ This tool never kills `TcXaeShell.exe` or `devenv.exe` by image name — "
+            "your open IDE is safe."
         )
 
+    return [TextContent(type="text", text=add_timing_to_output("\n".join(output_parts), tool_start_time))]
+
+
+def _kill_stale_blocking(dte_pids: list[int]) -> list[str]:
+    """DTE force-kill + janitor sweep for twincat_kill_stale. Blocking."""
+    output_parts: list[str] = []
+
+    for dte_pid in dte_pids:
+        try:
+            subprocess.run(
+                ["taskkill", "/F", "/PID", str(dte_pid)],
+                capture_output=True, text=True, timeout=10,
+                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+            )
+            output_parts.append(f"🔪 Force-killed our own DTE (PID {dte_pid})")
+        except Exception:
+            pass
+
     # Run the C# janitor explicitly via `reap-orphans`. It walks the
     # session files from crashed MCPs and safely kills matching orphans
     # (start-time verified, so a reused PID never hits the wrong process).
@@ -138,32 +187,51 @@ async def handle_kill_stale(arguments: dict, tool_start_time: float) -> list[Tex
     except Exception as e:
         output_parts.append(f"⚠️ Janitor sweep skipped: {e}")
 
-    if not output_parts:
-        output_parts.append("✅ Nothing to clean up. Your Visual Studio / TcXaeShell sessions were not touched.")
-    else:
-        output_parts.append(
-            "\nℹ️ This tool never kills `TcXaeShell.exe` or `devenv.exe` by image name — "
-            "your open IDE is safe."
-        )
-
-    return [TextContent(type="text", text=add_timing_to_output("\n".join(output_parts), tool_start_time))]
+    return output_parts
 
 
 @register("twincat_host_status")
 async def handle_host_status(arguments: dict, tool_start_time: float) -> list[TextContent]:
     """Report persistent-host state. Read-only; never spawns the host."""
     host = get_shell_host_if_alive()
+    warmup = _format_prewarm()
     if host is None or not host.is_alive():
         if HOST_DISABLED:
             out = "⚫ Shell host: DISABLED (TWINCAT_DISABLE_HOST is set)"
+        elif warmup and (prewarm_status() or {}).get("finishedAt") is None:
+            out = "🟡 Shell host: STARTING (pre-warm)\n\n" + warmup
         else:
             out = ("⚫ Shell host: not running\n\n"
                    "It will be started lazily on the next tool call that needs TcXaeShell. "
                    "Expect a one-time 25-90s cost for that first call; subsequent calls reuse the shell.")
+        ads_line = _format_ads_host()
+        if ads_line:
+            out += "\n\n" + ads_line
         return [TextContent(type="text", text=add_timing_to_output(out, tool_start_time))]
 
+    # The host runs requests one at a time, so during a long step (build,
+    # tcunit) a status round-trip would queue behind it. Answer from the Python-side view
+    # instead; it's enough to tell the agent what is going on.
+    busy = host.busy_step()
+    if busy is not None:
+        command, since = busy
+        st = host.local_status()
+        lines = ["🟠 Shell host: BUSY\n"]
+        lines.append(f"  Running: {command} (for {format_duration(time.time() - since)})")
+        if warmup:
+            lines.append(warmup)
+        if st.get("hostPid") is not None:
+            lines.append(f"  Host PID: {st.get('hostPid')}")
+        lines.append(f"  Loaded solution: {st.get('solutionPath') or '(none yet)'}")
+        if st.get("pending", 0) > 1:
+            lines.append(f"  Queued behind it: {st.get('pending') - 1} request(s)")
+        lines += _format_pool()
+        lines.append(_format_ads_host() or "  ADS host: not running")
+        lines.append(_format_lanes())
+        return [TextContent(type="text", text=add_timing_to_output("\n".join(lines), tool_start_time))]
+
     try:
-        st = host.status()
+        st = await host.status()
     except Exception as e:
         return [TextContent(type="text", text=add_timing_to_output(f"❌ Failed to query host: {e}", tool_start_time))]
 
@@ -186,9 +254,108 @@ async def handle_host_status(arguments: dict, tool_start_time: float) -> list[Te
         lines.append(f"  Calls served: {st.get('callsServed')}")
     if st.get("startedUtc"):
         lines.append(f"  Started: {st.get('startedUtc')}")
+    if warmup:
+        lines.append(warmup)
+    lines += _format_pool()
+    lines.append(_format_ads_host() or "  ADS host: not running")
+    lines.append(_format_lanes())
     return [TextContent(type="text", text=add_timing_to_output("\n".join(lines), tool_start_time))]
 
 
+def _format_prewarm() -> str | None:
+    """Warm-up progress (see host.start_prewarm), or None if it never ran."""
+    st = prewarm_status()
+    if st is None:
+        return None
+    target = st.get("solutionPath") or "no preload solution"
+    elapsed = format_duration((st.get("finishedAt") or time.time()) - st["startedAt"])
+    phase = st["phase"]
+    if phase == "ready":
+        return f"  Warm-up: ready ({target}, took {elapsed})"
+    if phase == "failed":
+        return f"  Warm-up: FAILED after {elapsed} ({target}): {st.get('error')}"
+    if phase == "cancelled":
+        return f"  Warm-up: cancelled after {elapsed}"
+    line = f"  Warm-up: {phase} ({target}, {elapsed} so far)"
+    if st.get("progress"):
+        line += f"\n    Last progress: {st['progress']}"
+    return line
+
+
+def _format_pool() -> list[str]:
+    """
+    Warm-spare state (if enabled), then one line per pooled shell host,
+    most recent first — the latter only when the pool holds more than
+    one host (the details above already cover a single one).
+    """
+    pool = get_shell_pool_if_alive()
+    if pool is None:
+        return []
+    lines = []
+    spare = pool.spare_status()
+    if spare is not None:
+        line = f"  Warm spare: {spare['state']}"
+        if spare.get("hostPid") is not None:
+            line += f" (PID {spare['hostPid']}"
+            line += f", {spare['solutionPath']})" if spare.get("solutionPath") else ")"
+        if pool.promotions:
+            line += f" — promoted {pool.promotions} time(s) after a crash"
+        lines.append(line)
+    if len(pool) <= 1:
+        return lines
+    now = time.monotonic()
+    lines.append(f"  Host pool: {len(pool)}/{pool.max_size} shells (most recent first)")
+    for key, pooled in pool.entries():
+        solution = pooled.local_status().get("solutionPath") or (key[0] if key else "(no solution yet)")
+        if key and key[1]:
+            solution += f" [{key[1]}]"
+        if not pooled.is_alive():
+            state = "not started"
+        elif pooled.busy_step() is not None:
+            state = "busy"
+        else:
+            state = f"idle for {format_duration(now - pooled.last_active)}"
+        lines.append(f"    • {solution} — {state}")
+    return lines
+
+
+def _format_ads_host() -> str | None:
+    """
+    Summary of the ADS host, the pooled ADS connections, the watches and
+    the background recordings, or None if none is in use. Built from the Python-side view only, so it never
+    waits on the host.
+    """
+    lines = []
+    ads_host = get_ads_host_if_alive()
+    if ads_host is not None and ads_host.is_alive():
+        st = ads_host.local_status()
+        busy = ads_host.busy_step()
+        state = f"busy with {busy[0]}" if busy is not None else "idle"
+        lines.append(f"  ADS host: running (PID {st.get('hostPid')}, {state}, {st.get('pending', 0)} pending)")
+    pool = get_ads_pool_if_alive()
+    if pool is not None and len(pool):
+        targets = ", ".join(f"{c['amsNetId']}:{c['port']}" for c in pool.status())
+        lines.append(f"  ADS connections: {len(pool)}/{pool.max_connections} open ({targets})")
+    watches = get_watches_if_alive()
+    if watches is not None and len(watches):
+        summary = ", ".join(f"{w.id} ({len(w.names)} symbols, {w.buffer.next_seq - 1} samples)"
+                            for w in watches.watches())
+        lines.append(f"  ADS watches: {summary}")
+    recordings = get_jobs_if_alive()
+    if recordings is not None and len(recordings):
+        summary = ", ".join(f"{job.id} ({job.recorder.status}, {len(job.recorder.variables)} variables)"
+                            for job in recordings.jobs())
+        lines.append(f"  ADS recordings: {summary}")
+    return "\n".join(lines) or None
+
+
+def _format_lanes() -> str:
+    """One-line summary of execution-lane occupancy."""
+    usage = lane_usage()
+    parts = [f"{name} {u['inUse']}/{u['limit']}" for name, u in usage.items()]
+    return "  Lanes in use: " + ", ".join(parts)
+
+
 @register("twincat_list_routes")
 async def handle_list_routes(arguments: dict, tool_start_time: float) -> list[TextContent]:
     """List ADS routes from TwinCAT's StaticRoutes.xml (file read only)."""
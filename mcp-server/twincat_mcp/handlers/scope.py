@@ -22,6 +22,7 @@ from datetime import datetime
 from mcp.types import TextContent
 
 from ..cli import find_tc_automation_exe, run_tc_automation
+from ..executor import LANE_IO, run_blocking
 from ..formatting import add_timing_to_output
 from ._registry import register
 
@@ -140,7 +141,7 @@ async def handle_scope_create_config(arguments: dict, tool_start_time: float) ->
     if record_time_sec is not None:
         args.extend(["--recordtime", str(record_time_sec)])
 
-    result = run_tc_automation("scope-create", args)
+    result = await run_blocking(LANE_IO, run_tc_automation, "scope-create", args)
 
     if result.get("success"):
         output = f"✅ Scope Configuration Created\n\n"
@@ -164,7 +165,10 @@ async def handle_scope_start_record(arguments: dict, tool_start_time: float) ->
     config_path = arguments.get("configPath", "")
 
     try:
-        resp = _scope_session.send_command({"command": "start", "configPath": config_path})
+        resp = await run_blocking(
+            LANE_IO, _scope_session.send_command,
+            {"command": "start", "configPath": config_path},
+        )
         if resp.get("success"):
             output = f"🔴 Scope Recording Started\n\n"
             output += f"📁 Config: `{resp.get('configPath', config_path)}`\n"
@@ -186,7 +190,8 @@ async def handle_scope_stop_record(arguments: dict, tool_start_time: float) -> l
     fmt = arguments.get("format", "csv")
 
     try:
-        resp = _scope_session.send_command(
+        resp = await run_blocking(
+            LANE_IO, _scope_session.send_command,
             {"command": "stop", "outputPath": output_path, "format": fmt},
             timeout_seconds=60,
         )
@@ -213,7 +218,7 @@ async def handle_scope_get_status(arguments: dict, tool_start_time: float) -> li
         ))]
 
     try:
-        resp = _scope_session.send_command({"command": "status"})
+        resp = await run_blocking(LANE_IO, _scope_session.send_command, {"command": "status"})
         if resp.get("success"):
             state = resp.get("state", "Unknown")
             is_recording = state.lower() == "record"
@@ -240,7 +245,7 @@ async def handle_scope_export(arguments: dict, tool_start_time: float) -> list[T
     if output_path:
         args.extend(["--output", output_path])
 
-    result = run_tc_automation("scope-export", args)
+    result = await run_blocking(LANE_IO, run_tc_automation, "scope-export", args)
 
     if result.get("success"):
         out = result.get("outputPath", output_path)
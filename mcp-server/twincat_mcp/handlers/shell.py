@@ -30,7 +30,7 @@ async def handle_build(arguments: dict, tool_start_time: float) -> list[TextCont
     clean = arguments.get("clean", True)
     tc_version = arguments.get("tcVersion")
 
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "build", {"clean": clean},
         solution_path=solution_path, tc_version=tc_version,
         timeout_minutes=10,
@@ -136,7 +136,7 @@ async def handle_get_info(arguments: dict, tool_start_time: float) -> list[TextC
     solution_path = arguments.get("solutionPath", "")
     tc_version = arguments.get("tcVersion")
 
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "info", {},
         solution_path=solution_path, tc_version=tc_version,
         timeout_minutes=5,
@@ -168,7 +168,7 @@ async def handle_clean(arguments: dict, tool_start_time: float) -> list[TextCont
     solution_path = arguments.get("solutionPath", "")
     tc_version = arguments.get("tcVersion")
 
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "clean", {},
         solution_path=solution_path, tc_version=tc_version,
         timeout_minutes=5,
@@ -188,7 +188,7 @@ async def handle_set_target(arguments: dict, tool_start_time: float) -> list[Tex
     ams_net_id = resolve_ams_net_id(arguments.get("amsNetId"))
     tc_version = arguments.get("tcVersion")
 
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "set-target", {"amsNetId": ams_net_id},
         solution_path=solution_path, tc_version=tc_version,
         timeout_minutes=5,
@@ -210,7 +210,7 @@ async def handle_activate(arguments: dict, tool_start_time: float) -> list[TextC
     ams_net_id = resolve_ams_net_id(arguments.get("amsNetId"))
     tc_version = arguments.get("tcVersion")
 
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "activate", {"amsNetId": ams_net_id},
         solution_path=solution_path, tc_version=tc_version,
         timeout_minutes=10,
@@ -231,7 +231,7 @@ async def handle_restart(arguments: dict, tool_start_time: float) -> list[TextCo
     ams_net_id = resolve_ams_net_id(arguments.get("amsNetId"))
     tc_version = arguments.get("tcVersion")
 
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "restart", {"amsNetId": ams_net_id},
         solution_path=solution_path, tc_version=tc_version,
         timeout_minutes=5,
@@ -251,7 +251,7 @@ async def handle_list_plcs(arguments: dict, tool_start_time: float) -> list[Text
     solution_path = arguments.get("solutionPath", "")
     tc_version = arguments.get("tcVersion")
 
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "list-plcs", {},
         solution_path=solution_path, tc_version=tc_version,
         timeout_minutes=5,
@@ -293,7 +293,7 @@ async def handle_set_boot_project(arguments: dict, tool_start_time: float) -> li
     step_args: dict = {"autostart": autostart, "generate": generate}
     if plc_name:
         step_args["plcName"] = plc_name
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "set-boot-project", step_args,
         solution_path=solution_path, tc_version=tc_version,
         timeout_minutes=10,
@@ -320,7 +320,7 @@ async def handle_disable_io(arguments: dict, tool_start_time: float) -> list[Tex
     enable = arguments.get("enable", False)
     tc_version = arguments.get("tcVersion")
 
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "disable-io", {"enable": bool(enable)},
         solution_path=solution_path, tc_version=tc_version,
         timeout_minutes=5,
@@ -363,7 +363,7 @@ async def handle_set_variant(arguments: dict, tool_start_time: float) -> list[Te
         step_args["variantName"] = variant_name
     else:
         step_args["getOnly"] = True
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "set-variant", step_args,
         solution_path=solution_path, tc_version=tc_version,
         timeout_minutes=5,
@@ -384,7 +384,7 @@ async def handle_list_tasks(arguments: dict, tool_start_time: float) -> list[Tex
     solution_path = arguments.get("solutionPath", "")
     tc_version = arguments.get("tcVersion")
 
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "list-tasks", {},
         solution_path=solution_path, tc_version=tc_version,
         timeout_minutes=5,
@@ -422,7 +422,7 @@ async def handle_configure_task(arguments: dict, tool_start_time: float) -> list
         step_args["enable"] = bool(enable)
     if autostart is not None:
         step_args["autoStart"] = bool(autostart)
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "configure-task", step_args,
         solution_path=solution_path, tc_version=tc_version,
         timeout_minutes=5,
@@ -450,7 +450,7 @@ async def handle_configure_rt(arguments: dict, tool_start_time: float) -> list[T
         step_args["maxCpus"] = int(max_cpus)
     if load_limit is not None:
         step_args["loadLimit"] = int(load_limit)
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "configure-rt", step_args,
         solution_path=solution_path, tc_version=tc_version,
         timeout_minutes=5,
@@ -475,7 +475,7 @@ async def handle_check_all_objects(arguments: dict, tool_start_time: float) -> l
     step_args: dict = {}
     if plc_name:
         step_args["plcName"] = plc_name
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "check-all-objects", step_args,
         solution_path=solution_path, tc_version=tc_version,
         timeout_minutes=15,
@@ -531,7 +531,7 @@ async def handle_static_analysis(arguments: dict, tool_start_time: float) -> lis
     step_args: dict = {"checkAll": bool(check_all)}
     if plc_name:
         step_args["plcName"] = plc_name
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "static-analysis", step_args,
         solution_path=solution_path, tc_version=tc_version,
         timeout_minutes=15,
@@ -591,7 +591,7 @@ async def handle_generate_library(arguments: dict, tool_start_time: float) -> li
     }
     if library_location:
         step_args["libraryLocation"] = library_location
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "generate-library", step_args,
         solution_path=solution_path, tc_version=tc_version,
         timeout_minutes=15,
@@ -635,7 +635,7 @@ async def handle_get_error_list(arguments: dict, tool_start_time: float) -> list
     }
     if contains:
         step_args["contains"] = str(contains)
-    result, _ = run_shell_step(
+    result, _ = await run_shell_step(
         "get-error-list", step_args,
         solution_path=solution_path, tc_version=tc_version,
         timeout_minutes=5,
@@ -2,9 +2,10 @@
 TcUnit test-runner handler.
 
 Unlike the other shell-routed tools this one consumes the progress
-stream from `run_shell_step` to render a live execution log, then
-renders a test summary with pass/fail breakdown. The output formatter
-is the bulk of the file.
+stream from `run_shell_step` to render an execution log (phase icons
+come from `progress.classify_progress`, the same table that tags the
+live MCP progress notifications), then renders a test summary with
+pass/fail breakdown. The output formatter is the bulk of the file.
 """
 
 from mcp.types import TextContent
@@ -12,6 +13,7 @@ from mcp.types import TextContent
 from ..defaults import resolve_ams_net_id
 from ..dispatch import run_shell_step
 from ..formatting import add_timing_to_output
+from ..progress import format_progress_line
 from ._registry import register
 
 
@@ -39,7 +41,7 @@ async def handle_run_tcunit(arguments: dict, tool_start_time: float) -> list[Tex
     if skip_build:
         step_args["skipBuild"] = True
 
-    result, progress_messages = run_shell_step(
+    result, progress_messages = await run_shell_step(
         "run-tcunit", step_args,
         solution_path=solution_path,
         tc_version=tc_version,
@@ -52,27 +54,7 @@ async def handle_run_tcunit(arguments: dict, tool_start_time: float) -> list[Tex
     if progress_messages:
         output += "📋 Execution Log:\n"
         for msg in progress_messages:
-            low = msg.lower()
-            if "error" in low or "failed" in low:
-                output += f"  ❌ {msg}\n"
-            elif "succeeded" in low or "passed" in low or "completed" in low:
-                output += f"  ✅ {msg}\n"
-            elif "waiting" in low or "polling" in low:
-                output += f"  ⏳ {msg}\n"
-            elif "starting" in low or "opening" in low or "loading" in low:
-                output += f"  🔄 {msg}\n"
-            elif "building" in low or "cleaning" in low:
-                output += f"  🔨 {msg}\n"
-            elif "configuring" in low or "configured" in low:
-                output += f"  ⚙️ {msg}\n"
-            elif "activating" in low or "activated" in low:
-                output += f"  📤 {msg}\n"
-            elif "restarting" in low or "restart" in low:
-                output += f"  🔄 {msg}\n"
-            elif "disabling" in low or "disabled" in low:
-                output += f"  🚫 {msg}\n"
-            else:
-                output += f"  ▸ {msg}\n"
+            output += format_progress_line(msg)
         output += "\n"
 
     if result.get("success"):
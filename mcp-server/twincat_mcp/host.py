@@ -8,32 +8,60 @@ of per tool call. Combined with the C# parent-death watchdog +
 session-file janitor, phantom TcXaeShell processes are impossible even
 across hard crashes.
 
+The client is asyncio-native: requests are written immediately and
+matched to their responses by id, so several can be in flight at once
+and each caller is woken as soon as its own answer arrives. Progress
+lines are forwarded live to the calling tool's progress reporter (see
+progress.py) as well as returned with the result.
+
 The host is lazily spawned on the first shell-needing tool call and
-torn down via atexit on a clean Python exit (plus defensively by the
+torn down by server.main() on a clean exit (plus defensively by the
 host's own parent-death watchdog on crash).
 
+Shell hosts live in a small LRU pool keyed by (solution, tcVersion), so
+switching back and forth between a few solutions doesn't reload them in
+one DTE every time. The ADS host is separate: it never loads a solution
+and only serves ADS-only steps (get-state, read-var, ping-target, ...),
+so a quick variable read never waits behind a 5-minute build on the STA
+thread.
+
 Exports:
   - HOST_DISABLED          environment flag (TWINCAT_DISABLE_HOST=1)
+  - ADS_HOST_DISABLED      environment flag (TWINCAT_DISABLE_ADS_HOST=1)
   - HostError              exception type for host failures
+  - HostRestarted          HostError for calls lost to a cancel-restart
   - ShellHost              the subprocess-management class
+  - ShellHostPool          LRU pool of shell hosts
+  - SHELL_COMMANDS         commands that need a loaded solution
   - _CIDict, _ci_wrap      case-insensitive dict helpers
-  - get_shell_host()       lazy singleton accessor
-  - get_shell_host_if_alive()  non-starting accessor used by status/kill tools
-  - drop_shell_host()      clear the singleton without starting a new one
-  - shutdown_shell_host()  graceful shutdown (idempotent, used by atexit)
+  - get_shell_host()       pool-aware lazy accessor (DTE lane)
+  - get_ads_host()         lazy singleton accessor (ADS lane)
+  - get_shell_host_if_alive() / get_ads_host_if_alive()
+                           non-starting accessors used by status/kill tools
+  - get_shell_pool_if_alive()  the pool itself, without constructing it
+  - promote_spare_host()   swap the warm spare in for a crashed host
+  - drop_shell_host() / drop_ads_host()
+                           forget a host without starting a new one
+  - shutdown_shell_host()  graceful shutdown of all hosts (idempotent,
+                           awaited on exit)
+  - start_prewarm()        opt-in background warm-up at server start
+  - prewarm_status()       warm-up progress snapshot for host_status
 """
 
+import asyncio
 import atexit
 import json
 import os
-import queue
 import subprocess
 import sys
-import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
+from typing import Callable
 
 from .cli import find_tc_automation_exe
+from .defaults import get_preload_solution
+from .progress import ProgressReporter, current_reporter
 
 # -----------------------------------------------------------------------------
 # Environment knobs
@@ -43,6 +71,46 @@ from .cli import find_tc_automation_exe
 # CLI path (useful for isolating host-related issues).
 HOST_DISABLED = os.environ.get("TWINCAT_DISABLE_HOST", "").strip() in ("1", "true", "yes")
 
+# Set TWINCAT_DISABLE_ADS_HOST=1 to run ADS-only steps on the shell host
+# again instead of on their own host process (they then queue behind
+# whatever DTE step is running).
+ADS_HOST_DISABLED = os.environ.get("TWINCAT_DISABLE_ADS_HOST", "").strip() in ("1", "true", "yes")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# Shell-host pool limits. Every pooled host is a full TcXaeShell (several
+# hundred MB to over a GB), so the pool stays small and refuses to grow
+# when the machine is low on free physical memory.
+POOL_MAX_SIZE = max(1, _env_int("TWINCAT_HOST_POOL_SIZE", 2))
+POOL_IDLE_SECONDS = max(0, _env_int("TWINCAT_HOST_POOL_IDLE_MINUTES", 30)) * 60
+POOL_MIN_FREE_MB = max(0, _env_int("TWINCAT_HOST_POOL_MIN_FREE_MB", 2048))
+
+# Set TWINCAT_HOST_PREWARM=1 to start the host (and load the preload
+# solution, if one is configured) in the background as soon as the
+# server starts, instead of on the first shell-needing tool call.
+PREWARM_ENABLED = os.environ.get("TWINCAT_HOST_PREWARM", "").strip() in ("1", "true", "yes")
+
+# Set TWINCAT_HOST_SPARE=1 to keep one extra shell host started and idling
+# with the most recent solution loaded. If a pooled host crashes, the
+# spare takes its place at once instead of falling back to the CLI.
+SPARE_ENABLED = os.environ.get("TWINCAT_HOST_SPARE", "").strip() in ("1", "true", "yes")
+
+# Minimum delay before replacing a spare that failed to warm up, so a
+# broken install doesn't spawn hosts in a tight loop.
+SPARE_RETRY_SEC = 60.0
+
+# How long a cancelled (or timed-out) step may keep running after the host
+# acknowledged the cancel before the host and its DTE are killed and
+# respawned. Polling steps stop within a second; a single DTE call (build,
+# activate) can't be interrupted and ends up here.
+CANCEL_GRACE_SEC = max(0, _env_int("TWINCAT_HOST_CANCEL_GRACE_SEC", 10))
+
 
 # -----------------------------------------------------------------------------
 # Case-insensitive dict helpers
@@ -103,10 +171,32 @@ class HostError(Exception):
     to the legacy CLI path."""
 
 
+class HostRestarted(HostError):
+    """The host was killed on purpose because a cancelled step would not
+    stop, taking the calls queued behind it along. Nothing is wrong with
+    the host itself: retry on the same ShellHost, which respawns lazily."""
+
+
 # -----------------------------------------------------------------------------
 # ShellHost
 # -----------------------------------------------------------------------------
 
+# Commands that need a loaded solution in the host's DTE; everything else
+# the host accepts is ADS-only. Mirrors StepDispatcher.ShellCommands.
+SHELL_COMMANDS = frozenset({
+    "build", "info", "clean", "set-target", "activate", "restart",
+    "list-plcs", "set-boot-project", "disable-io", "set-variant",
+    "list-tasks", "configure-task", "configure-rt",
+    "check-all-objects", "static-analysis", "generate-library",
+    "get-error-list",
+    "deploy", "run-tcunit",
+})
+
+# Host responses can carry full build / symbol listings on one NDJSON line;
+# asyncio's default 64 KiB line limit is far too small for those.
+_STREAM_LIMIT = 64 * 1024 * 1024
+
+
 def _paths_equal(a: str, b: str) -> bool:
     try:
         na = os.path.normcase(os.path.normpath(os.path.abspath(a)))
@@ -121,359 +211,1052 @@ class ShellHost:
     Manages the lifecycle of a `TcAutomation.exe host` subprocess and
     dispatches JSON-RPC calls to it over NDJSON on stdin/stdout.
 
-    Concurrency model: one DTE is STA-affine, so all calls are serialized
-    through a single lock. Progress messages from stderr are captured per
-    call (fenced by request-id boundaries) and returned alongside the result.
+    Concurrency model: asyncio-native. Every request gets a Future keyed
+    by its id in `_pending`; one stdout reader task resolves them as
+    responses arrive, in whatever order. Requests are written as soon as
+    they're issued, so several can be in flight (pipelined) and each
+    caller wakes the moment its own response lands — no polling.
+
+    The C# host processes requests strictly in arrival order on its STA
+    thread, so the oldest pending request is the one executing. Progress
+    lines from stderr are attributed to it.
+
+    Shell steps additionally serialize the "ensure-solution, then send
+    execute-step" pair under `_solution_lock`, so a pipelined step always
+    runs against the solution it asked for.
 
     Lifecycle:
-      - First `ensure_solution()` / `call()` lazily starts the subprocess.
+      - First `ensure_solution()` / `execute_step()` / `status()` lazily
+        starts the subprocess.
       - `shutdown()` sends the graceful shutdown request and waits.
-      - atexit + signal handlers trigger shutdown on a clean exit.
+      - On interpreter exit the host's stdin hits EOF, which the C# side
+        treats as a graceful shutdown.
       - On a hard crash, the host's own parent-death watchdog takes over.
+
+    All methods must be awaited on the same event loop.
     """
 
     # Time to wait for the "ready" handshake line on startup.
     READY_TIMEOUT_SEC = 30.0
 
-    def __init__(self, exe_path: Path):
+    def __init__(self, exe_path: Path, role: str = "shell"):
         self._exe_path = exe_path
-        self._proc: subprocess.Popen | None = None
-        self._lock = threading.Lock()
-        self._stdout_thread: threading.Thread | None = None
-        self._stderr_thread: threading.Thread | None = None
-        self._responses: "queue.Queue[dict]" = queue.Queue()
-        self._progress: list[str] = []
-        self._progress_lock = threading.Lock()
+        # "shell" owns the DTE; "ads" only ever runs ADS-only steps.
+        self.role = role
+        self._proc: asyncio.subprocess.Process | None = None
+        self._stdout_task: asyncio.Task | None = None
+        self._stderr_task: asyncio.Task | None = None
+        self._start_lock: asyncio.Lock | None = None
+        self._solution_lock: asyncio.Lock | None = None
+        self._ready: asyncio.Future | None = None
+        # request id -> Future resolved with the raw response message.
+        self._pending: dict[int, asyncio.Future] = {}
+        # request id -> (label, sent_at, progress lines, reporter). Same
+        # keys as _pending; insertion order == host execution order. The
+        # reporter (if any) forwards progress to the calling tool's client.
+        self._inflight: dict[int, tuple[str, float, list[str], ProgressReporter | None]] = {}
+        # Ids whose caller stopped waiting (MCP cancel, timeout) while the
+        # host still has them. They stay in _pending/_inflight until the
+        # host answers, so busy_step() keeps telling the truth.
+        self._abandoned: set[int] = set()
+        self._cancel_tasks: set[asyncio.Task] = set()
+        # Set while we kill the host over a step that ignored its cancel.
+        self._restarting = False
+        self._dte_pid: int | None = None
         self._request_id = 0
         self._current_solution: str | None = None
         self._current_tc_version: str | None = None
         self._ready_info: dict | None = None
         self._last_error: str | None = None
+        # time.monotonic() of the last request sent or answered; the pool
+        # uses it for idle eviction.
+        self.last_active = time.monotonic()
 
     # ---------------- public API ----------------
 
     def is_alive(self) -> bool:
-        return self._proc is not None and self._proc.poll() is None
+        return self._proc is not None and self._proc.returncode is None
+
+    def busy_step(self) -> tuple[str, float] | None:
+        """(method_or_command, sent_at) of the request the host is working
+        on right now, or None. Lock-free; used by status tools that must
+        not queue behind a build."""
+        for label, sent_at, _, _ in self._inflight.values():
+            return label, sent_at
+        return None
+
+    def current_progress(self) -> str | None:
+        """Latest [PROGRESS] line of the running request, if any."""
+        for _, _, progress, _ in self._inflight.values():
+            return progress[-1] if progress else None
+        return None
+
+    def pending_count(self) -> int:
+        """Number of requests written to the host and not yet answered."""
+        return len(self._pending)
+
+    def local_status(self) -> dict:
+        """Python-side view of the host (no round-trip, never blocks)."""
+        proc = self._proc
+        ready = self._ready_info or {}
+        return {
+            "role": self.role,
+            "alive": self.is_alive(),
+            "hostPid": ready.get("hostPid") or (proc.pid if proc is not None else None),
+            "solutionPath": self._current_solution,
+            "startedUtc": ready.get("startedUtc"),
+            "pending": len(self._pending),
+        }
 
-    def status(self) -> dict:
+    async def status(self) -> dict:
         """Query the host for its own status. Starts the host if needed."""
-        if not self.is_alive():
-            self._ensure_started()
-        return self._call_raw("status", None, timeout=10)
+        await self._ensure_started()
+        result, _ = await self._call("status", None, timeout=10)
+        return result
 
-    def ensure_solution(self, solution_path: str, tc_version: str | None,
-                        timeout: float = 120.0) -> dict:
+    async def ensure_solution(self, solution_path: str, tc_version: str | None,
+                              timeout: float = 120.0) -> dict:
         """
         Ensure the host has the given solution loaded. Lazily starts the
         host and/or reloads a different solution.
         """
         if HOST_DISABLED:
             raise HostError("host disabled via TWINCAT_DISABLE_HOST")
-
         if not solution_path:
             raise HostError("ensure_solution requires a solution path")
 
-        with self._lock:
-            if not self.is_alive():
-                self._start_locked()
-
-            # Cheap idempotency: if already pointing at the same solution
-            # skip the round-trip. Comparison is normalized.
-            if self._current_solution and _paths_equal(self._current_solution, solution_path):
-                if (tc_version or None) == (self._current_tc_version or None):
-                    return {"loaded": True, "cached": True, "solutionPath": solution_path}
-
-            params = {"solutionPath": solution_path}
-            if tc_version:
-                params["tcVersion"] = tc_version
-            res = self._call_raw_locked("ensure-solution", params, timeout=timeout)
-            self._current_solution = solution_path
-            self._current_tc_version = tc_version
-            return res
-
-    def execute_step(self, command: str, step_args: dict,
-                     solution_path: str | None, tc_version: str | None,
-                     timeout: float = 600.0) -> tuple[dict, list[str]]:
+        await self._ensure_started()
+        async with self._get_solution_lock():
+            return await self._ensure_solution_locked(solution_path, tc_version, timeout)
+
+    async def execute_step(self, command: str, step_args: dict,
+                           solution_path: str | None, tc_version: str | None,
+                           timeout: float = 600.0) -> tuple[dict, list[str]]:
         """
         Run a single StepDispatcher command in the host's DTE.
         Returns (inner_result_dict, progress_messages).
         """
         if HOST_DISABLED:
             raise HostError("host disabled via TWINCAT_DISABLE_HOST")
+        if self.role == "ads" and command in SHELL_COMMANDS:
+            raise HostError(f"{command} needs the DTE; the ADS host cannot run it")
+
+        await self._ensure_started()
+        params = {"command": command, "args": step_args or {}}
 
         # Only shell commands need a loaded solution; ADS commands don't.
-        shell_commands = {
-            "build", "info", "clean", "set-target", "activate", "restart",
-            "list-plcs", "set-boot-project", "disable-io", "set-variant",
-            "list-tasks", "configure-task", "configure-rt",
-            "check-all-objects", "static-analysis", "generate-library",
-            "get-error-list",
-            "deploy", "run-tcunit",
-        }
-        if command in shell_commands:
+        if command in SHELL_COMMANDS:
             if not solution_path:
                 raise HostError(f"{command} requires a solution path")
-            self.ensure_solution(solution_path, tc_version, timeout=120.0)
-
-        with self._lock:
-            if not self.is_alive():
-                self._start_locked()
-
-            # Drain per-call progress buffer so we only attribute new lines
-            # to THIS call. Progress lines that arrived between calls get
-            # discarded (they would belong to the previous one).
-            with self._progress_lock:
-                self._progress.clear()
-
-            params = {"command": command, "args": step_args or {}}
-            resp = self._call_raw_locked("execute-step", params, timeout=timeout)
-
-            # HandleExecuteStep wraps: {command, result: <inner>}
-            # We want the inner command result.
-            inner = resp.get("result") if isinstance(resp, dict) else None
-            if inner is None:
-                inner = resp
-
-            with self._progress_lock:
-                progress = list(self._progress)
-
-            return inner, progress
-
-    def shutdown(self, timeout: float = 8.0):
+            async with self._get_solution_lock():
+                await self._ensure_solution_locked(solution_path, tc_version, 120.0)
+                # Written while still holding the lock: the host runs it
+                # before any later ensure-solution can switch solutions.
+                req_id, fut = self._send_request("execute-step", params, label=command)
+        else:
+            req_id, fut = self._send_request("execute-step", params, label=command)
+
+        resp, progress = await self._await_response(req_id, fut, "execute-step", timeout)
+
+        # HandleExecuteStep wraps: {command, result: <inner>}
+        # We want the inner command result.
+        inner = resp.get("result") if isinstance(resp, dict) else None
+        if inner is None:
+            inner = resp
+        return inner, progress
+
+    async def shutdown(self, timeout: float = 8.0):
         """Politely ask the host to shut down; force-kill if it won't."""
-        with self._lock:
-            if not self.is_alive():
-                return
+        proc = self._proc
+        if proc is None:
+            return
+        if self.is_alive():
             try:
                 self._send_request("shutdown", None)
             except Exception:
                 pass
-
-            end = time.time() + timeout
-            while time.time() < end and self.is_alive():
-                time.sleep(0.1)
-
-            if self.is_alive():
-                try:
-                    self._proc.kill()  # type: ignore
-                except Exception:
-                    pass
-
-            self._cleanup_locked()
+            try:
+                await asyncio.wait_for(proc.wait(), timeout)
+            except (asyncio.TimeoutError, Exception):
+                self.kill()
+        await self._cleanup()
+
+    def kill(self):
+        """Force-kill the subprocess. Synchronous; safe from any context."""
+        proc = self._proc
+        if proc is not None and proc.returncode is None:
+            try:
+                proc.kill()
+            except Exception:
+                pass
 
     # ---------------- internals ----------------
 
-    def _ensure_started(self):
-        with self._lock:
-            if not self.is_alive():
-                self._start_locked()
+    def _get_start_lock(self) -> asyncio.Lock:
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        return self._start_lock
 
-    def _start_locked(self):
+    def _get_solution_lock(self) -> asyncio.Lock:
+        if self._solution_lock is None:
+            self._solution_lock = asyncio.Lock()
+        return self._solution_lock
+
+    async def _ensure_started(self):
         if self.is_alive():
             return
+        async with self._get_start_lock():
+            if not self.is_alive():
+                await self._start()
 
+    async def _spawn(self):
+        """Launch the host subprocess. Overridden by tests with a fake."""
         cmd = [str(self._exe_path), "host", "--mcp-pid", str(os.getpid())]
+        return await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=str(self._exe_path.parent),
+            limit=_STREAM_LIMIT,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        )
+
+    async def _start(self):
+        if self._proc is not None:
+            await self._cleanup()
         try:
-            self._proc = subprocess.Popen(
-                cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                encoding="utf-8",
-                bufsize=1,
-                cwd=str(self._exe_path.parent),
-                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
-            )
+            self._proc = await self._spawn()
         except Exception as e:
             self._proc = None
             raise HostError(f"failed to spawn host: {e}")
+        self._restarting = False
 
-        # Kick off stream drainers before any other interaction; otherwise
-        # the pipe buffers can fill and deadlock on long runs.
-        self._stdout_thread = threading.Thread(
-            target=self._stdout_loop, name="ShellHostStdout", daemon=True)
-        self._stderr_thread = threading.Thread(
-            target=self._stderr_loop, name="ShellHostStderr", daemon=True)
-        self._stdout_thread.start()
-        self._stderr_thread.start()
-
-        # Wait for the ready line (the very first message the host emits).
-        deadline = time.time() + self.READY_TIMEOUT_SEC
-        while time.time() < deadline:
-            if not self.is_alive():
-                err = self._last_error or "host exited during startup"
-                raise HostError(err)
-            if self._ready_info is not None:
-                return
-            time.sleep(0.05)
-
-        try: self._proc.kill()
-        except Exception: pass
-        raise HostError("timed out waiting for host 'ready' line")
+        loop = asyncio.get_running_loop()
+        self._ready = loop.create_future()
+        # Start draining both streams before anything else; otherwise the
+        # pipe buffers can fill and deadlock on long runs.
+        self._stdout_task = loop.create_task(self._stdout_loop(self._proc))
+        self._stderr_task = loop.create_task(self._stderr_loop(self._proc))
 
-    def _cleanup_locked(self):
+        try:
+            self._ready_info = await asyncio.wait_for(
+                asyncio.shield(self._ready), self.READY_TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            self.kill()
+            await self._cleanup()
+            raise HostError("timed out waiting for host 'ready' line")
+        except HostError:
+            await self._cleanup()
+            raise
+
+    async def _cleanup(self):
+        tasks = [t for t in (self._stdout_task, self._stderr_task) if t is not None]
+        tasks += [t for t in self._cancel_tasks if t is not asyncio.current_task()]
+        for t in tasks:
+            if not t.done():
+                t.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._fail_pending(HostError(self._last_error or "host shut down"))
         self._proc = None
-        self._stdout_thread = None
-        self._stderr_thread = None
+        self._stdout_task = None
+        self._stderr_task = None
+        self._ready = None
         self._ready_info = None
         self._current_solution = None
         self._current_tc_version = None
-        while not self._responses.empty():
-            try: self._responses.get_nowait()
-            except Exception: break
+        self._dte_pid = None
+
+    async def _ensure_solution_locked(self, solution_path: str, tc_version: str | None,
+                                      timeout: float) -> dict:
+        # Cheap idempotency: if already pointing at the same solution
+        # skip the round-trip. Comparison is normalized.
+        if self._current_solution and _paths_equal(self._current_solution, solution_path):
+            if (tc_version or None) == (self._current_tc_version or None):
+                return {"loaded": True, "cached": True, "solutionPath": solution_path}
+
+        params = {"solutionPath": solution_path}
+        if tc_version:
+            params["tcVersion"] = tc_version
+        res, _ = await self._call("ensure-solution", params, timeout=timeout)
+        self._current_solution = solution_path
+        self._current_tc_version = tc_version
+        if isinstance(res, dict) and isinstance(res.get("dtePid"), int):
+            self._dte_pid = res["dtePid"]
+        return res
 
     def _next_id(self) -> int:
         self._request_id += 1
         return self._request_id
 
-    def _send_request(self, method: str, params: dict | None) -> int:
-        if not self.is_alive():
+    def _send_request(self, method: str, params: dict | None,
+                      label: str | None = None,
+                      track: bool = True) -> tuple[int, asyncio.Future]:
+        """Write one request line and register its Future. Never blocks:
+        the line goes into the transport buffer in a single write.
+        `track=False` keeps it out of `_inflight`, for requests the host
+        answers out of band (cancel) rather than in execution order."""
+        proc = self._proc
+        if proc is None or not self.is_alive():
             raise HostError("host process is not running")
         req_id = self._next_id()
         payload = {"id": req_id, "method": method}
         if params is not None:
             payload["params"] = params
-        line = json.dumps(payload, separators=(",", ":"))
+        line = json.dumps(payload, separators=(",", ":")) + "\n"
+
+        fut = asyncio.get_running_loop().create_future()
+        self.last_active = time.monotonic()
+        self._pending[req_id] = fut
+        if track:
+            self._inflight[req_id] = (label or method, time.time(), [], current_reporter())
         try:
-            self._proc.stdin.write(line + "\n")  # type: ignore
-            self._proc.stdin.flush()  # type: ignore
-        except (BrokenPipeError, OSError) as e:
+            proc.stdin.write(line.encode("utf-8"))  # type: ignore[union-attr]
+        except (BrokenPipeError, ConnectionResetError, OSError, RuntimeError) as e:
+            self._pending.pop(req_id, None)
+            self._inflight.pop(req_id, None)
             raise HostError(f"failed to write to host stdin: {e}")
-        return req_id
+        return req_id, fut
 
-    def _call_raw(self, method: str, params: dict | None, timeout: float) -> dict:
-        with self._lock:
-            return self._call_raw_locked(method, params, timeout)
+    async def _await_response(self, req_id: int, fut: asyncio.Future, method: str,
+                              timeout: float) -> tuple[dict, list[str]]:
+        """Wait for the response to `req_id`. Returns (result, progress).
 
-    def _call_raw_locked(self, method: str, params: dict | None, timeout: float) -> dict:
-        req_id = self._send_request(method, params)
-        deadline = time.time() + timeout
-        while True:
-            remaining = deadline - time.time()
-            if remaining <= 0:
-                raise HostError(f"{method} timed out after {timeout:.0f}s")
-            try:
-                msg = self._responses.get(timeout=min(remaining, 0.5))
-            except queue.Empty:
-                if not self.is_alive():
-                    raise HostError(self._last_error or "host exited during call")
-                continue
+        If the caller is cancelled (MCP client cancelled the tool call) or
+        times out, it is released at once and the request is handed to
+        `_abandon`, which asks the host to cancel it."""
+        entry = None
+        try:
+            # Shielded: cancelling the wait must not cancel the Future, the
+            # stdout reader still has to match the host's eventual answer.
+            msg = await asyncio.wait_for(asyncio.shield(fut), timeout)
+        except asyncio.TimeoutError:
+            self._abandon(req_id, fut)
+            raise HostError(f"{method} timed out after {timeout:.0f}s")
+        except asyncio.CancelledError:
+            self._abandon(req_id, fut)
+            raise
+        finally:
+            self.last_active = time.monotonic()
+            if req_id not in self._abandoned:
+                self._pending.pop(req_id, None)
+                entry = self._inflight.pop(req_id, None)
+        progress = list(entry[2]) if entry else []
+
+        if msg.get("ok"):
+            return msg.get("result", {}), progress
+        err = msg.get("error") or "host returned error"
+        raise HostError(str(err))
+
+    async def _call(self, method: str, params: dict | None, timeout: float) -> tuple[dict, list[str]]:
+        req_id, fut = self._send_request(method, params)
+        return await self._await_response(req_id, fut, method, timeout)
+
+    def _fail_pending(self, exc: Exception):
+        for req_id, fut in self._pending.items():
+            if not fut.done():
+                fut.set_exception(exc)
+                if req_id in self._abandoned:
+                    fut.exception()  # nobody awaits it; don't log "never retrieved"
+        self._pending.clear()
+        self._inflight.clear()
+        self._abandoned.clear()
+
+    # ---------------- cancellation ----------------
+
+    def _abandon(self, req_id: int, fut: asyncio.Future) -> None:
+        """The caller of `req_id` stopped waiting but the host may still be
+        working on it. Keep it booked as in flight (without the caller's
+        progress reporter) until the host answers, and ask the host to
+        cancel it."""
+        if fut.done() or req_id not in self._pending or not self.is_alive():
+            return
+        self._abandoned.add(req_id)
+        entry = self._inflight.get(req_id)
+        if entry is not None:
+            self._inflight[req_id] = (entry[0], entry[1], entry[2], None)
+        task = asyncio.get_running_loop().create_task(self._cancel_request(req_id, fut))
+        self._cancel_tasks.add(task)
+        task.add_done_callback(self._cancel_tasks.discard)
+
+    async def _cancel_request(self, req_id: int, fut: asyncio.Future) -> None:
+        """Send `cancel` for `req_id`. If the host reports it running and it
+        hasn't finished `CANCEL_GRACE_SEC` later, kill and respawn the host:
+        a DTE stuck in one long call would otherwise block every request
+        queued behind it."""
+        deadline = time.monotonic() + CANCEL_GRACE_SEC
+        state = "running"
+        try:
+            cancel_id, cancel_fut = self._send_request("cancel", {"id": req_id}, track=False)
+        except HostError:
+            return
+        try:
+            msg = await asyncio.wait_for(cancel_fut, max(0.0, deadline - time.monotonic()))
+            if msg.get("ok") and isinstance(msg.get("result"), dict):
+                state = msg["result"].get("state") or state
+            # An older host answers "Unknown method" (once the step is
+            # done): treat it as running and let the grace period decide.
+        except (asyncio.TimeoutError, HostError):
+            pass
+        finally:
+            self._pending.pop(cancel_id, None)
 
-            if not isinstance(msg, dict):
-                continue
-            if msg.get("id") != req_id:
-                # Out-of-order or unsolicited; drop with a note.
-                continue
+        if state != "running":
+            # "dropped": the host answers it with an error when its turn
+            # comes. "not-found": it already finished.
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), max(0.0, deadline - time.monotonic()))
+            return
+        except asyncio.TimeoutError:
+            pass
+        except Exception:
+            return  # host died on its own meanwhile
+        if fut.done() or not self.is_alive():
+            return
 
-            if msg.get("ok"):
-                return msg.get("result", {})
+        sys.stderr.write(
+            f"[mcp-server] host request {req_id} still running {CANCEL_GRACE_SEC}s after cancel; "
+            "restarting host\n")
+        sys.stderr.flush()
+        self._restarting = True
+        self._last_error = f"host restarted: request {req_id} ignored cancel"
+        dte_pid = self._dte_pid
+        self.kill()
+        if dte_pid:
+            await self._kill_dte(dte_pid)
+
+    async def _kill_dte(self, pid: int) -> None:
+        """Force-kill the DTE of a host we just killed. The next host's
+        session-file janitor would reap it too, but only once one starts."""
+        try:
+            if os.name == "nt":
+                proc = await asyncio.create_subprocess_exec(
+                    "taskkill", "/F", "/PID", str(pid),
+                    stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+                    creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+                )
+                await asyncio.wait_for(proc.wait(), 10)
             else:
-                err = msg.get("error") or "host returned error"
-                raise HostError(str(err))
+                os.kill(pid, 9)
+        except Exception:
+            pass
 
-    def _stdout_loop(self):
+    async def _stdout_loop(self, proc):
         try:
-            proc = self._proc
-            if proc is None or proc.stdout is None:
-                return
-            for line in proc.stdout:
-                line = line.strip()
+            while True:
+                raw = await proc.stdout.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", errors="replace").strip()
                 if not line:
                     continue
                 try:
                     msg = json.loads(line)
                 except json.JSONDecodeError:
                     continue
-                if isinstance(msg, dict) and msg.get("type") == "ready":
-                    self._ready_info = msg
+                if not isinstance(msg, dict):
                     continue
-                self._responses.put(msg)
+                if msg.get("type") == "ready":
+                    if self._ready is not None and not self._ready.done():
+                        self._ready.set_result(msg)
+                    continue
+                req_id = msg.get("id")
+                fut = self._pending.get(req_id)
+                if fut is not None and not fut.done():
+                    fut.set_result(msg)
+                if req_id in self._abandoned:
+                    # Nobody awaits it any more; retire the bookkeeping.
+                    self._abandoned.discard(req_id)
+                    self._pending.pop(req_id, None)
+                    self._inflight.pop(req_id, None)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._last_error = self._last_error or f"host stdout reader failed: {e}"
+
+        # EOF: the host is gone. Let the process settle so is_alive() turns
+        # false, then wake everyone still waiting.
+        try:
+            await asyncio.wait_for(proc.wait(), 5.0)
         except Exception:
             pass
+        err_type = HostRestarted if self._restarting else HostError
+        err = err_type(self._last_error or "host exited during call")
+        if self._ready is not None and not self._ready.done():
+            self._ready.set_exception(HostError(self._last_error or "host exited during startup"))
+        self._fail_pending(err)
 
-    def _stderr_loop(self):
+    async def _stderr_loop(self, proc):
         try:
-            proc = self._proc
-            if proc is None or proc.stderr is None:
-                return
-            for line in proc.stderr:
-                line = line.rstrip()
+            while True:
+                raw = await proc.stderr.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", errors="replace").rstrip()
                 if not line:
                     continue
                 if line.startswith("[PROGRESS]"):
                     clean = line[len("[PROGRESS]"):].strip()
-                    with self._progress_lock:
-                        self._progress.append(clean)
+                    # The host is serial: the oldest in-flight request is
+                    # the one producing output.
+                    for _, _, progress, reporter in self._inflight.values():
+                        progress.append(clean)
+                        if reporter is not None:
+                            reporter.report(clean)
+                        break
                 else:
                     # Retain a breadcrumb for diagnostics; the latest stderr
                     # line is surfaced in HostError messages when the host
                     # dies unexpectedly.
                     self._last_error = line
+        except asyncio.CancelledError:
+            raise
         except Exception:
             pass
 
 
 # -----------------------------------------------------------------------------
-# Module-level singleton + lifecycle helpers
+# Shell-host pool
 # -----------------------------------------------------------------------------
 
-_shell_host: ShellHost | None = None
-_shell_host_init_lock = threading.Lock()
+PoolKey = tuple[str, str | None]
 
 
-def get_shell_host() -> ShellHost | None:
-    """Return the shared ShellHost, constructing it on first use.
-    Returns None if the host is disabled or the exe cannot be found."""
-    global _shell_host
-    if HOST_DISABLED:
+def _pool_key(solution_path: str, tc_version: str | None) -> PoolKey:
+    try:
+        norm = os.path.normcase(os.path.normpath(os.path.abspath(solution_path)))
+    except Exception:
+        norm = solution_path
+    return norm, (tc_version or None)
+
+
+def _available_memory_mb() -> int | None:
+    """Free physical memory in MB, or None if it can't be determined."""
+    if os.name == "nt":
+        try:
+            import ctypes
+
+            class _MemoryStatusEx(ctypes.Structure):
+                _fields_ = [
+                    ("dwLength", ctypes.c_ulong),
+                    ("dwMemoryLoad", ctypes.c_ulong),
+                    ("ullTotalPhys", ctypes.c_ulonglong),
+                    ("ullAvailPhys", ctypes.c_ulonglong),
+                    ("ullTotalPageFile", ctypes.c_ulonglong),
+                    ("ullAvailPageFile", ctypes.c_ulonglong),
+                    ("ullTotalVirtual", ctypes.c_ulonglong),
+                    ("ullAvailVirtual", ctypes.c_ulonglong),
+                    ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+                ]
+
+            stat = _MemoryStatusEx()
+            stat.dwLength = ctypes.sizeof(_MemoryStatusEx)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(stat)):
+                return int(stat.ullAvailPhys // (1024 * 1024))
+        except Exception:
+            pass
         return None
-    if _shell_host is not None:
-        return _shell_host
-    with _shell_host_init_lock:
-        if _shell_host is None:
+    try:
+        with open("/proc/meminfo", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+class ShellHostPool:
+    """
+    Bounded LRU pool of shell hosts keyed by (normalized solution path,
+    tcVersion). Each host keeps its solution loaded, so going back to a
+    solution used earlier costs nothing instead of a full reload.
+
+    Growth rules, checked when a solution without a host is requested:
+      - A host that has no solution yet (e.g. it only ran ADS steps) is
+        bound to the solution first.
+      - Below `max_size`, a new host is created — unless free physical
+        memory is under `min_free_mb`.
+      - Otherwise the least-recently-used host (idle ones first) is
+        re-bound to the new solution. Its process is reused; only the
+        solution is switched, which is cheaper than a shell start.
+
+    Hosts other than the most recent one are shut down after
+    `idle_seconds` without traffic. The pool never holds fewer than one
+    host once it has been used.
+
+    With `spare=True` the pool also keeps a warm standby outside the LRU:
+    one extra host, started in the background and loaded with the most
+    recent solution. `promote_spare()` swaps it in for a crashed host
+    and starts warming a replacement.
+
+    `factory` builds a new, not-yet-started ShellHost. Must be used from
+    a single event loop.
+    """
+
+    def __init__(self, factory: Callable[[], ShellHost], max_size: int = POOL_MAX_SIZE,
+                 idle_seconds: float = POOL_IDLE_SECONDS, min_free_mb: int = POOL_MIN_FREE_MB,
+                 memory_probe: Callable[[], int | None] = _available_memory_mb,
+                 spare: bool = SPARE_ENABLED):
+        self._factory = factory
+        self.max_size = max(1, max_size)
+        self.idle_seconds = idle_seconds
+        self.min_free_mb = min_free_mb
+        self._memory_probe = memory_probe
+        # key -> host, least recently used first. Key None marks a host
+        # that hasn't been bound to a solution yet.
+        self._hosts: "OrderedDict[PoolKey | None, ShellHost]" = OrderedDict()
+        self._reaper: asyncio.Task | None = None
+        self._retiring: set[asyncio.Task] = set()
+        self.spare_enabled = spare
+        self._spare: ShellHost | None = None
+        self._spare_key: PoolKey | None = None  # solution the spare has loaded
+        self._spare_task: asyncio.Task | None = None
+        self._spare_failed_at: float | None = None
+        self.promotions = 0
+
+    # ---------------- lookup ----------------
+
+    def acquire(self, solution_path: str | None = None, tc_version: str | None = None) -> ShellHost:
+        """
+        Return the host for `solution_path`/`tc_version`, creating or
+        re-binding one per the rules above, and mark it most recently
+        used. Without a solution, returns the most recently used host.
+        Never blocks; hosts start lazily on their first call.
+        """
+        self._start_reaper()
+        self.evict_idle()
+
+        if not solution_path:
+            if not self._hosts:
+                self._hosts[None] = self._factory()
+            key = next(reversed(self._hosts))
+            return self._hosts[key]
+
+        key = _pool_key(solution_path, tc_version)
+        host = self._hosts.get(key)
+        if host is not None:
+            self._hosts.move_to_end(key)
+            self._sync_spare()
+            return host
+
+        if None in self._hosts:
+            host = self._hosts.pop(None)
+        elif not self._hosts or (len(self._hosts) < self.max_size and self._memory_allows_growth()):
+            host = self._factory()
+        else:
+            victim = self._pick_victim()
+            host = self._hosts.pop(victim)
+        self._hosts[key] = host
+        self._sync_spare()
+        return host
+
+    def most_recent(self) -> ShellHost | None:
+        """Most recently used host, or None if the pool is empty."""
+        if not self._hosts:
+            return None
+        return self._hosts[next(reversed(self._hosts))]
+
+    def entries(self) -> list[tuple[PoolKey | None, ShellHost]]:
+        """(key, host) pairs, most recently used first."""
+        return list(reversed(self._hosts.items()))
+
+    def __len__(self) -> int:
+        return len(self._hosts)
+
+    def discard(self, host: ShellHost) -> None:
+        """Forget `host` (e.g. it crashed) without shutting it down."""
+        for key, h in list(self._hosts.items()):
+            if h is host:
+                del self._hosts[key]
+
+    # ---------------- warm spare ----------------
+
+    @property
+    def spare_host(self) -> ShellHost | None:
+        return self._spare
+
+    def spare_status(self) -> dict | None:
+        """{"state", "solutionPath", "hostPid"} of the spare, or None when
+        spares are disabled. Never blocks."""
+        if not self.spare_enabled:
+            return None
+        spare = self._spare
+        if spare is None:
+            state = "failed" if self._spare_failed_at is not None else "none"
+            return {"state": state, "solutionPath": None, "hostPid": None}
+        warming = self._spare_task is not None and not self._spare_task.done()
+        return {
+            "state": "warming" if warming else ("ready" if spare.is_alive() else "stopped"),
+            "solutionPath": self._spare_key[0] if self._spare_key else None,
+            "hostPid": spare.local_status().get("hostPid"),
+        }
+
+    def promote_spare(self, dead: ShellHost) -> ShellHost | None:
+        """
+        Replace the crashed `dead` host with the spare, under the same
+        key, and start warming a new spare. Returns the promoted host, or
+        None if there is no spare (`dead` is forgotten either way). A
+        spare still warming up is promoted too: waiting for it is never
+        slower than starting a fresh host.
+        """
+        key = next((k for k, h in self._hosts.items() if h is dead), None)
+        self.discard(dead)
+        dead.kill()
+        spare = self._spare
+        if spare is None:
+            return None
+        self._spare = None
+        self._spare_key = None
+        self._spare_task = None  # if still running, it finishes warming `spare`
+        if key in self._hosts:
+            self._retire(self._hosts.pop(key))
+        self._hosts[key] = spare
+        self.promotions += 1
+        self._sync_spare()
+        return spare
+
+    def _sync_spare(self) -> None:
+        """Start or re-target the spare so it holds the most recent
+        solution. Cheap; called on every acquire."""
+        if not self.spare_enabled:
+            return
+        if self._spare_task is not None and not self._spare_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        mru = next(reversed(self._hosts), None) if self._hosts else None
+        if self._spare is None:
+            if (self._spare_failed_at is not None
+                    and time.monotonic() - self._spare_failed_at < SPARE_RETRY_SEC):
+                return
+            if not self._memory_allows_growth():
+                return
+            self._spare = self._factory()
+            self._spare_key = None
+        elif self._spare.is_alive() and (mru is None or mru == self._spare_key):
+            return
+        self._spare_task = loop.create_task(self._warm_spare(self._spare, mru))
+
+    async def _warm_spare(self, spare: ShellHost, key: PoolKey | None) -> None:
+        try:
+            await spare.status()
+            if key is not None:
+                await spare.ensure_solution(key[0], key[1], timeout=300.0)
+            if self._spare is spare:
+                self._spare_key = key
+                self._spare_failed_at = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            sys.stderr.write(f"[mcp-server] warm spare host failed: {e}\n")
+            sys.stderr.flush()
+            if self._spare is spare:
+                self._spare = None
+                self._spare_key = None
+                self._spare_failed_at = time.monotonic()
+                self._retire(spare)
+
+    # ---------------- eviction ----------------
+
+    def evict_idle(self, now: float | None = None) -> list[ShellHost]:
+        """Retire every host but the most recent one that has been idle
+        for longer than `idle_seconds`. Returns the retired hosts."""
+        if self.idle_seconds <= 0 or len(self._hosts) <= 1:
+            return []
+        now = time.monotonic() if now is None else now
+        mru = next(reversed(self._hosts))
+        evicted = []
+        for key, host in list(self._hosts.items()):
+            if key == mru or host.pending_count():
+                continue
+            if now - host.last_active >= self.idle_seconds:
+                del self._hosts[key]
+                self._retire(host)
+                evicted.append(host)
+        return evicted
+
+    async def shutdown_all(self, timeout: float = 8.0) -> None:
+        """Shut down every pooled host and the spare, and wait for
+        retiring ones."""
+        if self._reaper is not None and not self._reaper.done():
+            self._reaper.cancel()
+        self._reaper = None
+        if self._spare_task is not None and not self._spare_task.done():
+            self._spare_task.cancel()
+            await asyncio.gather(self._spare_task, return_exceptions=True)
+        self._spare_task = None
+        hosts = list(self._hosts.values())
+        if self._spare is not None:
+            hosts.append(self._spare)
+        self._spare = None
+        self._spare_key = None
+        self._hosts.clear()
+        for host in hosts:
             try:
-                exe = find_tc_automation_exe()
+                await host.shutdown(timeout=timeout)
             except Exception:
-                return None
-            _shell_host = ShellHost(exe)
-    return _shell_host
+                pass
+        if self._retiring:
+            await asyncio.gather(*self._retiring, return_exceptions=True)
+
+    # ---------------- internals ----------------
+
+    def _memory_allows_growth(self) -> bool:
+        if self.min_free_mb <= 0:
+            return True
+        free = self._memory_probe()
+        return free is None or free >= self.min_free_mb
+
+    def _pick_victim(self) -> PoolKey | None:
+        for key, host in self._hosts.items():
+            if not host.pending_count():
+                return key
+        return next(iter(self._hosts))
+
+    def _retire(self, host: ShellHost) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            host.kill()
+            return
+        task = loop.create_task(host.shutdown(timeout=8.0))
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+
+    def _start_reaper(self) -> None:
+        if self.idle_seconds <= 0:
+            return
+        if self._reaper is not None and not self._reaper.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._reaper = loop.create_task(self._reap_loop())
+
+    async def _reap_loop(self) -> None:
+        interval = max(1.0, min(60.0, self.idle_seconds / 4))
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+
+# -----------------------------------------------------------------------------
+# Module-level accessors + lifecycle helpers
+# -----------------------------------------------------------------------------
+
+_shell_pool: ShellHostPool | None = None
+_ads_host: ShellHost | None = None
+
+
+def get_shell_host(solution_path: str | None = None,
+                   tc_version: str | None = None) -> ShellHost | None:
+    """Return the pooled ShellHost for `solution_path`/`tc_version` (or
+    the most recently used one if no solution is given), constructing the
+    pool on first use. Returns None if the host is disabled or the exe
+    cannot be found. Construction is cheap; the subprocess starts on the
+    first call."""
+    global _shell_pool
+    if HOST_DISABLED:
+        return None
+    if _shell_pool is None:
+        try:
+            exe = find_tc_automation_exe()
+        except Exception:
+            return None
+        _shell_pool = ShellHostPool(lambda: ShellHost(exe))
+    return _shell_pool.acquire(solution_path, tc_version)
+
+
+def get_ads_host() -> ShellHost | None:
+    """Return the dedicated ADS-lane host, constructing it on first use.
+    Returns None if either host flag disables it or the exe is missing;
+    callers then route ADS steps through get_shell_host()."""
+    global _ads_host
+    if HOST_DISABLED or ADS_HOST_DISABLED:
+        return None
+    if _ads_host is None:
+        try:
+            exe = find_tc_automation_exe()
+        except Exception:
+            return None
+        _ads_host = ShellHost(exe, role="ads")
+    return _ads_host
 
 
 def get_shell_host_if_alive() -> ShellHost | None:
     """
-    Return the current ShellHost singleton WITHOUT constructing one.
-    Used by status/kill tools that must NOT accidentally spawn a new host
-    just to inspect its state.
+    Return the most recently used pooled ShellHost WITHOUT constructing
+    one. Used by status/kill tools that must NOT accidentally spawn a new
+    host just to inspect its state.
     """
-    return _shell_host
+    return _shell_pool.most_recent() if _shell_pool is not None else None
+
+
+def promote_spare_host(dead: ShellHost) -> ShellHost | None:
+    """Swap the pool's warm spare in for the crashed `dead` host. Returns
+    the promoted host, or None if there's no spare (`dead` is dropped
+    from the pool either way)."""
+    if _shell_pool is None:
+        return None
+    return _shell_pool.promote_spare(dead)
+
 
+def get_shell_pool_if_alive() -> ShellHostPool | None:
+    """Return the shell-host pool if it has been created, else None."""
+    return _shell_pool
 
-def drop_shell_host() -> None:
+
+def get_ads_host_if_alive() -> ShellHost | None:
+    """ADS-host counterpart of get_shell_host_if_alive()."""
+    return _ads_host
+
+
+def drop_shell_host(host: ShellHost | None = None) -> None:
     """
-    Clear the singleton reference without shutting anything down. Used by
-    callers that have already terminated the process externally (e.g.
-    twincat_kill_stale, or run_shell_step after detecting a dead host) so
-    the next get_shell_host() starts a fresh instance.
+    Forget `host` (or, with no argument, the whole pool) without shutting
+    anything down. Used by callers that have already terminated the
+    process externally (e.g. twincat_kill_stale, or run_shell_step after
+    detecting a dead host) so the next get_shell_host() starts a fresh
+    instance.
     """
-    global _shell_host
-    _shell_host = None
+    global _shell_pool
+    if host is None:
+        _shell_pool = None
+    elif _shell_pool is not None:
+        _shell_pool.discard(host)
+
+
+def drop_ads_host() -> None:
+    """ADS-host counterpart of drop_shell_host()."""
+    global _ads_host
+    _ads_host = None
+
+
+async def shutdown_shell_host() -> None:
+    """Tear down every pooled shell host and the ADS host. Idempotent;
+    awaited by server.main() on the way out."""
+    global _shell_pool, _ads_host
+    if _prewarm_task is not None and not _prewarm_task.done():
+        _prewarm_task.cancel()
+        await asyncio.gather(_prewarm_task, return_exceptions=True)
+    pool, ads_host = _shell_pool, _ads_host
+    _shell_pool = None
+    _ads_host = None
+    if pool is not None:
+        await pool.shutdown_all(timeout=8.0)
+    if ads_host is not None:
+        try:
+            await ads_host.shutdown(timeout=8.0)
+        except Exception:
+            pass
 
 
-def shutdown_shell_host() -> None:
-    """Tear down the persistent host. Idempotent; safe to call from atexit."""
-    global _shell_host
-    host = _shell_host
-    if host is None:
-        return
+# -----------------------------------------------------------------------------
+# Pre-warm
+# -----------------------------------------------------------------------------
+
+_prewarm_task: asyncio.Task | None = None
+_prewarm_state: dict | None = None
+
+
+def start_prewarm(solution_path: str | None = None,
+                  tc_version: str | None = None) -> asyncio.Task | None:
+    """
+    Warm the hosts up in the background: start the shell host and the ADS
+    host, then load `solution_path` (default: `defaults.get_preload_solution()`)
+    so the first build doesn't pay the 25-90s TcXaeShell start.
+
+    No-op unless TWINCAT_HOST_PREWARM is set. Returns immediately; the
+    work runs as a task on the current loop, and `prewarm_status()`
+    reports how far it got. Without a preload solution only the host
+    processes are started — the DTE itself opens with the first solution.
+    """
+    global _prewarm_task, _prewarm_state
+    if not PREWARM_ENABLED or HOST_DISABLED:
+        return None
+    if _prewarm_task is not None and not _prewarm_task.done():
+        return _prewarm_task
+    source = "argument"
+    if not solution_path:
+        solution_path, tc_version, source = get_preload_solution()
+    _prewarm_state = {
+        "phase": "starting host",
+        "solutionPath": solution_path,
+        "tcVersion": tc_version,
+        "source": source,
+        "startedAt": time.time(),
+        "finishedAt": None,
+        "error": None,
+    }
+    _prewarm_task = asyncio.get_running_loop().create_task(_prewarm(solution_path, tc_version))
+    return _prewarm_task
+
+
+def prewarm_status() -> dict | None:
+    """Snapshot of the pre-warm (phase, solution, timings, error, and the
+    latest host progress line while loading), or None if it never ran."""
+    if _prewarm_state is None:
+        return None
+    st = dict(_prewarm_state)
+    host = get_shell_host_if_alive()
+    if st["phase"] == "loading solution" and host is not None:
+        st["progress"] = host.current_progress()
+    return st
+
+
+async def _prewarm(solution_path: str | None, tc_version: str | None) -> None:
+    state = _prewarm_state
     try:
-        host.shutdown(timeout=8.0)
-    except Exception:
-        pass
-    _shell_host = None
+        host = get_shell_host(solution_path, tc_version)
+        if host is None:
+            raise HostError("TcAutomation.exe not found")
+        await host.status()
+        ads_host = get_ads_host()
+        if ads_host is not None:
+            try:
+                await ads_host.status()
+            except HostError:
+                pass  # ADS steps fall back to the shell host / CLI
+        if solution_path:
+            state["phase"] = "loading solution"
+            await host.ensure_solution(solution_path, tc_version, timeout=300.0)
+        state["phase"] = "ready"
+    except asyncio.CancelledError:
+        state["phase"] = "cancelled"
+        raise
+    except Exception as e:
+        state["phase"] = "failed"
+        state["error"] = str(e)
+        sys.stderr.write(f"[mcp-server] host pre-warm failed: {e}\n")
+        sys.stderr.flush()
+    finally:
+        state["finishedAt"] = time.time()
+
+
+def _close_shell_host_at_exit() -> None:
+    """
+    atexit fallback for exits that bypass server.main()'s cleanup. The
+    event loop is gone by now, so we can't await a graceful shutdown;
+    closing the host's stdin is enough — the C# request loop treats EOF
+    as "shut down", quits the DTE and deletes its session file.
+    """
+    hosts = [h for _, h in _shell_pool.entries()] + [_shell_pool.spare_host] if _shell_pool is not None else []
+    for host in hosts + [_ads_host]:
+        proc = host._proc if host is not None else None
+        if proc is None or proc.returncode is not None:
+            continue
+        try:
+            proc.stdin.close()  # type: ignore[union-attr]
+        except Exception:
+            pass
 
 
-# Register cleanup for graceful Python exits. Hard crashes are handled by
-# the host's parent-death watchdog + session-file janitor (see
-# Core/SessionFile.cs on the C# side).
-atexit.register(shutdown_shell_host)
+# Hard crashes are handled by the host's parent-death watchdog +
+# session-file janitor (see Core/SessionFile.cs on the C# side).
+atexit.register(_close_shell_host_at_exit)
@@ -0,0 +1,152 @@
+"""
+Live progress reporting from running steps to the MCP client.
+
+`TcAutomation.exe` narrates long steps with `[PROGRESS] ...` lines on
+stderr ("Building solution...", "Activating configuration...",
+"Waiting for TcUnit results..."). Both the persistent host client and
+the CLI runner hand each line to the reporter of the tool call that
+caused it the moment it arrives. The reporter forwards it as an MCP
+progress notification, so clients can show what a 10-minute run is
+doing instead of a silent spinner.
+
+Wiring:
+  - `server.call_tool` opens `reporting(send)` when the client passed a
+    progress token; the reporter is stored in a contextvar for the call.
+  - `ShellHost` captures `current_reporter()` when a request is sent
+    (the stderr reader runs in its own task, outside the call's context).
+  - CLI runners run on worker threads, so callers pass
+    `progress_callback()` to them explicitly. `report()` is thread-safe.
+
+Every line is tagged with a phase derived from its wording (see
+`classify_progress`). The same table drives the icons in the TcUnit
+execution log.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+from typing import AsyncIterator, Awaitable, Callable
+
+# -----------------------------------------------------------------------------
+# Phase classification
+# -----------------------------------------------------------------------------
+
+# (keywords, phase, icon). First match wins, so failure/success wording is
+# checked before the activity verbs that often appear in the same line
+# ("Build succeeded", "Activation failed"). "restarting" has to beat
+# "starting", which it contains.
+_PHASE_RULES: list[tuple[tuple[str, ...], str, str]] = [
+    (("error", "failed"), "error", "❌"),
+    (("succeeded", "passed", "completed"), "done", "✅"),
+    (("waiting", "polling"), "waiting", "⏳"),
+    (("restarting",), "restarting", "🔄"),
+    (("starting", "opening", "loading"), "loading", "🔄"),
+    (("building", "cleaning"), "building", "🔨"),
+    (("configuring", "configured"), "configuring", "⚙️"),
+    (("activating", "activated"), "activating", "📤"),
+    (("restart",), "restarting", "🔄"),
+    (("disabling", "disabled"), "disabling", "🚫"),
+]
+
+
+def classify_progress(message: str) -> tuple[str, str]:
+    """Return (phase, icon) for a progress line, e.g. ("activating", "📤").
+    Lines that match no rule are ("running", "▸")."""
+    low = message.lower()
+    for keywords, phase, icon in _PHASE_RULES:
+        if any(k in low for k in keywords):
+            return phase, icon
+    return "running", "▸"
+
+
+def format_progress_line(message: str) -> str:
+    """One execution-log line with its phase icon, as the handlers render it."""
+    _, icon = classify_progress(message)
+    return f"  {icon} {message}\n"
+
+
+# -----------------------------------------------------------------------------
+# Reporter
+# -----------------------------------------------------------------------------
+
+class ProgressReporter:
+    """
+    Forwards progress lines of one tool call through `send(progress,
+    message)`. Lines are numbered (the MCP progress value must increase)
+    and sent in order by a single drain task, so a slow client never
+    blocks the host's stderr reader. Send errors are swallowed: progress
+    is best-effort and must never fail the tool call.
+    """
+
+    def __init__(self, send: Callable[[float, str], Awaitable[None]]):
+        self._send = send
+        self._loop = asyncio.get_running_loop()
+        self._queue: "asyncio.Queue[tuple[int, str]]" = asyncio.Queue()
+        self._drain_task: asyncio.Task | None = None
+        self.count = 0
+        self.phase: str | None = None
+
+    def report(self, message: str) -> None:
+        """Queue `message` for the client. Safe to call from any thread."""
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._enqueue(message)
+        else:
+            try:
+                self._loop.call_soon_threadsafe(self._enqueue, message)
+            except RuntimeError:
+                pass  # loop closed; nobody is listening any more
+
+    async def aclose(self) -> None:
+        """Wait until every queued line has been sent."""
+        if self._drain_task is not None:
+            await asyncio.gather(self._drain_task, return_exceptions=True)
+
+    def _enqueue(self, message: str) -> None:
+        self.count += 1
+        self.phase, _ = classify_progress(message)
+        self._queue.put_nowait((self.count, f"{self.phase}: {message}"))
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = self._loop.create_task(self._drain())
+
+    async def _drain(self) -> None:
+        while not self._queue.empty():
+            progress, text = self._queue.get_nowait()
+            try:
+                await self._send(progress, text)
+            except Exception:
+                pass
+
+
+_current: contextvars.ContextVar[ProgressReporter | None] = contextvars.ContextVar(
+    "twincat_progress_reporter", default=None
+)
+
+
+@contextlib.asynccontextmanager
+async def reporting(send: Callable[[float, str], Awaitable[None]]) -> AsyncIterator[ProgressReporter]:
+    """Install a reporter for the current tool call. On exit, waits for
+    the queued lines so they reach the client before the result does."""
+    reporter = ProgressReporter(send)
+    token = _current.set(reporter)
+    try:
+        yield reporter
+    finally:
+        _current.reset(token)
+        await reporter.aclose()
+
+
+def current_reporter() -> ProgressReporter | None:
+    """Reporter of the running tool call, or None if the client didn't
+    ask for progress."""
+    return _current.get()
+
+
+def progress_callback() -> Callable[[str], None] | None:
+    """`report` of the current reporter, for blocking runners on worker
+    threads (contextvars don't follow `run_in_executor`)."""
+    reporter = _current.get()
+    return reporter.report if reporter is not None else None
@@ -502,6 +502,9 @@ def get_tool_schemas() -> list[Tool]:
                 "  • prefix='MAIN.'                → top-level globals\n"
                 "  • contains='fbStateMachine'      → find by FB name\n"
                 "  • prefix='MAIN.', contains='Status' → both\n\n"
+                "Results come in name order, `max` per page. When more "
+                "match, the result carries a `nextCursor`; pass it back as "
+                "`cursor` for the next page.\n\n"
                 "Requires the runtime in Run or Stop. If the target is "
                 "rebooting (typical right after activate), the handler "
                 "surfaces that explicitly and nudges you to "
@@ -536,6 +539,10 @@ def get_tool_schemas() -> list[Tool]:
                         "type": "boolean",
                         "description": "Include type name + size per symbol (default: false; bump when you need the schema to write or cast)",
                         "default": False
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "Continue after this cursor (the `nextCursor` of the previous page, same prefix/contains)"
                     }
                 },
                 "required": []
@@ -705,7 +712,9 @@ def get_tool_schemas() -> list[Tool]:
         ),
         Tool(
             name="twincat_read_var",
-            description="Read a PLC variable value via direct ADS connection. Does NOT require Visual Studio - connects directly to the PLC. Use symbol paths like 'MAIN.bMyBool' or 'GVL.nCounter'.",
+            description="Read a PLC variable value via direct ADS connection. Does NOT require Visual Studio - connects directly to the PLC. Use symbol paths like 'MAIN.bMyBool' or 'GVL.nCounter'. "
+                        "For large numeric arrays pass `start`/`count` (and optionally `dumpPath`): only that index range is read, "
+                        "and the result is summary statistics plus a preview instead of every value inline.",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -717,6 +726,18 @@ def get_tool_schemas() -> list[Tool]:
                         "type": "string",
                         "description": "Full symbol path of the variable (e.g., 'MAIN.bMyBool', 'GVL.nCounter')"
                     },
+                    "start": {
+                        "type": "integer",
+                        "description": "Array index to start at (declared bounds, e.g. 0 for ARRAY[0..9999]; row-major from 0 for multi-dimensional arrays). Numeric element types only. Default: first element"
+                    },
+                    "count": {
+                        "type": "integer",
+                        "description": "Number of array elements to read from `start`. Default: to the end of the array"
+                    },
+                    "dumpPath": {
+                        "type": "string",
+                        "description": "Write every value of the range to this file: .npy (NumPy) or .csv (index,value)"
+                    },
                     "port": {
                         "type": "integer",
                         "description": "ADS port number (default: 851 for PLC runtime 1)",
@@ -747,7 +768,9 @@ def get_tool_schemas() -> list[Tool]:
                     },
                     "value": {
                         "type": "string",
-                        "description": "Value to write (will be converted to appropriate type). Examples: 'true', '42', '3.14', 'Hello'"
+                        "description": "Value to write (will be converted to appropriate type). Examples: 'true', '42', '3.14', 'Hello'. "
+                                       "With TWINCAT_ADS_BACKEND=python also structs as JSON objects (members not named are kept), "
+                                       "arrays as JSON lists, enum names and time literals like 'T#1s500ms'"
                     },
                     "port": {
                         "type": "integer",
@@ -1254,8 +1277,8 @@ def get_tool_schemas() -> list[Tool]:
                 "Much more efficient than calling twincat_write_var multiple times. "
                 "Accepts a dictionary of symbol paths to string values coerced to each symbol's PLC type. "
                 "Returns previous and new values for each symbol. "
-                "DANGEROUS: Requires armed mode. Writes are sequential — if one fails, "
-                "previous writes in the batch are NOT rolled back."
+                "DANGEROUS: Requires armed mode. A failed write does NOT roll back "
+                "the others in the batch."
             ),
             inputSchema={
                 "type": "object",
@@ -1269,6 +1292,12 @@ def get_tool_schemas() -> list[Tool]:
                         "description": "Dictionary of symbol paths to values (e.g., {'GVL.x': '42', 'GVL.y': '3.14'}). Max 500 entries.",
                         "additionalProperties": {"type": "string"}
                     },
+                    "verify": {
+                        "type": "boolean",
+                        "description": "Read the values back after writing and report them as NewValue (default: true). "
+                                       "Set false to save a round-trip; NewValue is then the value written.",
+                        "default": True
+                    },
                     "port": {
                         "type": "integer",
                         "description": "ADS port number (default: 851)",
@@ -1283,6 +1312,154 @@ def get_tool_schemas() -> list[Tool]:
                 "idempotentHint": True
             }
         ),
+        Tool(
+            name="twincat_watch_subscribe",
+            description=(
+                "Start watching PLC variables instead of polling twincat_read_var. "
+                "Registers an ADS device notification per symbol (on change, or every cycle) and buffers "
+                "every sample in the server. Returns a watchId; call twincat_watch_read to get all "
+                "samples since your last cursor in one response, and twincat_watch_unsubscribe when done. "
+                "Uses the Python ADS client (direct AMS/TCP to the target's router)."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "amsNetId": {
+                        "type": "string",
+                        "description": f"Target AMS Net ID. {_AMS_NET_ID_DESC}"
+                    },
+                    "symbols": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Symbol paths to watch (e.g., ['MAIN.nState', 'GVL.fSpeed'])"
+                    },
+                    "mode": {
+                        "type": "string",
+                        "enum": ["change", "cyclic"],
+                        "description": "'change': a sample only when the value changed (default). 'cyclic': a sample every cycleTimeMs",
+                        "default": "change"
+                    },
+                    "cycleTimeMs": {
+                        "type": "number",
+                        "description": "How often the PLC checks the values, in ms (default: 100)",
+                        "default": 100
+                    },
+                    "capacity": {
+                        "type": "integer",
+                        "description": "Samples kept in the buffer; older ones are dropped when it is full (default: 10000, max 1000000)",
+                        "default": 10000
+                    },
+                    "port": {
+                        "type": "integer",
+                        "description": "ADS port number (default: 851)",
+                        "default": 851
+                    }
+                },
+                "required": ["symbols"]
+            },
+            annotations={
+                "readOnlyHint": True,
+                "destructiveHint": False,
+                "idempotentHint": False
+            }
+        ),
+        Tool(
+            name="twincat_watch_read",
+            description=(
+                "Return the samples a watch (twincat_watch_subscribe) collected after `cursor`, oldest first, "
+                "with their PLC timestamps. Pass the returned cursor to the next call to get only new samples. "
+                "Reports how many samples were dropped if the buffer overflowed in between."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "watchId": {
+                        "type": "string",
+                        "description": "Watch id returned by twincat_watch_subscribe"
+                    },
+                    "cursor": {
+                        "type": "integer",
+                        "description": "Cursor from the previous twincat_watch_read (default: 0 = from the oldest buffered sample)",
+                        "default": 0
+                    },
+                    "max": {
+                        "type": "integer",
+                        "description": "Most samples to return (default: 1000)",
+                        "default": 1000
+                    }
+                },
+                "required": ["watchId"]
+            },
+            annotations={
+                "readOnlyHint": True,
+                "destructiveHint": False,
+                "idempotentHint": False
+            }
+        ),
+        Tool(
+            name="twincat_watch_unsubscribe",
+            description="Stop a watch started with twincat_watch_subscribe: deletes its ADS notifications and frees its buffer.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "watchId": {
+                        "type": "string",
+                        "description": "Watch id returned by twincat_watch_subscribe"
+                    }
+                },
+                "required": ["watchId"]
+            },
+            annotations={
+                "readOnlyHint": True,
+                "destructiveHint": False,
+                "idempotentHint": True
+            }
+        ),
+        Tool(
+            name="twincat_wait_for_condition",
+            description=(
+                "Wait server-side until a PLC condition holds, instead of polling twincat_read_var or "
+                "twincat_get_state. Returns the moment the condition is true (or at the timeout) with the "
+                "time it took and the values seen on the way. Condition syntax as in twincat_ads_record "
+                "triggers: 'MAIN.nState == 3', 'GVL.fTemp >= 80.5', 'MAIN.eMode == Auto', 'MAIN.bDone == TRUE', "
+                "or 'AdsState == Run' for the runtime state. Uses an on-change ADS notification, "
+                "falling back to adaptive polling. Uses the Python ADS client (direct AMS/TCP to the target's router)."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "amsNetId": {
+                        "type": "string",
+                        "description": f"Target AMS Net ID. {_AMS_NET_ID_DESC}"
+                    },
+                    "condition": {
+                        "type": "string",
+                        "description": "'<symbol> <op> <value>' with op one of >, <, >=, <=, ==, != (e.g., 'MAIN.nState == 3', 'AdsState == Run')"
+                    },
+                    "timeoutSec": {
+                        "type": "number",
+                        "description": "Give up after this many seconds (default: 10, max 300)",
+                        "default": 10
+                    },
+                    "cycleTimeMs": {
+                        "type": "number",
+                        "description": "How often the PLC checks the value, in ms (default: 10)",
+                        "default": 10
+                    },
+                    "port": {
+                        "type": "integer",
+                        "description": "ADS port number (default: 851)",
+                        "default": 851
+                    }
+                },
+                "required": ["condition"]
+            },
+            annotations={
+                "readOnlyHint": True,
+                "destructiveHint": False,
+                "idempotentHint": True
+            }
+        ),
 
         # ── ADS direct recording ─────────────────────────────────────────────
         Tool(
@@ -1324,7 +1501,80 @@ def get_tool_schemas() -> list[Tool]:
                     },
                     "outputPath": {
                         "type": "string",
-                        "description": "Optional path for the CSV output file. Default: auto-generated in temp folder."
+                        "description": "Optional path for the output file. Default: auto-generated in temp folder."
+                    },
+                    "outputFormat": {
+                        "type": "string",
+                        "enum": ["csv", "tcrec"],
+                        "description": "'csv' (default) or 'tcrec': columnar binary, each variable in its PLC type, several times smaller and memory-mapped on read. Default: by the outputPath extension, else csv."
+                    },
+                    "startTrigger": {
+                        "type": "string",
+                        "description": "Start recording when this condition is met. Format: 'VariablePath operator value' (e.g. 'MAIN.bRunning == 1'). Operators: > < >= <= == !="
+                    },
+                    "stopTrigger": {
+                        "type": "string",
+                        "description": "Stop recording when this condition is met. Format: 'VariablePath operator value'. Operators: > < >= <= == !="
+                    },
+                    "maxTimeSec": {
+                        "type": "number",
+                        "description": "Max seconds to wait for startTrigger, and safety fallback for open-ended recordings. Does NOT cap a timed durationSec recording. Default: 60",
+                        "default": 60
+                    }
+                },
+                "required": ["amsNetId", "variables"]
+            },
+            annotations={
+                "readOnlyHint": True,
+                "destructiveHint": False,
+                "idempotentHint": True
+            }
+        ),
+
+        Tool(
+            name="twincat_ads_record_start",
+            description=(
+                "Start a twincat_ads_record recording in the background and return at once with a job id, "
+                "so you can trigger the machine, read or write variables while it records. Same arguments "
+                "and file as twincat_ads_record. Poll with twincat_ads_record_status (progress and the last "
+                "rows recorded) and finish with twincat_ads_record_stop. Several recordings, also on different "
+                "targets, can run at once. Uses the Python ADS client (direct AMS/TCP to the target's router)."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "amsNetId": {
+                        "type": "string",
+                        "description": f"AMS Net ID of the target PLC. {_AMS_NET_ID_DESC}"
+                    },
+                    "port": {
+                        "type": "integer",
+                        "description": "ADS port number (default: 851 for PLC, 501 for NC)",
+                        "default": 851
+                    },
+                    "variables": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "List of PLC variable paths to record (e.g., ['GVL.fSpeed', 'GVL.fPosition'])"
+                    },
+                    "sampleTimeMs": {
+                        "type": "integer",
+                        "description": "Sample interval in milliseconds (min: 1, default: 10)",
+                        "default": 10
+                    },
+                    "durationSec": {
+                        "type": "number",
+                        "description": "Recording duration in seconds (0 = until twincat_ads_record_stop, the stop trigger or maxTimeSec)",
+                        "default": 0
+                    },
+                    "outputPath": {
+                        "type": "string",
+                        "description": "Optional path for the output file. Default: auto-generated in temp folder."
+                    },
+                    "outputFormat": {
+                        "type": "string",
+                        "enum": ["csv", "tcrec"],
+                        "description": "'csv' (default) or 'tcrec', as in twincat_ads_record. Default: by the outputPath extension, else csv."
                     },
                     "startTrigger": {
                         "type": "string",
@@ -1338,10 +1588,172 @@ def get_tool_schemas() -> list[Tool]:
                         "type": "number",
                         "description": "Max seconds to wait for startTrigger, and safety fallback for open-ended recordings. Does NOT cap a timed durationSec recording. Default: 60",
                         "default": 60
+                    },
+                    "tailRows": {
+                        "type": "integer",
+                        "description": "How many of the latest rows to keep in memory for twincat_ads_record_status (default: 1000, max 100000, 0 = none)",
+                        "default": 1000
                     }
                 },
                 "required": ["amsNetId", "variables"]
             },
+            annotations={
+                "readOnlyHint": True,
+                "destructiveHint": False,
+                "idempotentHint": False
+            }
+        ),
+        Tool(
+            name="twincat_ads_record_status",
+            description=(
+                "Progress of a recording started with twincat_ads_record_start: its state (waiting for the "
+                "start trigger, recording, done), rows recorded so far, and the last `tail` rows with their "
+                "PLC timestamps. Without jobId, lists every background recording."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "jobId": {
+                        "type": "string",
+                        "description": "Job id returned by twincat_ads_record_start (omit to list all)"
+                    },
+                    "tail": {
+                        "type": "integer",
+                        "description": "How many of the latest rows to return (default: 10, at most the job's tailRows)",
+                        "default": 10
+                    }
+                }
+            },
+            annotations={
+                "readOnlyHint": True,
+                "destructiveHint": False,
+                "idempotentHint": True
+            }
+        ),
+        Tool(
+            name="twincat_ads_record_stop",
+            description=(
+                "Stop a recording started with twincat_ads_record_start, or collect one that already "
+                "finished: deletes its ADS notifications, writes the rest of the file and returns the same "
+                "summary as twincat_ads_record."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "jobId": {
+                        "type": "string",
+                        "description": "Job id returned by twincat_ads_record_start"
+                    }
+                },
+                "required": ["jobId"]
+            },
+            annotations={
+                "readOnlyHint": True,
+                "destructiveHint": False,
+                "idempotentHint": True
+            }
+        ),
+
+        Tool(
+            name="twincat_convert_recording",
+            description=(
+                "Convert a twincat_ads_record output between CSV and the columnar binary .tcrec format: "
+                "a .tcrec file becomes CSV, anything else is read as the recorder's CSV and becomes .tcrec. "
+                "Streams the file in chunks, so it works on recordings larger than memory. "
+                "CSV has no PLC types, so variables converted from CSV are stored as LREAL (float64)."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "inputPath": {
+                        "type": "string",
+                        "description": "Recording to convert (.csv or .tcrec)"
+                    },
+                    "outputPath": {
+                        "type": "string",
+                        "description": "Where to write the result. Default: inputPath with the other extension."
+                    }
+                },
+                "required": ["inputPath"]
+            },
+            annotations={
+                "readOnlyHint": False,
+                "destructiveHint": False,
+                "idempotentHint": True
+            }
+        ),
+
+        Tool(
+            name="twincat_analyze_recording",
+            description=(
+                "Statistics of a twincat_ads_record output (CSV or .tcrec) without reading it into context: "
+                "per variable min, max, mean, std, percentiles, rising/falling edge counts with rise/fall times "
+                "(10%-90% of the range), plus sample interval jitter and gaps. "
+                "Streams the file in chunks, so memory use does not grow with the file size. "
+                "Use this instead of reading a recording's rows."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "Recording to analyze (.csv or .tcrec)"
+                    },
+                    "variables": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Variables to analyze (default: all)"
+                    },
+                    "percentiles": {
+                        "type": "array",
+                        "items": {"type": "number"},
+                        "description": "Percentiles to report, 0-100 (default: [1, 5, 25, 50, 75, 95, 99])"
+                    }
+                },
+                "required": ["path"]
+            },
+            annotations={
+                "readOnlyHint": True,
+                "destructiveHint": False,
+                "idempotentHint": True
+            }
+        ),
+
+        Tool(
+            name="twincat_preview_recording",
+            description=(
+                "Downsample a twincat_ads_record output (CSV or .tcrec) to a small preview, about 500 points "
+                "per variable by default, that keeps its shape and its spikes. Use it to look at a long recording "
+                "instead of reading its rows. 'lttb' (default): largest-triangle-three-buckets over a min/max "
+                "pre-selection; 'minmax': the min and max of each bucket, the envelope. "
+                "Streams the file in chunks, so it works on recordings larger than memory."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "Recording to preview (.csv or .tcrec)"
+                    },
+                    "variables": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Variables to preview (default: all)"
+                    },
+                    "points": {
+                        "type": "integer",
+                        "description": "Points per variable (default: 500, max 10000)",
+                        "default": 500
+                    },
+                    "method": {
+                        "type": "string",
+                        "enum": ["lttb", "minmax"],
+                        "description": "'lttb' (default) or 'minmax'",
+                        "default": "lttb"
+                    }
+                },
+                "required": ["path"]
+            },
             annotations={
                 "readOnlyHint": True,
                 "destructiveHint": False,